@@ -20,6 +20,7 @@ from tabulate import tabulate
 from .core.analyzer_enhanced import EnhancedBinarySniffer
 from .core.config import Config
 from .core.results import BatchAnalysisResult
+from .output.streaming import NdjsonWriter, is_ndjson_path, open_output, output_suffix
 from .signatures.generator import SignatureGenerator
 from .__init__ import __version__
 
@@ -91,9 +92,9 @@ def cli(ctx, config, data_dir, verbose, log_level, non_deterministic):
 @click.option('-o', '--output', type=click.Path(), 
               help='Save results to file (format auto-detected from extension)')
 @click.option('-f', '--format', 
-              type=click.Choice(['table', 'json', 'csv', 'cyclonedx', 'cdx', 'sbom', 'kissbom', 'kiss'], case_sensitive=False),
+              type=click.Choice(['table', 'json', 'ndjson', 'csv', 'cyclonedx', 'cdx', 'sbom', 'kissbom', 'kiss'], case_sensitive=False),
               default='table', show_default=True,
-              help='Output format (sbom/cyclonedx for SBOM, kiss/kissbom for KISS BOM)')
+              help='Output format (ndjson streams one result per line, sbom/cyclonedx for SBOM, kiss/kissbom for KISS BOM)')
 # Performance options
 @click.option('--deep', is_flag=True, 
               help='Deep analysis mode (slower, more thorough)')
@@ -101,6 +102,8 @@ def cli(ctx, config, data_dir, verbose, log_level, non_deterministic):
               help='Fast mode (skip TLSH fuzzy matching)')
 @click.option('--parallel/--no-parallel', default=True, show_default=True,
               help='Enable parallel processing for directories')
+@click.option('-j', '--workers', type=int, default=None,
+              help='Worker processes for parallel directory analysis (default: parallel_workers setting)')
 # Hash options
 @click.option('--with-hashes', is_flag=True,
               help='Include all hashes (MD5, SHA1, SHA256, TLSH, ssdeep)')
@@ -122,9 +125,9 @@ def cli(ctx, config, data_dir, verbose, log_level, non_deterministic):
 @click.option('--show-features', is_flag=True,
               help='Display extracted features (for debugging)')
 @click.option('--save-features', type=click.Path(),
-              help='Save features to JSON (for signature creation)')
+              help='Save features to JSON (for signature creation; .ndjson/.jsonl streams per file, .zst compresses)')
 @click.option('--full-export', type=click.Path(),
-              help='Export ALL features without limits to JSON (includes file relationships)')
+              help='Export ALL features without limits to JSON (includes file relationships; .ndjson/.jsonl streams per file, .zst compresses)')
 # Advanced options (hidden from basic help)
 @click.option('--tlsh-threshold', type=int, default=70, hidden=True,
               help='TLSH distance threshold (0-300, lower=more similar)')
@@ -136,11 +139,20 @@ def cli(ctx, config, data_dir, verbose, log_level, non_deterministic):
               help='Skip metadata files (plist, config, etc.) - speeds up analysis')
 @click.option('--timeout', type=int, default=60, show_default=True,
               help='Timeout in seconds for analyzing each file')
+@click.option('--no-cache', is_flag=True, default=False,
+              help='Re-analyze every file instead of reusing cached results')
+@click.option('--incremental', is_flag=True, default=False,
+              help='Only re-analyze files changed since the previous --incremental scan of the directory')
+@click.option('--cluster-duplicates', is_flag=True, default=False,
+              help='Analyze one file per cluster of near-identical files (TLSH) and copy its results to the others')
+@click.option('--cluster-threshold', type=int, default=10, hidden=True,
+              help='Maximum TLSH distance within a near-duplicate cluster')
 @click.pass_context
 def analyze(ctx, path, recursive, threshold, patterns, output, format, deep, fast, parallel,
-            with_hashes, basic_hashes, min_matches, license_focus, license_only,
+            workers, with_hashes, basic_hashes, min_matches, license_focus, license_only,
             debug, show_evidence, show_features, save_features, full_export,
-            tlsh_threshold, feature_limit, include_large, skip_metadata, timeout):
+            tlsh_threshold, feature_limit, include_large, skip_metadata, timeout, no_cache,
+            incremental, cluster_duplicates, cluster_threshold):
     """
     Analyze files for open source components and security issues.
     
@@ -158,10 +170,14 @@ def analyze(ctx, path, recursive, threshold, patterns, output, format, deep, fas
         binarysniffer analyze app.apk -o report.json    # Auto-detect JSON
         binarysniffer analyze app.apk --sbom -o sbom.json
         binarysniffer analyze app.apk -f csv -o results.csv
+        binarysniffer analyze rootfs/ -r -o results.ndjson   # One line per file, as scanned
         
         # Performance modes
         binarysniffer analyze large.bin --fast          # Quick scan
         binarysniffer analyze app.apk --deep            # Thorough analysis
+        binarysniffer analyze rootfs/ -r -j 32          # 32 worker processes
+        binarysniffer analyze rootfs/ -r --incremental  # Skip unchanged files
+        binarysniffer analyze builds/ -r --cluster-duplicates  # Analyze near-duplicates once
         
         # With hashes
         binarysniffer analyze file.exe --with-hashes -o report.json
@@ -201,14 +217,16 @@ def analyze(ctx, path, recursive, threshold, patterns, output, format, deep, fas
     
     # Auto-detect format from output filename if not specified
     if output and format == 'table':
-        output_path = Path(output)
-        if output_path.suffix.lower() == '.json':
+        suffix = output_suffix(output)  # .zst compression ignored
+        if suffix == '.json':
             format = 'json'
-        elif output_path.suffix.lower() == '.csv':
+        elif suffix in ('.ndjson', '.jsonl'):
+            format = 'ndjson'
+        elif suffix == '.csv':
             format = 'csv'
-        elif output_path.suffix.lower() in ('.sbom', '.cdx'):
+        elif suffix in ('.sbom', '.cdx'):
             format = 'cyclonedx'
-        elif output_path.suffix.lower() in ('.kissbom', '.kiss', '.bom'):
+        elif suffix in ('.kissbom', '.kiss', '.bom'):
             format = 'kissbom'
     
     # Handle format aliases
@@ -229,15 +247,44 @@ def analyze(ctx, path, recursive, threshold, patterns, output, format, deep, fas
 
     # Set the timeout value on the analyzer
     sniffer.file_timeout = timeout
+    
+    # Worker processes used for directory analysis
+    if workers is not None:
+        sniffer.config.parallel_workers = max(1, workers)
+    
+    # Result cache (totals are shared with worker processes through the cache file)
+    if no_cache:
+        sniffer.config.use_result_cache = False
+    cache_stats_before = sniffer.result_cache.stats() if sniffer.result_cache else None
 
     # Check for updates if auto-update is enabled
     if ctx.obj['config'].auto_update:
         if sniffer.check_updates():
             console.print("[yellow]Updates available. Run 'binarysniffer update' to get latest signatures.[/yellow]")
 
+    # Per-file output written while the scan runs. Features of written
+    # results are released unless a later output or the scan itself
+    # (manifest, duplicate propagation) still uses them
+    keep_features = (
+        show_features or show_evidence or incremental or cluster_duplicates
+        or format == 'json' or (format in ('cyclonedx', 'cdx') and not output)
+        or (save_features and not is_ndjson_path(save_features))
+        or (full_export and not is_ndjson_path(full_export))
+    )
+    streams = None
+
     start_time = time.time()
     
     try:
+        streams = StreamingOutput(
+            format, output, save_features, full_export,
+            min_matches=min_matches,
+            sbom_features=show_features,
+            release_features=not keep_features,
+            include_hashes=include_hashes,
+            include_fuzzy_hashes=include_fuzzy_hashes
+        )
+
         if path.is_file():
             # Single file analysis
             # Enable show_features if show_evidence is set (to get archive contents)
@@ -262,6 +309,7 @@ def analyze(ctx, path, recursive, threshold, patterns, output, format, deep, fas
                     console.print(f"[red]Failed: {result.error}[/red]")
                 else:
                     console.print(f"[green]Completed: Found {len(result.matches)} components[/green]")
+            streams.add(str(path), result)
             results = {str(path): result}
             # Create BatchAnalysisResult for single file
             batch_result = BatchAnalysisResult(
@@ -328,7 +376,10 @@ def analyze(ctx, path, recursive, threshold, patterns, output, format, deep, fas
                     confidence_threshold=threshold,
                     parallel=parallel,
                     progress_callback=update_progress,
-                    include_large=include_large
+                    include_large=include_large,
+                    incremental=incremental,
+                    cluster_threshold=cluster_threshold if cluster_duplicates else None,
+                    result_callback=streams.add if streams.active else None
                 )
                 results = batch_result.results
         
@@ -363,16 +414,13 @@ def analyze(ctx, path, recursive, threshold, patterns, output, format, deep, fas
                 else:
                     console.print("[yellow]No licenses detected[/yellow]")
         
-        # Add file hashes if requested
+        # Add file hashes if requested and not computed during analysis
         if include_hashes or include_fuzzy_hashes:
             from binarysniffer.utils.file_metadata import calculate_file_hashes
             for file_path, result in results.items():
-                if not result.error:
+                if not result.error and result.file_hashes is None:
                     try:
-                        hashes = calculate_file_hashes(Path(file_path), include_fuzzy=include_fuzzy_hashes)
-                        # Add hashes to the result - we'll need to update the AnalysisResult class
-                        if not hasattr(result, 'file_hashes'):
-                            result.file_hashes = hashes
+                        result.file_hashes = calculate_file_hashes(Path(file_path), include_fuzzy=include_fuzzy_hashes)
                     except Exception as e:
                         logger.debug(f"Failed to calculate hashes for {file_path}: {e}")
         
@@ -380,21 +428,27 @@ def analyze(ctx, path, recursive, threshold, patterns, output, format, deep, fas
         if not hasattr(batch_result, 'total_time'):
             batch_result.total_time = time.time() - start_time
         
+        # Finish the output written during the scan
+        streams.finish(batch_result)
+        
         # Save features to file if requested
-        if save_features:
+        if save_features and not streams.features:
             save_extracted_features(batch_result, save_features)
         
         # Full export of all features if requested
-        if full_export:
+        if full_export and not streams.export:
             export_all_features(batch_result, full_export)
         
-        # Output results
-        if format == 'json':
+        # Output results (NDJSON and SBOM files were written during the scan)
+        if format == 'ndjson':
+            pass
+        elif format == 'json':
             output_json(batch_result, output, min_matches, show_evidence)
         elif format == 'csv':
             output_csv(batch_result, output, min_matches)
         elif format in ('cyclonedx', 'cdx'):
-            output_cyclonedx(batch_result, output, show_features)
+            if not streams.sbom:
+                output_cyclonedx(batch_result, output, show_features)
         elif format in ('kissbom', 'kiss'):
             # Determine KISS BOM format type
             kiss_format = 'json'  # Default
@@ -408,13 +462,24 @@ def analyze(ctx, path, recursive, threshold, patterns, output, format, deep, fas
         if format == 'table' or output:
             console.print(f"\n[green]Analysis complete![/green]")
             console.print(f"Files analyzed: {batch_result.total_files}")
+            if getattr(batch_result, 'unchanged_files', 0):
+                console.print(f"Unchanged files (reused): {batch_result.unchanged_files}")
+            if getattr(batch_result, 'propagated_files', 0):
+                console.print(f"Near-duplicates (results copied): {batch_result.propagated_files}")
             console.print(f"Components found: {len(batch_result.all_components)}")
             console.print(f"Time elapsed: {batch_result.total_time:.2f}s")
+            if cache_stats_before is not None:
+                cache_stats = sniffer.result_cache.stats()
+                console.print(f"Result cache: {cache_stats['hits'] - cache_stats_before['hits']} hits, "
+                              f"{cache_stats['misses'] - cache_stats_before['misses']} misses")
         
     except Exception as e:
         console.print(f"[red]Error: {e}[/red]")
         logger.exception("Analysis failed")
         sys.exit(1)
+    finally:
+        if streams is not None:
+            streams.close()
 
 
 @cli.command()
@@ -643,6 +708,25 @@ def stats(ctx):
             table.add_row(f"  {type_names.get(sig_type, 'Unknown')}", f"{count:,}")
     
     console.print(table)
+    
+    # Result cache
+    if config.use_result_cache and config.cache_size_mb > 0:
+        from .storage.result_cache import ResultCache
+        cache_stats = ResultCache(config.cache_dir, config.cache_size_mb).stats()
+        lookups = cache_stats['hits'] + cache_stats['misses']
+        hit_rate = cache_stats['hits'] / lookups if lookups else 0.0
+        
+        console.print("\n[bold]Result Cache[/bold]\n")
+        cache_table = Table(show_header=False)
+        cache_table.add_column("Metric", style="cyan")
+        cache_table.add_column("Value", style="green")
+        cache_table.add_row("Cached Results", f"{cache_stats['entries']:,}")
+        cache_table.add_row("Cache Size", f"{cache_stats['size_bytes'] / 1024 / 1024:.1f} / "
+                                          f"{cache_stats['max_size_bytes'] / 1024 / 1024:.0f} MB")
+        cache_table.add_row("Hits", f"{cache_stats['hits']:,}")
+        cache_table.add_row("Misses", f"{cache_stats['misses']:,}")
+        cache_table.add_row("Hit Rate", f"{hit_rate:.1%}")
+        console.print(cache_table)
 
 
 @cli.command()
@@ -735,8 +819,13 @@ def config(ctx):
 @click.option('--deep', is_flag=True, help='Perform deep analysis including weight inspection')
 @click.option('--sandbox', is_flag=True, help='Run analysis in isolated environment (not implemented)')
 @click.option('--show-features', is_flag=True, help='Show extracted features')
+@click.option('-j', '--workers', type=int, default=None,
+              help='Worker processes for scanning several files (default: parallel_workers setting)')
+@click.option('--timeout', type=int, default=300, show_default=True,
+              help='Timeout in seconds per file when scanning several files')
 @click.pass_context
-def ml_scan(ctx, path, recursive, security_only, risk_threshold, format, output, deep, sandbox, show_features):
+def ml_scan(ctx, path, recursive, security_only, risk_threshold, format, output, deep, sandbox,
+            show_features, workers, timeout):
     """Perform security analysis on ML models.
     
     This command specializes in detecting malicious code, backdoors,
@@ -748,10 +837,8 @@ def ml_scan(ctx, path, recursive, security_only, risk_threshold, format, output,
         binarysniffer ml-scan suspicious.pkl --security-only --risk-threshold HIGH
     """
     from pathlib import Path
-    from binarysniffer.security.pickle_analyzer import PickleSecurityAnalyzer
+    from binarysniffer.security.ml_scanner import ML_MODEL_EXTENSIONS, MLModelScanner
     from binarysniffer.security.risk_scorer import RiskLevel
-    from binarysniffer.security.obfuscation import ObfuscationDetector
-    from binarysniffer.security.validators import ModelIntegrityValidator
     
     if sandbox:
         console.print("[yellow]Warning: Sandbox mode not yet implemented[/yellow]")
@@ -765,8 +852,7 @@ def ml_scan(ctx, path, recursive, security_only, risk_threshold, format, output,
     elif path.is_dir():
         if recursive:
             # Find all ML model files
-            ml_extensions = ['.pkl', '.pickle', '.p', '.onnx', '.safetensors', '.pt', '.pth', '.pb', '.h5']
-            for ext in ml_extensions:
+            for ext in ML_MODEL_EXTENSIONS:
                 files_to_scan.extend(path.rglob(f'*{ext}'))
         else:
             files_to_scan = [f for f in path.iterdir() if f.is_file()]
@@ -775,7 +861,6 @@ def ml_scan(ctx, path, recursive, security_only, risk_threshold, format, output,
         console.print("[yellow]No ML model files found to scan[/yellow]")
         return
     
-    results = []
     risk_threshold_map = {
         'LOW': RiskLevel.LOW,
         'MEDIUM': RiskLevel.MEDIUM,
@@ -784,12 +869,12 @@ def ml_scan(ctx, path, recursive, security_only, risk_threshold, format, output,
     }
     min_risk = risk_threshold_map[risk_threshold]
     
-    # Initialize analyzers
-    pickle_analyzer = PickleSecurityAnalyzer()
-    obfuscation_detector = ObfuscationDetector()
-    integrity_validator = ModelIntegrityValidator()
+    # Initialize scanner
+    scanner = MLModelScanner(ctx.obj['config'])
+    scanner.show_features = show_features
+    scanner.file_timeout = timeout
     
-    # Scan each file
+    # Scan files, in worker processes when there are several
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
@@ -799,58 +884,14 @@ def ml_scan(ctx, path, recursive, security_only, risk_threshold, format, output,
     ) as progress:
         scan_task = progress.add_task(f"Scanning {len(files_to_scan)} files...", total=len(files_to_scan))
         
-        for file_path in files_to_scan:
-            progress.update(scan_task, description=f"Scanning {file_path.name}...")
-            
-            # Determine file type
-            file_type = 'unknown'
-            if file_path.suffix.lower() in ['.pkl', '.pickle', '.p']:
-                file_type = 'pickle'
-            elif file_path.suffix.lower() == '.onnx':
-                file_type = 'onnx'
-            elif file_path.suffix.lower() == '.safetensors':
-                file_type = 'safetensors'
-            elif file_path.suffix.lower() in ['.pt', '.pth']:
-                file_type = 'pytorch'
-            elif file_path.suffix.lower() in ['.pb', '.h5']:
-                file_type = 'tensorflow'
-            
-            # Perform security analysis based on file type
-            if file_type == 'pickle':
-                risk_assessment, features = pickle_analyzer.analyze_pickle(str(file_path))
-                
-                # Check obfuscation
-                with open(file_path, 'rb') as f:
-                    content = f.read()
-                obfusc_results = obfuscation_detector.detect_obfuscation(content, features)
-                
-                # Validate integrity
-                integrity_results = integrity_validator.validate_model(str(file_path), file_type)
-                
-                # Combine results
-                result = {
-                    'file': str(file_path),
-                    'type': file_type,
-                    'risk_assessment': risk_assessment,
-                    'obfuscation': obfusc_results,
-                    'integrity': integrity_results,
-                    'features': list(features) if show_features else None
-                }
-                
-                # Filter by risk threshold
-                if risk_assessment.level.value >= min_risk.value:
-                    results.append(result)
+        def update_progress(current, total, file_path=None):
+            if file_path:
+                progress.update(scan_task, description=f"Scanning {Path(file_path).name}...")
             else:
-                # For other file types, use basic validation for now
-                integrity_results = integrity_validator.validate_model(str(file_path), file_type)
-                result = {
-                    'file': str(file_path),
-                    'type': file_type,
-                    'integrity': integrity_results
-                }
-                results.append(result)
-            
-            progress.advance(scan_task)
+                progress.update(scan_task, completed=current)
+        
+        results = scanner.scan_files(files_to_scan, min_risk, workers=workers,
+                                     progress_callback=update_progress)
     
     # Output results
     if format == 'table':
@@ -913,6 +954,9 @@ def _display_ml_security_table(results, security_only):
             if integrity.status.value != 'VALID':
                 issues.append(f"Integrity: {integrity.status.value}")
         
+        if 'error' in result:
+            issues.append(f"Error: {result['error']}")
+        
         # Format for display
         issues_str = '\n'.join(issues) if issues else "None"
         recommendations_str = '\n'.join(recommendations) if recommendations else "Review model"
@@ -958,6 +1002,9 @@ def _output_ml_security_json(results, output_path):
         if 'features' in result and result['features']:
             json_result['features'] = result['features']
         
+        if 'error' in result:
+            json_result['error'] = result['error']
+        
         json_results.append(json_result)
     
     output_data = {
@@ -1078,6 +1125,9 @@ def _output_ml_security_markdown(results, output_path):
         markdown.append(f"\n### {file_name}")
         markdown.append(f"- **Type**: {result['type']}")
         
+        if 'error' in result:
+            markdown.append(f"- **Error**: {result['error']}")
+        
         if 'risk_assessment' in result:
             risk = result['risk_assessment']
             markdown.append(f"- **Risk Level**: {risk.level.value}")
@@ -1141,6 +1191,9 @@ def _output_ml_security_sbom(results, output_path):
             "properties": []
         }
         
+        if 'error' in result:
+            component["properties"].append({"name": "security:error", "value": result['error']})
+        
         if 'risk_assessment' in result:
             risk = result['risk_assessment']
             component["properties"].extend([
@@ -1310,6 +1363,25 @@ def signatures_rebuild(ctx, github):
     console.print(f"  - Total signatures: {stats['total']}")
 
 
+@signatures.command(name='compile')
+@click.pass_context
+def signatures_compile(ctx):
+    """Precompile the matcher snapshot for fast startup."""
+    from .matchers.direct import DirectMatcher
+    
+    config = ctx.obj['config']
+    
+    with console.status("Compiling matcher snapshot..."):
+        matcher = DirectMatcher(config, use_snapshot=False)
+        matcher.save_snapshot()
+    
+    if config.snapshot_path.exists():
+        size_kb = config.snapshot_path.stat().st_size / 1024
+        console.print(f"[green]Compiled {len(matcher.signatures):,} signatures into {config.snapshot_path} ({size_kb:.0f} KB)[/green]")
+    else:
+        console.print("[red]Failed to write matcher snapshot[/red]")
+
+
 @signatures.command(name='update')
 @click.option('--force', is_flag=True, help='Force download even if up to date')
 @click.pass_context  
@@ -1601,7 +1673,7 @@ def save_extracted_features(batch_result: BatchAnalysisResult, output_path: str)
             features_data[file_path] = result.extracted_features.to_dict()
     
     if features_data:
-        with open(output_path, 'w') as f:
+        with open_output(output_path) as f:
             json.dump(features_data, f, indent=2)
         console.print(f"[green]Saved extracted features to {output_path}[/green]")
     else:
@@ -1622,45 +1694,174 @@ def export_all_features(batch_result: BatchAnalysisResult, output_path: str):
     total_features = 0
     for file_path, result in batch_result.results.items():
         if result.extracted_features:
-            file_data = {
-                "file_info": {
-                    "path": file_path,
-                    "size": result.file_size,
-                    "type": result.file_type,
-                    "analysis_time": result.analysis_time
-                },
-                "features": result.extracted_features.to_dict(),
-                "components_detected": [
-                    {
-                        "name": match.component,
-                        "confidence": match.confidence,
-                        "version": match.version,
-                        "license": match.license
-                    } for match in result.matches
-                ] if result.matches else []
-            }
-            
-            # Count features
-            if result.extracted_features and result.extracted_features.by_extractor:
-                for extractor_data in result.extracted_features.by_extractor.values():
-                    if 'features_by_type' in extractor_data:
-                        for feature_list in extractor_data['features_by_type'].values():
-                            total_features += len(feature_list)
-            
-            export_data["files"][file_path] = file_data
+            export_data["files"][file_path] = feature_export_record(file_path, result)
+            total_features += count_features(result)
     
     export_data["metadata"]["total_features_extracted"] = total_features
     
     if export_data["files"]:
-        with open(output_path, 'w') as f:
+        with open_output(output_path) as f:
             json.dump(export_data, f, indent=2)
-        console.print(f"[green]✓ Full feature export saved to {output_path}[/green]")
-        console.print(f"  • Files analyzed: {len(export_data['files'])}")
-        console.print(f"  • Total features extracted: {total_features:,}")
+        print_export_summary(output_path, len(export_data["files"]), total_features)
     else:
         console.print("[yellow]No features to export (use --full-export with file analysis)[/yellow]")
 
 
+def feature_export_record(file_path: str, result) -> Dict[str, Any]:
+    """Full feature export entry of one analyzed file"""
+    return {
+        "file_info": {
+            "path": file_path,
+            "size": result.file_size,
+            "type": result.file_type,
+            "analysis_time": result.analysis_time
+        },
+        "features": result.extracted_features.to_dict(),
+        "components_detected": [
+            {
+                "name": match.component,
+                "confidence": match.confidence,
+                "version": match.version,
+                "license": match.license
+            } for match in result.matches
+        ] if result.matches else []
+    }
+
+
+def count_features(result) -> int:
+    """Number of features collected for a result, over all extractors"""
+    total = 0
+    if result.extracted_features and result.extracted_features.by_extractor:
+        for extractor_data in result.extracted_features.by_extractor.values():
+            if 'features_by_type' in extractor_data:
+                for feature_list in extractor_data['features_by_type'].values():
+                    total += len(feature_list)
+    return total
+
+
+def print_export_summary(output_path: str, files: int, total_features: int):
+    """Report a saved full feature export"""
+    console.print(f"[green]✓ Full feature export saved to {output_path}[/green]")
+    console.print(f"  • Files analyzed: {files}")
+    console.print(f"  • Total features extracted: {total_features:,}")
+
+
+class StreamingOutput:
+    """
+    Output written file by file while a scan runs.
+    
+    NDJSON results (-f ndjson), NDJSON feature files (--save-features or
+    --full-export with a .ndjson/.jsonl path) and CycloneDX SBOMs saved to
+    a file are written as each result completes, so a crash keeps what
+    was written. Unless later output still needs them, the features of a
+    written result are then released, keeping memory flat however many
+    files are scanned.
+    """
+    
+    def __init__(self, format: str, output: Optional[str], save_features: Optional[str],
+                 full_export: Optional[str], min_matches: int = 0, sbom_features: bool = False,
+                 release_features: bool = False, include_hashes: bool = False,
+                 include_fuzzy_hashes: bool = False):
+        self.min_matches = min_matches
+        self.include_hashes = include_hashes
+        self.include_fuzzy_hashes = include_fuzzy_hashes
+        self.output = output
+        self.results = None
+        self.features = None
+        self.export = None
+        self.sbom = None
+        self.exported_features = 0
+        self._sbom_stream = None
+        
+        self.streams_results = format == 'ndjson'
+        if self.streams_results and output:
+            self.results = NdjsonWriter(output)
+        if save_features and is_ndjson_path(save_features):
+            self.features = NdjsonWriter(save_features)
+        if full_export and is_ndjson_path(full_export):
+            self.export = NdjsonWriter(full_export)
+        if format in ('cyclonedx', 'cdx') and output:
+            from .output.cyclonedx_formatter import CycloneDxStreamWriter
+            self._sbom_stream = open_output(output)
+            self.sbom = CycloneDxStreamWriter(self._sbom_stream, include_features=sbom_features)
+        
+        self.active = bool(self.streams_results or self.features or self.export or self.sbom)
+        self.release_features = release_features and self.active
+    
+    def add(self, file_path: str, result):
+        """Write the output of one finished file"""
+        if (self.include_hashes or self.include_fuzzy_hashes) and not result.error and result.file_hashes is None:
+            from binarysniffer.utils.file_metadata import calculate_file_hashes
+            try:
+                result.file_hashes = calculate_file_hashes(Path(file_path), include_fuzzy=self.include_fuzzy_hashes)
+            except Exception as e:
+                logger.debug(f"Failed to calculate hashes for {file_path}: {e}")
+        
+        if result.extracted_features:
+            if self.features:
+                self.features.write({"record": "features", "file_path": file_path,
+                                     **result.extracted_features.to_dict()})
+            if self.export:
+                self.export.write({"record": "file", **feature_export_record(file_path, result)})
+                self.exported_features += count_features(result)
+        
+        if self.sbom:
+            self.sbom.add_result(file_path, result)
+        
+        if self.streams_results:
+            filter_matches(result, self.min_matches)
+            record = {"record": "result", **result.to_dict()}
+            if self.results:
+                self.results.write(record)
+            else:
+                console.print(json.dumps(record, default=str), markup=False, highlight=False, soft_wrap=True)
+        
+        if self.release_features:
+            result.extracted_features = None
+    
+    def finish(self, batch_result: BatchAnalysisResult):
+        """Write the batch summaries, close the files and report them"""
+        if self.streams_results:
+            record = {"record": "summary", **batch_result.summary_to_dict()}
+            if self.results:
+                self.results.write(record)
+                console.print(f"[green]Results saved to {self.output}[/green]")
+            else:
+                console.print(json.dumps(record, default=str), markup=False, highlight=False, soft_wrap=True)
+        
+        if self.features:
+            if self.features.records:
+                console.print(f"[green]Saved extracted features to {self.features.path}[/green]")
+            else:
+                console.print("[yellow]No features to save (use --show-features to enable feature collection)[/yellow]")
+        
+        if self.export:
+            files = self.export.records
+            self.export.write({
+                "record": "metadata",
+                "total_files": len(batch_result.results),
+                "export_timestamp": datetime.now().isoformat(),
+                "analysis_time": getattr(batch_result, 'total_time', 0),
+                "total_features_extracted": self.exported_features
+            })
+            print_export_summary(str(self.export.path), files, self.exported_features)
+        
+        if self.sbom:
+            self.sbom.close(batch_result)
+            console.print(f"[green]SBOM saved to {self.output}[/green]")
+            console.print(f"[cyan]SBOM contains {len(self.sbom.components)} components[/cyan]")
+        
+        self.close()
+    
+    def close(self):
+        """Close all output files"""
+        for writer in (self.results, self.features, self.export):
+            if writer:
+                writer.close()
+        if self._sbom_stream:
+            self._sbom_stream.close()
+
+
 def output_table(batch_result: BatchAnalysisResult, min_patterns: int = 0, verbose_evidence: bool = False, show_features: bool = False, feature_limit: int = 20):
     """Output results as a table"""
     # Check if this is a multi-file analysis (directory scan)
@@ -2077,28 +2278,34 @@ def output_consolidated_summary(batch_result: BatchAnalysisResult, min_patterns:
             console.print(f"  • {license}: {count} components")
 
 
+def filter_matches(result, min_patterns: int):
+    """Drop matches of a result with fewer than min_patterns matched patterns"""
+    if min_patterns <= 0:
+        return
+    filtered_matches = []
+    for match in result.matches:
+        pattern_count = 0
+        if match.evidence:
+            if 'signatures_matched' in match.evidence:
+                pattern_count = match.evidence['signatures_matched']
+            elif 'signature_count' in match.evidence:
+                pattern_count = match.evidence['signature_count']
+        if pattern_count >= min_patterns:
+            filtered_matches.append(match)
+    result.matches = filtered_matches
+
+
 def output_json(batch_result: BatchAnalysisResult, output_path: Optional[str], min_patterns: int = 0, verbose_evidence: bool = False):
     """Output results as JSON"""
     # Filter results if min_patterns specified
-    if min_patterns > 0:
-        for file_path, result in batch_result.results.items():
-            filtered_matches = []
-            for match in result.matches:
-                pattern_count = 0
-                if match.evidence:
-                    if 'signatures_matched' in match.evidence:
-                        pattern_count = match.evidence['signatures_matched']
-                    elif 'signature_count' in match.evidence:
-                        pattern_count = match.evidence['signature_count']
-                if pattern_count >= min_patterns:
-                    filtered_matches.append(match)
-            result.matches = filtered_matches
+    for result in batch_result.results.values():
+        filter_matches(result, min_patterns)
     
     # JSON always includes full evidence data
     json_str = batch_result.to_json()
     
     if output_path:
-        with open(output_path, 'w') as f:
+        with open_output(output_path) as f:
             f.write(json_str)
         console.print(f"[green]Results saved to {output_path}[/green]")
     else:
@@ -2118,7 +2325,7 @@ def output_cyclonedx(batch_result: BatchAnalysisResult, output_path: Optional[st
     )
     
     if output_path:
-        with open(output_path, 'w') as f:
+        with open_output(output_path) as f:
             f.write(sbom_json)
         console.print(f"[green]SBOM saved to {output_path}[/green]")
         
@@ -11,7 +11,7 @@ from ..storage.database import SignatureDatabase
 from ..storage.updater import SignatureUpdater
 from ..matchers.progressive import ProgressiveMatcher
 from ..matchers.license import LicenseMatcher
-from ..extractors.factory import ExtractorFactory
+from ..extractors.factory import get_default_factory
 from .config import Config
 from .results import AnalysisResult, ComponentMatch
 from .base_analyzer import BaseAnalyzer
@@ -45,7 +45,7 @@ class BinarySniffer(BaseAnalyzer):
         # Initialize components specific to BinarySniffer
         self.matcher = ProgressiveMatcher(self.config)
         self.license_matcher = LicenseMatcher()
-        self.extractor_factory = ExtractorFactory()
+        self.extractor_factory = get_default_factory()
         self.updater = SignatureUpdater(self.config)
         
         # Check if database needs initialization
@@ -106,7 +106,7 @@ class BinarySniffer(BaseAnalyzer):
             file_type=features.file_type,
             matches=matches,
             analysis_time=self.matcher.last_analysis_time,
-            features_extracted=len(features.all_features),
+            features_extracted=features.feature_count,
             confidence_threshold=threshold,
             package_metadata=package_metadata
         )
@@ -2,15 +2,16 @@
 Enhanced Binary Sniffer analyzer with improved detection
 """
 
+import time
 import logging
 from pathlib import Path
-from typing import Union, Optional, List, Dict, Any
+from typing import Union, Optional, List, Dict, Any, Iterable, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from .config import Config
 from .results import AnalysisResult, ComponentMatch
 from .base_analyzer import BaseAnalyzer
-from ..extractors.factory import ExtractorFactory
+from ..extractors.factory import get_default_factory
 # Progressive matcher removed - using only direct matching for deterministic results
 from ..matchers.direct import DirectMatcher
 from ..matchers.license import LicenseMatcher
@@ -18,6 +19,8 @@ from ..matchers.license import LicenseMatcher
 from ..storage.database import SignatureDatabase
 from ..signatures.manager import SignatureManager
 from ..hashing.tlsh_hasher import TLSHHasher, TLSHSignatureStore
+from ..utils.binary_strings import BinaryStringExtractor, ExtractedString
+from ..utils.file_metadata import CRYPTO_HASHES, FUZZY_HASHES, FileDigests, read_file_once
 
 
 logger = logging.getLogger(__name__)
@@ -39,7 +42,7 @@ class EnhancedBinarySniffer(BaseAnalyzer):
         super().__init__(config)
         
         # Initialize components specific to EnhancedBinarySniffer
-        self.extractor_factory = ExtractorFactory()
+        self.extractor_factory = get_default_factory()
         self.signature_manager = SignatureManager(self.config, self.db)
         
         # Check if database needs initialization BEFORE creating matchers
@@ -63,6 +66,9 @@ class EnhancedBinarySniffer(BaseAnalyzer):
         # Instance attributes for feature collection
         self.show_features = False
         self.full_export = False
+        # File hashes computed during directory analysis (same read as the analysis)
+        self.include_hashes = False
+        self.include_fuzzy_hashes = False
     
     def analyze_file(
         self, 
@@ -97,10 +103,50 @@ class EnhancedBinarySniffer(BaseAnalyzer):
             raise FileNotFoundError(f"File not found: {file_path}")
         
         logger.debug(f"Analyzing file: {file_path}")
+        start_time = time.time()
         
-        # Extract features from file
+        use_tlsh = use_tlsh and self.tlsh_hasher.enabled
+        hash_names = []
+        if include_hashes or include_fuzzy_hashes:
+            hash_names = list(CRYPTO_HASHES + FUZZY_HASHES if include_fuzzy_hashes else CRYPTO_HASHES)
+        
+        # The extractor's string scan, TLSH matching, the requested file
+        # hashes and the SHA-256 of the result cache key share one
+        # sequential read
         extractor = self.extractor_factory.get_extractor(file_path)
-        features = extractor.extract(file_path)
+        digest_names = set(hash_names)
+        if use_tlsh:
+            digest_names.add('tlsh')
+        if self.result_cache is not None:
+            digest_names.add('sha256')
+        digests, strings = self._read_once(file_path, digest_names, extractor.string_extractor())
+        
+        # Identical content analyzed with the same signatures and options is
+        # served from the result cache before features are built and matched
+        cache_key = None
+        if 'sha256' in digests and self.result_cache is not None:
+            cache_key = self._result_cache_key(file_path, self._signature_stamp(), {
+                'threshold': confidence_threshold or 0.5,
+                'deep_analysis': deep_analysis,
+                'show_features': show_features,
+                'use_tlsh': use_tlsh,
+                'tlsh_threshold': tlsh_threshold,
+                'tlsh_signatures': len(self.tlsh_store.signatures),
+                'include_hashes': include_hashes,
+                'include_fuzzy_hashes': include_fuzzy_hashes,
+                'full_export': full_export
+            }, content_hash=digests['sha256'])
+            if cache_key:
+                cached = self._get_cached_result(cache_key, file_path, start_time)
+                if cached is not None:
+                    cached.content_sha256 = digests['sha256']
+                    return cached
+        
+        # Extract features from file
+        if strings is not None:
+            features = extractor.extract_from_strings(file_path, strings)
+        else:
+            features = extractor.extract(file_path)
         
         # Use lower threshold for direct matching since we're not using bloom filters
         threshold = confidence_threshold or 0.5
@@ -117,9 +163,11 @@ class EnhancedBinarySniffer(BaseAnalyzer):
         merged_matches = direct_matches
         
         # Apply TLSH fuzzy matching if enabled
-        if use_tlsh and self.tlsh_hasher.enabled:
+        if use_tlsh:
+            # TLSH needs at least 256 bytes of data for a file hash
+            file_hash = digests.get('tlsh') if file_path.stat().st_size >= 256 else None
             tlsh_matches = self._apply_tlsh_matching(
-                file_path, features, tlsh_threshold
+                file_hash, features, tlsh_threshold
             )
             # Merge TLSH matches with direct matches
             merged_matches = self._merge_tlsh_matches(merged_matches, tlsh_matches)
@@ -140,11 +188,11 @@ class EnhancedBinarySniffer(BaseAnalyzer):
             features_by_type = {}
             if features.strings:
                 # No limit if full_export is enabled
-                features_by_type["strings"] = features.strings if full_export else features.strings[:100]
+                features_by_type["strings"] = list(features.strings) if full_export else features.strings[:100]
             if features.symbols:
-                features_by_type["symbols"] = features.symbols if full_export else features.symbols[:100]
+                features_by_type["symbols"] = list(features.symbols) if full_export else features.symbols[:100]
             if hasattr(features, 'functions') and features.functions:
-                features_by_type["functions"] = features.functions if full_export else features.functions[:50]
+                features_by_type["functions"] = list(features.functions) if full_export else features.functions[:50]
             if hasattr(features, 'classes') and features.classes:
                 features_by_type["classes"] = features.classes if full_export else features.classes[:50]
             
@@ -166,12 +214,8 @@ class EnhancedBinarySniffer(BaseAnalyzer):
         
         # Calculate file hashes if requested
         file_hashes = None
-        if include_hashes or include_fuzzy_hashes:
-            from binarysniffer.utils.file_metadata import calculate_file_hashes
-            try:
-                file_hashes = calculate_file_hashes(file_path, include_fuzzy=include_fuzzy_hashes)
-            except Exception as e:
-                logger.debug(f"Failed to calculate hashes: {e}")
+        if hash_names:
+            file_hashes = {name: digests[name] for name in hash_names if name in digests}
         
         # Add licenses detected by OSLiLi from archive metadata
         if hasattr(features, 'metadata') and features.metadata and 'licenses' in features.metadata:
@@ -244,7 +288,7 @@ class EnhancedBinarySniffer(BaseAnalyzer):
         if hasattr(features, 'metadata') and features.metadata and 'package_metadata' in features.metadata:
             package_metadata = features.metadata['package_metadata']
 
-        return AnalysisResult(
+        result = AnalysisResult(
             file_path=str(file_path),
             file_size=file_path.stat().st_size,
             file_type=features.file_type,
@@ -254,8 +298,50 @@ class EnhancedBinarySniffer(BaseAnalyzer):
             confidence_threshold=threshold,
             extracted_features=extracted_features_summary,
             file_hashes=file_hashes,
-            package_metadata=package_metadata
+            package_metadata=package_metadata,
+            content_sha256=digests.get('sha256')
         )
+        
+        if cache_key:
+            self.result_cache.put(cache_key, result)
+        
+        return result
+    
+    def _read_once(
+        self,
+        file_path: Path,
+        digest_names: Iterable[str],
+        string_extractor: Optional[BinaryStringExtractor]
+    ) -> Tuple[Dict[str, str], Optional[List[ExtractedString]]]:
+        """
+        Compute digests of a file and scan its strings in one sequential read.
+        
+        Args:
+            file_path: File to read
+            digest_names: Digests to compute (see FileDigests)
+            string_extractor: Extractor whose strings to scan, or None
+            
+        Returns:
+            Digests by name and the scanned strings (None if no string
+            extractor was given or the file could not be read)
+        """
+        digest_names = list(digest_names)
+        if not digest_names and string_extractor is None:
+            return {}, None
+        
+        digests = FileDigests(digest_names)
+        scanner = string_extractor.scanner() if string_extractor is not None else None
+        try:
+            read_file_once(file_path, [digests] + ([scanner] if scanner is not None else []))
+        except OSError as e:
+            logger.debug(f"Failed to read {file_path}: {e}")
+            return {}, None
+        
+        return digests.hexdigests(), scanner.final() if scanner is not None else None
+    
+    def _signature_stamp(self) -> str:
+        """Stamp of the signature set the direct matcher was loaded with"""
+        return self.direct_matcher.stamp
     
     def _merge_matches(
         self,
@@ -356,7 +442,7 @@ class EnhancedBinarySniffer(BaseAnalyzer):
     
     def _apply_tlsh_matching(
         self,
-        file_path: Path,
+        file_hash: Optional[str],
         features,
         threshold: int = 70
     ) -> List[ComponentMatch]:
@@ -364,7 +450,7 @@ class EnhancedBinarySniffer(BaseAnalyzer):
         Apply TLSH fuzzy matching to find similar components.
         
         Args:
-            file_path: Path to the file being analyzed
+            file_hash: TLSH hash of the file (None if it could not be hashed)
             features: Extracted features from the file
             threshold: TLSH distance threshold
             
@@ -373,13 +459,12 @@ class EnhancedBinarySniffer(BaseAnalyzer):
         """
         matches = []
         
-        # Generate TLSH hash for the file
-        file_hash = self.tlsh_hasher.hash_file(file_path)
         if not file_hash:
             # Try hashing from features if file hash fails
-            all_features = list(features.strings) + list(features.symbols)
+            all_features = features.strings[:1000]  # Limit features
+            all_features += features.symbols[:1000 - len(all_features)]
             if all_features:
-                file_hash = self.tlsh_hasher.hash_features(all_features[:1000])  # Limit features
+                file_hash = self.tlsh_hasher.hash_features(all_features)
         
         if not file_hash:
             logger.debug("Could not generate TLSH hash for file")
@@ -2,13 +2,18 @@
 Base analyzer class with shared functionality
 """
 
+import copy
+import json
+import time
 import logging
 from pathlib import Path
-from typing import List, Optional, Union, Dict, Any
-from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
+from typing import List, Optional, Tuple, Union, Dict, Any
 import threading
 
 from ..storage.database import SignatureDatabase
+from ..storage.result_cache import ResultCache
+from ..storage.scan_manifest import ScanManifest
+from ..utils.hashing import compute_file_sha256
 from .config import Config
 from .results import AnalysisResult, BatchAnalysisResult
 
@@ -37,6 +42,7 @@ class BaseAnalyzer:
         self.db = SignatureDatabase(self.config.db_path)
         self.include_large_files = False  # By default, skip large files (>50MB)
         self.skip_metadata_files = False  # By default, process metadata files
+        self._result_cache = None
 
         # Ensure data directory exists
         self._ensure_data_directory()
@@ -49,6 +55,77 @@ class BaseAnalyzer:
         (self.config.data_dir / "bloom_filters").mkdir(exist_ok=True)
         (self.config.data_dir / "index").mkdir(exist_ok=True)
     
+    @property
+    def result_cache(self) -> Optional[ResultCache]:
+        """Result cache under config.cache_dir, or None if caching is disabled"""
+        if not self.config.use_result_cache or self.config.cache_size_mb <= 0:
+            return None
+        if self._result_cache is None:
+            self._result_cache = ResultCache(self.config.cache_dir, self.config.cache_size_mb)
+        return self._result_cache
+    
+    def _result_cache_key(
+        self,
+        file_path: Path,
+        signature_stamp: str,
+        options: Dict[str, Any],
+        content_hash: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Get the result cache key for a file.
+        
+        Args:
+            file_path: File being analyzed
+            signature_stamp: Stamp of the signatures the file is matched against
+            options: Analysis options that affect the result
+            content_hash: SHA256 of the file, if already computed
+            
+        Returns:
+            Cache key, or None if caching is disabled or the file is unreadable
+        """
+        cache = self.result_cache
+        if cache is None:
+            return None
+        
+        if content_hash is None:
+            try:
+                content_hash = compute_file_sha256(file_path)
+            except OSError as e:
+                logger.debug(f"Not caching {file_path}: {e}")
+                return None
+        
+        # Extractor choice and license detection also depend on the file name
+        from .. import __version__
+        options = dict(options, file_name=file_path.name, version=__version__)
+        return cache.make_key(content_hash, signature_stamp, options)
+    
+    def _get_cached_result(self, cache_key: str, file_path: Path, start_time: float) -> Optional[AnalysisResult]:
+        """Get a cached result, rewritten for file_path (identical content may live elsewhere)"""
+        result = self.result_cache.get(cache_key)
+        if result is None:
+            return None
+        
+        result = self._relocate_result(result, file_path)
+        result.analysis_time = time.time() - start_time
+        logger.debug(f"Result cache hit: {file_path}")
+        return result
+    
+    @staticmethod
+    def _relocate_result(result: AnalysisResult, file_path: Path) -> AnalysisResult:
+        """Point a stored result (and evidence referring to its file) at file_path"""
+        stored_path = result.file_path
+        if stored_path != str(file_path):
+            result.file_path = str(file_path)
+            for match in result.matches:
+                for key, value in match.evidence.items():
+                    if value == stored_path:
+                        match.evidence[key] = str(file_path)
+        return result
+    
+    def _signature_stamp(self) -> str:
+        """Stamp of the signature set results are matched against"""
+        return self.db.get_content_stamp()
+    
     def _analyze_file_with_features(self, file_path: Union[str, Path], confidence_threshold: Optional[float] = None) -> AnalysisResult:
         """Helper method to analyze file with instance-level feature settings"""
         # Check if we have the enhanced analyze_file method with additional parameters
@@ -58,7 +135,9 @@ class BaseAnalyzer:
                 file_path,
                 confidence_threshold,
                 show_features=self.show_features,
-                full_export=self.full_export
+                full_export=self.full_export,
+                include_hashes=getattr(self, 'include_hashes', False),
+                include_fuzzy_hashes=getattr(self, 'include_fuzzy_hashes', False)
             )
         else:
             # Fallback to basic analyze_file
@@ -90,7 +169,10 @@ class BaseAnalyzer:
         confidence_threshold: Optional[float] = None,
         parallel: bool = True,
         progress_callback: Optional[callable] = None,
-        include_large: bool = False
+        include_large: bool = False,
+        incremental: bool = False,
+        cluster_threshold: Optional[int] = None,
+        result_callback: Optional[callable] = None
     ) -> BatchAnalysisResult:
         """
         Analyze all files in a directory.
@@ -103,6 +185,14 @@ class BaseAnalyzer:
             parallel: Use parallel processing
             progress_callback: Optional callback(current, total) for progress updates
             include_large: Include large files (>50MB) in analysis
+            incremental: Reuse results of files unchanged since the previous
+                incremental scan of this directory
+            cluster_threshold: Cluster files with the same extension whose TLSH
+                distance is at most this value, analyze one representative per
+                cluster and copy its result to the other members (None disables)
+            result_callback: Optional callback(file_path, result) called with
+                each file's final result as soon as it is known, in completion
+                order, so output can be written while the scan runs
 
         Returns:
             BatchAnalysisResult containing all file results
@@ -117,113 +207,53 @@ class BaseAnalyzer:
         files = self._collect_files(directory_path, recursive, file_patterns)
         logger.info(f"Found {len(files)} files to analyze")
 
-        results = {}
-        successful = 0
-        failed = 0
-        total_time = 0.0
-
-        # Initialize progress
-        if progress_callback:
-            progress_callback(0, len(files))
+        # Incremental mode: only files changed since the previous scan are analyzed
+        manifest = None
+        unchanged = {}
+        if incremental:
+            manifest = self._open_scan_manifest(
+                directory_path, recursive, file_patterns, confidence_threshold, cluster_threshold
+            )
+            for file_path in files:
+                result = manifest.lookup(file_path)
+                if result is not None:
+                    unchanged[str(file_path)] = self._relocate_result(result, file_path)
+                    self._notify_result(result_callback, file_path, unchanged[str(file_path)])
+            logger.info(f"Incremental scan: {len(unchanged)} unchanged files, {len(files) - len(unchanged)} to analyze")
+        pending = [file_path for file_path in files if str(file_path) not in unchanged]
+        stats_before = {file_path: manifest.stat(file_path) for file_path in pending} if manifest else {}
+
+        # Near-duplicate pre-pass: only cluster representatives are analyzed
+        duplicates = {}
+        if cluster_threshold is not None and len(pending) > 1:
+            duplicates = self._cluster_near_duplicates(pending, cluster_threshold)
+        to_analyze = [file_path for file_path in pending if file_path not in duplicates]
+
+        results = self._analyze_files(to_analyze, confidence_threshold, parallel, progress_callback, result_callback)
+
+        if duplicates:
+            # Members of clusters whose representative failed are analyzed themselves
+            retry = [file_path for file_path, (representative, _) in duplicates.items()
+                     if results[str(representative)].error]
+            if retry:
+                results.update(self._analyze_files(retry, confidence_threshold, parallel, None, result_callback))
+            for file_path, (representative, distance) in duplicates.items():
+                if str(file_path) not in results:
+                    results[str(file_path)] = self._propagate_result(results[str(representative)], file_path, distance)
+                    self._notify_result(result_callback, file_path, results[str(file_path)])
+
+        # Time spent in this run only; unchanged files cost nothing
+        total_time = sum(result.analysis_time for result in results.values())
         
-        # Disable parallel processing for large file sets to avoid hanging
-        # Files timing out in parallel cause thread accumulation
-        if len(files) > 100:
-            logger.info(f"Large directory ({len(files)} files) - using sequential processing for stability")
-            parallel = False
-
-        if parallel and len(files) > 1:
-            # Parallel processing with improved timeout handling
-            max_workers = min(self.config.parallel_workers, 2)  # Limit to 2 workers to avoid overwhelming
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Submit all tasks
-                future_to_file = {}
-                for file in files:
-                    future = executor.submit(
-                        self._analyze_file_with_timeout,
-                        file,
-                        confidence_threshold
-                    )
-                    future_to_file[future] = file
-
-                # Process results as they complete
-                for future in as_completed(future_to_file):
-                    file_path = future_to_file[future]
-                    try:
-                        logger.debug(f"Processing file {len(results)+1}/{len(files)}: {file_path}")
-                        # Call progress callback with file path BEFORE processing
-                        if progress_callback:
-                            try:
-                                progress_callback(len(results), len(files), str(file_path))
-                            except TypeError:
-                                # Fallback for callbacks that don't accept file_path
-                                progress_callback(len(results), len(files))
-
-                        result = future.result()
-
-                        if result:
-                            results[str(file_path)] = result
-                            total_time += result.analysis_time
-                            if result.error:
-                                failed += 1
-                                logger.info(f"File skipped/error: {file_path} - {result.error}")
-                            else:
-                                successful += 1
-                            if result.analysis_time > 1.0:
-                                logger.warning(f"Slow file analysis ({result.analysis_time:.2f}s): {file_path}")
-                    except Exception as e:
-                        logger.error(f"Error analyzing {file_path}: {e}")
-                        failed += 1
-                        results[str(file_path)] = AnalysisResult.create_error(
-                            str(file_path), str(e)
-                        )
-
-                    # Update progress after completion
-                    if progress_callback:
-                        try:
-                            progress_callback(len(results), len(files), None)  # No file path after completion
-                        except TypeError:
-                            progress_callback(len(results), len(files))
-        else:
-            # Sequential processing with timeout
-            for i, file_path in enumerate(files):
-                try:
-                    logger.debug(f"Processing file {i+1}/{len(files)}: {file_path}")
-                    # Call progress callback with file path BEFORE processing
-                    if progress_callback:
-                        try:
-                            progress_callback(i, len(files), str(file_path))
-                        except TypeError:
-                            # Fallback for callbacks that don't accept file_path
-                            progress_callback(i, len(files))
-
-                    # Use timeout wrapper for sequential processing too
-                    result = self._analyze_file_with_timeout(
-                        file_path,
-                        confidence_threshold
-                    )
-                    results[str(file_path)] = result
-                    total_time += result.analysis_time
-                    if result.error:
-                        failed += 1
-                        logger.info(f"File skipped/error: {file_path} - {result.error}")
-                    else:
-                        successful += 1
-                    if result.analysis_time > 1.0:
-                        logger.warning(f"Slow file analysis ({result.analysis_time:.2f}s): {file_path}")
-                except Exception as e:
-                    logger.error(f"Error analyzing {file_path}: {e}")
-                    failed += 1
-                    results[str(file_path)] = AnalysisResult.create_error(
-                        str(file_path), str(e)
-                    )
-
-                # Update progress after completion
-                if progress_callback:
-                    try:
-                        progress_callback(i + 1, len(files), None)
-                    except TypeError:
-                        progress_callback(i + 1, len(files))
+        if manifest is not None:
+            for file_path in pending:
+                manifest.record(file_path, results[str(file_path)], stats_before[file_path])
+            manifest.save()
+        results.update(unchanged)
+        results = {str(file_path): results[str(file_path)] for file_path in files}
+        
+        successful = sum(1 for result in results.values() if not result.error)
+        failed = len(results) - successful
         
         # Create and return BatchAnalysisResult
         return BatchAnalysisResult(
@@ -231,9 +261,231 @@ class BaseAnalyzer:
             total_files=len(files),
             successful_files=successful,
             failed_files=failed,
-            total_time=total_time
+            total_time=total_time,
+            unchanged_files=len(unchanged),
+            propagated_files=sum(1 for result in results.values() if result.propagated_from)
         )
     
+    def _analyze_files(
+        self,
+        files: List[Path],
+        confidence_threshold: Optional[float],
+        parallel: bool,
+        progress_callback: Optional[callable],
+        result_callback: Optional[callable] = None
+    ) -> Dict[str, AnalysisResult]:
+        """
+        Analyze files, in worker processes if there is more than one.
+
+        Returns:
+            Results keyed by file path, in the order of files
+        """
+        results = {}
+
+        # Initialize progress
+        if progress_callback:
+            progress_callback(0, len(files))
+        
+        if len(files) > 1:
+            # Worker processes: CPU-bound analysis scales past the GIL and a
+            # timed-out or runaway file is stopped by killing its worker.
+            # Without parallel a single worker keeps files in sequence.
+            workers = self.config.parallel_workers if parallel else 1
+            return self._analyze_files_in_processes(
+                files, confidence_threshold, progress_callback, workers, result_callback
+            )
+
+        # Single file: analyze in-process with timeout
+        for i, file_path in enumerate(files):
+            try:
+                logger.debug(f"Processing file {i+1}/{len(files)}: {file_path}")
+                # Call progress callback with file path BEFORE processing
+                self._notify_progress(progress_callback, i, len(files), str(file_path))
+
+                # Use timeout wrapper for sequential processing too
+                result = self._analyze_file_with_timeout(
+                    file_path,
+                    confidence_threshold
+                )
+                results[str(file_path)] = result
+                self._log_file_result(file_path, result)
+            except Exception as e:
+                logger.error(f"Error analyzing {file_path}: {e}")
+                results[str(file_path)] = AnalysisResult.create_error(
+                    str(file_path), str(e)
+                )
+            self._notify_result(result_callback, file_path, results[str(file_path)])
+
+            # Update progress after completion
+            self._notify_progress(progress_callback, i + 1, len(files), None)
+
+        return results
+
+    def _cluster_near_duplicates(self, files: List[Path], threshold: int) -> Dict[Path, Tuple[Path, int]]:
+        """
+        Find near-duplicate files by TLSH.
+
+        Files are grouped by extension (extractor choice depends on it) and
+        clustered greedily; the first file of a cluster represents it.
+
+        Args:
+            files: Files to cluster
+            threshold: Maximum TLSH distance to the representative
+
+        Returns:
+            {member: (representative, TLSH distance)} for every non-representative
+        """
+        from ..hashing.tlsh_hasher import TLSHHasher
+
+        hasher = TLSHHasher()
+        if not hasher.enabled:
+            return {}
+
+        start_time = time.time()
+        groups: Dict[str, Dict[str, str]] = {}
+        for file_path in files:
+            tlsh_hash = hasher.hash_file(file_path)
+            if tlsh_hash:
+                groups.setdefault(file_path.suffix.lower(), {})[str(file_path)] = tlsh_hash
+
+        duplicates = {}
+        for hashes in groups.values():
+            for cluster in hasher.cluster_hashes(hashes, threshold):
+                representative = cluster[0]
+                for member in cluster[1:]:
+                    distance = hasher.compare(hashes[representative], hashes[member])
+                    duplicates[Path(member)] = (Path(representative), distance)
+
+        logger.info(f"Near-duplicate pre-pass: {len(duplicates)} of {len(files)} files covered by "
+                    f"cluster representatives ({time.time() - start_time:.2f}s)")
+        return duplicates
+
+    def _propagate_result(self, result: AnalysisResult, file_path: Path, distance: int) -> AnalysisResult:
+        """Copy a representative's result to a near-duplicate member"""
+        representative = result.file_path
+        result = self._relocate_result(copy.deepcopy(result), file_path)
+        try:
+            result.file_size = file_path.stat().st_size
+        except OSError:
+            pass
+        result.analysis_time = 0.0
+        result.content_sha256 = None  # Hash of the representative, not of this file
+        result.propagated_from = {'file_path': representative, 'tlsh_distance': distance}
+        return result
+
+    def _open_scan_manifest(
+        self,
+        directory_path: Path,
+        recursive: bool,
+        file_patterns: Optional[List[str]],
+        confidence_threshold: Optional[float],
+        cluster_threshold: Optional[int] = None
+    ) -> ScanManifest:
+        """Load the manifest of the previous incremental scan of a directory"""
+        from .. import __version__
+        from .worker_pool import WORKER_ATTRIBUTES
+        
+        scan_id = json.dumps([str(directory_path.resolve()), recursive, sorted(file_patterns or [])])
+        fingerprint = json.dumps({
+            'analyzer': type(self).__name__,
+            'version': __version__,
+            'signatures': self._signature_stamp(),
+            'threshold': confidence_threshold,
+            'cluster_threshold': cluster_threshold,
+            'settings': {name: getattr(self, name) for name in WORKER_ATTRIBUTES if hasattr(self, name)}
+        }, sort_keys=True, default=str)
+        return ScanManifest.for_directory(self.config.manifest_dir, scan_id, fingerprint)
+    
+    def _analyze_files_in_processes(
+        self,
+        files: List[Path],
+        confidence_threshold: Optional[float],
+        progress_callback: Optional[callable],
+        workers: int,
+        result_callback: Optional[callable] = None
+    ) -> Dict[str, AnalysisResult]:
+        """
+        Analyze files in a pool of worker processes.
+
+        Args:
+            files: Files to analyze
+            confidence_threshold: Minimum confidence score
+            progress_callback: Optional callback(current, total, file_path)
+            workers: Number of worker processes
+            result_callback: Optional callback(file_path, result) per finished file
+
+        Returns:
+            Results keyed by file path, in the order of files
+        """
+        from .worker_pool import WorkerPool
+
+        results: Dict[int, AnalysisResult] = {}
+        tasks = []
+        default_timeout = getattr(self, 'file_timeout', 60)
+        for index, file_path in enumerate(files):
+            skip_result, timeout = self._precheck_file(file_path, default_timeout)
+            if skip_result is not None:
+                results[index] = skip_result
+                self._notify_result(result_callback, file_path, skip_result)
+            else:
+                tasks.append((index, file_path, timeout))
+
+        pool = WorkerPool(self, workers, confidence_threshold)
+        events = pool.run(tasks)
+        try:
+            while True:
+                # Only pool failures fall back; errors raised by callbacks propagate
+                try:
+                    event, index, result = next(events)
+                except StopIteration:
+                    break
+                except (RuntimeError, OSError) as e:
+                    logger.warning(f"Worker processes unavailable ({e}) - analyzing remaining files sequentially")
+                    for index, file_path in enumerate(files):
+                        if index not in results:
+                            self._notify_progress(progress_callback, len(results), len(files), str(file_path))
+                            results[index] = self._analyze_file_with_timeout(file_path, confidence_threshold)
+                            self._log_file_result(file_path, results[index])
+                            self._notify_result(result_callback, file_path, results[index])
+                            self._notify_progress(progress_callback, len(results), len(files), None)
+                    break
+
+                if event == 'start':
+                    self._notify_progress(progress_callback, len(results), len(files), str(files[index]))
+                else:
+                    results[index] = result
+                    self._log_file_result(files[index], result)
+                    self._notify_result(result_callback, files[index], result)
+                    self._notify_progress(progress_callback, len(results), len(files), None)
+        finally:
+            events.close()
+
+        return {str(file_path): results[index] for index, file_path in enumerate(files)}
+
+    @staticmethod
+    def _notify_progress(progress_callback: Optional[callable], current: int, total: int, file_path: Optional[str]):
+        """Call progress_callback, falling back to callbacks without a file_path argument"""
+        if not progress_callback:
+            return
+        try:
+            progress_callback(current, total, file_path)
+        except TypeError:
+            progress_callback(current, total)
+
+    @staticmethod
+    def _notify_result(result_callback: Optional[callable], file_path: Path, result: AnalysisResult):
+        """Pass a file's final result to result_callback"""
+        if result_callback:
+            result_callback(str(file_path), result)
+
+    @staticmethod
+    def _log_file_result(file_path: Path, result: AnalysisResult):
+        """Log skipped, failed and slow files"""
+        if result.error:
+            logger.info(f"File skipped/error: {file_path} - {result.error}")
+        if result.analysis_time > 1.0:
+            logger.warning(f"Slow file analysis ({result.analysis_time:.2f}s): {file_path}")
+
     def _collect_files(
         self,
         directory: Path,
@@ -320,29 +572,18 @@ class BaseAnalyzer:
         
         return sorted(set(files))  # Remove duplicates and sort
 
-    def _analyze_file_with_timeout(self, file_path: Path, confidence_threshold: Optional[float], timeout: int = None) -> AnalysisResult:
+    def _precheck_file(self, file_path: Path, timeout: int) -> Tuple[Optional[AnalysisResult], int]:
         """
-        Analyze a file with timeout protection.
+        Quick pre-checks to avoid known problematic files.
 
         Args:
             file_path: Path to file
-            confidence_threshold: Minimum confidence threshold
-            timeout: Timeout in seconds
+            timeout: Default timeout in seconds
 
         Returns:
-            AnalysisResult
+            (skip_result, timeout) - skip_result is set when the file should not
+            be analyzed, timeout is the timeout to apply to this file
         """
-        import queue
-        import time
-
-        # Use timeout from configuration if not specified
-        if timeout is None:
-            timeout = getattr(self, 'file_timeout', 60)  # Default to 60 seconds
-
-        # Log file being analyzed
-        logger.info(f"Starting analysis: {file_path}")
-
-        # Quick pre-checks to avoid known problematic files
         try:
             file_size = file_path.stat().st_size
             logger.debug(f"File size: {file_size / (1024*1024):.2f}MB - {file_path}")
@@ -353,14 +594,14 @@ class BaseAnalyzer:
                 return AnalysisResult.create_error(
                     str(file_path),
                     f"File skipped ({file_size / 1024 / 1024:.1f}MB) - use --include-large to analyze"
-                )
+                ), timeout
             # Even with include_large, skip extremely large files (>500MB)
             elif file_size > 500 * 1024 * 1024:
                 logger.warning(f"Skipping extremely large file ({file_size / 1024 / 1024:.1f}MB): {file_path}")
                 return AnalysisResult.create_error(
                     str(file_path),
                     f"File too large ({file_size / 1024 / 1024:.1f}MB) - maximum 500MB"
-                )
+                ), timeout
 
             # Skip metadata files if flag is set or if plist files are large
             metadata_extensions = {'.plist', '.xib', '.storyboard', '.nib', '.strings', '.xcprivacy', '.xcconfig'}
@@ -369,14 +610,14 @@ class BaseAnalyzer:
                 return AnalysisResult.create_error(
                     str(file_path),
                     f"Metadata file skipped (--skip-metadata enabled)"
-                )
+                ), timeout
             # Skip XML-based metadata files over 100KB even without the flag (they're just metadata and can cause hangs)
             elif file_path.suffix.lower() in {'.plist', '.xcprivacy', '.xcconfig'} and file_size > 100 * 1024:
                 logger.info(f"Skipping large XML metadata file ({file_size / 1024:.1f}KB): {file_path.name}")
                 return AnalysisResult.create_error(
                     str(file_path),
                     f"Large XML metadata file skipped"
-                )
+                ), timeout
 
             # Skip known problematic extensions that cause hangs
             problematic_extensions = {
@@ -397,6 +638,34 @@ class BaseAnalyzer:
         except Exception as e:
             logger.debug(f"Pre-check failed for {file_path}: {e}")
 
+        return None, timeout
+
+    def _analyze_file_with_timeout(self, file_path: Path, confidence_threshold: Optional[float], timeout: int = None) -> AnalysisResult:
+        """
+        Analyze a file with timeout protection.
+
+        Args:
+            file_path: Path to file
+            confidence_threshold: Minimum confidence threshold
+            timeout: Timeout in seconds
+
+        Returns:
+            AnalysisResult
+        """
+        import queue
+        import time
+
+        # Use timeout from configuration if not specified
+        if timeout is None:
+            timeout = getattr(self, 'file_timeout', 60)  # Default to 60 seconds
+
+        # Log file being analyzed
+        logger.info(f"Starting analysis: {file_path}")
+
+        skip_result, timeout = self._precheck_file(file_path, timeout)
+        if skip_result is not None:
+            return skip_result
+
         result_queue = queue.Queue()
         error_queue = queue.Queue()
 
@@ -37,7 +37,10 @@ class Config:
     
     # Performance settings
     cache_size_mb: int = 100
+    use_result_cache: bool = True
     parallel_workers: int = 4
+    worker_max_tasks: int = 500  # Files per worker process before it is replaced (0 = no limit)
+    worker_max_rss_mb: int = 4096  # Anonymous RSS ceiling per worker process, excluding mapped files (0 = no limit)
     chunk_size: int = 1000
     max_file_size_mb: int = 500
     
@@ -84,6 +87,11 @@ class Config:
         """Path to signature database"""
         return self.data_dir / "signatures.db"
     
+    @property
+    def snapshot_path(self) -> Path:
+        """Path to precompiled matcher snapshot"""
+        return self.data_dir / "signatures.snapshot"
+    
     @property
     def bloom_filter_dir(self) -> Path:
         """Path to bloom filter directory"""
@@ -99,6 +107,11 @@ class Config:
         """Path to cache directory"""
         return self.data_dir / "cache"
     
+    @property
+    def manifest_dir(self) -> Path:
+        """Path to incremental scan manifests"""
+        return self.data_dir / "manifests"
+    
     def _load_from_file(self, config_file: Path):
         """Load configuration from JSON file"""
         try:
@@ -75,6 +75,8 @@ class AnalysisResult:
     extracted_features: Optional[ExtractedFeaturesSummary] = None  # For --show-features flag
     file_hashes: Optional[Dict[str, str]] = None  # For --include-hashes flag
     package_metadata: Optional[Dict[str, Any]] = None  # Package metadata from UPMEX
+    propagated_from: Optional[Dict[str, Any]] = None  # Near-duplicate: representative file and TLSH distance
+    content_sha256: Optional[str] = None  # SHA-256 of the analyzed content, if computed (not serialized)
     
     @property
     def has_matches(self) -> bool:
@@ -129,6 +131,10 @@ class AnalysisResult:
         if self.package_metadata:
             result["package_metadata"] = self.package_metadata
 
+        # Result copied from a near-duplicate file instead of analyzed
+        if self.propagated_from:
+            result["propagated_from"] = self.propagated_from
+
         return result
     
     def to_json(self, indent: int = 2) -> str:
@@ -160,6 +166,8 @@ class BatchAnalysisResult:
     failed_files: int
     total_time: float
     timestamp: datetime = field(default_factory=datetime.now)
+    unchanged_files: int = 0  # Results reused from the previous incremental scan
+    propagated_files: int = 0  # Results copied from near-duplicate cluster representatives
     
     @property
     def total_matches(self) -> int:
@@ -205,17 +213,26 @@ class BatchAnalysisResult:
                 path: result.to_dict() 
                 for path, result in self.results.items()
             },
-            "summary": {
-                "total_files": self.total_files,
-                "successful_files": self.successful_files,
-                "failed_files": self.failed_files,
-                "total_time": round(self.total_time, 3),
-                "timestamp": self.timestamp.isoformat(),
-                "all_components": self.all_components,
-                "all_licenses": self.all_licenses,
-                "component_frequency": self.component_frequency
-            }
+            "summary": self.summary_to_dict()
+        }
+    
+    def summary_to_dict(self) -> Dict[str, Any]:
+        """Convert the batch summary (totals, components, licenses) to a dictionary"""
+        summary = {
+            "total_files": self.total_files,
+            "successful_files": self.successful_files,
+            "failed_files": self.failed_files,
+            "total_time": round(self.total_time, 3),
+            "timestamp": self.timestamp.isoformat(),
+            "all_components": self.all_components,
+            "all_licenses": self.all_licenses,
+            "component_frequency": self.component_frequency
         }
+        if self.unchanged_files:
+            summary["unchanged_files"] = self.unchanged_files
+        if self.propagated_files:
+            summary["propagated_files"] = self.propagated_files
+        return summary
     
     def to_json(self, indent: int = 2) -> str:
         """Convert to JSON string"""
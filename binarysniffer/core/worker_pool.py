@@ -0,0 +1,394 @@
+"""
+Process pool for directory analysis with kill-safe per-file timeouts
+"""
+
+import os
+import sys
+import time
+import pickle
+import logging
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Generator, Iterator, List, Optional, Tuple
+
+from .results import AnalysisResult
+
+
+logger = logging.getLogger(__name__)
+
+
+# Analyzer settings copied into every worker (set by the CLI or library callers)
+WORKER_ATTRIBUTES = (
+    'show_features',
+    'full_export',
+    'file_timeout',
+    'include_large_files',
+    'skip_metadata_files',
+    'use_tlsh',
+    'tlsh_threshold',
+    'include_hashes',
+    'include_fuzzy_hashes',
+)
+
+
+def _worker_main(conn, analyzer_class, config, attributes: Dict[str, Any], task: str,
+                 task_args: Tuple, error_result: Callable[[str, str], Any]):
+    """
+    Worker process entry point.
+
+    Builds the analyzer once, then runs its task method on the chunks of
+    (index, path) pairs it receives until it gets None or the pipe closes.
+    """
+    from .config import Config
+
+    if not Config._logging_setup:
+        config._setup_logging()
+        Config._logging_setup = True
+
+    try:
+        analyzer = analyzer_class(config)
+        for name, value in attributes.items():
+            setattr(analyzer, name, value)
+        run_task = getattr(analyzer, task)
+    except Exception as e:
+        conn.send(('init_error', None, f"{type(e).__name__}: {e}"))
+        return
+
+    conn.send(('ready', None, None))
+
+    tasks_done = 0
+    while True:
+        try:
+            chunk = conn.recv()
+        except (EOFError, OSError):
+            break
+        if chunk is None:
+            break
+
+        for index, file_path in chunk:
+            conn.send(('start', index, None))
+            try:
+                result = run_task(file_path, *task_args)
+            except Exception as e:
+                result = error_result(str(file_path), str(e))
+
+            try:
+                conn.send(('done', index, result))
+            except (pickle.PicklingError, TypeError, AttributeError) as e:
+                conn.send(('done', index, error_result(
+                    str(file_path), f"Could not transfer analysis result: {e}"
+                )))
+
+            # Exit between files once worn out; the parent starts a fresh worker
+            tasks_done += 1
+            reason = _retire_reason(config, tasks_done)
+            if reason:
+                conn.send(('retire', None, reason))
+                return
+
+
+def _retire_reason(config, tasks_done: int) -> Optional[str]:
+    """Get the reason a worker should be recycled, or None to keep it"""
+    if config.worker_max_tasks and tasks_done >= config.worker_max_tasks:
+        return f"analyzed {tasks_done} files"
+
+    if config.worker_max_rss_mb:
+        rss_mb = process_rss_mb()
+        if rss_mb is not None and rss_mb > config.worker_max_rss_mb:
+            return f"RSS {rss_mb:.0f}MB above {config.worker_max_rss_mb}MB"
+
+    return None
+
+
+def process_rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """
+    Get the anonymous resident memory of a process.
+
+    File-backed pages are left out: they are page cache the kernel can
+    reclaim, and a worker hashing a memory-mapped multi-GB model would
+    otherwise look as large as the model.
+
+    Args:
+        pid: Process ID (current process if None)
+
+    Returns:
+        Resident minus shared (file-backed) memory in MB, or None where it
+        cannot be measured. Outside Linux only the current process can be
+        measured, through its peak RSS.
+    """
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            fields = f.read().split()
+        anonymous_pages = int(fields[1]) - int(fields[2])
+        return anonymous_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    if pid is None:
+        try:
+            import resource
+        except ImportError:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in KB elsewhere
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+    return None
+
+
+class _Worker:
+    """Parent-side handle of one worker process"""
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.ready = False
+        self.assigned = deque()  # (index, path, timeout) not yet finished
+        self.current = None      # Task currently being analyzed
+        self.deadline = None
+        self.error = None        # Initialization error reported by the worker
+        self.retired = None      # Reason the worker exited to be recycled
+
+    @property
+    def busy(self) -> bool:
+        """Whether the worker still has files of its chunk to finish"""
+        return bool(self.assigned) or self.current is not None
+
+
+class WorkerPool:
+    """
+    Analyze files in a pool of worker processes.
+
+    Each worker builds its own analyzer once; the DirectMatcher inside it is
+    loaded from the memory-mapped matcher snapshot, so workers share the
+    signature data through the page cache. Files are sent in chunks over a
+    private pipe per worker. A file that runs past its timeout or pushes the
+    worker over the RSS ceiling (Config.worker_max_rss_mb) is stopped by
+    killing its worker, which is replaced, and the rest of its chunk is
+    requeued. Workers also retire between files after
+    Config.worker_max_tasks files or once their RSS stays above the ceiling,
+    so leaks from one pathological file do not slow down the files after it.
+    """
+
+    # Upper bound for files sent to a worker at once
+    MAX_CHUNK_SIZE = 16
+
+    # Seconds between memory samples of busy workers (with an RSS ceiling)
+    MEMORY_POLL_INTERVAL = 0.5
+
+    # Seconds to wait for workers to exit on shutdown before killing them
+    SHUTDOWN_GRACE = 5.0
+
+    def __init__(
+        self,
+        analyzer,
+        workers: int,
+        confidence_threshold: Optional[float] = None,
+        task: str = '_analyze_file_with_features',
+        task_args: Optional[Tuple] = None,
+        error_result: Callable[[str, str], Any] = AnalysisResult.create_error
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            analyzer: Analyzer whose class, config and settings the workers replicate
+            workers: Number of worker processes
+            confidence_threshold: Minimum confidence passed to analyze_file
+            task: Analyzer method the workers call with each file path
+            task_args: Arguments of task after the path (default: confidence_threshold)
+            error_result: Picklable callable(path, message) building the
+                result of a file that failed, timed out or was killed
+        """
+        self.analyzer_class = type(analyzer)
+        self.config = analyzer.config
+        self.attributes = {
+            name: getattr(analyzer, name)
+            for name in WORKER_ATTRIBUTES
+            if hasattr(analyzer, name)
+        }
+        self.workers = max(1, workers)
+        self.max_rss_mb = self.config.worker_max_rss_mb
+        self.confidence_threshold = confidence_threshold
+        self.task = task
+        self.task_args = (confidence_threshold,) if task_args is None else tuple(task_args)
+        self.error_result = error_result
+        self._context = self._get_context()
+        self._pool: List[_Worker] = []
+
+    def run(self, tasks: List[Tuple[int, Path, float]]) -> Iterator[Tuple[str, int, Optional[AnalysisResult]]]:
+        """
+        Analyze files and yield progress events as they happen.
+
+        Args:
+            tasks: (index, path, timeout) tuples; index identifies the file in events
+
+        Yields:
+            ('start', index, None) when a worker begins a file and
+            ('done', index, result) when its result is available
+
+        Raises:
+            RuntimeError: If no worker process could be started
+        """
+        pending = deque(tasks)
+        if not pending:
+            return
+
+        worker_count = min(self.workers, len(pending))
+        chunk_size = max(1, min(self.MAX_CHUNK_SIZE, len(pending) // (worker_count * 4)))
+        startup_failures = 0
+        logger.info(f"Analyzing {len(pending)} files with {worker_count} worker processes (chunk size {chunk_size})")
+
+        try:
+            for _ in range(worker_count):
+                self._pool.append(self._start_worker())
+
+            while pending or any(worker.busy for worker in self._pool):
+                # Hand out work to idle workers
+                for worker in self._pool:
+                    if worker.ready and not worker.busy and pending:
+                        chunk = [pending.popleft() for _ in range(min(chunk_size, len(pending)))]
+                        worker.assigned.extend(chunk)
+                        worker.conn.send([(index, path) for index, path, _ in chunk])
+
+                deadlines = [worker.deadline for worker in self._pool if worker.deadline is not None]
+                wait_timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+                if self.max_rss_mb and deadlines:
+                    # Wake up regularly to sample the memory of running workers
+                    wait_timeout = min(wait_timeout, self.MEMORY_POLL_INTERVAL)
+                waitables = [worker.conn for worker in self._pool] + [worker.process.sentinel for worker in self._pool]
+                wait(waitables, wait_timeout)
+
+                for position, worker in enumerate(self._pool):
+                    exited = yield from self._drain(worker)
+                    timed_out = (
+                        not exited and worker.deadline is not None
+                        and time.monotonic() >= worker.deadline
+                    )
+                    rss_mb = None
+                    if not (exited or timed_out) and self.max_rss_mb and worker.current is not None:
+                        rss_mb = process_rss_mb(worker.process.pid)
+                        if rss_mb is not None and rss_mb <= self.max_rss_mb:
+                            rss_mb = None
+                    if not (exited or timed_out or rss_mb):
+                        continue
+
+                    # Stop the worker for good and account for its file
+                    self._kill(worker)
+                    failure = worker.error or f"Worker process exited unexpectedly (exit code {worker.process.exitcode})"
+                    if worker.retired:
+                        logger.debug(f"Recycling worker {worker.process.pid}: {worker.retired}")
+                    elif not worker.ready:
+                        startup_failures += 1
+                        logger.warning(failure)
+                        if startup_failures >= 2 * worker_count:
+                            raise RuntimeError(failure)
+                    elif worker.current is not None:
+                        index, path, timeout = worker.current
+                        if timed_out:
+                            logger.error(f"Timeout analyzing {path} (>{timeout:g}s) - worker process killed")
+                            message = f"Analysis timeout (>{timeout:g}s) - file may be too large or complex"
+                        elif rss_mb:
+                            logger.error(f"Memory limit exceeded analyzing {path} ({rss_mb:.0f}MB) - worker process killed")
+                            message = f"Analysis exceeded memory limit ({self.max_rss_mb}MB) - file may be too large or complex"
+                        else:
+                            logger.error(f"{failure} while analyzing {path}")
+                            message = failure
+                        yield 'done', index, self.error_result(str(path), message)
+
+                    # Unfinished files of the chunk go back to the front of the queue
+                    pending.extendleft(reversed(worker.assigned))
+                    self._pool[position] = self._start_worker()
+        finally:
+            self.close()
+
+    def _drain(self, worker: _Worker) -> Generator[Tuple[str, int, Optional[AnalysisResult]], None, bool]:
+        """
+        Relay the messages a worker has sent so far.
+
+        Returns:
+            True if the worker has exited or failed to initialize
+        """
+        try:
+            while worker.conn.poll():
+                kind, index, payload = worker.conn.recv()
+                if kind == 'ready':
+                    worker.ready = True
+                elif kind == 'init_error':
+                    worker.error = f"Worker failed to initialize: {payload}"
+                    return True
+                elif kind == 'retire':
+                    worker.retired = payload
+                    return True
+                elif kind == 'start':
+                    worker.current = self._take(worker, index)
+                    worker.deadline = time.monotonic() + worker.current[2]
+                    yield 'start', index, None
+                elif kind == 'done':
+                    worker.current = worker.deadline = None
+                    yield 'done', index, payload
+        except (EOFError, OSError):
+            return True
+
+        return not worker.process.is_alive() and not worker.conn.poll()
+
+    def close(self):
+        """Stop all worker processes"""
+        for worker in self._pool:
+            if worker.process.is_alive():
+                try:
+                    worker.conn.send(None)
+                except (OSError, ValueError):
+                    pass
+
+        deadline = time.monotonic() + self.SHUTDOWN_GRACE
+        for worker in self._pool:
+            worker.process.join(max(0.0, deadline - time.monotonic()))
+            self._kill(worker)
+        self._pool = []
+
+    def _start_worker(self) -> _Worker:
+        """Start one worker process"""
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.analyzer_class, self.config, self.attributes,
+                  self.task, self.task_args, self.error_result),
+            name="binarysniffer-worker",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    def _kill(self, worker: _Worker):
+        """Kill a worker process and release its pipe"""
+        if worker.process.is_alive():
+            worker.process.kill()
+        worker.process.join()
+        worker.conn.close()
+
+    @staticmethod
+    def _take(worker: _Worker, index: int) -> Tuple[int, Path, float]:
+        """Remove a task from the worker's assigned chunk"""
+        for task in worker.assigned:
+            if task[0] == index:
+                worker.assigned.remove(task)
+                return task
+        raise RuntimeError(f"Worker reported unknown task {index}")
+
+    def _get_context(self):
+        """
+        Pick the process start method.
+
+        Forking a parent that runs threads (progress displays, the signature
+        database) is unsafe, so a fork server with the analyzer module
+        preloaded is used where available and spawn elsewhere.
+        """
+        if sys.platform != 'win32' and 'forkserver' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('forkserver')
+            context.set_forkserver_preload([self.analyzer_class.__module__])
+            return context
+        return multiprocessing.get_context('spawn')
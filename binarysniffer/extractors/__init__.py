@@ -3,10 +3,14 @@ Feature extraction modules
 """
 
 from .base import BaseExtractor, ExtractedFeatures
-from .factory import ExtractorFactory
+from .factory import ExtractorFactory, get_default_factory
+from .feature_store import FeatureList, FeatureStore
 
 __all__ = [
     "ExtractorFactory",
+    "get_default_factory",
     "BaseExtractor",
-    "ExtractedFeatures"
+    "ExtractedFeatures",
+    "FeatureList",
+    "FeatureStore"
 ]
@@ -5,9 +5,9 @@ Androguard-based extractor for comprehensive Android APK analysis.
 import hashlib
 import logging
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Set
 
-from .base import BaseExtractor, ExtractedFeatures
+from .base import BaseExtractor, ExtractedFeatures, FileHeader
 
 if TYPE_CHECKING:
     from androguard.core.bytecodes.apk import APK
@@ -41,6 +41,14 @@ class AndroguardExtractor(BaseExtractor):
 
     def can_handle(self, file_path: Path) -> bool:
         """Check if this extractor can handle the file."""
+        return self.can_handle_header(file_path, FileHeader(file_path))
+
+    def handled_extensions(self) -> Set[str]:
+        """APKs are only recognized by extension."""
+        return {'.apk', '.xapk'}
+
+    def can_handle_header(self, file_path: Path, header: FileHeader) -> bool:
+        """Check availability, extension and ZIP magic."""
         if not ANDROGUARD_AVAILABLE:
             return False
 
@@ -49,12 +57,7 @@ class AndroguardExtractor(BaseExtractor):
             return False
 
         # Verify it's actually an APK (ZIP-based)
-        try:
-            with open(file_path, 'rb') as f:
-                magic = f.read(4)
-                return magic[:2] == b'PK'  # ZIP magic number
-        except Exception:
-            return False
+        return header.data[:2] == b'PK'  # ZIP magic number
 
     def extract(self, file_path: Path) -> ExtractedFeatures:
         """
@@ -96,7 +99,7 @@ class AndroguardExtractor(BaseExtractor):
             # Identify common SDKs
             self._identify_sdks(apk, features)
 
-            logger.info(f"Extracted {len(features.all_features)} features from {file_path}")
+            logger.info(f"Extracted {features.feature_count} features from {file_path}")
 
         except Exception as e:
             logger.error(f"Error extracting from APK {file_path}: {e}")
@@ -181,7 +184,7 @@ class AndroguardExtractor(BaseExtractor):
                         features.add_feature(method_name)
 
                 # Stop if we have enough features
-                if len(features.all_features) > 50000:
+                if features.feature_count > 50000:
                     break
 
         except Exception as e:
@@ -279,7 +282,7 @@ class AndroguardExtractor(BaseExtractor):
                     features.add_feature(string)
 
                 # Stop if too many
-                if len(features.all_features) > 100000:
+                if features.feature_count > 100000:
                     break
 
         except Exception as e:
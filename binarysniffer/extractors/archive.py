@@ -3,27 +3,89 @@ Archive file extractor for ZIP, JAR, APK, IPA, TAR, etc.
 """
 
 import logging
+import multiprocessing
+import os
 import shutil
 import subprocess
+import sys
 import tarfile
 import tempfile
 import zipfile
-from pathlib import Path
-from typing import List, Optional
-
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path, PurePosixPath
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+from .archive_members import (
+    ArchiveMember,
+    DirectoryMemberSource,
+    MemberSource,
+    TarMemberSource,
+    ZipMemberSource,
+    archive_member_context,
+    inside_archive,
+)
 from .base import BaseExtractor, ExtractedFeatures
-from ..integrations.enhanced_oslili import EnhancedOsliliIntegration
+from ..integrations.enhanced_oslili import EnhancedOsliliIntegration, LicenseDetectionResult
 from ..integrations import UPMEXAdapter
 
 logger = logging.getLogger(__name__)
 
 
+# Members license detection skips (binaries, archives, media); others are
+# scanned while they are materialized, unless their first
+# LICENSE_SCAN_PROBE_BYTES contain a NUL byte (ELF and other binaries
+# without a telling extension)
+LICENSE_SCAN_PROBE_BYTES = 8192
+LICENSE_SCAN_SKIP_EXTENSIONS = {
+    '.pyc', '.pyo', '.pyd', '.so', '.dll', '.dylib', '.exe',
+    '.bin', '.dat', '.db', '.sqlite', '.sqlite3',
+    '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.ico', '.svg',
+    '.mp3', '.mp4', '.avi', '.mov', '.wav', '.flac',
+    '.zip', '.tar', '.gz', '.bz2', '.xz', '.7z', '.rar',
+    '.whl', '.egg', '.gem', '.jar', '.war', '.ear',
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+    '.ttf', '.otf', '.woff', '.woff2', '.eot',
+    '.class', '.o', '.a', '.lib', '.obj', '.dex', '.apk', '.ipa',
+}
+
+
+def _extract_member(member_path: Path) -> Tuple[None, Optional[ExtractedFeatures]]:
+    """Extract the features of an archive member in a worker process"""
+    from .factory import get_default_factory
+
+    try:
+        with archive_member_context():
+            return None, get_default_factory().extract(member_path)
+    except Exception as e:
+        logger.debug(f"Error processing {member_path}: {e}")
+        return None, None
+
+
 class ArchiveExtractor(BaseExtractor):
     """Extract features from archive files"""
 
-    def __init__(self):
-        """Initialize archive extractor"""
+    # Upper bound for the default number of member analysis workers
+    MAX_MEMBER_WORKERS = 8
+
+    # Archives with fewer selected members are analyzed on threads: starting
+    # worker processes and building their extractor factories costs more
+    # than it saves
+    PROCESS_MIN_MEMBERS = 32
+
+    def __init__(self, member_workers: Optional[int] = None, factory=None):
+        """
+        Initialize archive extractor.
+
+        Args:
+            member_workers: Processes (threads inside daemonic workers)
+                analyzing archive members concurrently (default: CPU count,
+                up to MAX_MEMBER_WORKERS; 1 = in order)
+            factory: ExtractorFactory used for archive members (default: the
+                shared factory, built on first use)
+        """
         super().__init__()
+        self._factory = factory
+        self.member_workers = max(1, member_workers or min(self.MAX_MEMBER_WORKERS, os.cpu_count() or 1))
         self._seven_zip_path = self._find_seven_zip()
         if self._seven_zip_path:
             logger.debug(f"7-Zip found at: {self._seven_zip_path}")
@@ -37,6 +99,15 @@ class ArchiveExtractor(BaseExtractor):
         self.upmex = UPMEXAdapter()
         logger.debug("UPMEX integration initialized for package metadata")
 
+    @property
+    def factory(self):
+        """Extractor factory used for archive members"""
+        if self._factory is None:
+            # Import here to avoid circular dependency
+            from .factory import get_default_factory
+            self._factory = get_default_factory()
+        return self._factory
+
     # Archive extensions
     ARCHIVE_EXTENSIONS = {
         # ZIP-based
@@ -115,6 +186,10 @@ class ArchiveExtractor(BaseExtractor):
 
         return False
 
+    def handled_extensions(self) -> Optional[Set[str]]:
+        """Archives are recognized by extension (plus NSIS .exe installers)"""
+        return self.ARCHIVE_EXTENSIONS | {'.exe'}
+
     def extract(self, file_path: Path) -> ExtractedFeatures:
         """Extract features from archive"""
         logger.debug(f"Extracting features from archive: {file_path}")
@@ -136,119 +211,118 @@ class ArchiveExtractor(BaseExtractor):
             else:
                 logger.debug(f"UPMEX extraction failed: {upmex_result['error']}")
 
-        # Extract archive to temporary directory
+        # Stream members out of the archive as they are analyzed; nothing is
+        # extracted up front and scratch space only holds members in flight
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
 
             try:
-                # Extract archive
-                extracted_files = self._extract_archive(file_path, temp_path)
+                with self._open_members(file_path, temp_path) as source:
+                    members = source.members
+
+                    if not members:
+                        logger.warning(f"No files extracted from {file_path}")
+                        return features
+
+                    # Special handling for known archive types
+                    archive_type = self.SPECIAL_ARCHIVES.get(file_path.suffix.lower())
+                    if archive_type:
+                        self._handle_special_archive(
+                            archive_type, source, features
+                        )
+
+                    # Process archive members; nested archives are handled here,
+                    # so the factory never recurses into another ArchiveExtractor
+                    factory = self.factory
+
+                    # For single file archives, use all features; for multi-file, apply limits
+                    is_single_file = len(members) == 1
+
+                    # Track which files we process for verbose output
+                    processed_files = []
+
+                    # INTELLIGENT PRIORITIZATION: Detect archive type based on content
+                    # Runs on the member listing, before anything is decompressed
+                    # Priority 1: Native libraries and executables (highest value for detection)
+                    # Priority 2: Bytecode and intermediate files
+                    # Priority 3: Source code files
+                    # Priority 4: Configuration and data files
+
+                    priority_extensions = {
+                        1: ['.so', '.dll', '.dylib', '.a', '.lib', '.exe', '.elf', '.ko', '.o'],  # Native binaries
+                        2: ['.dex', '.class', '.jar', '.pyc', '.pyo', '.beam', '.wasm'],  # Bytecode
+                        3: ['.c', '.cpp', '.cc', '.cxx', '.h', '.hpp', '.m', '.mm', '.swift'],  # Source code
+                        4: ['.js', '.py', '.java', '.kt', '.ts', '.go', '.rs', '.rb'],  # High-level source
+                        5: ['.json', '.xml', '.yaml', '.yml', '.conf', '.ini', '.properties']  # Config files
+                    }
+
+                    # Check if archive contains native libraries or mobile app content
+                    has_native_libs = any(m.suffix in priority_extensions[1] for m in members[:100])
+                    has_mobile_content = any(m.suffix in ['.dex', '.swift', '.m', '.mm'] for m in members[:100])
+                    has_embedded_content = any('lib/' in m.name or 'bin/' in m.name or 'usr/' in m.name for m in members[:100])
+
+                    # Determine if this is a binary-rich archive (embedded, mobile, or contains many native libs)
+                    is_binary_rich = has_native_libs or has_mobile_content or has_embedded_content or \
+                                     features.file_type == 'android' or features.file_type == 'ios'
 
-                if not extracted_files:
-                    logger.warning(f"No files extracted from {file_path}")
-                    return features
-
-                # Special handling for known archive types
-                archive_type = self.SPECIAL_ARCHIVES.get(file_path.suffix.lower())
-                if archive_type:
-                    self._handle_special_archive(
-                        archive_type, temp_path, features
-                    )
-
-                # Process extracted files
-                # Import here to avoid circular dependency
-                from .factory import ExtractorFactory
-                factory = ExtractorFactory()
-
-                # Remove self from extractors to avoid infinite recursion
-                factory.extractors = [e for e in factory.extractors
-                                    if not isinstance(e, ArchiveExtractor)]
-
-                # For single file archives, use all features; for multi-file, apply limits
-                is_single_file = len(extracted_files) == 1
-
-                # Track which files we process for verbose output
-                processed_files = []
-
-                # INTELLIGENT PRIORITIZATION: Detect archive type based on content
-                # Priority 1: Native libraries and executables (highest value for detection)
-                # Priority 2: Bytecode and intermediate files
-                # Priority 3: Source code files
-                # Priority 4: Configuration and data files
-
-                priority_extensions = {
-                    1: ['.so', '.dll', '.dylib', '.a', '.lib', '.exe', '.elf', '.ko', '.o'],  # Native binaries
-                    2: ['.dex', '.class', '.jar', '.pyc', '.pyo', '.beam', '.wasm'],  # Bytecode
-                    3: ['.c', '.cpp', '.cc', '.cxx', '.h', '.hpp', '.m', '.mm', '.swift'],  # Source code
-                    4: ['.js', '.py', '.java', '.kt', '.ts', '.go', '.rs', '.rb'],  # High-level source
-                    5: ['.json', '.xml', '.yaml', '.yml', '.conf', '.ini', '.properties']  # Config files
-                }
-
-                # Check if archive contains native libraries or mobile app content
-                has_native_libs = any(f.suffix.lower() in priority_extensions[1] for f in extracted_files[:100])
-                has_mobile_content = any(f.suffix.lower() in ['.dex', '.swift', '.m', '.mm'] for f in extracted_files[:100])
-                has_embedded_content = any('lib/' in str(f) or 'bin/' in str(f) or 'usr/' in str(f) for f in extracted_files[:100])
-
-                # Determine if this is a binary-rich archive (embedded, mobile, or contains many native libs)
-                is_binary_rich = has_native_libs or has_mobile_content or has_embedded_content or \
-                                 features.file_type == 'android' or features.file_type == 'ios'
-
-                if is_binary_rich:
-                    # Smart prioritization for binary-rich archives
-                    prioritized_files = {1: [], 2: [], 3: [], 4: [], 5: [], 6: []}
-
-                    for f in extracted_files:
-                        suffix = f.suffix.lower()
-                        placed = False
-                        for priority, extensions in priority_extensions.items():
-                            if suffix in extensions:
-                                prioritized_files[priority].append(f)
-                                placed = True
+                    if is_binary_rich:
+                        # Smart prioritization for binary-rich archives
+                        prioritized_members = {1: [], 2: [], 3: [], 4: [], 5: [], 6: []}
+
+                        for m in members:
+                            placed = False
+                            for priority, extensions in priority_extensions.items():
+                                if m.suffix in extensions:
+                                    prioritized_members[priority].append(m)
+                                    placed = True
+                                    break
+                            if not placed:
+                                prioritized_members[6].append(m)  # Other files
+
+                        # Combine prioritized members, in name order within each priority level
+                        members = []
+                        remaining_slots = 10000  # Maximum files to process
+
+                        for priority in sorted(prioritized_members.keys()):
+                            level = prioritized_members[priority]
+                            if priority <= 2:  # Native and bytecode - take all up to limit
+                                members.extend(level[:remaining_slots])
+                                remaining_slots -= len(level[:remaining_slots])
+                            else:  # Other files - take subset
+                                subset_size = min(100, remaining_slots // 2)  # Take fewer of lower priority
+                                members.extend(level[:subset_size])
+                                remaining_slots -= len(level[:subset_size])
+
+                            if remaining_slots <= 0:
                                 break
-                        if not placed:
-                            prioritized_files[6].append(f)  # Other files
-
-                    # Combine prioritized files, sorted within each priority level
-                    extracted_files = []
-                    remaining_slots = 10000  # Maximum files to process
-
-                    for priority in sorted(prioritized_files.keys()):
-                        files = sorted(prioritized_files[priority])
-                        if priority <= 2:  # Native and bytecode - take all up to limit
-                            extracted_files.extend(files[:remaining_slots])
-                            remaining_slots -= len(files[:remaining_slots])
-                        else:  # Other files - take subset
-                            subset_size = min(100, remaining_slots // 2)  # Take fewer of lower priority
-                            extracted_files.extend(files[:subset_size])
-                            remaining_slots -= len(files[:subset_size])
-
-                        if remaining_slots <= 0:
-                            break
-
-                    file_limit = len(extracted_files)
-                else:
-                    # Standard processing for non-binary archives
-                    file_limit = 10000 if not is_single_file else 1
 
-                # Keep track of nested archives to process recursively
-                nested_archives = []
-
-                for extracted_file in extracted_files[:file_limit]:  # Limit files for large archives
-                    # No need to check is_file() again since we already filtered
-                    try:
-                        # Check if this is a nested archive
-                        if self.can_handle(extracted_file):
+                        file_limit = len(members)
+                    else:
+                        # Standard processing for non-binary archives
+                        file_limit = 10000 if not is_single_file else 1
+
+                    # Keep track of nested archives to process recursively
+                    nested_archives = []
+
+                    # License detection results, collected member by member
+                    licenses = [] if self.oslili.is_available else None
+
+                    # Limit files for large archives; members are read in storage
+                    # order, analyzed concurrently and merged in priority order
+                    member_results = self._process_members(
+                        [(file_path, source, members[:file_limit])], factory, licenses
+                    )[0][1]
+                    for member, nested_path, file_features in member_results:
+                        if nested_path is not None:
                             # Queue it for recursive extraction
-                            nested_archives.append(extracted_file)
-                            logger.debug(f"Found nested archive: {extracted_file}")
+                            nested_archives.append(nested_path)
+                            logger.debug(f"Found nested archive: {member.name}")
+                            continue
+                        if file_features is None:
                             continue
-
-                        # Extract features from each file
-                        file_features = factory.extract(extracted_file)
 
                         # Track relative path within archive
-                        relative_path = str(extracted_file.relative_to(temp_path))
-                        processed_files.append(relative_path)
+                        processed_files.append(member.name)
 
                         # Merge features - use all features for single file archives
                         if is_single_file:
@@ -265,9 +339,6 @@ class ArchiveExtractor(BaseExtractor):
                             features.imports.extend(file_features.imports[:5000])  # Was 500
                             features.symbols.extend(file_features.symbols[:10000])  # Was 1000
 
-                    except Exception as e:
-                        logger.debug(f"Error processing {extracted_file}: {e}")
-
                 # Process nested archives recursively (with depth limit)
                 max_recursion_depth = 5
                 current_depth = 0
@@ -276,45 +347,28 @@ class ArchiveExtractor(BaseExtractor):
                     current_depth += 1
                     next_level_archives = []
 
-                    for nested_archive in nested_archives:
-                        logger.info(f"Extracting nested archive (depth {current_depth}): {nested_archive.name}")
-                        try:
-                            # Create a subdirectory for nested archive extraction
-                            nested_temp = temp_path / f"nested_{current_depth}_{nested_archive.stem}"
-                            nested_temp.mkdir(exist_ok=True)
-
-                            # Extract nested archive
-                            nested_files = self._extract_archive(nested_archive, nested_temp)
-
-                            for nested_file in nested_files[:1000]:  # Limit nested files
-                                if not nested_file.is_file():
-                                    continue
-
-                                # Check if this is another nested archive
-                                if self.can_handle(nested_file):
-                                    next_level_archives.append(nested_file)
-                                    continue
-
-                                try:
-                                    # Extract features from nested file
-                                    nested_features = factory.extract(nested_file)
-
-                                    # Track nested path
-                                    nested_relative = f"[nested:{current_depth}]{nested_archive.name}/{nested_file.name}"
-                                    processed_files.append(nested_relative)
-
-                                    # Merge features with limits for nested content
-                                    features.strings.extend(nested_features.strings[:10000])
-                                    features.functions.extend(nested_features.functions[:2000])
-                                    features.constants.extend(nested_features.constants[:2000])
-                                    features.imports.extend(nested_features.imports[:1000])
-                                    features.symbols.extend(nested_features.symbols[:2000])
-
-                                except Exception as e:
-                                    logger.debug(f"Error processing nested file {nested_file}: {e}")
-
-                        except Exception as e:
-                            logger.warning(f"Failed to extract nested archive {nested_archive}: {e}")
+                    # Members of all archives at this depth share the worker threads
+                    for nested_archive, member_results in self._process_members(
+                        self._open_nested_archives(nested_archives, current_depth, temp_path), factory, licenses
+                    ):
+                        for nested_member, nested_path, nested_features in member_results:
+                            # Check if this is another nested archive
+                            if nested_path is not None:
+                                next_level_archives.append(nested_path)
+                                continue
+                            if nested_features is None:
+                                continue
+
+                            # Track nested path
+                            nested_relative = f"[nested:{current_depth}]{nested_archive.name}/{nested_member.path.name}"
+                            processed_files.append(nested_relative)
+
+                            # Merge features with limits for nested content
+                            features.strings.extend(nested_features.strings[:10000])
+                            features.functions.extend(nested_features.functions[:2000])
+                            features.constants.extend(nested_features.constants[:2000])
+                            features.imports.extend(nested_features.imports[:1000])
+                            features.symbols.extend(nested_features.symbols[:2000])
 
                     # Move to next level of nesting
                     nested_archives = next_level_archives
@@ -322,28 +376,28 @@ class ArchiveExtractor(BaseExtractor):
                 # Deduplicate and limit (be generous for single-file archives)
                 if is_single_file:
                     # For single file archives, use the same limits as the original extractor
-                    # Use dict.fromkeys() for order-preserving deduplication
-                    features.strings = list(dict.fromkeys(features.strings))[:self.max_strings]
-                    features.functions = list(dict.fromkeys(features.functions))
-                    features.constants = list(dict.fromkeys(features.constants))
-                    features.imports = list(dict.fromkeys(features.imports))
-                    features.symbols = list(dict.fromkeys(features.symbols))
+                    # Order-preserving deduplication of feature ids (no decoding)
+                    features.strings.dedupe(self.max_strings)
+                    features.functions.dedupe()
+                    features.constants.dedupe()
+                    features.imports.dedupe()
+                    features.symbols.dedupe()
                 else:
                     # For multi-file archives, apply limits based on detected content type
                     if is_binary_rich:
                         # Binary-rich archives (mobile apps, embedded systems, firmware, etc.) - very generous limits
-                        features.strings = list(dict.fromkeys(features.strings))[:100000]  # 100k strings
-                        features.functions = list(dict.fromkeys(features.functions))[:20000]
-                        features.constants = list(dict.fromkeys(features.constants))[:10000]
-                        features.imports = list(dict.fromkeys(features.imports))[:5000]
-                        features.symbols = list(dict.fromkeys(features.symbols))[:20000]
+                        features.strings.dedupe(100000)  # 100k strings
+                        features.functions.dedupe(20000)
+                        features.constants.dedupe(10000)
+                        features.imports.dedupe(5000)
+                        features.symbols.dedupe(20000)
                     else:
                         # Standard archives (source code, documents, etc.) - moderate limits
-                        features.strings = list(dict.fromkeys(features.strings))[:self.max_strings]
-                        features.functions = list(dict.fromkeys(features.functions))[:5000]
-                        features.constants = list(dict.fromkeys(features.constants))[:2000]
-                        features.imports = list(dict.fromkeys(features.imports))[:1000]
-                        features.symbols = list(dict.fromkeys(features.symbols))[:5000]
+                        features.strings.dedupe(self.max_strings)
+                        features.functions.dedupe(5000)
+                        features.constants.dedupe(2000)
+                        features.imports.dedupe(1000)
+                        features.symbols.dedupe(5000)
 
                 # Add base metadata
                 if not hasattr(features, 'metadata') or features.metadata is None:
@@ -351,51 +405,50 @@ class ArchiveExtractor(BaseExtractor):
 
                 features.metadata.update({
                     'archive_type': archive_type or 'generic',
-                    'file_count': len(extracted_files),
+                    'file_count': len(members),
                     'processed_files': processed_files,
                     'processed_count': len(processed_files),
                     'size': file_path.stat().st_size
                 })
                 
-                # Use OSLiLi to detect licenses in extracted files
-                if self.oslili.is_available:
-                    try:
-                        logger.debug(f"Running OSLiLi license detection on extracted files from {file_path}")
-                        license_results = self.oslili.detect_licenses_in_path(str(temp_path))
-
-                        if license_results:
-                            # Store license information in metadata
-                            features.metadata['licenses'] = []
-                            features.metadata['license_spdx_ids'] = []
-
-                            for license_result in license_results:
-                                license_info = {
-                                    'spdx_id': license_result.spdx_id,
-                                    'name': license_result.name,
-                                    'confidence': license_result.confidence,
-                                    'detection_method': license_result.detection_method,
-                                    'source_file': license_result.source_file,
-                                    'category': license_result.category
-                                }
-                                features.metadata['licenses'].append(license_info)
-
-                                # Add SPDX ID to list if not already there
-                                if license_result.spdx_id not in features.metadata['license_spdx_ids']:
-                                    features.metadata['license_spdx_ids'].append(license_result.spdx_id)
-
-                            logger.info(f"Detected {len(license_results)} licenses in {file_path}: {features.metadata['license_spdx_ids']}")
-                    except Exception as e:
-                        logger.warning(f"OSLiLi license detection failed for {file_path}: {e}")
+                # Licenses OSLiLi detected in the members
+                if licenses:
+                    # Store license information in metadata
+                    features.metadata['licenses'] = []
+                    features.metadata['license_spdx_ids'] = []
+
+                    for license_result in licenses:
+                        license_info = {
+                            'spdx_id': license_result.spdx_id,
+                            'name': license_result.name,
+                            'confidence': license_result.confidence,
+                            'detection_method': license_result.detection_method,
+                            'source_file': license_result.source_file,
+                            'category': license_result.category
+                        }
+                        features.metadata['licenses'].append(license_info)
+
+                        # Add SPDX ID to list if not already there
+                        if license_result.spdx_id not in features.metadata['license_spdx_ids']:
+                            features.metadata['license_spdx_ids'].append(license_result.spdx_id)
+
+                    logger.info(f"Detected {len(licenses)} licenses in {file_path}: {features.metadata['license_spdx_ids']}")
 
             except Exception as e:
                 logger.error(f"Error extracting archive {file_path}: {e}")
 
         return features
 
-    def _extract_archive(self, archive_path: Path, extract_to: Path) -> List[Path]:
-        """Extract archive and return list of extracted files"""
-        extracted_files = []
+    def _open_members(self, archive_path: Path, extract_to: Path) -> MemberSource:
+        """
+        Open an archive for member-level reading.
+
+        ZIP and TAR archives are listed and read in place. Formats that need
+        an external tool or whole-file decompression are extracted to
+        extract_to first and read from there.
+        """
         suffix = archive_path.suffix.lower()
+        extracted_files = None
 
         try:
             # Check for Zstandard compressed files first (.zst, .tar.zst, .vpkg)
@@ -420,15 +473,11 @@ class ArchiveExtractor(BaseExtractor):
 
             elif zipfile.is_zipfile(archive_path):
                 # Handle ZIP-based archives
-                with zipfile.ZipFile(archive_path, 'r') as zip_file:
-                    zip_file.extractall(extract_to)
-                    extracted_files = sorted([f for f in extract_to.rglob('*') if f.is_file()])
+                return ZipMemberSource(archive_path, extract_to)
 
             elif tarfile.is_tarfile(archive_path):
                 # Handle TAR archives (including .tar.gz, .tar.bz2, .tar.xz)
-                with tarfile.open(archive_path, 'r:*') as tar_file:
-                    tar_file.extractall(extract_to)
-                    extracted_files = sorted([f for f in extract_to.rglob('*') if f.is_file()])
+                return TarMemberSource(archive_path, extract_to)
 
             elif self._seven_zip_path and suffix in ['.exe', '.msi', '.pkg', '.dmg']:
                 # Try to extract NSIS installer, MSI, PKG, or DMG with 7-Zip
@@ -440,8 +489,239 @@ class ArchiveExtractor(BaseExtractor):
 
         except Exception as e:
             logger.error(f"Failed to extract {archive_path}: {e}")
+            extracted_files = None
+
+        return DirectoryMemberSource(extract_to, extracted_files or [])
+
+    def _open_nested_archives(
+        self,
+        nested_archives: List[Path],
+        depth: int,
+        temp_path: Path
+    ) -> Iterator[Tuple[Path, MemberSource, List[ArchiveMember]]]:
+        """
+        Open nested archives one after another for _process_members.
+
+        Each archive is closed and deleted once its members have been read.
+        """
+        for nested_archive in nested_archives:
+            logger.info(f"Extracting nested archive (depth {depth}): {nested_archive.name}")
+            try:
+                # Create a subdirectory for nested archive members
+                nested_temp = temp_path / f"nested_{depth}_{nested_archive.stem}"
+                nested_temp.mkdir(exist_ok=True)
+
+                with self._open_members(nested_archive, nested_temp) as nested_source:
+                    yield nested_archive, nested_source, nested_source.members[:1000]  # Limit nested files
+
+            except Exception as e:
+                logger.warning(f"Failed to extract nested archive {nested_archive}: {e}")
+            finally:
+                # Its members have been read; free the scratch space
+                nested_archive.unlink(missing_ok=True)
 
-        return extracted_files
+    def _process_members(
+        self,
+        batches: Iterable[Tuple[Path, MemberSource, List[ArchiveMember]]],
+        factory,
+        licenses: Optional[List[LicenseDetectionResult]] = None
+    ) -> List[Tuple[Path, List[Tuple[ArchiveMember, Optional[Path], Optional[ExtractedFeatures]]]]]:
+        """
+        Extract features from the members of one or more archives.
+
+        The calling thread reads members in storage order, so compressed
+        archives are decompressed front to back once, and hands them to up to
+        member_workers worker processes (see _member_executor). At most two
+        members per worker are materialized at a time. Results keep the given
+        member order no matter which worker finishes first, so merging them is
+        deterministic.
+
+        With a licenses list, license detection runs on each text member while
+        it is materialized; text members outside the selection are
+        materialized for it one at a time and released right away.
+
+        Args:
+            batches: (archive path, member source, members) per archive
+            factory: Extractor factory used for the members
+            licenses: List license detection results are appended to, or
+                None to skip license detection
+
+        Returns:
+            (archive path, [(member, nested archive path or None, features or None)])
+            per batch
+        """
+        collected = []
+        executor = None
+        in_flight = set()
+
+        try:
+            for archive_path, source, members in batches:
+                if executor is None and self.member_workers > 1:
+                    executor = self._member_executor(len(members), factory)
+
+                outcomes = {}
+                selected = {member.name for member in members}
+                to_read = members
+                if licenses is not None:
+                    to_read = members + [
+                        member for member in source.members
+                        if member.name not in selected and self._is_license_candidate(member)
+                    ]
+
+                for member in sorted(to_read, key=lambda m: m.offset):
+                    try:
+                        member_path = source.materialize(member)
+                    except Exception as e:
+                        logger.debug(f"Error processing {member.name}: {e}")
+                        if member.name in selected:
+                            outcomes[member.name] = (None, None)
+                        continue
+
+                    if licenses is not None:
+                        self._detect_member_licenses(member, member_path, licenses)
+                    if member.name not in selected:
+                        source.release(member_path)
+                        continue
+
+                    if executor is None:
+                        outcomes[member.name] = self._process_member(source, member, member_path, factory)
+                        continue
+
+                    # Bound the scratch space taken by members waiting for a worker
+                    if len(in_flight) >= 2 * self.member_workers:
+                        _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    if isinstance(executor, ProcessPoolExecutor):
+                        outcome = self._submit_member(executor, source, member, member_path)
+                    else:
+                        outcome = executor.submit(self._process_member, source, member, member_path, factory)
+                    if isinstance(outcome, Future):
+                        in_flight.add(outcome)
+                    outcomes[member.name] = outcome
+
+                collected.append((archive_path, members, outcomes))
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+        results = []
+        for archive_path, members, outcomes in collected:
+            member_results = []
+            for member in members:
+                outcome = outcomes[member.name]
+                if isinstance(outcome, Future):
+                    try:
+                        outcome = outcome.result()
+                    except Exception as e:
+                        # A worker process died (BrokenProcessPool)
+                        logger.debug(f"Error processing {member.name}: {e}")
+                        outcome = (None, None)
+                member_results.append((member, *outcome))
+            results.append((archive_path, member_results))
+        return results
+
+    def _member_executor(self, member_count: int, factory) -> Executor:
+        """
+        Pick the pool that analyzes archive members.
+
+        Member extraction (regex scans, symbol and string parsing) is pure
+        Python and holds the GIL, so large archives are analyzed in worker
+        processes. Daemonic processes (directory-scan workers) cannot start
+        children and fall back to threads, as do small archives, members
+        extracted inside another archive, and callers with their own
+        factory (workers use the shared default factory).
+        """
+        from .factory import is_default_factory
+
+        use_processes = (
+            member_count >= self.PROCESS_MIN_MEMBERS
+            and not multiprocessing.current_process().daemon
+            and not inside_archive()
+            and is_default_factory(factory)
+        )
+        if not use_processes:
+            return ThreadPoolExecutor(max_workers=self.member_workers)
+
+        # Forking a parent that runs threads is unsafe (see WorkerPool)
+        if sys.platform != 'win32' and 'forkserver' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('forkserver')
+            context.set_forkserver_preload([__name__])
+        else:
+            context = multiprocessing.get_context('spawn')
+        return ProcessPoolExecutor(max_workers=self.member_workers, mp_context=context)
+
+    def _submit_member(
+        self,
+        executor: ProcessPoolExecutor,
+        source: MemberSource,
+        member: ArchiveMember,
+        member_path: Path
+    ):
+        """
+        Extract the features of a materialized member in a worker process.
+
+        Nested archives are recognized here and kept for the caller.
+
+        Returns:
+            Future of (None, features or None), or the outcome itself for
+            nested archives and members that could not be checked
+        """
+        try:
+            if self.can_handle(member_path):
+                return member_path, None
+        except Exception as e:
+            logger.debug(f"Error processing {member.name}: {e}")
+            return None, None
+
+        future = executor.submit(_extract_member, member_path)
+        future.add_done_callback(lambda _: source.release(member_path))
+        return future
+
+    def _process_member(
+        self,
+        source: MemberSource,
+        member: ArchiveMember,
+        member_path: Path,
+        factory
+    ) -> Tuple[Optional[Path], Optional[ExtractedFeatures]]:
+        """Extract the features of a materialized member (nested archives are kept for later)"""
+        try:
+            if self.can_handle(member_path):
+                return member_path, None
+        except Exception as e:
+            logger.debug(f"Error processing {member.name}: {e}")
+            return None, None
+
+        try:
+            with archive_member_context():
+                return None, factory.extract(member_path)
+        except Exception as e:
+            logger.debug(f"Error processing {member_path}: {e}")
+            return None, None
+        finally:
+            source.release(member_path)
+
+    @staticmethod
+    def _is_license_candidate(member: ArchiveMember) -> bool:
+        """Whether license detection would scan this member, judging by its name"""
+        return member.suffix not in LICENSE_SCAN_SKIP_EXTENSIONS
+
+    def _detect_member_licenses(
+        self,
+        member: ArchiveMember,
+        member_path: Path,
+        licenses: List[LicenseDetectionResult]
+    ):
+        """Run license detection on a materialized text member"""
+        if not self._is_license_candidate(member):
+            return
+        try:
+            with open(member_path, 'rb') as f:
+                if b'\x00' in f.read(LICENSE_SCAN_PROBE_BYTES):
+                    return
+        except OSError as e:
+            logger.debug(f"Could not read {member.name} for license detection: {e}")
+            return
+        licenses.extend(self.oslili.detect_licenses_in_path(str(member_path)))
 
     def _get_archive_type(self, file_path: Path) -> str:
         """Determine archive type"""
@@ -473,36 +753,54 @@ class ArchiveExtractor(BaseExtractor):
     def _handle_special_archive(
         self,
         archive_type: str,
-        extract_path: Path,
+        source: MemberSource,
         features: ExtractedFeatures
     ):
         """Handle special archive types"""
 
         if archive_type == 'android':
             # APK specific handling
-            self._handle_apk(extract_path, features)
+            self._handle_apk(source, features)
 
         elif archive_type == 'ios':
             # IPA specific handling
-            self._handle_ipa(extract_path, features)
+            self._handle_ipa(source, features)
 
         elif archive_type in ['java', 'java_web']:
             # JAR/WAR specific handling
-            self._handle_java_archive(extract_path, features)
+            self._handle_java_archive(source, features)
 
         elif archive_type in ['python', 'python_wheel']:
             # Python package handling
-            self._handle_python_archive(extract_path, features)
+            self._handle_python_archive(source, features)
+
+    @staticmethod
+    def _find_member(source: MemberSource, name: str) -> Optional[ArchiveMember]:
+        """Find a member by its path inside the archive"""
+        for member in source.members:
+            if member.name == name:
+                return member
+        return None
+
+    @staticmethod
+    def _member_packages(members: List[ArchiveMember]) -> set:
+        """Dotted package names of the directories holding the given members"""
+        packages = set()
+        for member in members:
+            parts = member.path.parts
+            if len(parts) > 1:
+                packages.add('.'.join(parts[:-1]))
+        return packages
 
-    def _handle_apk(self, extract_path: Path, features: ExtractedFeatures):
+    def _handle_apk(self, source: MemberSource, features: ExtractedFeatures):
         """Handle Android APK files"""
         # Look for AndroidManifest.xml
-        manifest = extract_path / "AndroidManifest.xml"
-        if manifest.exists():
+        if self._find_member(source, "AndroidManifest.xml"):
             features.metadata['has_android_manifest'] = True
 
         # Look for classes.dex
-        dex_files = sorted(list(extract_path.glob("classes*.dex")))
+        dex_files = [m for m in source.members
+                     if len(m.path.parts) == 1 and m.name.startswith("classes") and m.suffix == '.dex']
         if dex_files:
             features.metadata['dex_files'] = len(dex_files)
             # Extract strings from DEX files using simple strings command
@@ -510,7 +808,7 @@ class ArchiveExtractor(BaseExtractor):
                 try:
                     import subprocess
                     result = subprocess.run(
-                        ['strings', str(dex_file)],
+                        ['strings', str(source.materialize(dex_file))],
                         capture_output=True,
                         text=True,
                         timeout=5
@@ -525,49 +823,46 @@ class ArchiveExtractor(BaseExtractor):
                     pass  # Strings command might not be available
 
         # Look for lib directory with native libraries
-        lib_dir = extract_path / "lib"
-        if lib_dir.exists():
-            native_libs = []
-            for arch_dir in lib_dir.iterdir():
-                if arch_dir.is_dir():
-                    for lib in arch_dir.glob("*.so"):
-                        native_libs.append(lib.name)
-                        # CRITICAL FIX: Don't just add the name, let the main loop process the .so file!
-                        # The main extraction loop will handle these files properly
+        if any(len(m.path.parts) > 1 and m.path.parts[0] == "lib" for m in source.members):
+            native_libs = [m.path.name for m in source.members
+                           if len(m.path.parts) == 3 and m.path.parts[0] == "lib" and m.suffix == '.so']
+            # CRITICAL FIX: Don't just add the name, let the main loop process the .so file!
+            # The main extraction loop will handle these files properly
             features.metadata['native_libs'] = native_libs[:20]
 
         # Package name from directory structure
-        java_files = list(extract_path.rglob("*.class"))
-        packages = set()
-        for java_file in java_files[:100]:
-            parts = java_file.relative_to(extract_path).parts
-            if len(parts) > 1:
-                package = '.'.join(parts[:-1])
-                packages.add(package)
+        class_files = [m for m in source.members if m.suffix == '.class']
+        packages = self._member_packages(class_files[:100])
 
         if packages:
             features.metadata['java_packages'] = list(packages)[:10]
 
-    def _handle_ipa(self, extract_path: Path, features: ExtractedFeatures):
+    def _handle_ipa(self, source: MemberSource, features: ExtractedFeatures):
         """Handle iOS IPA files"""
         # Look for Info.plist
-        info_plists = sorted(list(extract_path.rglob("Info.plist")))
-        if info_plists:
+        if any(m.path.name == "Info.plist" for m in source.members):
             features.metadata['has_info_plist'] = True
 
         # Look for executable in .app directory
-        app_dirs = sorted(list(extract_path.glob("Payload/*.app")))
+        app_dirs = sorted({m.path.parts[1] for m in source.members
+                           if len(m.path.parts) > 2 and m.path.parts[0] == "Payload"
+                           and m.path.parts[1].endswith(".app")})
         if app_dirs:
             app_dir = app_dirs[0]
             # Find main executable
-            for file in app_dir.iterdir():
-                if file.is_file() and file.stat().st_mode & 0o111:  # Executable
-                    features.metadata['main_executable'] = file.name
+            for m in source.members:
+                if m.path.parts[:2] == ("Payload", app_dir) and len(m.path.parts) == 3 and m.mode & 0o111:  # Executable
+                    features.metadata['main_executable'] = m.path.name
                     break
 
         # Look for frameworks
         frameworks = []
-        framework_dirs = sorted(list(extract_path.rglob("*.framework")))
+        framework_dirs = sorted({
+            PurePosixPath(*m.path.parts[:i + 1])
+            for m in source.members
+            for i, part in enumerate(m.path.parts)
+            if part.endswith(".framework")
+        })
         for fw in framework_dirs[:20]:
             frameworks.append(fw.name)
             features.imports.append(fw.name)
@@ -575,13 +870,13 @@ class ArchiveExtractor(BaseExtractor):
         if frameworks:
             features.metadata['frameworks'] = frameworks
 
-    def _handle_java_archive(self, extract_path: Path, features: ExtractedFeatures):
+    def _handle_java_archive(self, source: MemberSource, features: ExtractedFeatures):
         """Handle JAR/WAR files"""
         # Look for META-INF/MANIFEST.MF
-        manifest = extract_path / "META-INF" / "MANIFEST.MF"
-        if manifest.exists():
+        manifest = self._find_member(source, "META-INF/MANIFEST.MF")
+        if manifest:
             try:
-                content = manifest.read_text(errors='ignore')
+                content = source.read(manifest).decode('utf-8', errors='ignore')
                 # Extract Main-Class
                 for line in content.splitlines():
                     if line.startswith("Main-Class:"):
@@ -592,31 +887,25 @@ class ArchiveExtractor(BaseExtractor):
                 pass
 
         # Look for web.xml (for WAR files)
-        web_xml = extract_path / "WEB-INF" / "web.xml"
-        if web_xml.exists():
+        if self._find_member(source, "WEB-INF/web.xml"):
             features.metadata['is_webapp'] = True
 
         # Extract package structure
-        class_files = sorted(list(extract_path.rglob("*.class")))
-        packages = set()
-        for class_file in class_files[:100]:
-            parts = class_file.relative_to(extract_path).parts
-            if len(parts) > 1:
-                package = '.'.join(parts[:-1])
-                packages.add(package)
+        class_files = [m for m in source.members if m.suffix == '.class']
+        packages = self._member_packages(class_files[:100])
 
         if packages:
             features.metadata['packages'] = list(packages)[:20]
 
-    def _handle_python_archive(self, extract_path: Path, features: ExtractedFeatures):
+    def _handle_python_archive(self, source: MemberSource, features: ExtractedFeatures):
         """Handle Python egg/wheel files"""
         # Look for metadata
-        metadata_files = list(extract_path.rglob("METADATA")) + \
-                        list(extract_path.rglob("PKG-INFO"))
+        metadata_files = [m for m in source.members if m.path.name == "METADATA"] + \
+                        [m for m in source.members if m.path.name == "PKG-INFO"]
 
         if metadata_files:
             try:
-                content = metadata_files[0].read_text(errors='ignore')
+                content = source.read(metadata_files[0]).decode('utf-8', errors='ignore')
                 for line in content.splitlines():
                     if line.startswith("Name:"):
                         features.metadata['package_name'] = line.split(":", 1)[1].strip()
@@ -626,12 +915,12 @@ class ArchiveExtractor(BaseExtractor):
                 pass
 
         # Look for top-level packages
-        py_files = list(extract_path.glob("*.py"))
-        init_files = list(extract_path.glob("*/__init__.py"))
+        init_files = [m for m in source.members
+                      if len(m.path.parts) == 2 and m.path.name == "__init__.py"]
 
         packages = set()
         for init_file in init_files[:20]:
-            package = init_file.parent.name
+            package = init_file.path.parts[0]
             packages.add(package)
             features.symbols.append(package)
 
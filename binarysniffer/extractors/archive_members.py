@@ -0,0 +1,223 @@
+"""
+Member-level access to archives without extracting them as a whole
+"""
+
+import logging
+import shutil
+import stat
+import tarfile
+import zipfile
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Set while the features of an archive member are extracted (per thread/task)
+_inside_archive: ContextVar[bool] = ContextVar('inside_archive', default=False)
+
+
+@contextmanager
+def archive_member_context():
+    """Mark the current thread as extracting an archive member"""
+    token = _inside_archive.set(True)
+    try:
+        yield
+    finally:
+        _inside_archive.reset(token)
+
+
+def inside_archive() -> bool:
+    """Whether an archive member is being extracted in the current thread"""
+    return _inside_archive.get()
+
+
+@dataclass
+class ArchiveMember:
+    """Regular file stored in an archive"""
+
+    name: str        # Relative POSIX path inside the archive (normalized)
+    size: int        # Uncompressed size in bytes
+    offset: int = 0  # Position in the archive, used to read members in storage order
+    mode: int = 0    # Unix permission bits (0 if the archive does not record them)
+
+    @property
+    def path(self) -> PurePosixPath:
+        """Member name as a path"""
+        return PurePosixPath(self.name)
+
+    @property
+    def suffix(self) -> str:
+        """Lower-case file extension"""
+        return self.path.suffix.lower()
+
+
+def normalize_member_name(name: str) -> Optional[str]:
+    """
+    Turn a stored member name into a safe relative path.
+
+    Absolute paths, drive letters and '..' components are dropped the way
+    extractall() does, so a member can never be written outside its root.
+
+    Returns:
+        Normalized name, or None if nothing is left
+    """
+    parts = [
+        part for part in name.replace('\\', '/').split('/')
+        if part not in ('', '.', '..') and not part.endswith(':')
+    ]
+    return '/'.join(parts) or None
+
+
+class MemberSource:
+    """
+    Listing and on-demand reading of the files in an archive.
+
+    The listing is available before any member is decompressed, so callers
+    can decide what to read. Selected members are streamed one at a time
+    into files under ``root`` (extractors work on paths) and released again
+    once analyzed, so scratch space is bounded by the members in flight
+    instead of the uncompressed archive size.
+    """
+
+    def __init__(self, root: Path, members: Iterable[ArchiveMember] = ()):
+        """
+        Initialize member source.
+
+        Args:
+            root: Directory members are materialized under
+            members: Files in the archive
+        """
+        self.root = Path(root)
+        # Later entries with the same name replace earlier ones, as on extraction
+        by_name: Dict[str, ArchiveMember] = {member.name: member for member in members}
+        self.members: List[ArchiveMember] = sorted(by_name.values(), key=lambda m: m.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Release the underlying archive"""
+
+    def open(self, member: ArchiveMember) -> BinaryIO:
+        """Open a member for streaming reads"""
+        raise NotImplementedError
+
+    def read(self, member: ArchiveMember, limit: int = -1) -> bytes:
+        """
+        Read a member into memory.
+
+        Args:
+            member: Member to read
+            limit: Maximum number of bytes (-1 for all)
+        """
+        with self.open(member) as f:
+            return f.read(limit)
+
+    def local_path(self, member: ArchiveMember) -> Path:
+        """Path a member is materialized at"""
+        return self.root / member.name
+
+    def materialize(self, member: ArchiveMember) -> Path:
+        """
+        Stream a member into a file under the source root.
+
+        Returns:
+            Path of the file (reused if already materialized)
+        """
+        target = self.local_path(member)
+        if target.is_file():
+            return target
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with self.open(member) as src, open(target, 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        return target
+
+    def release(self, path: Path):
+        """Remove a materialized member once it is no longer needed"""
+        path.unlink(missing_ok=True)
+
+
+class ZipMemberSource(MemberSource):
+    """Members of a ZIP-based archive (zip, jar, apk, ipa, whl, ...)"""
+
+    def __init__(self, archive_path: Path, root: Path):
+        self._zip = zipfile.ZipFile(archive_path, 'r')
+        self._infos: Dict[str, zipfile.ZipInfo] = {}
+        members = []
+        for info in self._zip.infolist():
+            name = normalize_member_name(info.filename)
+            if info.is_dir() or name is None:
+                continue
+            self._infos[name] = info
+            mode = (info.external_attr >> 16) & 0o777 if info.create_system == 3 else 0
+            members.append(ArchiveMember(name, info.file_size, info.header_offset, mode))
+        super().__init__(root, members)
+
+    def close(self):
+        self._zip.close()
+
+    def open(self, member: ArchiveMember) -> BinaryIO:
+        return self._zip.open(self._infos[member.name])
+
+
+class TarMemberSource(MemberSource):
+    """
+    Members of a TAR archive, compressed or not.
+
+    Compressed tars can only be read forwards cheaply; read members in
+    storage order (by ``offset``) to decompress the archive once.
+    """
+
+    def __init__(self, archive_path: Path, root: Path):
+        self._tar = tarfile.open(archive_path, 'r:*')
+        self._infos: Dict[str, tarfile.TarInfo] = {}
+        members = []
+        for info in self._tar.getmembers():
+            name = normalize_member_name(info.name)
+            if not (info.isreg() or info.islnk()) or name is None:
+                continue
+            self._infos[name] = info
+            members.append(ArchiveMember(name, info.size, info.offset_data, stat.S_IMODE(info.mode)))
+        super().__init__(root, members)
+
+    def close(self):
+        self._tar.close()
+
+    def open(self, member: ArchiveMember) -> BinaryIO:
+        f = self._tar.extractfile(self._infos[member.name])
+        if f is None:
+            raise OSError(f"Cannot read {member.name} from archive")
+        return f
+
+
+class DirectoryMemberSource(MemberSource):
+    """
+    Files already extracted to a directory.
+
+    Used for formats that need an external tool (7-Zip, rpm2cpio, ...) or
+    whole-file decompression; members are materialized in place.
+    """
+
+    def __init__(self, root: Path, files: Optional[List[Path]] = None):
+        root = Path(root)
+        if files is None:
+            files = [f for f in root.rglob('*') if f.is_file()] if root.is_dir() else []
+        members = []
+        for f in files:
+            st = f.stat()
+            members.append(ArchiveMember(f.relative_to(root).as_posix(), st.st_size, 0, stat.S_IMODE(st.st_mode)))
+        super().__init__(root, members)
+
+    def open(self, member: ArchiveMember) -> BinaryIO:
+        return open(self.local_path(member), 'rb')
+
+    def materialize(self, member: ArchiveMember) -> Path:
+        return self.local_path(member)
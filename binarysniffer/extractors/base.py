@@ -3,23 +3,80 @@ Base extractor class and data structures
 """
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Set
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from ..utils.binary_strings import BinaryStringExtractor, ExtractedString
+from .feature_store import CATEGORIES, CONSTANTS, FUNCTIONS, IMPORTS, STRINGS, SYMBOLS, FeatureList, FeatureStore
+
+
+class FeatureCategory:
+    """Descriptor exposing one category of ExtractedFeatures.store as a FeatureList"""
+
+    def __init__(self, bit: int):
+        self.bit = bit
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        return FeatureList(obj.store, self.bit)
+
+    def __set__(self, obj, values: Iterable[str]):
+        obj.store.replace(self.bit, values)
 
 
-@dataclass
 class ExtractedFeatures:
-    """Container for extracted features from a file"""
+    """
+    Container for extracted features from a file.
+
+    The five categories are list-style views of one FeatureStore, which
+    keeps each unique feature once however many categories (or archive
+    members) it comes from. Assigning a list to a category replaces it.
+    """
 
-    file_path: str
-    file_type: str
-    strings: List[str] = field(default_factory=list)
-    symbols: List[str] = field(default_factory=list)
-    functions: List[str] = field(default_factory=list)
-    constants: List[str] = field(default_factory=list)
-    imports: List[str] = field(default_factory=list)
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    strings = FeatureCategory(STRINGS)
+    symbols = FeatureCategory(SYMBOLS)
+    functions = FeatureCategory(FUNCTIONS)
+    constants = FeatureCategory(CONSTANTS)
+    imports = FeatureCategory(IMPORTS)
+
+    def __init__(
+        self,
+        file_path: str,
+        file_type: str,
+        strings: Optional[Iterable[str]] = None,
+        symbols: Optional[Iterable[str]] = None,
+        functions: Optional[Iterable[str]] = None,
+        constants: Optional[Iterable[str]] = None,
+        imports: Optional[Iterable[str]] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        self.file_path = file_path
+        self.file_type = file_type
+        self.metadata = metadata if metadata is not None else {}
+        self.store = FeatureStore()
+        for name, values in (('strings', strings), ('symbols', symbols), ('functions', functions),
+                             ('constants', constants), ('imports', imports)):
+            if values:
+                setattr(self, name, values)
+
+    def _fields(self) -> tuple:
+        """Field values in dataclass order, with the categories as lists"""
+        return ((self.file_path, self.file_type)
+                + tuple(list(getattr(self, name)) for name in CATEGORIES)
+                + (self.metadata,))
+
+    def __eq__(self, other) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        names = ('file_path', 'file_type', *CATEGORIES, 'metadata')
+        fields = ", ".join(f"{name}={value!r}" for name, value in zip(names, self._fields()))
+        return f"{self.__class__.__qualname__}({fields})"
 
     @property
     def all_features(self) -> List[str]:
@@ -32,10 +89,15 @@ class ExtractedFeatures:
         features.extend(self.imports)
         return features
 
+    @property
+    def feature_count(self) -> int:
+        """Number of features over all categories (len(all_features) without decoding them)"""
+        return sum(len(self.store.ids(bit)) for bit in CATEGORIES.values())
+
     @property
     def unique_features(self) -> Set[str]:
         """Get unique features"""
-        return set(self.all_features)
+        return set(self.store.unique())
 
     def filter_by_length(self, min_length: int = 5) -> "ExtractedFeatures":
         """Filter features by minimum length"""
@@ -51,6 +113,75 @@ class ExtractedFeatures:
         )
 
 
+class FileHeader:
+    """
+    Leading bytes of a file, read once and shared by the extractors probing it.
+
+    The file is only opened on first access, so extractors that decide by
+    extension alone never cause a read.
+    """
+
+    # Bytes read up front; covers every extractor's magic/marker checks
+    SIZE = 16 * 1024
+
+    def __init__(self, file_path: Path):
+        """
+        Initialize header.
+
+        Args:
+            file_path: File to probe
+        """
+        self.file_path = Path(file_path)
+        self._data: Optional[bytes] = None
+        self._file_size: Optional[int] = None
+
+    @property
+    def data(self) -> bytes:
+        """First SIZE bytes of the file (empty if it cannot be read)"""
+        if self._data is None:
+            try:
+                with open(self.file_path, 'rb') as f:
+                    self._data = f.read(self.SIZE)
+            except OSError:
+                self._data = b''
+        return self._data
+
+    @property
+    def file_size(self) -> int:
+        """Size of the file in bytes (0 if it cannot be read)"""
+        if self._file_size is None:
+            data = self.data
+            if len(data) < self.SIZE:
+                self._file_size = len(data)
+            else:
+                try:
+                    self._file_size = self.file_path.stat().st_size
+                except OSError:
+                    self._file_size = 0
+        return self._file_size
+
+    def read(self, offset: int, length: int) -> bytes:
+        """
+        Read a byte range, from the buffer when it covers the range.
+
+        Args:
+            offset: Start offset
+            length: Number of bytes
+
+        Returns:
+            Bytes read (shorter at end of file or on error)
+        """
+        end = offset + length
+        if end <= len(self.data) or len(self.data) < self.SIZE:
+            return self.data[offset:end]
+        try:
+            with open(self.file_path, 'rb') as f:
+                f.seek(offset)
+                return f.read(length)
+        except OSError:
+            return b''
+
+
 class BaseExtractor(ABC):
     """Base class for all feature extractors"""
 
@@ -73,6 +204,43 @@ class BaseExtractor(ABC):
     def extract(self, file_path: Path) -> ExtractedFeatures:
         """Extract features from the file"""
 
+    def handled_extensions(self) -> Optional[Set[str]]:
+        """
+        Get the extensions this extractor can accept.
+
+        ExtractorFactory skips the extractor for files with other
+        extensions. None means files may also be recognized by content.
+        """
+        return None
+
+    def can_handle_header(self, file_path: Path, header: FileHeader) -> bool:
+        """
+        Check if this extractor can handle the file, given its header.
+
+        Extractors that look at file content override this to use the
+        shared header instead of opening the file themselves.
+        """
+        return self.can_handle(file_path)
+
+    def string_extractor(self) -> Optional[BinaryStringExtractor]:
+        """
+        Get the string extractor behind extract(), if it only scans file strings.
+
+        Callers that already read the file sequentially can then scan its
+        strings in the same read (see BinaryStringExtractor.scanner()) and
+        pass them to extract_from_strings(). None means extract() needs
+        the file itself.
+        """
+        return None
+
+    def extract_from_strings(self, file_path: Path, strings: List[ExtractedString]) -> ExtractedFeatures:
+        """
+        Build features from strings scanned with string_extractor().
+
+        Only called on extractors whose string_extractor() is not None.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} extracts from the file itself")
+
     def _filter_strings(self, strings: List[str]) -> List[str]:
         """Filter and limit strings"""
         # Filter by length
@@ -4,8 +4,9 @@ Binary file feature extractor
 
 import logging
 from pathlib import Path
+from typing import List
 
-from ..utils.binary_strings import BinaryStringExtractor
+from ..utils.binary_strings import BinaryStringExtractor, ExtractedString
 from .base import BaseExtractor, ExtractedFeatures
 
 logger = logging.getLogger(__name__)
@@ -41,21 +42,28 @@ class BinaryExtractor(BaseExtractor):
 
         return False
 
+    def string_extractor(self) -> BinaryStringExtractor:
+        """Strings are scanned with default settings"""
+        return BinaryStringExtractor(min_length=5, max_strings=self.max_strings * 2)
+
     def extract(self, file_path: Path) -> ExtractedFeatures:
         """Extract strings and symbols from binary"""
         logger.debug(f"Extracting features from binary: {file_path}")
 
+        # Extract printable strings in file order
+        strings = self.string_extractor().extract_ordered_strings(file_path)
+        return self.extract_from_strings(file_path, strings)
+
+    def extract_from_strings(self, file_path: Path, strings: List[ExtractedString]) -> ExtractedFeatures:
+        """Build features from the binary's strings"""
         features = ExtractedFeatures(
             file_path=str(file_path),
             file_type="binary"
         )
 
         try:
-            # Initialize string extractor with default settings
-            string_extractor = BinaryStringExtractor(min_length=5, max_strings=self.max_strings * 2)
-
-            # Extract printable strings
-            raw_strings = string_extractor.extract_strings(file_path)
+            string_extractor = self.string_extractor()
+            raw_strings = [s.value for s in strings]
             features.strings = self._filter_strings(list(raw_strings))
 
             # Extract categorized strings using the shared utility
@@ -74,4 +82,3 @@ class BinaryExtractor(BaseExtractor):
             logger.error(f"Error extracting from {file_path}: {e}")
 
         return features
-
@@ -7,8 +7,8 @@ import re
 from pathlib import Path
 from typing import List
 
-from ..utils.binary_strings import BinaryStringExtractor
-from .base import BaseExtractor, ExtractedFeatures
+from ..utils.binary_strings import BinaryStringExtractor, ExtractedString
+from .base import BaseExtractor, ExtractedFeatures, FileHeader
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +34,10 @@ class ImprovedBinaryExtractor(BaseExtractor):
 
     def can_handle(self, file_path: Path) -> bool:
         """Check if file is a binary"""
+        return self.can_handle_header(file_path, FileHeader(file_path))
+
+    def can_handle_header(self, file_path: Path, header: FileHeader) -> bool:
+        """Check extension, then null bytes and binary signatures"""
         # Check extension
         if file_path.suffix.lower() in self.BINARY_EXTENSIONS:
             return True
@@ -54,40 +58,40 @@ class ImprovedBinaryExtractor(BaseExtractor):
             return False
 
         # Check if file is binary by reading first bytes
-        try:
-            with open(file_path, 'rb') as f:
-                chunk = f.read(1024)
+        chunk = header.data[:1024]
 
-                # Reject if it starts with XML declaration
-                if chunk.startswith(b'<?xml') or chunk.startswith(b'<!DOCTYPE'):
-                    return False
+        # Reject if it starts with XML declaration
+        if chunk.startswith(b'<?xml') or chunk.startswith(b'<!DOCTYPE'):
+            return False
 
-                # Check for null bytes (common in binaries)
-                if b'\x00' in chunk:
-                    return True
-                # Check for common binary signatures
-                if chunk.startswith((b'MZ', b'\x7fELF', b'\xfe\xed\xfa', b'\xce\xfa\xed\xfe')):
-                    return True
-        except Exception:
-            pass
+        # Check for null bytes (common in binaries)
+        if b'\x00' in chunk:
+            return True
+        # Check for common binary signatures
+        return chunk.startswith((b'MZ', b'\x7fELF', b'\xfe\xed\xfa', b'\xce\xfa\xed\xfe'))
 
-        return False
+    def string_extractor(self) -> BinaryStringExtractor:
+        """Strings are scanned with improved settings"""
+        return BinaryStringExtractor(min_length=self.min_string_length, max_strings=self.max_strings)
 
     def extract(self, file_path: Path) -> ExtractedFeatures:
         """Extract strings and symbols from binary"""
         logger.debug(f"Extracting features from binary: {file_path}")
 
+        # Extract printable strings with minimal filtering, in file order
+        strings = self.string_extractor().extract_ordered_strings(file_path)
+        return self.extract_from_strings(file_path, strings)
+
+    def extract_from_strings(self, file_path: Path, strings: List[ExtractedString]) -> ExtractedFeatures:
+        """Build features from the binary's strings"""
         features = ExtractedFeatures(
             file_path=str(file_path),
             file_type="binary"
         )
 
         try:
-            # Initialize string extractor with improved settings
-            string_extractor = BinaryStringExtractor(min_length=self.min_string_length, max_strings=self.max_strings)
-
-            # Extract printable strings with minimal filtering
-            raw_strings = string_extractor.extract_strings(file_path)
+            string_extractor = self.string_extractor()
+            raw_strings = [s.value for s in strings]
 
             # Keep ALL strings for matching (important!)
             features.strings = list(raw_strings)
@@ -14,7 +14,7 @@ except ImportError:
     HAS_LIEF = False
 
 from ..utils.binary_strings import BinaryStringExtractor
-from .base import BaseExtractor, ExtractedFeatures
+from .base import BaseExtractor, ExtractedFeatures, FileHeader
 
 logger = logging.getLogger(__name__)
 
@@ -35,29 +35,25 @@ class LiefBinaryExtractor(BaseExtractor):
 
     def can_handle(self, file_path: Path) -> bool:
         """Check if file is a binary"""
+        return self.can_handle_header(file_path, FileHeader(file_path))
+
+    def can_handle_header(self, file_path: Path, header: FileHeader) -> bool:
+        """Check extension or ELF/PE/Mach-O magic"""
         # Handle common binary extensions
         binary_extensions = {'.so', '.dll', '.exe', '.dylib', '.a', '.lib', '.o'}
         if file_path.suffix.lower() in binary_extensions:
             return True
 
-        # Check magic bytes for ELF, PE, Mach-O
-        try:
-            with open(file_path, 'rb') as f:
-                magic = f.read(4)
-                # ELF: 0x7f454c46
-                if magic.startswith(b'\x7fELF'):
-                    return True
-                # PE: MZ header
-                if magic.startswith(b'MZ'):
-                    return True
-                # Mach-O: Various magic numbers
-                if magic in [b'\xfe\xed\xfa\xce', b'\xce\xfa\xed\xfe',
-                           b'\xfe\xed\xfa\xcf', b'\xcf\xfa\xed\xfe']:
-                    return True
-        except Exception:
-            pass
-
-        return False
+        magic = header.data[:4]
+        # ELF: 0x7f454c46
+        if magic.startswith(b'\x7fELF'):
+            return True
+        # PE: MZ header
+        if magic.startswith(b'MZ'):
+            return True
+        # Mach-O: Various magic numbers
+        return magic in [b'\xfe\xed\xfa\xce', b'\xce\xfa\xed\xfe',
+                         b'\xfe\xed\xfa\xcf', b'\xcf\xfa\xed\xfe']
 
     def extract(self, file_path: Path) -> ExtractedFeatures:
         """Extract features from binary file using LIEF when available"""
@@ -95,7 +91,7 @@ class LiefBinaryExtractor(BaseExtractor):
         # Categorize strings using shared utility
         features.functions = string_extractor.extract_functions(all_strings)
         features.constants = string_extractor.extract_constants(all_strings)
-        features.imports = list(dict.fromkeys(features.imports))[:5000]  # Limit imports
+        features.imports.dedupe(5000)  # Limit imports
         features.symbols = self._extract_symbols(features.strings)
 
         # Set metadata
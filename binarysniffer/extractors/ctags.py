@@ -5,14 +5,30 @@ CTags-based source code feature extractor (example implementation)
 import json
 import logging
 import subprocess
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Set
 
 from .base import BaseExtractor, ExtractedFeatures
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
+def _ctags_available() -> bool:
+    """Probe for universal-ctags once per process"""
+    try:
+        result = subprocess.run(
+            ['ctags', '--version'],
+            capture_output=True,
+            text=True
+        )
+        return 'Universal Ctags' in result.stdout
+    except Exception:
+        logger.warning("CTags not found. Install universal-ctags for source code analysis.")
+        return False
+
+
 class CTagsExtractor(BaseExtractor):
     """Extract features from source code using CTags"""
 
@@ -43,16 +59,7 @@ class CTagsExtractor(BaseExtractor):
 
     def _check_ctags(self) -> bool:
         """Check if universal-ctags is available"""
-        try:
-            result = subprocess.run(
-                ['ctags', '--version'],
-                capture_output=True,
-                text=True
-            )
-            return 'Universal Ctags' in result.stdout
-        except Exception:
-            logger.warning("CTags not found. Install universal-ctags for source code analysis.")
-            return False
+        return _ctags_available()
 
     def can_handle(self, file_path: Path) -> bool:
         """Check if this extractor can handle the file"""
@@ -61,6 +68,10 @@ class CTagsExtractor(BaseExtractor):
             file_path.suffix.lower() in self.SOURCE_EXTENSIONS
         )
 
+    def handled_extensions(self) -> Optional[Set[str]]:
+        """Source files are recognized by extension only"""
+        return self.SOURCE_EXTENSIONS if self.ctags_available else set()
+
     def extract(self, file_path: Path) -> ExtractedFeatures:
         """Extract features using CTags"""
         logger.debug(f"Extracting features from source: {file_path}")
@@ -12,7 +12,7 @@ try:
 except ImportError:
     HAS_LIEF = False
 
-from .base import BaseExtractor, ExtractedFeatures
+from .base import BaseExtractor, ExtractedFeatures, FileHeader
 
 logger = logging.getLogger(__name__)
 
@@ -27,20 +27,15 @@ class DexExtractor(BaseExtractor):
 
     def can_handle(self, file_path: Path) -> bool:
         """Check if file is a DEX file"""
+        return self.can_handle_header(file_path, FileHeader(file_path))
+
+    def can_handle_header(self, file_path: Path, header: FileHeader) -> bool:
+        """Check extension or DEX magic"""
         if file_path.suffix.lower() == '.dex':
             return True
 
-        # Check magic bytes
-        try:
-            with open(file_path, 'rb') as f:
-                magic = f.read(8)
-                # DEX magic: "dex\n035\0" or "dex\n037\0" etc
-                if magic.startswith(b'dex\n'):
-                    return True
-        except Exception:
-            pass
-
-        return False
+        # DEX magic: "dex\n035\0" or "dex\n037\0" etc
+        return header.data[:8].startswith(b'dex\n')
 
     def extract(self, file_path: Path) -> ExtractedFeatures:
         """Extract features from DEX file"""
@@ -3,10 +3,13 @@ Factory for selecting appropriate feature extractor
 """
 
 import logging
+import threading
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 from .archive import ArchiveExtractor
-from .base import BaseExtractor, ExtractedFeatures
+from .archive_members import inside_archive
+from .base import BaseExtractor, ExtractedFeatures, FileHeader
 from .binary_improved import ImprovedBinaryExtractor
 from .binary_lief import LiefBinaryExtractor
 from .dex import DexExtractor
@@ -22,6 +25,30 @@ from .tensorflow_native import TensorFlowNativeExtractor
 logger = logging.getLogger(__name__)
 
 
+_default_factory: Optional["ExtractorFactory"] = None
+_default_factory_lock = threading.Lock()
+
+
+def get_default_factory() -> "ExtractorFactory":
+    """
+    Get the factory shared within this process.
+
+    Building a factory instantiates every extractor and probes optional
+    tools, so it is built once, on first use.
+    """
+    global _default_factory
+    if _default_factory is None:
+        with _default_factory_lock:
+            if _default_factory is None:
+                _default_factory = ExtractorFactory()
+    return _default_factory
+
+
+def is_default_factory(factory: "ExtractorFactory") -> bool:
+    """Whether factory is the one get_default_factory() returns in this process"""
+    return factory is not None and factory is _default_factory
+
+
 class ExtractorFactory:
     """Factory for creating appropriate extractors"""
 
@@ -32,7 +59,7 @@ class ExtractorFactory:
             enable_ctags: Whether to enable CTags extractor if available
         """
         self.extractors = [
-            ArchiveExtractor(),     # Check archives first (contains other files)
+            ArchiveExtractor(factory=self),  # Check archives first (contains other files)
             StaticLibraryExtractor(),  # Static libraries (.a files)
         ]
 
@@ -86,6 +113,35 @@ class ExtractorFactory:
             ImprovedBinaryExtractor(),      # Finally binaries as fallback
         ])
 
+        # Extractors to probe per file extension, rebuilt if self.extractors changes
+        self._candidates: Dict[str, List[BaseExtractor]] = {}
+        self._candidates_key: Tuple[int, ...] = ()
+
+    def _candidates_for(self, suffix: str) -> List[BaseExtractor]:
+        """
+        Get the extractors that may handle files with an extension, in order.
+
+        Args:
+            suffix: Lower-case file extension
+
+        Returns:
+            Extractors whose handled_extensions() allow the extension
+        """
+        key = tuple(map(id, self.extractors))
+        if key != self._candidates_key:
+            self._candidates = {}
+            self._candidates_key = key
+
+        candidates = self._candidates.get(suffix)
+        if candidates is None:
+            candidates = []
+            for extractor in self.extractors:
+                extensions = extractor.handled_extensions()
+                if extensions is None or suffix in extensions:
+                    candidates.append(extractor)
+            self._candidates[suffix] = candidates
+        return candidates
+
     def get_extractor(self, file_path: Path) -> BaseExtractor:
         """
         Get appropriate extractor for file.
@@ -98,9 +154,17 @@ class ExtractorFactory:
         """
         file_path = Path(file_path)
 
-        # Try each extractor
-        for extractor in self.extractors:
-            if extractor.can_handle(file_path):
+        # Archive members never recurse into archive extraction; the
+        # ArchiveExtractor handles nested archives itself
+        skip_archives = inside_archive()
+
+        # Extractors that only match by extension are pruned up front; the
+        # rest share a single read of the file header
+        header = FileHeader(file_path)
+        for extractor in self._candidates_for(file_path.suffix.lower()):
+            if skip_archives and isinstance(extractor, ArchiveExtractor):
+                continue
+            if extractor.can_handle_header(file_path, header):
                 logger.debug(f"Using {extractor.__class__.__name__} for {file_path}")
                 return extractor
 
@@ -119,4 +183,7 @@ class ExtractorFactory:
             Extracted features
         """
         extractor = self.get_extractor(file_path)
-        return extractor.extract(file_path)
+        features = extractor.extract(file_path)
+        # Extraction is done: drop replaced features and the intern index
+        features.store.compact()
+        return features
@@ -0,0 +1,387 @@
+"""
+Compact storage of extracted features
+
+Extractors put the same string into several categories (an identifier
+is a string, a function and a symbol) and archives merge the features of
+many members that share most of their strings. A FeatureStore keeps
+each unique feature once, UTF-8 encoded in one contiguous buffer with an
+offset table, and records the categories it belongs to as a bitmask.
+Each category is an array of 4-byte feature ids, exposed as a list-style
+FeatureList, so order and repeats are preserved for existing callers.
+"""
+
+from array import array
+from collections.abc import MutableSequence
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional
+
+# Category bits
+STRINGS = 1
+SYMBOLS = 2
+FUNCTIONS = 4
+CONSTANTS = 8
+IMPORTS = 16
+
+# Category name -> bit, in the order of ExtractedFeatures.all_features
+CATEGORIES = {
+    'strings': STRINGS,
+    'symbols': SYMBOLS,
+    'functions': FUNCTIONS,
+    'constants': CONSTANTS,
+    'imports': IMPORTS,
+}
+ALL_CATEGORIES = STRINGS | SYMBOLS | FUNCTIONS | CONSTANTS | IMPORTS
+
+# Lone surrogates (from lenient decoders) must survive the round trip
+_ENCODING = 'utf-8'
+_ERRORS = 'surrogatepass'
+
+
+class FeatureStore:
+    """
+    Interned features of one file.
+
+    Feature ids index the offset table; a feature whose mask is 0 is no
+    longer in any category and is dropped by compact(). The str -> id
+    index used while adding features is released by compact() and
+    rebuilt on demand.
+    """
+
+    __slots__ = ('_buffer', '_offsets', '_masks', '_categories', '_index', '_lowercase', '_counts')
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._offsets = array('Q', [0])
+        self._masks = bytearray()
+        self._categories: Dict[int, array] = {bit: array('I') for bit in CATEGORIES.values()}
+        self._index: Optional[Dict[str, int]] = {}
+        self._lowercase: Dict[Any, FrozenSet[str]] = {}
+        # Occurrences per feature id of categories edited item by item (see splice)
+        self._counts: Dict[int, array] = {}
+
+    def __len__(self) -> int:
+        """Number of stored features (including dropped ones until compact())"""
+        return len(self._masks)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the buffers and id arrays"""
+        ids = sum(ids.buffer_info()[1] * ids.itemsize for ids in self._categories.values())
+        return len(self._buffer) + len(self._masks) + len(self._offsets) * self._offsets.itemsize + ids
+
+    def intern(self, value: str) -> int:
+        """Get the id of a feature, adding it if it is new"""
+        index = self._index if self._index is not None else self._build_index()
+        feature_id = index.get(value)
+        if feature_id is None:
+            feature_id = self._insert(index, value)
+        return feature_id
+
+    def _insert(self, index: Dict[str, int], value: Any) -> int:
+        """Add a feature missing from the index (non-str values are stored as str)"""
+        if not isinstance(value, str):
+            value = str(value)
+            feature_id = index.get(value)
+            if feature_id is not None:
+                return feature_id
+        feature_id = len(self._masks)
+        self._buffer += value.encode(_ENCODING, _ERRORS)
+        self._offsets.append(len(self._buffer))
+        self._masks.append(0)
+        index[value] = feature_id
+        return feature_id
+
+    def lookup(self, value: Any) -> Optional[int]:
+        """Get the id of a stored feature, or None"""
+        if not isinstance(value, str):
+            return None
+        index = self._index if self._index is not None else self._build_index()
+        return index.get(value)
+
+    def get(self, feature_id: int) -> str:
+        """Decode a feature"""
+        return self._buffer[self._offsets[feature_id]:self._offsets[feature_id + 1]].decode(_ENCODING, _ERRORS)
+
+    def has(self, feature_id: int, bits: int) -> bool:
+        """Check whether a feature is in any of the categories"""
+        return bool(self._masks[feature_id] & bits)
+
+    def ids(self, bit: int) -> array:
+        """Feature ids of a category, in order (not a copy)"""
+        return self._categories[bit]
+
+    def intern_all(self, values: Iterable[Any]) -> array:
+        """Get the ids of features, adding new ones"""
+        index = self._index if self._index is not None else self._build_index()
+        ids, insert = array('I'), self._insert
+        for value in values:
+            feature_id = index.get(value)
+            if feature_id is None:
+                feature_id = insert(index, value)
+            ids.append(feature_id)
+        return ids
+
+    def add(self, bit: int, values: Iterable[Any]):
+        """Append features to a category"""
+        new_ids = self.intern_all(values)
+        self._categories[bit].extend(new_ids)
+        masks = self._masks
+        for feature_id in new_ids:
+            masks[feature_id] |= bit
+        counts = self._counts.get(bit)
+        if counts is not None:
+            self._grow(counts)
+            for feature_id in new_ids:
+                counts[feature_id] += 1
+        self._lowercase.clear()
+
+    def replace(self, bit: int, values: Iterable[Any]):
+        """Replace the contents of a category"""
+        if isinstance(values, FeatureList) and values.store is self:
+            new_ids = array('I', values.store.ids(values.bit))
+        else:
+            new_ids = self.intern_all(values)
+        self.set_ids(bit, new_ids)
+
+    def set_ids(self, bit: int, new_ids: array):
+        """Replace the feature ids of a category and update their masks"""
+        old_ids = self._categories[bit]
+        self._categories[bit] = new_ids
+        self._counts.pop(bit, None)
+        clear = ~bit & 0xff
+        masks = self._masks
+        for feature_id in old_ids:
+            masks[feature_id] &= clear
+        for feature_id in new_ids:
+            masks[feature_id] |= bit
+        self._lowercase.clear()
+
+    def splice(self, bit: int, index: slice, new_ids: Optional[array]):
+        """
+        Replace a slice of a category's ids in place (new_ids None deletes it).
+
+        Only the masks of the features removed or added change; a removed
+        feature keeps the category bit while another occurrence remains.
+        Occurrences are counted per category on its first splice.
+        """
+        ids = self._categories[bit]
+        removed = ids[index]
+        if new_ids is None:
+            del ids[index]
+            new_ids = ()
+        else:
+            ids[index] = new_ids
+
+        counts = self._counts.get(bit)
+        if counts is None:
+            counts = self._counts[bit] = array('I', bytes(4 * len(self._masks)))
+            for feature_id in removed:
+                counts[feature_id] += 1
+            for feature_id in ids:
+                counts[feature_id] += 1
+        else:
+            self._grow(counts)
+            for feature_id in new_ids:
+                counts[feature_id] += 1
+
+        masks = self._masks
+        for feature_id in new_ids:
+            masks[feature_id] |= bit
+        clear = ~bit & 0xff
+        for feature_id in removed:
+            counts[feature_id] -= 1
+            if not counts[feature_id]:
+                masks[feature_id] &= clear
+        self._lowercase.clear()
+
+    def _grow(self, counts: array):
+        """Extend an occurrence count array to the features added since it was built"""
+        if len(counts) < len(self._masks):
+            counts.frombytes(bytes(4 * (len(self._masks) - len(counts))))
+
+    def unique(self, bits: int = ALL_CATEGORIES) -> Iterator[str]:
+        """Features in any of the categories, once each, in the order first added"""
+        buffer, offsets, masks = self._buffer, self._offsets, self._masks
+        for feature_id in range(len(masks)):
+            if masks[feature_id] & bits:
+                yield buffer[offsets[feature_id]:offsets[feature_id + 1]].decode(_ENCODING, _ERRORS)
+
+    def lowercase(self, bits: int = ALL_CATEGORIES, min_length: int = 1) -> FrozenSet[str]:
+        """
+        Lowercased features in any of the categories.
+
+        Each unique feature is decoded and lowercased once; the set is
+        cached until the store changes, so several matchers share it.
+
+        Args:
+            bits: Categories to include
+            min_length: Minimum length of the original feature
+        """
+        key = (bits, min_length)
+        normalized = self._lowercase.get(key)
+        if normalized is None:
+            normalized = frozenset(value.lower() for value in self.unique(bits) if len(value) >= min_length)
+            self._lowercase[key] = normalized
+        return normalized
+
+    def compact(self):
+        """Drop features no category holds and release the index"""
+        masks = self._masks
+        if all(masks):
+            self._index = None
+            return
+
+        remap = array('I', bytes(4 * len(masks)))
+        buffer, offsets = bytearray(), array('Q', [0])
+        new_masks = bytearray()
+        for feature_id, mask in enumerate(masks):
+            if mask:
+                remap[feature_id] = len(new_masks)
+                buffer += self._buffer[self._offsets[feature_id]:self._offsets[feature_id + 1]]
+                offsets.append(len(buffer))
+                new_masks.append(mask)
+        self._buffer, self._offsets, self._masks = buffer, offsets, new_masks
+        for bit, ids in self._categories.items():
+            self._categories[bit] = array('I', (remap[feature_id] for feature_id in ids))
+        self._counts.clear()
+        self._index = None
+
+    def _build_index(self) -> Dict[str, int]:
+        """Rebuild the str -> id index after compact()"""
+        self._index = {self.get(feature_id): feature_id for feature_id in range(len(self._masks))}
+        return self._index
+
+    def __getstate__(self):
+        return (bytes(self._buffer), self._offsets, bytes(self._masks), self._categories)
+
+    def __setstate__(self, state):
+        buffer, self._offsets, masks, self._categories = state
+        self._buffer, self._masks = bytearray(buffer), bytearray(masks)
+        self._index = None
+        self._lowercase = {}
+        self._counts = {}
+
+
+class FeatureList(MutableSequence):
+    """
+    List-style view of one category of a FeatureStore.
+
+    Supports what callers do with the former List[str] fields: append,
+    extend, indexing and slicing (slices are plain lists), iteration,
+    membership (a dict lookup instead of a scan), len, + and ==.
+    Single-item mutations change the category in place and only touch
+    the masks of the features they remove or add.
+    """
+
+    __slots__ = ('store', 'bit')
+
+    def __init__(self, store: FeatureStore, bit: int):
+        self.store = store
+        self.bit = bit
+
+    def __len__(self) -> int:
+        return len(self.store.ids(self.bit))
+
+    def __getitem__(self, index):
+        ids = self.store.ids(self.bit)
+        if isinstance(index, slice):
+            return [self.store.get(feature_id) for feature_id in ids[index]]
+        return self.store.get(ids[index])
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self.store.splice(self.bit, index, self.store.intern_all(value))
+        else:
+            self.store.splice(self.bit, self._position(index), array('I', [self.store.intern(value)]))
+
+    def __delitem__(self, index):
+        if not isinstance(index, slice):
+            index = self._position(index)
+        self.store.splice(self.bit, index, None)
+
+    def insert(self, index: int, value: str):
+        # Like list.insert, ids[index:index] clamps out-of-range positions
+        self.store.splice(self.bit, slice(index, index), array('I', [self.store.intern(value)]))
+
+    def _position(self, index: int) -> slice:
+        """One-item slice at a list index (IndexError if out of range)"""
+        length = len(self)
+        position = index + length if index < 0 else index
+        if not 0 <= position < length:
+            raise IndexError("list index out of range")
+        return slice(position, position + 1)
+
+    def index(self, value, start: int = 0, stop: Optional[int] = None) -> int:
+        feature_id = self.store.lookup(value)
+        if feature_id is not None and self.store.has(feature_id, self.bit):
+            start, stop, _ = slice(start, stop).indices(len(self))
+            try:
+                return self.store.ids(self.bit)[start:stop].index(feature_id) + start
+            except ValueError:
+                pass
+        raise ValueError(f"{value!r} is not in list")
+
+    def count(self, value) -> int:
+        feature_id = self.store.lookup(value)
+        if feature_id is None or not self.store.has(feature_id, self.bit):
+            return 0
+        return self.store.ids(self.bit).count(feature_id)
+
+    def append(self, value: str):
+        self.store.add(self.bit, (value,))
+
+    def extend(self, values: Iterable[str]):
+        if isinstance(values, FeatureList) and values.store is self.store:
+            values = list(values)  # Extending a category with itself
+        self.store.add(self.bit, values)
+
+    def dedupe(self, limit: Optional[int] = None):
+        """
+        Drop repeated features, keeping first occurrences, and truncate.
+
+        Same as assigning list(dict.fromkeys(view))[:limit], without
+        decoding the features.
+        """
+        ids = array('I', dict.fromkeys(self.store.ids(self.bit)))
+        self.store.set_ids(self.bit, ids[:limit])
+
+    def clear(self):
+        self.store.set_ids(self.bit, array('I'))
+
+    def reverse(self):
+        self.store.set_ids(self.bit, array('I', reversed(self.store.ids(self.bit))))
+
+    def sort(self, key=None, reverse: bool = False):
+        values = sorted(self, key=key, reverse=reverse)
+        self.store.replace(self.bit, values)
+
+    def copy(self) -> List[str]:
+        return list(self)
+
+    def __iter__(self) -> Iterator[str]:
+        get = self.store.get
+        for feature_id in self.store.ids(self.bit):
+            yield get(feature_id)
+
+    def __contains__(self, value) -> bool:
+        feature_id = self.store.lookup(value)
+        return feature_id is not None and self.store.has(feature_id, self.bit)
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def __add__(self, other) -> List[str]:
+        return list(self) + list(other)
+
+    def __radd__(self, other) -> List[str]:
+        return list(other) + list(self)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, FeatureList)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(list(self))
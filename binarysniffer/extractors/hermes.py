@@ -11,7 +11,7 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from binarysniffer.extractors.base import BaseExtractor
+from binarysniffer.extractors.base import BaseExtractor, FileHeader
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +69,10 @@ class HermesExtractor(BaseExtractor):
         """Check if this extractor can handle the file"""
         return self.can_extract(file_path)
 
+    def can_handle_header(self, file_path: Path, header: FileHeader) -> bool:
+        """Check Hermes magic (with or without a standard extension)"""
+        return file_path.is_file() and header.data[:4] == HERMES_MAGIC
+
     def extract(self, file_path: Path):
         """Extract features from file"""
         from binarysniffer.extractors.base import ExtractedFeatures
@@ -7,9 +7,10 @@ which use protobuf serialization for cross-framework interoperability.
 
 import logging
 from pathlib import Path
-from typing import Any, Dict, Set
+from typing import Any, Dict, Iterator, List, Set
 
-from binarysniffer.extractors.base import BaseExtractor, ExtractedFeatures
+from binarysniffer.extractors.base import BaseExtractor, ExtractedFeatures, FileHeader
+from binarysniffer.extractors.protobuf_wire import Field, ProtobufError, decode_message, mapped_file
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +51,58 @@ ONNX_OPERATORS = {
     'custom': [],
 }
 
+# Wire-format schemas of the ONNX messages read (onnx/onnx.proto). Tensor
+# payloads (raw_data and the typed *_data fields) are not listed, so
+# initializer weights are skipped without being read.
+ONNX_TENSOR_SCHEMA = {
+    1: Field('dims', 'int', repeated=True),
+    8: Field('name', 'string'),
+}
+ONNX_GRAPH_SCHEMA: Dict[int, Field] = {}
+ONNX_ATTRIBUTE_SCHEMA = {
+    1: Field('name', 'string'),
+    6: Field('g', 'message', schema=ONNX_GRAPH_SCHEMA),  # Subgraphs (If, Loop, Scan)
+    11: Field('graphs', 'message', repeated=True, schema=ONNX_GRAPH_SCHEMA),
+}
+ONNX_NODE_SCHEMA = {
+    3: Field('name', 'string'),
+    4: Field('op_type', 'string'),
+    5: Field('attribute', 'message', repeated=True, schema=ONNX_ATTRIBUTE_SCHEMA),
+    7: Field('domain', 'string'),
+}
+ONNX_VALUE_INFO_SCHEMA = {
+    1: Field('name', 'string'),
+}
+ONNX_GRAPH_SCHEMA.update({
+    1: Field('node', 'message', repeated=True, schema=ONNX_NODE_SCHEMA),
+    2: Field('name', 'string'),
+    5: Field('initializer', 'message', repeated=True, schema=ONNX_TENSOR_SCHEMA),
+    11: Field('input', 'message', repeated=True, schema=ONNX_VALUE_INFO_SCHEMA),
+    12: Field('output', 'message', repeated=True, schema=ONNX_VALUE_INFO_SCHEMA),
+})
+ONNX_FUNCTION_SCHEMA = {
+    1: Field('name', 'string'),
+    7: Field('node', 'message', repeated=True, schema=ONNX_NODE_SCHEMA),
+    10: Field('domain', 'string'),
+}
+ONNX_MODEL_SCHEMA = {
+    1: Field('ir_version', 'int'),
+    2: Field('producer_name', 'string'),
+    3: Field('producer_version', 'string'),
+    4: Field('domain', 'string'),
+    5: Field('model_version', 'int'),
+    7: Field('graph', 'message', schema=ONNX_GRAPH_SCHEMA),
+    8: Field('opset_import', 'message', repeated=True, schema={
+        1: Field('domain', 'string'),
+        2: Field('version', 'int'),
+    }),
+    14: Field('metadata_props', 'message', repeated=True, schema={
+        1: Field('key', 'string'),
+        2: Field('value', 'string'),
+    }),
+    25: Field('functions', 'message', repeated=True, schema=ONNX_FUNCTION_SCHEMA),
+}
+
 # Framework signatures in ONNX models
 FRAMEWORK_SIGNATURES = {
     'pytorch': [
@@ -112,46 +165,26 @@ SUSPICIOUS_PATTERNS = {
 class ONNXModelExtractor(BaseExtractor):
     """Extract features from ONNX model files."""
 
-    def __init__(self):
-        """Initialize the ONNX model extractor."""
-        super().__init__()
-        self.has_onnx = self._check_onnx_available()
-
-    def _check_onnx_available(self) -> bool:
-        """Check if onnx library is available."""
-        try:
-            import onnx
-            return True
-        except ImportError:
-            logger.debug("ONNX library not available, using fallback pattern matching")
-            return False
-
     def can_handle(self, file_path: Path) -> bool:
         """Check if file is an ONNX model."""
+        return self.can_handle_header(file_path, FileHeader(file_path))
+
+    def can_handle_header(self, file_path: Path, header: FileHeader) -> bool:
+        """Check extension or ONNX identifiers in the first 1KB."""
         # Check extension
         # Note: .pb files can be used for ONNX models (sometimes)
         if file_path.suffix.lower() in ['.onnx', '.onnxmodel', '.pb']:
             return True
 
-        # Check for ONNX identifiers in file
-        try:
-            with open(file_path, 'rb') as f:
-                # Read first 1KB
-                header = f.read(1024)
-
-                # Check for ONNX identifiers
-                for identifier in ONNX_IDENTIFIERS:
-                    if identifier in header:
-                        return True
-
-                # Check for protobuf structure with ONNX-like content
-                if b'GraphProto' in header or b'ModelProto' in header:
-                    return True
+        first_kb = header.data[:1024]
 
-        except Exception:
-            pass
+        # Check for ONNX identifiers
+        for identifier in ONNX_IDENTIFIERS:
+            if identifier in first_kb:
+                return True
 
-        return False
+        # Check for protobuf structure with ONNX-like content
+        return b'GraphProto' in first_kb or b'ModelProto' in first_kb
 
     def extract(self, file_path: Path) -> ExtractedFeatures:
         """Extract features from ONNX model file."""
@@ -163,13 +196,12 @@ class ONNXModelExtractor(BaseExtractor):
         suspicious_items = set()
 
         try:
-            if self.has_onnx:
-                # Use ONNX library for full parsing
-                features_extracted = self._extract_with_onnx(
-                    file_path, features, operators, frameworks,
-                    architectures, metadata, suspicious_items
-                )
-            else:
+            # Walk the protobuf structure, skipping the weights
+            features_extracted = self._extract_with_wire_format(
+                file_path, features, operators, frameworks,
+                architectures, metadata, suspicious_items
+            )
+            if not features_extracted:
                 # Fallback to pattern matching
                 features_extracted = self._extract_with_patterns(
                     file_path, features, operators, frameworks,
@@ -219,116 +251,140 @@ class ONNXModelExtractor(BaseExtractor):
             metadata=metadata
         )
 
-    def _extract_with_onnx(self, file_path: Path, features: Set[str],
-                           operators: Set[str], frameworks: Set[str],
-                           architectures: Set[str], metadata: Dict[str, Any],
-                           suspicious_items: Set[str]) -> bool:
-        """Extract features using ONNX library."""
+    def _extract_with_wire_format(self, file_path: Path, features: Set[str],
+                                  operators: Set[str], frameworks: Set[str],
+                                  architectures: Set[str], metadata: Dict[str, Any],
+                                  suspicious_items: Set[str]) -> bool:
+        """Extract features by walking the ModelProto wire format.
+
+        Only the graph structure is decoded; initializer payloads are
+        skipped by their length prefix, so model size does not matter.
+        Returns False if the file is not a well-formed ONNX model.
+        """
         try:
-            import onnx
-
-            # Load the model
-            model = onnx.load(str(file_path))
-
-            # Extract model metadata
-            metadata['ir_version'] = model.ir_version
-            metadata['producer_name'] = model.producer_name
-            metadata['producer_version'] = model.producer_version
-            metadata['domain'] = model.domain
-            metadata['model_version'] = model.model_version
-
-            # Add producer as feature
-            if model.producer_name:
-                features.add(f"onnx_producer:{model.producer_name}")
-
-                # Check for framework
-                producer_lower = model.producer_name.lower()
-                for fw, patterns in FRAMEWORK_SIGNATURES.items():
-                    if fw in producer_lower:
+            with mapped_file(file_path) as data:
+                model = decode_message(data, ONNX_MODEL_SCHEMA)
+        except ProtobufError as e:
+            logger.debug(f"Not an ONNX protobuf ({e}), falling back to patterns")
+            return False
+
+        graph = model.get('graph')
+        if not graph or not graph.get('node'):
+            logger.debug("No ONNX graph found, falling back to patterns")
+            return False
+
+        # Extract model metadata
+        metadata['ir_version'] = model.get('ir_version', 0)
+        metadata['producer_name'] = model.get('producer_name', '')
+        metadata['producer_version'] = model.get('producer_version', '')
+        metadata['domain'] = model.get('domain', '')
+        metadata['model_version'] = model.get('model_version', 0)
+
+        # Add producer as feature
+        if metadata['producer_name']:
+            features.add(f"onnx_producer:{metadata['producer_name']}")
+
+            # Check for framework
+            producer_lower = metadata['producer_name'].lower()
+            for fw, patterns in FRAMEWORK_SIGNATURES.items():
+                if fw in producer_lower:
+                    frameworks.add(fw)
+                    break
+
+        # Extract graph information
+        graph_name = graph.get('name', '')
+        metadata['graph_name'] = graph_name
+        features.add(f"onnx_graph:{graph_name}")
+
+        # Extract operators from nodes, including subgraphs and local functions
+        for node in self._iter_nodes(graph, model.get('functions', [])):
+            op_type = node.get('op_type', '')
+            operators.add(op_type)
+            features.add(f"onnx_operator:{op_type}")
+
+            # Check for suspicious operators
+            if op_type in SUSPICIOUS_PATTERNS or 'Custom' in op_type:
+                suspicious_items.add(f"suspicious_operator:{op_type}")
+
+            # Check node names for framework hints
+            node_name = node.get('name', '').lower()
+            for fw, patterns in FRAMEWORK_SIGNATURES.items():
+                for pattern in patterns:
+                    if pattern.lower() in node_name:
                         frameworks.add(fw)
                         break
 
-            # Extract graph information
-            if model.graph:
-                graph = model.graph
-                metadata['graph_name'] = graph.name
-                features.add(f"onnx_graph:{graph.name}")
-
-                # Extract operators from nodes
-                for node in graph.node:
-                    op_type = node.op_type
-                    operators.add(op_type)
-                    features.add(f"onnx_operator:{op_type}")
-
-                    # Check for suspicious operators
-                    if op_type in SUSPICIOUS_PATTERNS or 'Custom' in op_type:
-                        suspicious_items.add(f"suspicious_operator:{op_type}")
-
-                    # Check node names for framework hints
-                    node_name = node.name.lower() if node.name else ""
-                    for fw, patterns in FRAMEWORK_SIGNATURES.items():
-                        for pattern in patterns:
-                            if pattern.lower() in node_name:
-                                frameworks.add(fw)
-                                break
-
-                    # Check for architecture patterns
-                    for arch, patterns in MODEL_ARCHITECTURES.items():
-                        for pattern in patterns:
-                            if pattern.lower() in node_name or pattern.lower() in op_type.lower():
-                                architectures.add(arch)
-                                break
-
-                # Extract input/output information
-                metadata['num_inputs'] = len(graph.input)
-                metadata['num_outputs'] = len(graph.output)
-                features.add(f"onnx_inputs:{len(graph.input)}")
-                features.add(f"onnx_outputs:{len(graph.output)}")
-
-                # Extract initializer (weights) information
-                metadata['num_weights'] = len(graph.initializer)
-                total_params = 0
-                for init in graph.initializer:
-                    if init.dims:
-                        params = 1
-                        for dim in init.dims:
-                            params *= dim
-                        total_params += params
-
-                metadata['total_parameters'] = total_params
-                features.add(f"onnx_parameters:{total_params}")
-
-            # Extract metadata properties
-            for prop in model.metadata_props:
-                key = prop.key.lower()
-                value = prop.value
-
-                # Check for framework signatures
-                for fw, patterns in FRAMEWORK_SIGNATURES.items():
-                    for pattern in patterns:
-                        if pattern.lower() in key or pattern.lower() in value.lower():
-                            frameworks.add(fw)
-                            break
-
-                # Check for suspicious content
-                for pattern in SUSPICIOUS_PATTERNS:
-                    if pattern in value.lower():
-                        suspicious_items.add(f"suspicious_metadata:{key}={value[:50]}")
-
-                # Store important metadata
-                if any(k in key for k in ['license', 'author', 'description', 'framework']):
-                    metadata[key] = value
-
-            # Extract opset information
-            for opset in model.opset_import:
-                features.add(f"onnx_opset:{opset.domain}:{opset.version}")
-                metadata[f'opset_{opset.domain}'] = opset.version
+            # Check for architecture patterns
+            for arch, patterns in MODEL_ARCHITECTURES.items():
+                for pattern in patterns:
+                    if pattern.lower() in node_name or pattern.lower() in op_type.lower():
+                        architectures.add(arch)
+                        break
 
-            return True
+        # Extract input/output information
+        num_inputs = len(graph.get('input', []))
+        num_outputs = len(graph.get('output', []))
+        metadata['num_inputs'] = num_inputs
+        metadata['num_outputs'] = num_outputs
+        features.add(f"onnx_inputs:{num_inputs}")
+        features.add(f"onnx_outputs:{num_outputs}")
+
+        # Extract initializer (weights) information from their shapes
+        initializers = graph.get('initializer', [])
+        metadata['num_weights'] = len(initializers)
+        total_params = 0
+        for init in initializers:
+            dims = init.get('dims')
+            if dims:
+                params = 1
+                for dim in dims:
+                    params *= dim
+                total_params += params
+
+        metadata['total_parameters'] = total_params
+        features.add(f"onnx_parameters:{total_params}")
+
+        # Extract metadata properties
+        for prop in model.get('metadata_props', []):
+            key = prop.get('key', '').lower()
+            value = prop.get('value', '')
+
+            # Check for framework signatures
+            for fw, patterns in FRAMEWORK_SIGNATURES.items():
+                for pattern in patterns:
+                    if pattern.lower() in key or pattern.lower() in value.lower():
+                        frameworks.add(fw)
+                        break
 
-        except Exception as e:
-            logger.debug(f"ONNX library extraction failed: {e}, falling back to patterns")
-            return False
+            # Check for suspicious content
+            for pattern in SUSPICIOUS_PATTERNS:
+                if pattern in value.lower():
+                    suspicious_items.add(f"suspicious_metadata:{key}={value[:50]}")
+
+            # Store important metadata
+            if any(k in key for k in ['license', 'author', 'description', 'framework']):
+                metadata[key] = value
+
+        # Extract opset information
+        for opset in model.get('opset_import', []):
+            domain = opset.get('domain', '')
+            version = opset.get('version', 0)
+            features.add(f"onnx_opset:{domain}:{version}")
+            metadata[f'opset_{domain}'] = version
+
+        return True
+
+    def _iter_nodes(self, graph: Dict[str, Any], functions: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield the nodes of a graph, its subgraphs and model-local functions."""
+        pending = [graph] + functions
+        while pending:
+            container = pending.pop()
+            for node in container.get('node', []):
+                yield node
+                for attribute in node.get('attribute', []):
+                    if 'g' in attribute:
+                        pending.append(attribute['g'])
+                    pending.extend(attribute.get('graphs', []))
 
     def _extract_with_patterns(self, file_path: Path, features: Set[str],
                                operators: Set[str], frameworks: Set[str],
@@ -6,11 +6,11 @@ focusing on detecting potentially malicious operations and ML framework signatur
 """
 
 import logging
-import pickletools
 from pathlib import Path
-from typing import Set
+from typing import List, Set
 
-from binarysniffer.extractors.base import BaseExtractor, ExtractedFeatures
+from binarysniffer.extractors.base import BaseExtractor, ExtractedFeatures, FileHeader
+from binarysniffer.utils.pickle_stream import PickleOp, scan_opcodes
 
 logger = logging.getLogger(__name__)
 
@@ -101,41 +101,41 @@ class PickleModelExtractor(BaseExtractor):
 
     def can_handle(self, file_path: Path) -> bool:
         """Check if file is a pickle file."""
+        return self.can_handle_header(file_path, FileHeader(file_path))
+
+    def can_handle_header(self, file_path: Path, header: FileHeader) -> bool:
+        """Check extension or pickle protocol markers."""
         # Check extension
         # Note: .pth files can be pickled PyTorch models
         if file_path.suffix.lower() in ['.pkl', '.pickle', '.p', '.pth']:
             return True
 
         # Check magic bytes for pickle protocol
-        try:
-            with open(file_path, 'rb') as f:
-                header = f.read(8)  # Read more bytes for better identification
-                # Protocol 3: b'\x80\x03'
-                # Protocol 4: b'\x80\x04'
-                # Protocol 5: b'\x80\x05'
-                if len(header) >= 2 and header[:2] in [b'\x80\x03', b'\x80\x04', b'\x80\x05']:
-                    return True
+        header = header.data[:8]  # Read more bytes for better identification
+        # Protocol 3: b'\x80\x03'
+        # Protocol 4: b'\x80\x04'
+        # Protocol 5: b'\x80\x05'
+        if len(header) >= 2 and header[:2] in [b'\x80\x03', b'\x80\x04', b'\x80\x05']:
+            return True
 
-                # Protocol 0-2 are ASCII-based and more complex to detect
-                # Only check for specific known patterns, not just any single character
-                if len(header) >= 1:
-                    first_byte = header[0:1]
-                    # More restrictive checks for pickle protocol 0-2
-                    if first_byte == b'(':
-                        # Likely a tuple start in protocol 0
-                        return True
-                    elif first_byte == b'c' and len(header) >= 4:
-                        # Check for pickle GLOBAL opcode pattern: c<module>\n<name>\n
-                        # Look for newline characters which indicate pickle format
-                        if b'\n' in header[1:4] or b'\r' in header[1:4]:
-                            return True
-                    elif first_byte in [b'}', b']'] and len(header) >= 2:
-                        # Dict/list end markers - check if followed by reasonable pickle data
-                        # This is quite rare as a file start, so be more careful
-                        if header[1:2] in [b'q', b'p', b'(', b'.']: # Common pickle opcodes
-                            return True
-        except Exception:
-            pass
+        # Protocol 0-2 are ASCII-based and more complex to detect
+        # Only check for specific known patterns, not just any single character
+        if len(header) >= 1:
+            first_byte = header[0:1]
+            # More restrictive checks for pickle protocol 0-2
+            if first_byte == b'(':
+                # Likely a tuple start in protocol 0
+                return True
+            elif first_byte == b'c' and len(header) >= 4:
+                # Check for pickle GLOBAL opcode pattern: c<module>\n<name>\n
+                # Look for newline characters which indicate pickle format
+                if b'\n' in header[1:4] or b'\r' in header[1:4]:
+                    return True
+            elif first_byte in [b'}', b']'] and len(header) >= 2:
+                # Dict/list end markers - check if followed by reasonable pickle data
+                # This is quite rare as a file start, so be more careful
+                if header[1:2] in [b'q', b'p', b'(', b'.']: # Common pickle opcodes
+                    return True
 
         return False
 
@@ -191,104 +191,12 @@ class PickleModelExtractor(BaseExtractor):
         risk_level = "unknown"  # Initialize risk_level
 
         try:
+            # Stream opcodes from the file (safe, no execution); STACK_GLOBAL
+            # imports are resolved as they are decoded
             with open(file_path, 'rb') as f:
-                content = f.read()
-
-            # Parse opcodes using pickletools (safe, no execution)
-            opcodes = list(pickletools.genops(content))
-
-            # Track stack for STACK_GLOBAL resolution
-            stack = []
-
-            for opcode, arg, pos in opcodes:
-                opname = opcode.name
-
-
-                # Track dangerous opcodes
-                if opname in DANGEROUS_OPCODES:
-                    features.add(f"pickle_opcode:{opname}")
-
-                    # Handle STACK_GLOBAL (builds name from stack)
-                    if opname == 'STACK_GLOBAL':
-                        if len(stack) >= 2:
-                            module_name = stack[-2]
-                            attr_name = stack[-1]
-                            import_str = f"{module_name}.{attr_name}"
-                            stack = stack[:-2]
-
-                            # Normalize posix.system to os.system
-                            if import_str == 'posix.system' or import_str == 'nt.system':
-                                import_str = 'os.system'
-
-                            imports.add(import_str)
-                            features.add(f"pickle_import:{import_str}")
-
-                            # Check for dangerous imports
-                            for dangerous in DANGEROUS_IMPORTS:
-                                if dangerous in import_str or import_str.startswith(dangerous):
-                                    suspicious_items.add(f"dangerous_import:{import_str}")
-                                    risk_indicators.append(f"DANGEROUS: {import_str}")
-
-                            # Check for ML frameworks
-                            for framework, signatures in ML_FRAMEWORK_SIGNATURES.items():
-                                for sig in signatures:
-                                    if import_str.startswith(sig):
-                                        ml_frameworks.add(framework)
-                                        features.add(f"ml_framework:{framework}")
-                                        break
-
-                    # Handle regular GLOBAL opcodes
-                    elif opname == 'GLOBAL' and arg:
-                        # Handle different formats of GLOBAL arguments
-                        if isinstance(arg, str):
-                            import_str = arg
-                        elif isinstance(arg, (list, tuple)) and len(arg) >= 2:
-                            import_str = f"{arg[0]}.{arg[1]}"
-                        else:
-                            import_str = str(arg).replace('\n', '.')
-
-                        imports.add(import_str)
-                        features.add(f"pickle_import:{import_str}")
-
-                        # Check for dangerous imports
-                        for dangerous in DANGEROUS_IMPORTS:
-                            if dangerous in import_str or import_str.startswith(dangerous):
-                                suspicious_items.add(f"dangerous_import:{import_str}")
-                                risk_indicators.append(f"DANGEROUS: {import_str}")
-
-                        # Check for ML frameworks
-                        for framework, signatures in ML_FRAMEWORK_SIGNATURES.items():
-                            for sig in signatures:
-                                if import_str.startswith(sig):
-                                    ml_frameworks.add(framework)
-                                    features.add(f"ml_framework:{framework}")
-                                    break
-
-                # Extract string constants (also track for STACK_GLOBAL)
-                elif opname in ['STRING', 'BINSTRING', 'SHORT_BINSTRING',
-                               'UNICODE', 'BINUNICODE', 'SHORT_BINUNICODE']:
-                    if arg and isinstance(arg, (str, bytes)):
-                        string_val = arg.decode('utf-8', errors='ignore') if isinstance(arg, bytes) else arg
-
-                        # Add to stack for STACK_GLOBAL resolution
-                        stack.append(string_val)
-
-                        # Check for suspicious patterns
-                        for pattern in SUSPICIOUS_PATTERNS:
-                            if pattern in string_val.lower():
-                                suspicious_items.add(f"suspicious_string:{pattern}")
-                                risk_indicators.append(f"SUSPICIOUS: Found '{pattern}'")
-
-                        # Add significant strings as features
-                        if len(string_val) > 4 and len(string_val) < 100:
-                            # Clean the string for feature extraction
-                            clean_str = ''.join(c for c in string_val if c.isalnum() or c in '._-')
-                            if clean_str:
-                                features.add(f"pickle_string:{clean_str[:50]}")
-
-                # Track other interesting opcodes
-                elif opname in ['MARK', 'STOP', 'FRAME', 'MEMOIZE']:
-                    features.add(f"pickle_structure:{opname}")
+                for op in scan_opcodes(f):
+                    self._process_opcode(op, features, imports, suspicious_items,
+                                         ml_frameworks, risk_indicators)
 
             # Add risk assessment
             risk_level = self._assess_risk(imports, suspicious_items, ml_frameworks)
@@ -337,6 +245,64 @@ class PickleModelExtractor(BaseExtractor):
                      'suspicious_items': list(suspicious_items) if suspicious_items else None}
         )
 
+    def _process_opcode(self, op: PickleOp, features: Set[str], imports: Set[str],
+                        suspicious_items: Set[str], ml_frameworks: Set[str],
+                        risk_indicators: List[str]):
+        """Record the features of one decoded opcode."""
+        opname = op.name
+
+        # Track dangerous opcodes
+        if opname in DANGEROUS_OPCODES:
+            features.add(f"pickle_opcode:{opname}")
+
+            # Handle imports (GLOBAL, STACK_GLOBAL and INST)
+            if opname in ('GLOBAL', 'STACK_GLOBAL', 'INST') and op.target:
+                import_str = str(op.target)
+
+                # Normalize posix.system to os.system
+                if import_str == 'posix.system' or import_str == 'nt.system':
+                    import_str = 'os.system'
+
+                imports.add(import_str)
+                features.add(f"pickle_import:{import_str}")
+
+                # Check for dangerous imports
+                for dangerous in DANGEROUS_IMPORTS:
+                    if dangerous in import_str or import_str.startswith(dangerous):
+                        suspicious_items.add(f"dangerous_import:{import_str}")
+                        risk_indicators.append(f"DANGEROUS: {import_str}")
+
+                # Check for ML frameworks
+                for framework, signatures in ML_FRAMEWORK_SIGNATURES.items():
+                    for sig in signatures:
+                        if import_str.startswith(sig):
+                            ml_frameworks.add(framework)
+                            features.add(f"ml_framework:{framework}")
+                            break
+
+        # Extract string constants
+        elif opname in ['STRING', 'BINSTRING', 'SHORT_BINSTRING',
+                        'UNICODE', 'BINUNICODE', 'SHORT_BINUNICODE']:
+            if op.arg and isinstance(op.arg, str):
+                string_val = op.arg
+
+                # Check for suspicious patterns
+                for pattern in SUSPICIOUS_PATTERNS:
+                    if pattern in string_val.lower():
+                        suspicious_items.add(f"suspicious_string:{pattern}")
+                        risk_indicators.append(f"SUSPICIOUS: Found '{pattern}'")
+
+                # Add significant strings as features
+                if len(string_val) > 4 and len(string_val) < 100:
+                    # Clean the string for feature extraction
+                    clean_str = ''.join(c for c in string_val if c.isalnum() or c in '._-')
+                    if clean_str:
+                        features.add(f"pickle_string:{clean_str[:50]}")
+
+        # Track other interesting opcodes
+        elif opname in ['MARK', 'STOP', 'FRAME', 'MEMOIZE']:
+            features.add(f"pickle_structure:{opname}")
+
     def _assess_risk(self, imports: Set[str], suspicious: Set[str], frameworks: Set[str]) -> str:
         """Assess the risk level of the pickle file."""
         # Count dangerous indicators
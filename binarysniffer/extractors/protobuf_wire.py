@@ -0,0 +1,182 @@
+"""
+Protocol Buffers wire-format scanning for model files
+
+ONNX models and TensorFlow GraphDef/SavedModel files are protobuf
+messages whose size is almost entirely tensor payloads. Decoding them
+with generated classes materializes every weight; walking the wire
+format instead reads only the field tags and the fields a schema asks
+for, and jumps over every other length-delimited field (raw_data,
+initializers, Const tensors) without touching its bytes. Over a memory
+map, multi-GB models are described from the few pages that hold their
+graph structure.
+"""
+
+import mmap
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Tuple, Union
+
+# Wire types (groups, types 3 and 4, are not used by ONNX or TensorFlow)
+WIRE_VARINT = 0
+WIRE_FIXED64 = 1
+WIRE_LENGTH = 2
+WIRE_FIXED32 = 5
+
+# Deepest message nesting decoded (subgraphs nest graphs in attributes)
+MAX_DEPTH = 64
+
+
+class ProtobufError(ValueError):
+    """Data is not a well-formed protobuf message"""
+
+
+class Field(NamedTuple):
+    """
+    A field to decode from a message.
+
+    kind is 'int' (varint, packed or not), 'string' (UTF-8) or
+    'message' (decoded with the nested schema). Repeated fields decode
+    to lists. Fields missing from a schema are skipped.
+    """
+    name: str
+    kind: str
+    repeated: bool = False
+    schema: Optional[Dict[int, "Field"]] = None
+
+
+@contextmanager
+def mapped_file(file_path: Union[str, Path]) -> Iterator[Union[bytes, mmap.mmap]]:
+    """Map a file read-only (empty files give b'')"""
+    with open(file_path, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+
+def read_varint(data, pos: int, end: int) -> Tuple[int, int]:
+    """
+    Decode a base-128 varint.
+
+    Returns:
+        (value, offset after the varint)
+    """
+    result = 0
+    shift = 0
+    while pos < end and shift < 70:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+    raise ProtobufError(f"Truncated varint at offset {pos}")
+
+
+def iter_fields(data, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, int, Any]]:
+    """
+    Walk the fields of a message.
+
+    Args:
+        data: Bytes-like object (bytes, mmap)
+        start: Offset of the message
+        end: End offset of the message (default: end of data)
+
+    Yields:
+        (field number, wire type, value); the value is an int for
+        varint and fixed fields and the (start, end) span of the
+        payload for length-delimited fields, which are never read here
+
+    Raises:
+        ProtobufError: If the message is malformed
+    """
+    end = len(data) if end is None else end
+    pos = start
+    while pos < end:
+        key, pos = read_varint(data, pos, end)
+        number, wire_type = key >> 3, key & 7
+        if number == 0:
+            raise ProtobufError(f"Invalid field number 0 at offset {pos}")
+
+        if wire_type == WIRE_VARINT:
+            value, pos = read_varint(data, pos, end)
+        elif wire_type == WIRE_LENGTH:
+            length, pos = read_varint(data, pos, end)
+            if length > end - pos:
+                raise ProtobufError(f"Field {number} overruns its message at offset {pos}")
+            value = (pos, pos + length)
+            pos += length
+        elif wire_type in (WIRE_FIXED64, WIRE_FIXED32):
+            size = 8 if wire_type == WIRE_FIXED64 else 4
+            if size > end - pos:
+                raise ProtobufError(f"Truncated fixed field {number} at offset {pos}")
+            value = int.from_bytes(data[pos:pos + size], 'little')
+            pos += size
+        else:
+            raise ProtobufError(f"Unsupported wire type {wire_type} for field {number}")
+        yield number, wire_type, value
+
+
+def decode_message(data, schema: Dict[int, Field], start: int = 0,
+                   end: Optional[int] = None, depth: int = 0) -> Dict[str, Any]:
+    """
+    Decode the fields of a message that a schema lists.
+
+    Args:
+        data: Bytes-like object
+        schema: Field number -> Field
+        start: Offset of the message
+        end: End offset of the message (default: end of data)
+        depth: Nesting depth of the message
+
+    Returns:
+        Field name -> value (lists for repeated fields); absent fields
+        are left out
+
+    Raises:
+        ProtobufError: If the message is malformed or a field has the
+            wrong wire type
+    """
+    if depth > MAX_DEPTH:
+        raise ProtobufError("Messages nested too deeply")
+
+    message: Dict[str, Any] = {}
+    for number, wire_type, value in iter_fields(data, start, end):
+        field = schema.get(number)
+        if field is None:
+            continue
+
+        if field.kind == 'int' and wire_type == WIRE_LENGTH and field.repeated:
+            # Packed repeated varints
+            values = []
+            pos, stop = value
+            while pos < stop:
+                item, pos = read_varint(data, pos, stop)
+                values.append(_signed(item))
+            message.setdefault(field.name, []).extend(values)
+            continue
+
+        if field.kind == 'int':
+            if wire_type != WIRE_VARINT:
+                raise ProtobufError(f"Field {field.name} is not a varint")
+            decoded = _signed(value)
+        else:
+            if wire_type != WIRE_LENGTH:
+                raise ProtobufError(f"Field {field.name} is not length-delimited")
+            if field.kind == 'string':
+                decoded = bytes(data[value[0]:value[1]]).decode('utf-8', errors='replace')
+            else:
+                decoded = decode_message(data, field.schema, value[0], value[1], depth + 1)
+
+        if field.repeated:
+            message.setdefault(field.name, []).append(decoded)
+        else:
+            message[field.name] = decoded
+    return message
+
+
+def _signed(value: int) -> int:
+    """Interpret a varint as a two's complement int64"""
+    return value - (1 << 64) if value >= 1 << 63 else value
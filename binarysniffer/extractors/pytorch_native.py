@@ -6,11 +6,12 @@ containing model state dictionaries, optimizer states, and metadata.
 """
 
 import logging
-import pickletools
 from pathlib import Path
-from typing import Optional, Set
+from typing import Iterator, List, Optional, Set, Tuple
 
-from .base import BaseExtractor, ExtractedFeatures
+from .base import BaseExtractor, ExtractedFeatures, FileHeader
+from .pytorch_zip import ZIP_MAGIC, TorchZipCheckpoint, is_torch_zip_header
+from ..utils.pickle_stream import PickleOp, scan_opcodes
 
 logger = logging.getLogger(__name__)
 
@@ -54,26 +55,27 @@ class PyTorchNativeExtractor(BaseExtractor):
 
     def can_handle(self, file_path: Path) -> bool:
         """Check if file is a PyTorch native format file."""
+        return self.can_handle_header(file_path, FileHeader(file_path))
+
+    def handled_extensions(self) -> Set[str]:
+        """PyTorch files are only recognized by extension."""
+        return {'.pt', '.pth'}
+
+    def can_handle_header(self, file_path: Path, header: FileHeader) -> bool:
+        """Check extension, pickle protocol and PyTorch markers."""
         # Check extension
         if file_path.suffix.lower() not in ['.pt', '.pth']:
             return False
 
-        try:
-            # PyTorch files are pickle files, check magic number
-            with open(file_path, 'rb') as f:
-                header = f.read(2)
-                # Pickle protocol headers
-                if header in [b'\x80\x02', b'\x80\x03', b'\x80\x04', b'\x80\x05']:
-                    # Try to check for PyTorch-specific content
-                    f.seek(0)
-                    content = f.read(min(10000, file_path.stat().st_size))
-
-                    # Look for PyTorch markers in the content
-                    content_str = content.decode('latin-1', errors='ignore')
-                    return any(marker in content_str for marker in ['torch', 'cuda', 'state_dict'])
+        # Zip-format checkpoints (torch.save since PyTorch 1.6)
+        if is_torch_zip_header(header.data):
+            return True
 
-        except Exception as e:
-            logger.debug(f"Error checking PyTorch file {file_path}: {e}")
+        # PyTorch files are pickle files, check magic number
+        if header.data[:2] in [b'\x80\x02', b'\x80\x03', b'\x80\x04', b'\x80\x05']:
+            # Look for PyTorch markers in the content
+            content_str = header.data[:10000].decode('latin-1', errors='ignore')
+            return any(marker in content_str for marker in ['torch', 'cuda', 'state_dict'])
 
         return False
 
@@ -90,94 +92,17 @@ class PyTorchNativeExtractor(BaseExtractor):
         )
 
         try:
-            # Extract pickle opcodes for analysis
-            with open(file_path, 'rb') as f:
-                content = f.read()
-
-            # Analyze pickle structure
-            opcodes = list(pickletools.genops(content))
-
-            # Track imports and state
-            imports = set()
-            keys = set()
-            tensor_info = []
-            has_optimizer = False
-            has_state_dict = False
-            suspicious_ops = []
-            stack = []  # For tracking stack operations
-
-            for opcode, arg, pos in opcodes:
-                # Track imports
-                if opcode.name in ['GLOBAL', 'STACK_GLOBAL']:
-                    if opcode.name == 'GLOBAL':
-                        # Handle different GLOBAL formats
-                        if isinstance(arg, (tuple, list)) and len(arg) >= 2:
-                            import_str = f"{arg[0]}.{arg[1]}"
-                        elif isinstance(arg, str):
-                            import_str = arg
-                        else:
-                            import_str = str(arg).replace('\n', '.')
-                    else:
-                        # STACK_GLOBAL builds module.attribute from stack
-                        if len(stack) >= 2:
-                            module_name = stack[-2]
-                            attr_name = stack[-1]
-                            import_str = f"{module_name}.{attr_name}"
-                            stack = stack[:-2]  # Remove the two items used
-
-                            # Normalize posix.system to os.system
-                            if import_str == 'posix.system' or import_str == 'nt.system':
-                                import_str = 'os.system'
-                        else:
-                            import_str = "stack_global_incomplete"
-
-                    imports.add(import_str)
-                    features.imports.append(import_str)
-
-                    # Check for PyTorch modules
-                    if 'torch' in import_str:
-                        features.strings.append(import_str.replace('.', '_'))
-
-                    # Check for optimizer
-                    if 'optim' in import_str:
-                        has_optimizer = True
-
-                    # Check for dangerous operations
-                    if any(danger in import_str for danger in [
-                        'os.system', 'subprocess', 'eval', 'exec',
-                        'compile', '__import__', 'open'
-                    ]):
-                        suspicious_ops.append(import_str)
-
-                # Track string keys (likely layer names)
-                elif opcode.name in ['SHORT_BINSTRING', 'BINSTRING', 'BINUNICODE', 'UNICODE', 'STRING', 'SHORT_BINUNICODE']:
-                    if isinstance(arg, (bytes, str)):
-                        key = arg.decode('utf-8') if isinstance(arg, bytes) else arg
-                        keys.add(key)
-                        stack.append(key)  # Add to stack for STACK_GLOBAL resolution
-
-                        # Check for state_dict variations
-                        if key in ['state_dict', 'model_state_dict']:
-                            has_state_dict = True
-
-                        # Check for optimizer variations
-                        if key in ['optimizer_state_dict', 'optimizer']:
-                            has_optimizer = True
-
-                        # Extract layer names and parameter names
-                        if any(pattern in key for pattern in [
-                            'weight', 'bias', 'running_mean', 'running_var',
-                            'num_batches_tracked', 'layer', 'conv', 'bn', 'fc',
-                            'attention', 'encoder', 'decoder', 'query', 'key', 'value'
-                        ]):
-                            features.constants.append(key)
-
-                # Track tensor rebuild operations
-                elif opcode.name == 'REDUCE':
-                    if arg and len(arg) > 0:
-                        func = str(arg[0])
-                        if 'rebuild_tensor' in func:
-                            tensor_info.append('tensor_rebuild')
+            # Walk the pickle opcodes as they are read; zip checkpoints only
+            # have their data.pkl member read, never the tensor storages
+            if self._is_zip_checkpoint(file_path):
+                with TorchZipCheckpoint(file_path) as checkpoint, checkpoint.open_pickle() as stream:
+                    scan = self._scan_opcodes(scan_opcodes(stream), features)
+                    features.metadata['container'] = 'zip'
+                    features.metadata.update(checkpoint.storage_summary())
+            else:
+                with open(file_path, 'rb') as stream:
+                    scan = self._scan_opcodes(scan_opcodes(stream), features)
+            imports, keys, has_state_dict, has_optimizer, suspicious_ops = scan
 
             # Detect architecture
             architecture = self._detect_architecture(keys)
@@ -223,6 +148,79 @@ class PyTorchNativeExtractor(BaseExtractor):
 
         return features
 
+    def _is_zip_checkpoint(self, file_path: Path) -> bool:
+        """Check whether the file is a zip-format checkpoint."""
+        with open(file_path, 'rb') as f:
+            return f.read(4) == ZIP_MAGIC
+
+    def _scan_opcodes(self, opcodes: Iterator[PickleOp],
+                      features: ExtractedFeatures) -> Tuple[Set[str], Set[str], bool, bool, List[str]]:
+        """
+        Collect imports and keys from a stream of pickle opcodes.
+
+        Returns:
+            (imports, keys, has_state_dict, has_optimizer, suspicious_ops)
+        """
+        imports = set()
+        keys = set()
+        has_optimizer = False
+        has_state_dict = False
+        suspicious_ops = []
+
+        for op in opcodes:
+            # Track imports
+            if op.name in ['GLOBAL', 'STACK_GLOBAL']:
+                if op.target:
+                    import_str = str(op.target)
+
+                    # Normalize posix.system to os.system
+                    if import_str == 'posix.system' or import_str == 'nt.system':
+                        import_str = 'os.system'
+                else:
+                    import_str = "stack_global_incomplete"
+
+                imports.add(import_str)
+                features.imports.append(import_str)
+
+                # Check for PyTorch modules
+                if 'torch' in import_str:
+                    features.strings.append(import_str.replace('.', '_'))
+
+                # Check for optimizer
+                if 'optim' in import_str:
+                    has_optimizer = True
+
+                # Check for dangerous operations
+                if any(danger in import_str for danger in [
+                    'os.system', 'subprocess', 'eval', 'exec',
+                    'compile', '__import__', 'open'
+                ]):
+                    suspicious_ops.append(import_str)
+
+            # Track string keys (likely layer names)
+            elif op.name in ['SHORT_BINSTRING', 'BINSTRING', 'BINUNICODE', 'UNICODE', 'STRING', 'SHORT_BINUNICODE']:
+                if isinstance(op.arg, (bytes, str)):
+                    key = op.arg.decode('utf-8') if isinstance(op.arg, bytes) else op.arg
+                    keys.add(key)
+
+                    # Check for state_dict variations
+                    if key in ['state_dict', 'model_state_dict']:
+                        has_state_dict = True
+
+                    # Check for optimizer variations
+                    if key in ['optimizer_state_dict', 'optimizer']:
+                        has_optimizer = True
+
+                    # Extract layer names and parameter names
+                    if any(pattern in key for pattern in [
+                        'weight', 'bias', 'running_mean', 'running_var',
+                        'num_batches_tracked', 'layer', 'conv', 'bn', 'fc',
+                        'attention', 'encoder', 'decoder', 'query', 'key', 'value'
+                    ]):
+                        features.constants.append(key)
+
+        return imports, keys, has_state_dict, has_optimizer, suspicious_ops
+
     def _detect_architecture(self, keys: Set[str]) -> Optional[str]:
         """Detect model architecture from layer keys."""
         keys_lower = {k.lower() for k in keys}
@@ -0,0 +1,114 @@
+"""
+Lazy access to zip-format PyTorch checkpoints
+
+torch.save (since PyTorch 1.6) writes a zip archive holding the pickled
+object graph in data.pkl and every tensor storage as a separate data/<key>
+member. Storages make up nearly all of the bytes but say nothing about
+the model's structure or safety, so only the central directory and the
+pickle member are ever read.
+"""
+
+import hashlib
+import logging
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import IO, Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+# Local file header signature at the start of a zip archive
+ZIP_MAGIC = b'PK\x03\x04'
+
+# Name of the pickled object graph inside the checkpoint's top directory
+PICKLE_MEMBER = 'data.pkl'
+
+
+def is_torch_zip_header(data: bytes) -> bool:
+    """
+    Check whether leading file bytes look like a zip-format checkpoint.
+
+    torch.save writes data.pkl as the first member, so its name appears
+    in the first local file header.
+    """
+    return data[:4] == ZIP_MAGIC and PICKLE_MEMBER.encode() in data
+
+
+class TorchZipCheckpoint:
+    """
+    Zip-format PyTorch checkpoint, read without touching tensor data.
+
+    Opening reads the central directory only. open_pickle() streams the
+    data.pkl member; storages are described from their directory entries
+    (name, size, CRC-32), which identify their content without reading it.
+    """
+
+    def __init__(self, file_path: Path):
+        """
+        Open the checkpoint.
+
+        Args:
+            file_path: Checkpoint file
+
+        Raises:
+            zipfile.BadZipFile: If the file is not a zip archive
+            ValueError: If the archive has no data.pkl member
+        """
+        self.file_path = Path(file_path)
+        self._zip = zipfile.ZipFile(self.file_path)
+        try:
+            self.pickle_info = self._find_pickle_member()
+        except ValueError:
+            self._zip.close()
+            raise
+        self.prefix = str(PurePosixPath(self.pickle_info.filename).parent)
+
+    def __enter__(self) -> "TorchZipCheckpoint":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _find_pickle_member(self) -> zipfile.ZipInfo:
+        """Get the top-level data.pkl member (archive/data.pkl or data.pkl)"""
+        for info in self._zip.infolist():
+            path = PurePosixPath(info.filename)
+            if path.name == PICKLE_MEMBER and len(path.parts) <= 2:
+                return info
+        raise ValueError(f"No {PICKLE_MEMBER} in {self.file_path}")
+
+    def open_pickle(self) -> IO[bytes]:
+        """Open the data.pkl member as a stream"""
+        return self._zip.open(self.pickle_info)
+
+    def storages(self) -> List[zipfile.ZipInfo]:
+        """Directory entries of the tensor storages, in archive order"""
+        storage_dir = PurePosixPath(self.prefix, 'data')
+        return [
+            info for info in self._zip.infolist()
+            if PurePosixPath(info.filename).parent == storage_dir and not info.is_dir()
+        ]
+
+    def storage_summary(self) -> Dict[str, Any]:
+        """
+        Describe the tensor storages from directory metadata alone.
+
+        Returns:
+            storage_count, storage_bytes and storage_fingerprint, a SHA-256
+            over the storage keys, sizes and CRC-32s that changes whenever
+            a storage's content does
+        """
+        storages = self.storages()
+        digest = hashlib.sha256()
+        for info in sorted(storages, key=lambda info: info.filename):
+            key = PurePosixPath(info.filename).name
+            digest.update(f"{key}:{info.file_size}:{info.CRC:08x}\n".encode())
+        return {
+            'storage_count': len(storages),
+            'storage_bytes': sum(info.file_size for info in storages),
+            'storage_fingerprint': digest.hexdigest(),
+        }
+
+    def close(self):
+        """Close the archive"""
+        self._zip.close()
@@ -9,9 +9,9 @@ import json
 import logging
 import struct
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 
-from .base import BaseExtractor, ExtractedFeatures
+from .base import BaseExtractor, ExtractedFeatures, FileHeader
 
 logger = logging.getLogger(__name__)
 
@@ -21,37 +21,39 @@ class SafeTensorsExtractor(BaseExtractor):
 
     def can_handle(self, file_path: Path) -> bool:
         """Check if file is a SafeTensors file."""
+        return self.can_handle_header(file_path, FileHeader(file_path))
+
+    def handled_extensions(self) -> Set[str]:
+        """SafeTensors files are only recognized by extension."""
+        return {'.safetensors', '.st'}
+
+    def can_handle_header(self, file_path: Path, header: FileHeader) -> bool:
+        """Check extension and that the JSON metadata header parses."""
         if file_path.suffix.lower() not in ['.safetensors', '.st']:
             return False
 
-        try:
-            with open(file_path, 'rb') as f:
-                # SafeTensors starts with an 8-byte header containing
-                # the size of the JSON metadata
-                header = f.read(8)
-                if len(header) < 8:
-                    return False
-
-                # Try to parse the header size (little-endian uint64)
-                header_size = struct.unpack('<Q', header)[0]
+        # SafeTensors starts with an 8-byte header containing
+        # the size of the JSON metadata
+        size_bytes = header.data[:8]
+        if len(size_bytes) < 8:
+            return False
 
-                # Sanity check: header shouldn't be larger than 100MB
-                if header_size > 100 * 1024 * 1024:
-                    return False
+        # Parse the header size (little-endian uint64)
+        header_size = struct.unpack('<Q', size_bytes)[0]
 
-                # Try to read and parse the JSON metadata
-                metadata_bytes = f.read(header_size)
-                if len(metadata_bytes) != header_size:
-                    return False
+        # Sanity check: header shouldn't be larger than 100MB
+        if header_size > 100 * 1024 * 1024:
+            return False
 
-                try:
-                    json.loads(metadata_bytes)
-                    return True
-                except (json.JSONDecodeError, UnicodeDecodeError):
-                    return False
+        # Try to read and parse the JSON metadata
+        metadata_bytes = header.read(8, header_size)
+        if len(metadata_bytes) != header_size:
+            return False
 
-        except Exception as e:
-            logger.debug(f"Error checking SafeTensors file {file_path}: {e}")
+        try:
+            json.loads(metadata_bytes)
+            return True
+        except (json.JSONDecodeError, UnicodeDecodeError):
             return False
 
     def extract(self, file_path: Path) -> ExtractedFeatures:
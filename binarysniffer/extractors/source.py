@@ -5,6 +5,7 @@ Simple source code feature extractor using regex
 import logging
 import re
 from pathlib import Path
+from typing import Optional, Set
 
 from .base import BaseExtractor, ExtractedFeatures
 
@@ -60,6 +61,10 @@ class SourceCodeExtractor(BaseExtractor):
         """Check if file is source code"""
         return file_path.suffix.lower() in self.SOURCE_EXTENSIONS
 
+    def handled_extensions(self) -> Optional[Set[str]]:
+        """Source files are recognized by extension only"""
+        return self.SOURCE_EXTENSIONS
+
     def extract(self, file_path: Path) -> ExtractedFeatures:
         """Extract features from source code"""
         logger.debug(f"Extracting features from source: {file_path}")
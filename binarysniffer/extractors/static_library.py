@@ -7,12 +7,16 @@ providing better attribution and component detection.
 """
 
 import logging
-from io import BytesIO
+import mmap
+import os
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-from binarysniffer.extractors.base import BaseExtractor, ExtractedFeatures
+import xxhash
+
+from binarysniffer.extractors.base import BaseExtractor, ExtractedFeatures, FileHeader
 from binarysniffer.extractors.binary import BinaryExtractor
+from binarysniffer.utils.byte_stats import printable_runs
 
 logger = logging.getLogger(__name__)
 
@@ -25,11 +29,22 @@ AR_END_MARKER = b'`\n'
 class ARMember:
     """Represents a single member (object file) in an AR archive"""
 
-    def __init__(self, name: str, size: int, offset: int, data: bytes = None):
+    def __init__(self, name: str, size: int, offset: int, data: bytes = None,
+                 source: Optional[Path] = None):
         self.name = name
         self.size = size
         self.offset = offset
-        self.data = data
+        self.source = source
+        self._data = data
+
+    @property
+    def data(self) -> Optional[bytes]:
+        """Member content, read from the archive on access (not kept in memory)"""
+        if self._data is not None or self.source is None:
+            return self._data
+        with open(self.source, 'rb') as f:
+            f.seek(self.offset)
+            return f.read(self.size)
 
     def __repr__(self):
         return f"ARMember(name={self.name}, size={self.size}, offset={self.offset})"
@@ -55,17 +70,20 @@ class StaticLibraryExtractor(BaseExtractor):
 
     def can_handle(self, file_path: Path) -> bool:
         """Check if this extractor can handle the file"""
+        return self.can_handle_header(file_path, FileHeader(file_path))
+
+    def handled_extensions(self) -> Set[str]:
+        """Static libraries are only recognized by extension"""
+        return self.SUPPORTED_EXTENSIONS
+
+    def can_handle_header(self, file_path: Path, header: FileHeader) -> bool:
+        """Check extension and AR magic"""
         # Check extension
         if file_path.suffix.lower() not in self.SUPPORTED_EXTENSIONS:
             return False
 
         # Verify AR magic
-        try:
-            with open(file_path, 'rb') as f:
-                magic = f.read(8)
-                return magic == AR_MAGIC
-        except Exception:
-            return False
+        return header.data[:8] == AR_MAGIC
 
     def extract(self, file_path: Path) -> ExtractedFeatures:
         """Extract features from static library"""
@@ -85,23 +103,20 @@ class StaticLibraryExtractor(BaseExtractor):
         }
 
         try:
-            # Parse AR archive
+            # Parse AR archive (headers only; member data stays in the file)
             members = self._parse_ar_archive(file_path)
             metadata['total_objects'] = len(members)
 
             logger.info(f"Found {len(members)} members in {file_path.name}")
 
-            # Analyze each object file
-            for member in members:
-                # Skip non-object files and symbol tables
-                if not self._is_object_file(member.name):
-                    continue
-
-                logger.debug(f"Analyzing member: {member.name}")
+            # Skip non-object files and symbol tables
+            objects = [m for m in members if self._is_object_file(m.name)]
 
-                # Extract features from object file
-                member_features = self._analyze_object_file(member)
+            with open(file_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                analyzed = self._analyze_objects(objects, mm, metadata)
 
+            for member, member_features in analyzed:
                 if member_features:
                     # Track which object contains which features
                     metadata['members'].append({
@@ -133,16 +148,55 @@ class StaticLibraryExtractor(BaseExtractor):
         return ExtractedFeatures(
             file_path=str(file_path),
             file_type='static_library',
-            strings=list(set(all_strings))[:10000],  # Limit total strings
-            symbols=list(set(all_symbols))[:5000],
-            functions=list(set(all_functions))[:2000],
-            constants=list(set(all_constants))[:2000],
-            imports=list(set(all_imports))[:1000],
+            strings=list(dict.fromkeys(all_strings))[:10000],  # Limit total strings
+            symbols=list(dict.fromkeys(all_symbols))[:5000],
+            functions=list(dict.fromkeys(all_functions))[:2000],
+            constants=list(dict.fromkeys(all_constants))[:2000],
+            imports=list(dict.fromkeys(all_imports))[:1000],
             metadata=metadata
         )
 
+    def _analyze_objects(self, objects: List[ARMember], mm: mmap.mmap,
+                         metadata: Dict[str, Any]) -> List[Tuple[ARMember, Dict[str, List[str]]]]:
+        """
+        Analyze object files from the mapped archive, skipping duplicates.
+
+        Members with the same name, size and content are analyzed once, in
+        archive order. Objects are analyzed one after another: the per-object
+        work is pure Python and holds the GIL, and directory scans already
+        run each library in its own worker process.
+
+        Args:
+            objects: Object file members
+            mm: Memory map of the archive
+            metadata: Extraction metadata, updated with the duplicate count
+
+        Returns:
+            (member, features) pairs of the unique objects
+        """
+        seen = set()
+        unique = []
+        for member in objects:
+            with memoryview(mm)[member.offset:member.offset + member.size] as data:
+                key = (member.name, member.size, xxhash.xxh64(data).intdigest())
+            if key in seen:
+                continue
+            seen.add(key)
+            unique.append(member)
+
+        metadata['duplicate_objects'] = len(objects) - len(unique)
+        if metadata['duplicate_objects']:
+            logger.debug(f"Skipping {metadata['duplicate_objects']} duplicate object files")
+
+        analyzed = []
+        for member in unique:
+            logger.debug(f"Analyzing member: {member.name}")
+            with memoryview(mm)[member.offset:member.offset + member.size] as data:
+                analyzed.append((member, self._analyze_object_file(member, data)))
+        return analyzed
+
     def _parse_ar_archive(self, file_path: Path) -> List[ARMember]:
-        """Parse AR archive and return list of members"""
+        """Parse AR archive headers and return list of members (data is read lazily)"""
         members = []
 
         with open(file_path, 'rb') as f:
@@ -174,14 +228,12 @@ class StaticLibraryExtractor(BaseExtractor):
                 else:
                     # No name found, try to continue
                     if size > 0:
-                        f.read(size)
-                        if size % 2 != 0:
-                            f.read(1)
+                        f.seek(size + (size & 1), os.SEEK_CUR)
                     continue
 
-                # Read member data
+                # Record where the member data is and skip over it
                 current_pos = f.tell()
-                member_data = f.read(actual_data_size)
+                f.seek(actual_data_size, os.SEEK_CUR)
 
                 # Create member only if we have a valid name
                 if name:
@@ -189,13 +241,13 @@ class StaticLibraryExtractor(BaseExtractor):
                         name=name,
                         size=actual_data_size,
                         offset=current_pos,
-                        data=member_data
+                        source=file_path
                     )
                     members.append(member)
 
                 # Align to 2-byte boundary (using original size, not actual_data_size)
                 if (size & 1) == 1:
-                    f.read(1)
+                    f.seek(1, os.SEEK_CUR)
 
         return members
 
@@ -256,13 +308,12 @@ class StaticLibraryExtractor(BaseExtractor):
         # Check for object file extensions
         return name.endswith('.o') or name.endswith('.obj')
 
-    def _analyze_object_file(self, member: ARMember) -> Dict[str, List[str]]:
-        """Analyze a single object file from the archive"""
+    def _analyze_object_file(self, member: ARMember, data=None) -> Dict[str, List[str]]:
+        """Analyze a single object file from the archive (data defaults to member.data)"""
         try:
-            # Create a temporary file-like object
-            temp_file = BytesIO(member.data)
+            if data is None:
+                data = member.data
 
-            # Use BinaryExtractor to analyze the object file
             # We'll extract strings and symbols directly
             features = {
                 'strings': [],
@@ -273,7 +324,7 @@ class StaticLibraryExtractor(BaseExtractor):
             }
 
             # Extract strings (simplified - just looking for ASCII strings)
-            strings = self._extract_strings_from_bytes(member.data)
+            strings = self._extract_strings_from_bytes(data)
             features['strings'] = strings
 
             # Try to identify symbols (looking for common patterns)
@@ -291,36 +342,17 @@ class StaticLibraryExtractor(BaseExtractor):
             logger.debug(f"Error analyzing object file {member.name}: {e}")
             return {}
 
-    def _extract_strings_from_bytes(self, data: bytes, min_length: int = 4) -> List[str]:
+    def _extract_strings_from_bytes(self, data, min_length: int = 4) -> List[str]:
         """Extract ASCII strings from binary data"""
         strings = []
-        current_string = bytearray()
-
-        for byte in data:
-            # Check if printable ASCII
-            if 32 <= byte <= 126:
-                current_string.append(byte)
-            else:
-                # End of string
-                if len(current_string) >= min_length:
-                    try:
-                        s = current_string.decode('ascii', errors='ignore')
-                        if s and not s.isspace():
-                            strings.append(s)
-                    except:
-                        pass
-                current_string = bytearray()
-
-        # Don't forget the last string
-        if len(current_string) >= min_length:
-            try:
-                s = current_string.decode('ascii', errors='ignore')
-                if s and not s.isspace():
-                    strings.append(s)
-            except:
-                pass
-
-        return strings[:5000]  # Limit per object
+        for start, end in printable_runs(data, min_length):
+            s = bytes(data[start:end]).decode('ascii')
+            if not s.isspace():
+                strings.append(s)
+                if len(strings) >= 5000:  # Limit per object
+                    break
+
+        return strings
 
     def _is_significant_string(self, s: str) -> bool:
         """Check if a string is significant enough to track its source"""
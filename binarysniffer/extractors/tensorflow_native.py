@@ -9,12 +9,39 @@ Supports:
 import json
 import logging
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-from .base import BaseExtractor, ExtractedFeatures
+from .base import BaseExtractor, ExtractedFeatures, FileHeader
+from .protobuf_wire import Field, ProtobufError, decode_message, mapped_file
 
 logger = logging.getLogger(__name__)
 
+# Wire-format schemas of the TensorFlow messages read (graph.proto,
+# saved_model.proto). NodeDef attrs, which hold Const tensors, and the
+# object graph are not listed, so weights are skipped without being read.
+NODE_DEF_SCHEMA = {
+    1: Field('name', 'string'),
+    2: Field('op', 'string'),
+}
+GRAPH_DEF_SCHEMA = {
+    1: Field('node', 'message', repeated=True, schema=NODE_DEF_SCHEMA),
+    2: Field('library', 'message', schema={
+        1: Field('function', 'message', repeated=True, schema={
+            3: Field('node_def', 'message', repeated=True, schema=NODE_DEF_SCHEMA),
+        }),
+    }),
+}
+SAVED_MODEL_SCHEMA = {
+    1: Field('saved_model_schema_version', 'int'),
+    2: Field('meta_graphs', 'message', repeated=True, schema={
+        1: Field('meta_info_def', 'message', schema={
+            4: Field('tags', 'string', repeated=True),
+            5: Field('tensorflow_version', 'string'),
+        }),
+        2: Field('graph_def', 'message', schema=GRAPH_DEF_SCHEMA),
+    }),
+}
+
 
 class TensorFlowNativeExtractor(BaseExtractor):
     """Extractor for TensorFlow native format files."""
@@ -28,6 +55,9 @@ class TensorFlowNativeExtractor(BaseExtractor):
         'BiasAdd', 'FusedBatchNorm', 'DepthwiseConv2dNative'
     }
 
+    # Ops that run arbitrary Python functions
+    PY_FUNC_OPS = {'PyFunc', 'PyFuncStateless', 'EagerPyFunc'}
+
     # Keras/TensorFlow layer names in H5 files
     KERAS_LAYERS = {
         'dense', 'conv2d', 'conv1d', 'lstm', 'gru', 'embedding',
@@ -50,34 +80,34 @@ class TensorFlowNativeExtractor(BaseExtractor):
 
     def can_handle(self, file_path: Path) -> bool:
         """Check if file is a TensorFlow native format file."""
+        return self.can_handle_header(file_path, FileHeader(file_path))
+
+    def handled_extensions(self) -> Set[str]:
+        """TensorFlow files are only recognized by extension."""
+        return {'.pb', '.h5', '.keras', '.tf'}
+
+    def can_handle_header(self, file_path: Path, header: FileHeader) -> bool:
+        """Check extension and protobuf markers or HDF5 magic."""
         suffix = file_path.suffix.lower()
 
         # Check extensions
         if suffix not in ['.pb', '.h5', '.keras', '.tf']:
             return False
 
-        try:
-            with open(file_path, 'rb') as f:
-                header = f.read(16)
-
-                # Check for Protocol Buffer (.pb)
-                if suffix == '.pb':
-                    # TensorFlow SavedModel has specific protobuf markers
-                    # Look for common TF protobuf fields
-                    content = f.read(min(5000, file_path.stat().st_size - 16))
-                    content_str = (header + content).decode('latin-1', errors='ignore')
+        # Check for Protocol Buffer (.pb)
+        if suffix == '.pb':
+            # TensorFlow SavedModel has specific protobuf markers
+            # Look for common TF protobuf fields
+            content_str = header.data[:5016].decode('latin-1', errors='ignore')
 
-                    # Check for TensorFlow markers
-                    tf_markers = ['tensorflow', 'tf.', 'saved_model', 'graph_def', 'node_def']
-                    return any(marker in content_str.lower() for marker in tf_markers)
+            # Check for TensorFlow markers
+            tf_markers = ['tensorflow', 'tf.', 'saved_model', 'graph_def', 'node_def']
+            return any(marker in content_str.lower() for marker in tf_markers)
 
-                # Check for HDF5 (.h5, .keras)
-                if suffix in ['.h5', '.keras']:
-                    # HDF5 magic number
-                    return header[:8] == b'\x89HDF\r\n\x1a\n'
-
-        except Exception as e:
-            logger.debug(f"Error checking TensorFlow file {file_path}: {e}")
+        # Check for HDF5 (.h5, .keras)
+        if suffix in ['.h5', '.keras']:
+            # HDF5 magic number
+            return header.data[:8] == b'\x89HDF\r\n\x1a\n'
 
         return False
 
@@ -114,6 +144,64 @@ class TensorFlowNativeExtractor(BaseExtractor):
 
     def _extract_pb_features(self, file_path: Path, features: ExtractedFeatures):
         """Extract features from Protocol Buffer (.pb) file."""
+        graph = self._read_pb_graph(file_path)
+        if graph is None:
+            self._extract_pb_patterns(file_path, features)
+            return
+
+        nodes, format_type, meta_info = graph
+
+        # Operation types and node names straight from the NodeDefs
+        ops_found = {node.get('op', '') for node in nodes} - {''}
+        features.functions.extend(sorted(ops_found))
+        strings_found = [node['name'] for node in nodes if node.get('name')]
+
+        features.metadata['node_count'] = len(nodes)
+        for key in ('tensorflow_version', 'tags'):
+            if meta_info.get(key):
+                features.metadata[key] = meta_info[key]
+
+        search_text = ' '.join(sorted(ops_found) + strings_found).lower()
+        suspicious = sorted(ops_found & self.PY_FUNC_OPS)
+        self._add_pb_features(features, ops_found, strings_found, format_type, search_text, suspicious)
+
+    def _read_pb_graph(self, file_path: Path) -> Optional[Tuple[List[Dict[str, Any]], str, Dict[str, Any]]]:
+        """
+        Walk a SavedModel or GraphDef protobuf, skipping tensor contents.
+
+        Returns:
+            (nodes, format type, meta info) or None if the file is not a
+            well-formed TensorFlow graph
+        """
+        try:
+            with mapped_file(file_path) as data:
+                # SavedModel starts with its schema version (field 1, varint);
+                # a GraphDef starts with its nodes
+                if data[:1] == b'\x08':
+                    saved_model = decode_message(data, SAVED_MODEL_SCHEMA)
+                    meta_graphs = saved_model.get('meta_graphs', [])
+                    graphs = [meta.get('graph_def', {}) for meta in meta_graphs]
+                    meta_info = meta_graphs[0].get('meta_info_def', {}) if meta_graphs else {}
+                    format_type = 'SavedModel'
+                else:
+                    graphs = [decode_message(data, GRAPH_DEF_SCHEMA)]
+                    meta_info = {}
+                    format_type = 'GraphDef'
+        except ProtobufError as e:
+            logger.debug(f"Not a TensorFlow protobuf ({e}), falling back to patterns")
+            return None
+
+        nodes = []
+        for graph in graphs:
+            nodes.extend(graph.get('node', []))
+            for function in graph.get('library', {}).get('function', []):
+                nodes.extend(function.get('node_def', []))
+        if not nodes:
+            return None
+        return nodes, format_type, meta_info
+
+    def _extract_pb_patterns(self, file_path: Path, features: ExtractedFeatures):
+        """Extract features from a .pb file by pattern matching (fallback)."""
         with open(file_path, 'rb') as f:
             content = f.read()
 
@@ -127,13 +215,20 @@ class TensorFlowNativeExtractor(BaseExtractor):
                 ops_found.add(op)
                 features.functions.append(op)
 
-        features.metadata['operations'] = list(ops_found)
-        features.metadata['op_count'] = len(ops_found)
-
         # Look for layer names and variables
         # In protobuf, strings are often prefixed with their length
         strings_found = self._extract_protobuf_strings(content)
 
+        format_type = 'SavedModel' if 'saved_model' in content_str.lower() else 'GraphDef'
+        self._add_pb_features(features, ops_found, strings_found, format_type, content_str.lower(), [])
+
+    def _add_pb_features(self, features: ExtractedFeatures, ops_found: Set[str],
+                         strings_found: List[str], format_type: str,
+                         search_text: str, suspicious: List[str]):
+        """Add operation, layer, architecture and risk features of a .pb file."""
+        features.metadata['operations'] = list(ops_found)
+        features.metadata['op_count'] = len(ops_found)
+
         # Filter for relevant TensorFlow patterns
         layers = []
         variables = []
@@ -156,13 +251,13 @@ class TensorFlowNativeExtractor(BaseExtractor):
 
         # Add format info
         features.metadata['format'] = 'tensorflow_pb'
-        features.metadata['format_type'] = 'SavedModel' if 'saved_model' in content_str.lower() else 'GraphDef'
+        features.metadata['format_type'] = format_type
 
         # Security check - look for suspicious operations
-        suspicious = []
+        suspicious = list(suspicious)
         danger_ops = ['py_func', 'py_function', 'numpy_function', 'script']
         for op in danger_ops:
-            if op in content_str.lower():
+            if op in search_text:
                 suspicious.append(op)
 
         if suspicious:
@@ -2,10 +2,12 @@
 TLSH (Trend Micro Locality Sensitive Hash) support for fuzzy matching
 """
 
+import os
+import json
+import struct
 import logging
 from pathlib import Path
-from typing import Optional, List, Dict, Tuple
-import json
+from typing import Optional, List, Dict, Tuple, Iterable
 
 try:
     import tlsh
@@ -14,6 +16,9 @@ except ImportError:
     HAS_TLSH = False
     tlsh = None
 
+from .tlsh_index import TLSHIndex
+from ..utils.file_metadata import FileDigests, read_file_once
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,6 +31,7 @@ class TLSHHasher:
     SIMILAR_THRESHOLD = 70        # Similar (possibly same component, moderate changes)
     RELATED_THRESHOLD = 100       # Related (might be same family/library)
     MAX_DISTANCE = 300            # Maximum meaningful distance
+    NEAR_DUPLICATE_THRESHOLD = 10 # Near-duplicates (same build, different packaging)
     
     def __init__(self):
         """Initialize TLSH hasher"""
@@ -50,18 +56,17 @@ class TLSHHasher:
             return None
         
         try:
-            # TLSH requires at least 256 bytes of data
-            with open(file_path, 'rb') as f:
-                data = f.read()
+            # Stream the file instead of reading it into memory
+            digests = FileDigests(['tlsh'])
+            size = read_file_once(file_path, [digests])
             
-            if len(data) < 256:
-                logger.debug(f"File too small for TLSH: {file_path} ({len(data)} bytes)")
+            # TLSH requires at least 256 bytes of data
+            if size < 256:
+                logger.debug(f"File too small for TLSH: {file_path} ({size} bytes)")
                 return None
             
-            # Generate hash
-            hash_value = tlsh.hash(data)
-            
-            # TLSH returns empty string if it can't generate hash
+            # TLSH could not generate a hash (e.g. not enough variation)
+            hash_value = digests.hexdigests().get('tlsh')
             if not hash_value:
                 logger.debug(f"TLSH could not generate hash for {file_path}")
                 return None
@@ -157,14 +162,17 @@ class TLSHHasher:
         Returns:
             Similarity score between 0.0 (different) and 1.0 (identical)
         """
-        distance = self.compare(hash1, hash2)
-        
-        if distance >= self.MAX_DISTANCE:
+        return self.score_for_distance(self.compare(hash1, hash2))
+    
+    @classmethod
+    def score_for_distance(cls, distance: int) -> float:
+        """Similarity score (0.0-1.0) of a TLSH distance"""
+        if distance >= cls.MAX_DISTANCE:
             return 0.0
         
         # Convert distance to similarity score
         # Using exponential decay for more intuitive scores
-        score = max(0.0, 1.0 - (distance / self.MAX_DISTANCE))
+        score = max(0.0, 1.0 - (distance / cls.MAX_DISTANCE))
         return score
     
     def get_similarity_level(self, hash1: str, hash2: str) -> str:
@@ -178,15 +186,18 @@ class TLSHHasher:
         Returns:
             Similarity level string
         """
-        distance = self.compare(hash1, hash2)
-        
-        if distance <= self.IDENTICAL_THRESHOLD:
+        return self.level_for_distance(self.compare(hash1, hash2))
+    
+    @classmethod
+    def level_for_distance(cls, distance: int) -> str:
+        """Human-readable similarity level of a TLSH distance"""
+        if distance <= cls.IDENTICAL_THRESHOLD:
             return "identical"
-        elif distance <= self.VERY_SIMILAR_THRESHOLD:
+        elif distance <= cls.VERY_SIMILAR_THRESHOLD:
             return "very_similar"
-        elif distance <= self.SIMILAR_THRESHOLD:
+        elif distance <= cls.SIMILAR_THRESHOLD:
             return "similar"
-        elif distance <= self.RELATED_THRESHOLD:
+        elif distance <= cls.RELATED_THRESHOLD:
             return "related"
         else:
             return "different"
@@ -252,66 +263,161 @@ class TLSHHasher:
         if threshold is None:
             threshold = self.VERY_SIMILAR_THRESHOLD
         
-        # Simple greedy clustering
+        if threshold >= self.MAX_DISTANCE:
+            # Distances are capped at MAX_DISTANCE, so everything is one cluster
+            return [[identifier for identifier, hash_value in hashes.items() if hash_value]]
+        
+        # Greedy clustering: each unclustered hash in order collects all
+        # unclustered hashes within threshold, found through the index
+        index = TLSHIndex((identifier, hash_value) for identifier, hash_value in hashes.items() if hash_value)
         clusters = []
         processed = set()
         
-        for id1, hash1 in hashes.items():
-            if id1 in processed or not hash1:
+        for position, hash_value in enumerate(index.hashes):
+            if position in processed:
                 continue
             
-            cluster = [id1]
-            processed.add(id1)
-            
-            for id2, hash2 in hashes.items():
-                if id2 in processed or not hash2 or id2 == id1:
-                    continue
-                
-                distance = self.compare(hash1, hash2)
-                if distance <= threshold:
-                    cluster.append(id2)
-                    processed.add(id2)
-            
-            clusters.append(cluster)
+            members = sorted(
+                other for other, _ in index.query_positions(hash_value, threshold)
+                if other not in processed and other != position
+            )
+            processed.add(position)
+            processed.update(members)
+            clusters.append([index.keys[position]] + [index.keys[other] for other in members])
         
         return clusters
 
 
 class TLSHSignatureStore:
-    """Store and manage TLSH signatures for components"""
+    """
+    Store and manage TLSH signatures for components.
+    
+    Signatures are kept in an append-only binary file: a magic header
+    followed by length-prefixed records (hash, component, version and JSON
+    metadata separated by NUL). Adding a signature appends one record; a
+    later record for the same component version replaces the earlier one
+    when loading, and the file is compacted once most records are stale.
+    Lookups go through a TLSHIndex instead of comparing every signature.
+    A legacy JSON store is read and converted on the next write.
+    """
+    
+    MAGIC = b"BSTLSH1\n"
+    LEGACY_FILENAME = 'tlsh_signatures.json'
+    _RECORD_LENGTH = struct.Struct('<I')
     
     def __init__(self, storage_path: Optional[Path] = None):
         """
         Initialize TLSH signature store.
         
         Args:
-            storage_path: Path to store TLSH signatures (default: ~/.binarysniffer/tlsh_signatures.json)
+            storage_path: Path to store TLSH signatures (default: ~/.binarysniffer/tlsh_signatures.bin)
         """
         if storage_path is None:
-            storage_path = Path.home() / '.binarysniffer' / 'tlsh_signatures.json'
+            storage_path = Path.home() / '.binarysniffer' / 'tlsh_signatures.bin'
         
-        self.storage_path = storage_path
+        self.storage_path = Path(storage_path)
         self.hasher = TLSHHasher()
+        self._records = 0
+        self._rewrite = False
+        self._index: Optional[TLSHIndex] = None
         self.signatures = self._load_signatures()
     
+    @property
+    def index(self) -> TLSHIndex:
+        """Nearest-neighbour index over the stored hashes (built on first use)"""
+        if self._index is None:
+            self._index = TLSHIndex((key, sig['hash']) for key, sig in self.signatures.items() if sig.get('hash'))
+        return self._index
+    
     def _load_signatures(self) -> Dict[str, Dict]:
         """Load TLSH signatures from storage"""
-        if not self.storage_path.exists():
-            return {}
+        path = self.storage_path
+        if not path.exists():
+            legacy = path.with_name(self.LEGACY_FILENAME)
+            if path.suffix == '.json' or not legacy.exists():
+                return {}
+            path = legacy
         
         try:
-            with open(self.storage_path, 'r') as f:
-                return json.load(f)
-        except Exception as e:
+            data = path.read_bytes()
+        except OSError as e:
             logger.error(f"Error loading TLSH signatures: {e}")
             return {}
+        
+        if not data.startswith(self.MAGIC):
+            try:
+                signatures = json.loads(data)
+            except Exception as e:
+                logger.error(f"Error loading TLSH signatures: {e}")
+                return {}
+            self._rewrite = True
+            return signatures
+        
+        signatures = {}
+        offset = len(self.MAGIC)
+        while offset + self._RECORD_LENGTH.size <= len(data):
+            (length,) = self._RECORD_LENGTH.unpack_from(data, offset)
+            offset += self._RECORD_LENGTH.size
+            if offset + length > len(data):
+                break
+            try:
+                tlsh_hash, component, version, metadata = data[offset:offset + length].decode('utf-8').split('\0')
+                metadata = json.loads(metadata) if metadata else {}
+            except (UnicodeDecodeError, ValueError) as e:
+                logger.warning(f"Skipping corrupt TLSH signature record at offset {offset}: {e}")
+            else:
+                signatures[f"{component}_{version}"] = {
+                    'component': component,
+                    'version': version,
+                    'hash': tlsh_hash,
+                    'metadata': metadata
+                }
+            offset += length
+            self._records += 1
+        
+        if offset != len(data):
+            # Interrupted append; rewrite without the partial record
+            logger.warning(f"Ignoring truncated TLSH signature record in {path}")
+            self._rewrite = True
+        
+        return signatures
+    
+    def _encode(self, sig: Dict) -> bytes:
+        """Encode a signature as a length-prefixed record"""
+        payload = '\0'.join((
+            sig['hash'],
+            sig['component'],
+            sig['version'],
+            json.dumps(sig['metadata'], separators=(',', ':')) if sig.get('metadata') else ''
+        )).encode('utf-8')
+        return self._RECORD_LENGTH.pack(len(payload)) + payload
     
     def _save_signatures(self):
-        """Save TLSH signatures to storage"""
+        """Rewrite the store with one record per signature"""
+        tmp_path = self.storage_path.with_name(f"{self.storage_path.name}.{os.getpid()}.tmp")
         try:
             self.storage_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.storage_path, 'w') as f:
-                json.dump(self.signatures, f, indent=2)
+            with open(tmp_path, 'wb') as f:
+                f.write(self.MAGIC)
+                f.write(b''.join(self._encode(sig) for sig in self.signatures.values()))
+            os.replace(tmp_path, self.storage_path)
+            self._records = len(self.signatures)
+            self._rewrite = False
+        except Exception as e:
+            logger.error(f"Error saving TLSH signatures: {e}")
+            tmp_path.unlink(missing_ok=True)
+    
+    def _append_signatures(self, sigs: List[Dict]):
+        """Append records, compacting the store instead when it is mostly stale"""
+        if (self._rewrite or not self.storage_path.exists()
+                or self._records + len(sigs) > 2 * len(self.signatures) + 64):
+            self._save_signatures()
+            return
+        
+        try:
+            with open(self.storage_path, 'ab') as f:
+                f.write(b''.join(self._encode(sig) for sig in sigs))
+            self._records += len(sigs)
         except Exception as e:
             logger.error(f"Error saving TLSH signatures: {e}")
     
@@ -331,19 +437,38 @@ class TLSHSignatureStore:
             tlsh_hash: TLSH hash value
             metadata: Optional metadata
         """
-        if not tlsh_hash:
-            return
-        
-        key = f"{component}_{version}"
-        
-        self.signatures[key] = {
-            'component': component,
-            'version': version,
-            'hash': tlsh_hash,
-            'metadata': metadata or {}
-        }
+        self.add_signatures([(component, version, tlsh_hash, metadata)])
+    
+    def add_signatures(self, entries: Iterable[Tuple[str, str, str, Optional[Dict]]]):
+        """
+        Add TLSH signatures with a single write.
         
-        self._save_signatures()
+        Args:
+            entries: (component, version, TLSH hash, metadata) tuples
+        """
+        added = []
+        for component, version, tlsh_hash, metadata in entries:
+            if not tlsh_hash:
+                continue
+            
+            key = f"{component}_{version}"
+            sig = {
+                'component': component,
+                'version': version,
+                'hash': tlsh_hash,
+                'metadata': metadata or {}
+            }
+            
+            if key in self.signatures:
+                # Replaced hashes cannot be removed from the index
+                self._index = None
+            elif self._index is not None:
+                self._index.add(key, tlsh_hash)
+            self.signatures[key] = sig
+            added.append(sig)
+        
+        if added:
+            self._append_signatures(added)
     
     def find_matches(
         self,
@@ -363,26 +488,27 @@ class TLSHSignatureStore:
         if not self.hasher.enabled or not target_hash:
             return []
         
-        # Build candidate hash dict
-        candidates = {
-            key: sig['hash']
-            for key, sig in self.signatures.items()
-            if sig.get('hash')
-        }
+        if threshold is None:
+            threshold = self.hasher.SIMILAR_THRESHOLD
         
-        # Find similar hashes
-        similar = self.hasher.find_similar(target_hash, candidates, threshold)
+        if threshold >= self.hasher.MAX_DISTANCE:
+            # Every signature matches at the capped distance
+            candidates = {key: sig['hash'] for key, sig in self.signatures.items() if sig.get('hash')}
+            similar = [(key, distance) for key, distance, _ in
+                       self.hasher.find_similar(target_hash, candidates, threshold)]
+        else:
+            similar = self.index.query(target_hash, threshold)
         
         # Build result with component info
         results = []
-        for key, distance, score in similar:
+        for key, distance in similar:
             sig = self.signatures[key]
             results.append({
                 'component': sig['component'],
                 'version': sig['version'],
                 'distance': distance,
-                'similarity_score': score,
-                'similarity_level': self.hasher.get_similarity_level(target_hash, sig['hash']),
+                'similarity_score': self.hasher.score_for_distance(distance),
+                'similarity_level': self.hasher.level_for_distance(distance),
                 'metadata': sig.get('metadata', {})
             })
         
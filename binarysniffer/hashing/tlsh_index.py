@@ -0,0 +1,256 @@
+"""
+Nearest-neighbour index over TLSH hashes
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import tlsh
+    HAS_TLSH = True
+except ImportError:
+    HAS_TLSH = False
+    tlsh = None
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+logger = logging.getLogger(__name__)
+
+
+# Standard TLSH: 1 byte checksum, 1 byte length, 1 byte quartile ratios, 32 byte body
+TLSH_HEX_LENGTH = 70
+TLSH_BODY_SIZE = 32
+TLSH_RECORD_SIZE = 3 + TLSH_BODY_SIZE
+
+
+def _swap_nibbles(value: int) -> int:
+    """Undo the nibble swap of TLSH header bytes in the hex encoding"""
+    return ((value & 0x0F) << 4) | (value >> 4)
+
+
+def _mod_diff(x: int, y: int, modulus: int) -> int:
+    """Distance between two values on a circle of the given size"""
+    d = abs(x - y)
+    return min(d, modulus - d)
+
+
+def _length_cost(d: int) -> int:
+    """Distance contributed by a length difference"""
+    return d if d <= 1 else d * 12
+
+
+def _ratio_cost(d: int) -> int:
+    """Distance contributed by a quartile ratio difference"""
+    return d if d <= 1 else (d - 1) * 12
+
+
+def _byte_pair_diff(x: int, y: int) -> int:
+    """Body distance of two bytes (four 2-bit buckets, a difference of 3 counts 6)"""
+    total = 0
+    for shift in (0, 2, 4, 6):
+        d = abs(((x >> shift) & 3) - ((y >> shift) & 3))
+        total += 6 if d == 3 else d
+    return total
+
+
+# Body distance of every pair of body bytes
+_BODY_DIFF = [[_byte_pair_diff(x, y) for y in range(256)] for x in range(256)]
+if HAS_NUMPY:
+    _BODY_DIFF_ARRAY = np.array(_BODY_DIFF, dtype=np.uint16)
+
+
+def parse_tlsh(tlsh_hash: str) -> Optional[bytes]:
+    """
+    Decode a standard TLSH hash.
+
+    Args:
+        tlsh_hash: Hash string, with or without the 'T1' version prefix
+
+    Returns:
+        TLSH_RECORD_SIZE bytes (checksum, length, quartile ratios, body) with the header
+        nibbles in natural order, or None for other TLSH variants
+    """
+    if len(tlsh_hash) == TLSH_HEX_LENGTH + 2 and tlsh_hash[:2] in ('T1', 't1'):
+        tlsh_hash = tlsh_hash[2:]
+    if len(tlsh_hash) != TLSH_HEX_LENGTH:
+        return None
+    try:
+        raw = bytearray.fromhex(tlsh_hash)
+    except ValueError:
+        return None
+    raw[1] = _swap_nibbles(raw[1])
+    raw[2] = _swap_nibbles(raw[2])
+    return bytes(raw)
+
+
+def tlsh_distance(a: bytes, b: bytes) -> int:
+    """
+    Distance of two parsed hashes, identical to tlsh.diff().
+
+    Args:
+        a: Result of parse_tlsh()
+        b: Result of parse_tlsh()
+    """
+    distance = _length_cost(_mod_diff(a[1], b[1], 256))
+    distance += _ratio_cost(_mod_diff(a[2] & 0x0F, b[2] & 0x0F, 16))
+    distance += _ratio_cost(_mod_diff(a[2] >> 4, b[2] >> 4, 16))
+    distance += a[0] != b[0]
+    return distance + sum(_BODY_DIFF[x][y] for x, y in zip(a[3:], b[3:]))
+
+
+def max_length_diff(threshold: int) -> int:
+    """Largest length difference whose cost alone stays within threshold"""
+    if threshold < 1:
+        return 0
+    return max(1, min(128, threshold // 12))
+
+
+class TLSHIndex:
+    """
+    Index answering "which hashes are within distance T of this one".
+
+    The TLSH distance charges 12 per step of length difference beyond the
+    first, so hashes are bucketed by their length byte and a query only
+    visits the few buckets that can still be within the threshold. Within
+    those buckets the header cost prunes further, and the remaining
+    distances are computed exactly over a byte-pair table with NumPy
+    (bucketed tlsh.diff calls without NumPy). Hashes that are not standard
+    TLSH are compared linearly with tlsh.diff. Results are exact.
+    """
+
+    def __init__(self, items: Iterable[Tuple[str, str]] = ()):
+        """
+        Initialize index.
+
+        Args:
+            items: (key, TLSH hash) pairs
+        """
+        self.keys: List[str] = []
+        self.hashes: List[str] = []
+        self._parsed: List[Optional[bytes]] = []
+        self._unindexed: List[int] = []
+        self._buckets: Dict[int, List[int]] = {}
+        self._array = None
+        self._positions = None
+        self._starts = None
+        for key, tlsh_hash in items:
+            self.add(key, tlsh_hash)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, key: str, tlsh_hash: str) -> int:
+        """
+        Add a hash.
+
+        Args:
+            key: Identifier returned by queries
+            tlsh_hash: TLSH hash string
+
+        Returns:
+            Position of the entry
+        """
+        position = len(self.keys)
+        parsed = parse_tlsh(tlsh_hash)
+        self.keys.append(key)
+        self.hashes.append(tlsh_hash)
+        self._parsed.append(parsed)
+        if parsed is None:
+            self._unindexed.append(position)
+        else:
+            self._buckets.setdefault(parsed[1], []).append(position)
+        self._array = None
+        return position
+
+    def query(self, tlsh_hash: str, threshold: int) -> List[Tuple[str, int]]:
+        """
+        Find stored hashes within a distance.
+
+        Args:
+            tlsh_hash: Hash to search for
+            threshold: Maximum distance (inclusive)
+
+        Returns:
+            (key, distance) pairs sorted by distance, then insertion order
+        """
+        return [(self.keys[position], distance) for position, distance in self.query_positions(tlsh_hash, threshold)]
+
+    def query_positions(self, tlsh_hash: str, threshold: int) -> List[Tuple[int, int]]:
+        """Like query(), returning entry positions instead of keys"""
+        target = parse_tlsh(tlsh_hash) if tlsh_hash else None
+        if target is None:
+            found = self._linear(tlsh_hash, range(len(self.keys)), threshold)
+        else:
+            reach = max_length_diff(threshold)
+            lengths = {(target[1] + d) % 256 for d in range(-reach, reach + 1)}
+            if HAS_NUMPY:
+                found = self._scan_numpy(target, lengths, threshold)
+            else:
+                found = [
+                    (position, distance)
+                    for length in lengths
+                    for position in self._buckets.get(length, ())
+                    for distance in (tlsh_distance(target, self._parsed[position]),)
+                    if distance <= threshold
+                ]
+            found.extend(self._linear(tlsh_hash, self._unindexed, threshold))
+
+        found.sort(key=lambda item: (item[1], item[0]))
+        return found
+
+    def _linear(self, tlsh_hash: str, positions: Iterable[int], threshold: int) -> List[Tuple[int, int]]:
+        """Compare with tlsh.diff one by one"""
+        if not HAS_TLSH or not tlsh_hash:
+            return []
+
+        found = []
+        for position in positions:
+            try:
+                distance = tlsh.diff(tlsh_hash, self.hashes[position])
+            except Exception as e:
+                logger.debug(f"Cannot compare TLSH hashes: {e}")
+                continue
+            if distance <= threshold:
+                found.append((position, distance))
+        return found
+
+    def _build(self):
+        """Lay parsed hashes out as an array sorted by length byte"""
+        positions = [position for length in sorted(self._buckets) for position in self._buckets[length]]
+        self._positions = np.array(positions, dtype=np.int64)
+        self._array = np.frombuffer(b''.join(self._parsed[p] for p in positions), dtype=np.uint8).reshape(-1, TLSH_RECORD_SIZE)
+        self._starts = np.searchsorted(self._array[:, 1], np.arange(257)) if positions else np.zeros(257, dtype=np.int64)
+
+    def _scan_numpy(self, target: bytes, lengths, threshold: int) -> List[Tuple[int, int]]:
+        """Exact distances to all hashes in the given length buckets"""
+        if self._array is None:
+            self._build()
+
+        rows = [np.arange(self._starts[length], self._starts[length + 1]) for length in sorted(lengths)]
+        rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int64)
+        if not len(rows):
+            return []
+
+        header = self._array[rows, :3].astype(np.int32)
+        d = np.abs(header[:, 1] - target[1])
+        d = np.minimum(d, 256 - d)
+        cost = np.where(d <= 1, d, d * 12)
+        for shift in (0, 4):
+            d = np.abs(((header[:, 2] >> shift) & 0x0F) - ((target[2] >> shift) & 0x0F))
+            d = np.minimum(d, 16 - d)
+            cost += np.where(d <= 1, d, (d - 1) * 12)
+        cost += header[:, 0] != target[0]
+
+        keep = cost <= threshold
+        rows, cost = rows[keep], cost[keep]
+        if not len(rows):
+            return []
+
+        body = np.frombuffer(target, dtype=np.uint8)[3:]
+        distance = cost + _BODY_DIFF_ARRAY[self._array[rows, 3:], body].sum(axis=1, dtype=np.int32)
+        keep = distance <= threshold
+        return list(zip(self._positions[rows[keep]].tolist(), distance[keep].tolist()))
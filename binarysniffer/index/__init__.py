@@ -2,7 +2,8 @@
 Index structures for efficient matching
 """
 
+from .automaton import AhoCorasickAutomaton
 from .bloom import TieredBloomFilter
 from .minhash import MinHashIndex
 
-__all__ = ["TieredBloomFilter", "MinHashIndex"]
\ No newline at end of file
+__all__ = ["AhoCorasickAutomaton", "TieredBloomFilter", "MinHashIndex"]
\ No newline at end of file
@@ -0,0 +1,262 @@
+"""
+Aho-Corasick automaton for multi-pattern substring matching
+"""
+
+import logging
+from array import array
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class AhoCorasickAutomaton:
+    """
+    Multi-pattern string matcher based on the Aho-Corasick algorithm.
+
+    Patterns are added once, the automaton is built, and every text is then
+    scanned in a single pass regardless of how many patterns are loaded.
+
+    An automaton restored with from_arrays() reads its transitions straight
+    from the given buffers (typically a memory-mapped snapshot) and only
+    expands the states a scan actually visits.
+    """
+
+    def __init__(self):
+        """Initialize an empty automaton"""
+        # Node 0 is the root; goto entries are None until expanded (lazy mode)
+        self.goto: List[Optional[Dict[str, int]]] = [{}]
+        self.fail = [0]
+        self.outputs: Dict[int, Tuple[int, ...]] = {}
+        self.patterns: List[str] = []
+        self._terminals = []
+        self._pattern_ids: Dict[str, int] = {}
+        self._built = False
+
+        # Flattened transitions backing lazily expanded states
+        self._edge_offsets = None
+        self._edge_chars = None
+        self._edge_targets = None
+
+    def __len__(self) -> int:
+        """Number of distinct patterns in the automaton"""
+        return len(self.patterns)
+
+    @property
+    def state_count(self) -> int:
+        """Number of automaton states"""
+        return len(self.goto)
+
+    def add(self, pattern: str) -> int:
+        """
+        Add a pattern to the automaton.
+
+        Args:
+            pattern: Pattern string (must be non-empty)
+
+        Returns:
+            Pattern ID (adding the same pattern twice returns the same ID)
+        """
+        if not pattern:
+            raise ValueError("Pattern must be non-empty")
+
+        if pattern in self._pattern_ids:
+            return self._pattern_ids[pattern]
+
+        self._expand_all()
+
+        node = 0
+        for char in pattern:
+            next_node = self.goto[node].get(char)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto[node][char] = next_node
+                self.goto.append({})
+            node = next_node
+
+        pattern_id = len(self.patterns)
+        self.patterns.append(pattern)
+        self._pattern_ids[pattern] = pattern_id
+        self._terminals.append(node)
+        self._built = False
+        return pattern_id
+
+    def build(self):
+        """Compute failure links and merged outputs (breadth-first)"""
+        self._expand_all()
+        goto = self.goto
+        fail = self.fail = [0] * len(goto)
+        outputs = {}
+        for pattern_id, node in enumerate(self._terminals):
+            outputs[node] = outputs.get(node, ()) + (pattern_id,)
+
+        queue = deque(goto[0].values())
+
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                queue.append(child)
+
+                # Follow failure links until a node with a matching edge is found
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(char, 0)
+
+                # Inherit outputs of the failure state so scans never walk the chain
+                if fail[child] in outputs:
+                    outputs[child] = outputs.get(child, ()) + outputs[fail[child]]
+
+        self.outputs = outputs
+        self._built = True
+        logger.debug(f"Built automaton with {len(self.patterns)} patterns and {len(goto)} states")
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        Scan text and yield every pattern occurrence.
+
+        Args:
+            text: Text to scan
+
+        Yields:
+            (end_index, pattern_id) tuples, where end_index is exclusive
+        """
+        if not self._built:
+            self.build()
+
+        goto = self.goto
+        fail = self.fail
+        outputs = self.outputs
+        node = 0
+
+        for index, char in enumerate(text):
+            while True:
+                edges = goto[node]
+                if edges is None:
+                    edges = self._expand(node)
+                next_node = edges.get(char)
+                if next_node is not None:
+                    node = next_node
+                    break
+                if not node:
+                    break
+                node = fail[node]
+
+            found = outputs.get(node)
+            if found:
+                for pattern_id in found:
+                    yield index + 1, pattern_id
+
+    def find_all(self, text: str) -> Set[int]:
+        """
+        Get the IDs of all patterns occurring in text.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Set of pattern IDs
+        """
+        return {pattern_id for _, pattern_id in self.iter_matches(text)}
+
+    def to_arrays(self) -> Dict[str, array]:
+        """
+        Flatten the built automaton into typed arrays for serialization.
+
+        Returns:
+            Dictionary of uint32 arrays; edge labels are UTF-32 code points
+        """
+        if not self._built:
+            self.build()
+
+        edge_offsets = array('I', [0])
+        edge_chars = array('I')
+        edge_targets = array('I')
+        for node in range(len(self.goto)):
+            edges = self._edges(node)
+            for char in sorted(edges):
+                edge_chars.append(ord(char))
+                edge_targets.append(edges[char])
+            edge_offsets.append(len(edge_chars))
+
+        # Outputs are sparse: most states never complete a pattern
+        output_nodes = array('I')
+        output_offsets = array('I', [0])
+        output_ids = array('I')
+        for node in sorted(self.outputs):
+            output_nodes.append(node)
+            output_ids.extend(self.outputs[node])
+            output_offsets.append(len(output_ids))
+
+        return {
+            'edge_offsets': edge_offsets,
+            'edge_chars': edge_chars,
+            'edge_targets': edge_targets,
+            'fail': array('I', self.fail),
+            'output_nodes': output_nodes,
+            'output_offsets': output_offsets,
+            'output_ids': output_ids,
+            'terminals': array('I', self._terminals),
+        }
+
+    @classmethod
+    def from_arrays(cls, patterns: List[str], arrays: Dict[str, memoryview]) -> "AhoCorasickAutomaton":
+        """
+        Restore a built automaton from to_arrays() output.
+
+        The edge and failure arrays are used in place, so buffers backed by
+        a memory map must stay open for the lifetime of the automaton.
+
+        Args:
+            patterns: Patterns in pattern ID order
+            arrays: uint32 sequences (arrays or memoryviews) keyed as in to_arrays()
+
+        Returns:
+            Ready-to-scan automaton
+        """
+        automaton = cls()
+        automaton._edge_offsets = arrays['edge_offsets']
+        automaton._edge_chars = arrays['edge_chars']
+        automaton._edge_targets = arrays['edge_targets']
+        automaton.goto = [None] * (len(automaton._edge_offsets) - 1)
+        automaton.fail = arrays['fail']
+        automaton._terminals = arrays['terminals']
+
+        output_offsets = arrays['output_offsets'].tolist()
+        output_ids = arrays['output_ids'].tolist()
+        automaton.outputs = {
+            node: tuple(output_ids[start:end])
+            for node, start, end in zip(arrays['output_nodes'].tolist(), output_offsets, output_offsets[1:])
+        }
+
+        automaton.patterns = list(patterns)
+        automaton._pattern_ids = {pattern: index for index, pattern in enumerate(automaton.patterns)}
+        automaton._built = True
+        return automaton
+
+    def _edges(self, node: int) -> Dict[str, int]:
+        """Get the transitions of a state, expanding it if needed"""
+        edges = self.goto[node]
+        if edges is None:
+            edges = self._expand(node)
+        return edges
+
+    def _expand(self, node: int) -> Dict[str, int]:
+        """Materialize the transitions of a lazily loaded state"""
+        start = self._edge_offsets[node]
+        end = self._edge_offsets[node + 1]
+        edges = dict(zip(map(chr, self._edge_chars[start:end]), self._edge_targets[start:end]))
+        self.goto[node] = edges
+        return edges
+
+    def _expand_all(self):
+        """Detach from the backing arrays so the automaton can be modified"""
+        if self._edge_offsets is None:
+            return
+
+        for node in range(len(self.goto)):
+            self._edges(node)
+        self.fail = list(self.fail)
+        self._terminals = list(self._terminals)
+        self._edge_offsets = self._edge_chars = self._edge_targets = None
@@ -12,11 +12,14 @@ from collections import defaultdict
 
 import xxhash
 
-from ..utils.hashing import MinHash
+from ..utils.hashing import MINHASH_ALGORITHM, MinHash
 
 
 logger = logging.getLogger(__name__)
 
+# Index file header: magic, then the MINHASH_ALGORITHM the bands were built with
+INDEX_MAGIC = b'BSMH'
+
 
 class MinHashIndex:
     """
@@ -64,7 +67,11 @@ class MinHashIndex:
         
         for sig_id, minhash_bytes in signatures:
             # Convert bytes back to MinHash
-            minhash = MinHash.from_bytes(minhash_bytes, self.num_perm)
+            try:
+                minhash = MinHash.from_bytes(minhash_bytes, self.num_perm)
+            except ValueError as e:
+                logger.debug(f"Skipping MinHash of signature {sig_id}: {e}")
+                continue
             
             # Hash each band
             for band in range(self.bands):
@@ -114,14 +121,22 @@ class MinHashIndex:
         
         return candidates
     
+    @staticmethod
+    def _header() -> bytes:
+        """File header identifying the MinHash algorithm"""
+        algorithm = MINHASH_ALGORITHM.encode('ascii')
+        return INDEX_MAGIC + struct.pack('<H', len(algorithm)) + algorithm
+    
     def _write_index(self, band_buckets: Dict[int, List[int]]):
         """Write index to file"""
         with open(self.index_path, 'wb') as f:
             # Write header
+            header = self._header()
+            f.write(header)
             f.write(struct.pack('<I', len(band_buckets)))  # Number of buckets
             
             # Calculate offsets
-            offset = 4 + len(band_buckets) * 16  # Header + index table
+            offset = len(header) + 4 + len(band_buckets) * 16  # Header + index table
             
             # Build index map
             self.index_map.clear()
@@ -139,17 +154,32 @@ class MinHashIndex:
                     f.write(struct.pack('<I', sig_id))
     
     def _load_index(self):
-        """Load index from file"""
+        """
+        Load index from file.
+        
+        An index built with another MinHash algorithm (or before the header
+        existed) would silently match nothing; it is deleted so callers
+        rebuild it.
+        """
         try:
             with open(self.index_path, 'rb') as f:
                 # Read header
-                num_buckets = struct.unpack('<I', f.read(4))[0]
-                
-                # Read index table
+                header = self._header()
+                stale = f.read(len(header)) != header
+                if not stale:
+                    num_buckets = struct.unpack('<I', f.read(4))[0]
+                    
+                    # Read index table
+                    self.index_map.clear()
+                    for _ in range(num_buckets):
+                        band_hash, offset, count = struct.unpack('<QII', f.read(16))
+                        self.index_map[band_hash] = (offset, count)
+            
+            if stale:
+                logger.info(f"Removing MinHash index built with another algorithm: {self.index_path}")
                 self.index_map.clear()
-                for _ in range(num_buckets):
-                    band_hash, offset, count = struct.unpack('<QII', f.read(16))
-                    self.index_map[band_hash] = (offset, count)
+                self.index_path.unlink()
+                return
             
             logger.debug(f"Loaded index with {len(self.index_map)} buckets")
         except Exception as e:
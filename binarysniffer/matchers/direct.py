@@ -5,13 +5,17 @@ Direct string matching for better detection rates
 import time
 import json
 import logging
-from typing import List, Dict, Any, Set
+from functools import cached_property
+from typing import List, Dict, Any, Optional, Set
 from collections import defaultdict
 
 from ..core.config import Config
 from ..core.results import ComponentMatch
 from ..extractors.base import ExtractedFeatures
+from ..extractors.feature_store import CONSTANTS, FUNCTIONS, STRINGS, SYMBOLS
 from ..storage.database import SignatureDatabase
+from ..storage.snapshot import MatcherSnapshot, SnapshotIndex
+from ..index.automaton import AhoCorasickAutomaton
 from ..signatures.validator import SignatureValidator
 
 logger = logging.getLogger(__name__)
@@ -23,26 +27,51 @@ class DirectMatcher:
     This bypasses bloom filters and MinHash for direct pattern matching.
     """
     
-    def __init__(self, config: Config):
-        """Initialize matcher with configuration"""
+    # Substring matching limits (pattern length range and longest source string)
+    MIN_SUBSTRING_LENGTH = 5
+    MAX_SUBSTRING_LENGTH = 29
+    MAX_SUBSTRING_SOURCE_LENGTH = 50
+    
+    def __init__(self, config: Config, use_snapshot: bool = True):
+        """
+        Initialize matcher with configuration.
+        
+        Args:
+            config: BinarySniffer configuration
+            use_snapshot: Load/store the precompiled matcher snapshot next to
+                the database instead of always rebuilding from SQLite
+        """
         self.config = config
         self.db = SignatureDatabase(config.db_path)
         self.last_analysis_time = 0.0
+        self.snapshot = MatcherSnapshot(config.snapshot_path)
+        self.loaded_from_snapshot = False
         
-        # Cache all signatures in memory for fast matching
-        self._load_signatures()
-        
-        # Pre-compute signature lengths for optimization
-        self.sig_lengths = {sig['id']: len(sig['pattern']) for sig in self.signatures}
-        
-        # Group signatures by length for efficient matching
-        self.sigs_by_length = defaultdict(list)
+        # Memory-map the precompiled snapshot when it matches the database
+        stamp = self.stamp = self.db.get_content_stamp()
+        if not (use_snapshot and self._load_snapshot(stamp)):
+            # Otherwise cache all signatures in memory for fast matching and
+            # build exact-match lookup and substring automaton once per matcher
+            loaded = self._load_signatures()
+            self._build_match_index()
+            if use_snapshot and loaded:
+                self.save_snapshot(stamp)
+    
+    @cached_property
+    def sig_lengths(self) -> Dict[int, int]:
+        """Signature ID -> pattern length"""
+        return {sig['id']: len(sig['pattern']) for sig in self.signatures}
+    
+    @cached_property
+    def sigs_by_length(self) -> Dict[int, List[Dict[str, Any]]]:
+        """Signatures grouped by pattern length"""
+        sigs_by_length = defaultdict(list)
         for sig in self.signatures:
-            length = len(sig['pattern'])
-            self.sigs_by_length[length].append(sig)
+            sigs_by_length[len(sig['pattern'])].append(sig)
+        return sigs_by_length
     
-    def _load_signatures(self):
-        """Load all signatures into memory for fast matching"""
+    def _load_signatures(self) -> bool:
+        """Load all signatures into memory for fast matching (False on error)"""
         self.signatures = []
         self.component_map = {}
         
@@ -92,10 +121,105 @@ class DirectMatcher:
                                 }
             
             logger.debug(f"Loaded {valid_sigs} valid signatures out of {total_sigs} total (filtered {total_sigs - valid_sigs} generic patterns)")
+            return True
             
         except Exception as e:
             logger.error(f"Error loading signatures: {e}")
             self.signatures = []
+            return False
+    
+    def _load_snapshot(self, stamp: str) -> bool:
+        """
+        Load signatures, components and match index from the matcher snapshot.
+        
+        Returns:
+            True if loaded, False if the snapshot is missing or stale
+        """
+        loaded = self.snapshot.load(stamp)
+        if loaded is None:
+            return False
+        
+        signatures, component_map, automaton_patterns, automaton_arrays = loaded
+        try:
+            # Transitions stay in the mapped file and are expanded on first use
+            automaton = AhoCorasickAutomaton.from_arrays(automaton_patterns, automaton_arrays)
+        except (KeyError, ValueError) as e:
+            logger.warning(f"Ignoring incomplete matcher snapshot: {e}")
+            return False
+        
+        # Signature records are decoded as exact and substring lookups return them
+        self.signatures = signatures
+        self.component_map = component_map
+        self.automaton = automaton
+        self.exact_index = SnapshotIndex(signatures.exact, signatures.pattern_count)
+        self.substring_sigs = SnapshotIndex(signatures.substring, len(automaton))
+        self.loaded_from_snapshot = True
+        logger.debug(f"Loaded {len(self.signatures)} signatures from matcher snapshot")
+        return True
+    
+    def save_snapshot(self, stamp: Optional[str] = None):
+        """
+        Write the current signatures and match index to the matcher snapshot.
+        
+        Args:
+            stamp: Database stamp to record (computed if not given)
+        """
+        if stamp is None:
+            stamp = self.db.get_content_stamp()
+        try:
+            self.snapshot.write(
+                stamp,
+                self.signatures,
+                self.component_map,
+                self.automaton.patterns,
+                self.automaton.to_arrays()
+            )
+        except OSError as e:
+            logger.warning(f"Could not write matcher snapshot: {e}")
+    
+    def _build_match_index(self):
+        """
+        Build the lookup structures used by match().
+        
+        Exact matches are resolved through a pattern -> signatures dict and
+        substring matches through a single Aho-Corasick automaton, so the
+        cost of matching a file no longer grows with the signature count.
+        """
+        self.automaton = AhoCorasickAutomaton()
+        self.exact_index = defaultdict(list)
+        
+        # Number signatures in length order so hits keep a deterministic order
+        ordered_sigs = [
+            sig
+            for length in sorted(self.sigs_by_length.keys())
+            for sig in self.sigs_by_length[length]
+        ]
+        for order, sig in enumerate(ordered_sigs):
+            sig['order'] = order
+            self.exact_index[sig['pattern']].append(sig)
+            sig['substring_id'] = self._add_substring_pattern(sig['pattern'])
+        
+        self.automaton.build()
+        
+        self.substring_sigs = [[] for _ in range(len(self.automaton))]
+        for sig in ordered_sigs:
+            if sig['substring_id'] >= 0:
+                self.substring_sigs[sig['substring_id']].append(sig)
+        
+        logger.debug(f"Built match index: {len(self.exact_index)} exact patterns, "
+                     f"{len(self.automaton)} substring patterns")
+    
+    def _add_substring_pattern(self, pattern: str) -> int:
+        """Add pattern to the automaton if eligible; returns its ID or -1"""
+        if not (self.MIN_SUBSTRING_LENGTH <= len(pattern) <= self.MAX_SUBSTRING_LENGTH):
+            return -1
+        
+        # Skip generic patterns (unless it's a codec/MIME pattern)
+        if not self._is_codec_or_mime_string(pattern):
+            if self._contains_only_generic_terms(pattern):
+                return -1
+        
+        return self.automaton.add(pattern)
     
     def match(
         self,
@@ -118,16 +242,14 @@ class DirectMatcher:
         matches = []
         component_scores = defaultdict(list)
         
-        # Get all strings from features (sorted for deterministic processing)
-        all_strings = sorted(features.strings + features.functions + features.constants + features.symbols)
+        # Unique lowercased strings, functions, constants and symbols, each
+        # decoded and normalized once however many categories hold it
+        string_set = features.store.lowercase(STRINGS | FUNCTIONS | CONSTANTS | SYMBOLS, min_length=3)
         
-        if not all_strings:
+        if not string_set:
             self.last_analysis_time = time.time() - start_time
             return matches
         
-        # Convert to lowercase for matching
-        string_set = {s.lower() for s in all_strings if s and len(s) >= 3}
-        
         logger.debug(f"Direct matching against {len(string_set)} unique strings")
         
         # Pre-filter strings for substring matching (exclude very short/generic ones)
@@ -137,49 +259,40 @@ class DirectMatcher:
                                if (len(s) >= 6 and s not in generic_terms) or
                                   self._is_codec_or_mime_string(s)])
         
-        # Create a set of all substrings for faster matching
-        # Only for strings up to a reasonable length to avoid memory explosion
-        substring_set = set()
-        for s in valid_strings:
-            if len(s) <= 50:  # Limit substring generation
-                for i in range(len(s)):
-                    for j in range(i + 5, min(i + 30, len(s) + 1)):
-                        substring_set.add(s[i:j])
-        
-        # Process signatures in length order for cache efficiency
-        for length in sorted(self.sigs_by_length.keys()):
-            for sig in self.sigs_by_length[length]:
-                pattern = sig['pattern']
-                
-                # Check for exact match first (fast)
-                if pattern in string_set:
-                    component_scores[sig['component_id']].append({
-                        'sig_id': sig['id'],
-                        'confidence': sig['confidence'],
-                        'sig_type': sig['sig_type'],
-                        'pattern': pattern,
-                        'matched_string': pattern  # exact match
-                    })
-                    continue
-                
-                # Skip if pattern is too short or generic (unless it's a codec/MIME pattern)
-                if not self._is_codec_or_mime_string(pattern):
-                    if length < 5 or self._contains_only_generic_terms(pattern):
-                        continue
-                
-                # Fast substring check using pre-computed set
-                if length <= 30 and pattern in substring_set:
-                    # Find which string contains this pattern
-                    for string in valid_strings:
-                        if pattern in string:
-                            component_scores[sig['component_id']].append({
-                                'sig_id': sig['id'],
-                                'confidence': sig['confidence'] * 0.8,
-                                'sig_type': sig['sig_type'],
-                                'pattern': pattern,
-                                'matched_string': string
-                            })
-                            break  # Only need one match per pattern
+        # Exact matches: one lookup per unique string
+        hits = []
+        for string in string_set:
+            for sig in self.exact_index.get(string, ()):
+                hits.append((sig, sig['confidence'], string))
+        
+        # Substring matches: scan every valid string once with the automaton.
+        # A pattern counts when it occurs in a short string (the substring
+        # source limit); evidence reports the first string containing it.
+        first_container = {}
+        in_short_string = set()
+        for string in valid_strings:
+            for pattern_id in self.automaton.find_all(string):
+                if pattern_id not in first_container:
+                    first_container[pattern_id] = string
+                if len(string) <= self.MAX_SUBSTRING_SOURCE_LENGTH:
+                    in_short_string.add(pattern_id)
+        
+        for pattern_id in in_short_string:
+            if self.automaton.patterns[pattern_id] in string_set:
+                continue  # Already reported as an exact match
+            for sig in self.substring_sigs[pattern_id]:
+                hits.append((sig, sig['confidence'] * 0.8, first_container[pattern_id]))
+        
+        # Record hits in signature order for deterministic evidence
+        hits.sort(key=lambda hit: hit[0]['order'])
+        for sig, confidence, matched_string in hits:
+            component_scores[sig['component_id']].append({
+                'sig_id': sig['id'],
+                'confidence': confidence,
+                'sig_type': sig['sig_type'],
+                'pattern': sig['pattern'],
+                'matched_string': matched_string
+            })
         
         # Aggregate scores by component (sorted for deterministic order)
         for component_id, sig_matches in sorted(component_scores.items()):
@@ -2,10 +2,15 @@
 Output formatters for BinarySniffer analysis results.
 """
 
-from .cyclonedx_formatter import CycloneDxFormatter
+from .cyclonedx_formatter import CycloneDxFormatter, CycloneDxStreamWriter
 from .kissbom_formatter import KissBomFormatter
+from .streaming import NdjsonWriter, is_ndjson_path, open_output
 
 __all__ = [
     'CycloneDxFormatter',
+    'CycloneDxStreamWriter',
     'KissBomFormatter',
-]
\ No newline at end of file
+    'NdjsonWriter',
+    'is_ndjson_path',
+    'open_output',
+]
@@ -6,9 +6,10 @@ security and compliance toolchains.
 """
 
 import json
+import textwrap
 import uuid
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, TextIO
 from pathlib import Path
 import hashlib
 
@@ -73,19 +74,8 @@ class CycloneDxFormatter:
         for file_path, result in batch_result.results.items():
             if result.error:
                 continue
-                
-            # Add components from this file
-            for match in result.matches:
-                comp_key = self._get_component_key(match)
-                
-                if comp_key not in seen_components:
-                    # First time seeing this component
-                    component = self._create_component(match, result, include_evidence)
-                    seen_components[comp_key] = component
-                    sbom["components"].append(component)
-                else:
-                    # Component already exists, add this occurrence
-                    self._add_occurrence(seen_components[comp_key], match, result)
+            for component in self._add_components(seen_components, result, include_evidence):
+                sbom["components"].append(component)
         
         # Add dependencies if we can infer them
         if self._has_dependencies(batch_result):
@@ -97,6 +87,32 @@ class CycloneDxFormatter:
         
         return json.dumps(sbom, indent=2, default=str)
     
+    def _add_components(
+        self,
+        seen_components: Dict[str, Dict[str, Any]],
+        result: AnalysisResult,
+        include_evidence: bool
+    ) -> List[Dict[str, Any]]:
+        """
+        Add a file's matches to the components seen so far.
+        
+        Returns:
+            Components seen for the first time, in match order
+        """
+        new_components = []
+        for match in result.matches:
+            comp_key = self._get_component_key(match)
+            
+            if comp_key not in seen_components:
+                # First time seeing this component
+                component = self._create_component(match, result, include_evidence)
+                seen_components[comp_key] = component
+                new_components.append(component)
+            else:
+                # Component already exists, add this occurrence
+                self._add_occurrence(seen_components[comp_key], match, result)
+        return new_components
+    
     def _create_metadata(self, batch_result: BatchAnalysisResult) -> Dict[str, Any]:
         """Create SBOM metadata section"""
         metadata = {
@@ -395,41 +411,129 @@ class CycloneDxFormatter:
         for file_path, result in batch_result.results.items():
             if result.error or not result.extracted_features:
                 continue
-            
-            # Create annotation with extracted features
-            annotation = {
-                "bom-ref": f"features-{self._sanitize_ref(file_path)}",
-                "subjects": [f"target-{self._sanitize_ref(file_path)}"],
-                "annotator": {
-                    "name": "binarysniffer",
-                    "version": __version__
-                },
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "text": f"Extracted {result.features_extracted} features from {Path(file_path).name}"
+            annotations.append(self._create_file_annotation(file_path, result))
+        
+        return annotations
+    
+    def _create_file_annotation(self, file_path: str, result: AnalysisResult) -> Dict[str, Any]:
+        """Create the feature annotation of one analyzed file"""
+        annotation = {
+            "bom-ref": f"features-{self._sanitize_ref(file_path)}",
+            "subjects": [f"target-{self._sanitize_ref(file_path)}"],
+            "annotator": {
+                "name": "binarysniffer",
+                "version": __version__
+            },
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "text": f"Extracted {result.features_extracted} features from {Path(file_path).name}"
+        }
+        
+        # Add sample features if available
+        if result.extracted_features and result.extracted_features.by_extractor:
+            features_data = {
+                "total_features": result.features_extracted,
+                "extractors": {}
             }
             
-            # Add sample features if available
-            if result.extracted_features and result.extracted_features.by_extractor:
-                features_data = {
-                    "total_features": result.features_extracted,
-                    "extractors": {}
-                }
-                
-                for extractor_name, extractor_data in result.extracted_features.by_extractor.items():
-                    if 'features_by_type' in extractor_data:
-                        # Include a sample of features
-                        sample = {}
-                        for feature_type, features in extractor_data['features_by_type'].items():
-                            if features:
-                                # Include first 10 features of each type
-                                sample[feature_type] = features[:10]
-                        
-                        if sample:
-                            features_data["extractors"][extractor_name] = sample
-                
-                # Store as JSON in annotation
-                annotation["data"] = json.dumps(features_data, indent=2)
+            for extractor_name, extractor_data in result.extracted_features.by_extractor.items():
+                if 'features_by_type' in extractor_data:
+                    # Include a sample of features
+                    sample = {}
+                    for feature_type, features in extractor_data['features_by_type'].items():
+                        if features:
+                            # Include first 10 features of each type
+                            sample[feature_type] = features[:10]
+                    
+                    if sample:
+                        features_data["extractors"][extractor_name] = sample
             
-            annotations.append(annotation)
+            # Store as JSON in annotation
+            annotation["data"] = json.dumps(features_data, indent=2)
         
-        return annotations
\ No newline at end of file
+        return annotation
+
+
+class CycloneDxStreamWriter:
+    """
+    Write a CycloneDX SBOM incrementally as file results complete.
+    
+    Feature annotations, the bulk of an SBOM with extracted features, are
+    written as each file is added and need not be kept. Components are
+    kept until close, since later files add occurrences to them, and are
+    written with the metadata that needs the batch totals. The document
+    is equivalent to CycloneDxFormatter.format_results output.
+    """
+    
+    def __init__(
+        self,
+        stream: TextIO,
+        include_evidence: bool = True,
+        include_features: bool = False,
+        formatter: Optional[CycloneDxFormatter] = None
+    ):
+        """
+        Initialize writer and write the document header.
+        
+        Args:
+            stream: Text stream to write to (see output.streaming.open_output)
+            include_evidence: Include detection evidence in SBOM
+            include_features: Include extracted features for signature recreation
+            formatter: Formatter whose serial number and helpers to use
+        """
+        self.stream = stream
+        self.include_evidence = include_evidence
+        self.include_features = include_features
+        self.formatter = formatter or CycloneDxFormatter()
+        self.components: List[Dict[str, Any]] = []
+        self._seen_components: Dict[str, Dict[str, Any]] = {}
+        self._annotations = 0
+        
+        self.stream.write("{\n")
+        self._write_key("bomFormat", "CycloneDX")
+        self._write_key("specVersion", self.formatter.SPEC_VERSION)
+        self._write_key("serialNumber", self.formatter.serial_number)
+        self._write_key("version", 1)
+        if self.include_features:
+            self.stream.write('  "annotations": [')
+        self.stream.flush()
+    
+    def add_result(self, file_path: str, result: AnalysisResult):
+        """Add the result of one analyzed file"""
+        if result.error:
+            return
+        self.components.extend(
+            self.formatter._add_components(self._seen_components, result, self.include_evidence)
+        )
+        
+        if self.include_features and result.extracted_features:
+            annotation = self.formatter._create_file_annotation(file_path, result)
+            self.stream.write("," if self._annotations else "")
+            self.stream.write("\n" + self._indent(json.dumps(annotation, indent=2, default=str), 4))
+            self._annotations += 1
+            self.stream.flush()
+    
+    def close(self, batch_result: BatchAnalysisResult):
+        """
+        Write components and metadata and end the document.
+        
+        Args:
+            batch_result: Results of the whole batch (features not needed)
+        """
+        if self.include_features:
+            self.stream.write("\n  ],\n" if self._annotations else "],\n")
+        self._write_key("components", self.components)
+        if self.formatter._has_dependencies(batch_result):
+            self._write_key("dependencies", self.formatter._create_dependencies(self.components))
+        self._write_key("metadata", self.formatter._create_metadata(batch_result), last=True)
+        self.stream.write("}")
+        self.stream.flush()
+    
+    def _write_key(self, key: str, value: Any, last: bool = False):
+        """Write one top-level key of the document"""
+        value_json = self._indent(json.dumps(value, indent=2, default=str), 2).lstrip()
+        self.stream.write(f'  {json.dumps(key)}: {value_json}{"" if last else ","}\n')
+    
+    @staticmethod
+    def _indent(text: str, spaces: int) -> str:
+        """Indent every line of text"""
+        return textwrap.indent(text, " " * spaces)
@@ -0,0 +1,82 @@
+"""
+Streaming writers for analysis output.
+
+Batch output written per file as results complete, so large scans keep
+only one file's features in memory and a crash keeps everything written
+so far. Paths ending in .zst are zstd-compressed.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, TextIO, Union
+
+import zstandard as zstd
+
+COMPRESSED_SUFFIX = '.zst'
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl')
+
+
+def is_compressed_path(path: Union[str, Path]) -> bool:
+    """Check whether output to a path is zstd-compressed"""
+    return Path(path).suffix.lower() == COMPRESSED_SUFFIX
+
+
+def output_suffix(path: Union[str, Path]) -> str:
+    """Lowercase suffix of a path, ignoring a trailing .zst"""
+    path = Path(path)
+    if is_compressed_path(path):
+        path = path.with_suffix('')
+    return path.suffix.lower()
+
+
+def is_ndjson_path(path: Union[str, Path]) -> bool:
+    """Check whether a path names an NDJSON file (.ndjson, .jsonl, optionally .zst)"""
+    return output_suffix(path) in NDJSON_SUFFIXES
+
+
+def open_output(path: Union[str, Path]) -> TextIO:
+    """
+    Open a text file for writing, zstd-compressed if the path ends in .zst.
+
+    Compressed streams are flushed block by block, so everything flushed
+    can be decompressed even if the writer never closes the file.
+    """
+    if is_compressed_path(path):
+        return zstd.open(path, 'wt', cctx=zstd.ZstdCompressor(level=3), encoding='utf-8')
+    return open(path, 'w', encoding='utf-8')
+
+
+class NdjsonWriter:
+    """
+    Write records as newline-delimited JSON, one line per record.
+
+    Each line is flushed as it is written, so a reader (or a scan that
+    crashes) sees every complete record.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Initialize writer.
+
+        Args:
+            path: Output file (.zst for zstd compression)
+        """
+        self.path = Path(path)
+        self.records = 0
+        self._stream = open_output(path)
+
+    def write(self, record: Dict[str, Any]):
+        """Write one record"""
+        self._stream.write(json.dumps(record, default=str) + '\n')
+        self._stream.flush()
+        self.records += 1
+
+    def close(self):
+        """Close the output file"""
+        self._stream.close()
+
+    def __enter__(self) -> "NdjsonWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -5,11 +5,13 @@ This module provides comprehensive security analysis for ML models,
 detecting malicious code, backdoors, and supply chain attacks.
 """
 
+from .model_file import ModelFile
 from .patterns import MaliciousPatterns
 from .risk_scorer import RiskScorer, RiskAssessment
 from .pickle_analyzer import PickleSecurityAnalyzer
 from .obfuscation import ObfuscationDetector
 from .validators import ModelIntegrityValidator
+from .ml_scanner import MLModelScanner
 
 __all__ = [
     'MaliciousPatterns',
@@ -17,5 +19,7 @@ __all__ = [
     'RiskAssessment',
     'PickleSecurityAnalyzer',
     'ObfuscationDetector',
-    'ModelIntegrityValidator'
+    'ModelIntegrityValidator',
+    'ModelFile',
+    'MLModelScanner'
 ]
\ No newline at end of file
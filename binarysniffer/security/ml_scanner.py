@@ -0,0 +1,223 @@
+"""
+ML model security scanning across many files
+
+This module runs the pickle, obfuscation and integrity checks of ml-scan
+on a list of model files, in worker processes when there are several, so
+large model registries are scanned on all cores.
+"""
+
+import logging
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from ..core.config import Config
+from .model_file import ModelFile
+from .obfuscation import ObfuscationDetector
+from .pickle_analyzer import PickleSecurityAnalyzer
+from .risk_scorer import RiskLevel
+from .validators import ModelIntegrityValidator
+
+logger = logging.getLogger(__name__)
+
+
+# Extensions collected by recursive directory scans
+ML_MODEL_EXTENSIONS = ('.pkl', '.pickle', '.p', '.onnx', '.safetensors', '.pt', '.pth', '.pb', '.h5')
+
+# Model type by file extension
+MODEL_FILE_TYPES = {
+    '.pkl': 'pickle',
+    '.pickle': 'pickle',
+    '.p': 'pickle',
+    '.onnx': 'onnx',
+    '.safetensors': 'safetensors',
+    '.pt': 'pytorch',
+    '.pth': 'pytorch',
+    '.pb': 'tensorflow',
+    '.h5': 'tensorflow',
+}
+
+# Risk levels from least to most severe, for risk thresholds
+RISK_LEVEL_ORDER = (RiskLevel.SAFE, RiskLevel.LOW, RiskLevel.MEDIUM, RiskLevel.HIGH, RiskLevel.CRITICAL)
+
+
+def model_file_type(file_path: Union[str, Path]) -> str:
+    """Get the model type of a file from its extension ('unknown' if not a model)"""
+    return MODEL_FILE_TYPES.get(Path(file_path).suffix.lower(), 'unknown')
+
+
+class MLModelScanner:
+    """
+    Security scanner for ML model files.
+
+    scan_file() analyzes one file in-process. scan_files() fans several
+    files out to a WorkerPool: each worker builds its own scanner once,
+    and a file running past file_timeout is stopped by killing its worker,
+    so one pathological checkpoint cannot stall the scan. A single file,
+    or files left when worker processes are unavailable, are scanned
+    in-process with the same timeout; the scan is abandoned on a thread
+    that cannot be killed.
+    """
+
+    def __init__(self, config: Optional[Config] = None):
+        """
+        Initialize the scanner.
+
+        Args:
+            config: Configuration (parallel_workers and worker limits apply)
+        """
+        self.config = config or Config()
+        self.show_features = False
+        self.file_timeout = 300  # Seconds per file
+
+        self.pickle_analyzer = PickleSecurityAnalyzer()
+        self.obfuscation_detector = ObfuscationDetector()
+        self.integrity_validator = ModelIntegrityValidator()
+
+    def scan_file(self, file_path: Union[str, Path]) -> Dict[str, Any]:
+        """
+        Scan one model file.
+
+        Args:
+            file_path: Model file
+
+        Returns:
+            Result with 'file' and 'type', the pickle 'risk_assessment',
+            'obfuscation' and 'features' for pickle files, and 'integrity'
+        """
+        file_path = Path(file_path)
+        file_type = model_file_type(file_path)
+
+        # All analyzers share one mapping of the file and its digest
+        with ModelFile(file_path) as model_file:
+            if file_type == 'pickle':
+                risk_assessment, features = self.pickle_analyzer.analyze_pickle(str(file_path), model_file)
+
+                # Check obfuscation
+                obfusc_results = self.obfuscation_detector.detect_obfuscation(model_file.data, features)
+
+                # Validate integrity
+                integrity_results = self.integrity_validator.validate_model(
+                    str(file_path), file_type, model_file=model_file
+                )
+
+                return {
+                    'file': str(file_path),
+                    'type': file_type,
+                    'risk_assessment': risk_assessment,
+                    'obfuscation': obfusc_results,
+                    'integrity': integrity_results,
+                    'features': list(features) if self.show_features else None
+                }
+
+            # For other file types, use basic validation for now
+            integrity_results = self.integrity_validator.validate_model(
+                str(file_path), file_type, model_file=model_file
+            )
+            return {
+                'file': str(file_path),
+                'type': file_type,
+                'integrity': integrity_results
+            }
+
+    def scan_files(
+        self,
+        files: Sequence[Union[str, Path]],
+        min_risk: RiskLevel = RiskLevel.LOW,
+        workers: Optional[int] = None,
+        progress_callback: Optional[Callable] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Scan model files, in worker processes if there is more than one.
+
+        Args:
+            files: Model files
+            min_risk: Pickle results below this risk level are left out
+                (MALFORMED results are always kept)
+            workers: Worker processes (default: config.parallel_workers)
+            progress_callback: Optional callback(current, total, file_path);
+                file_path is set when a file starts and None when one finishes
+
+        Returns:
+            Results in the order of files; files that failed or timed out
+            have an 'error' entry
+        """
+        files = [Path(f) for f in files]
+        results: Dict[int, Dict[str, Any]] = {}
+
+        def notify(file_path: Optional[Path]):
+            if progress_callback:
+                progress_callback(len(results), len(files), str(file_path) if file_path else None)
+
+        if len(files) > 1:
+            from ..core.worker_pool import WorkerPool
+
+            workers = self.config.parallel_workers if workers is None else workers
+            tasks = [(index, file_path, self.file_timeout) for index, file_path in enumerate(files)]
+            pool = WorkerPool(self, workers, task='_scan_task', task_args=(), error_result=self.error_result)
+            try:
+                for event, index, result in pool.run(tasks):
+                    if event == 'start':
+                        notify(files[index])
+                    else:
+                        results[index] = result
+                        notify(None)
+            except (RuntimeError, OSError) as e:
+                logger.warning(f"Worker processes unavailable ({e}) - scanning remaining files sequentially")
+
+        for index, file_path in enumerate(files):
+            if index not in results:
+                notify(file_path)
+                results[index] = self._scan_with_timeout(file_path)
+                notify(None)
+
+        return [
+            results[index] for index in range(len(files))
+            if self._meets_threshold(results[index], min_risk)
+        ]
+
+    @staticmethod
+    def _meets_threshold(result: Dict[str, Any], min_risk: RiskLevel) -> bool:
+        """Check whether a result is at or above the risk threshold"""
+        risk_assessment = result.get('risk_assessment')
+        if risk_assessment is None or risk_assessment.level not in RISK_LEVEL_ORDER:
+            return True
+        return RISK_LEVEL_ORDER.index(risk_assessment.level) >= RISK_LEVEL_ORDER.index(min_risk)
+
+    def _scan_task(self, file_path: Path) -> Dict[str, Any]:
+        """Scan a file, turning failures into an error result"""
+        try:
+            return self.scan_file(file_path)
+        except Exception as e:
+            logger.error(f"Error scanning {file_path}: {e}")
+            return self.error_result(str(file_path), str(e))
+
+    def _scan_with_timeout(self, file_path: Path) -> Dict[str, Any]:
+        """
+        Scan a file in-process, giving up after file_timeout seconds.
+
+        The scan runs on a daemon thread; a file that times out gets an
+        error result like in a worker, but its thread cannot be stopped
+        and keeps running in the background.
+        """
+        result_queue = queue.Queue()
+        thread = threading.Thread(target=lambda: result_queue.put(self._scan_task(file_path)), daemon=True)
+        thread.start()
+        thread.join(timeout=self.file_timeout)
+
+        if thread.is_alive():
+            logger.error(f"Timeout scanning {file_path} (>{self.file_timeout:g}s)")
+            return self.error_result(
+                str(file_path), f"Analysis timeout (>{self.file_timeout:g}s) - file may be too large or complex"
+            )
+        return result_queue.get()
+
+    @staticmethod
+    def error_result(file_path: str, message: str) -> Dict[str, Any]:
+        """Result of a file that could not be scanned"""
+        return {
+            'file': file_path,
+            'type': model_file_type(file_path),
+            'error': message
+        }
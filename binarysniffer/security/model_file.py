@@ -0,0 +1,101 @@
+"""
+Shared file context for ML model security scanning
+
+This module maps a model file once so that the pickle analyzer,
+obfuscation detector and integrity validator all work on the same
+buffer instead of each reading the file.
+"""
+
+import hashlib
+import mmap
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+
+class ModelFile:
+    """
+    A model file mapped into memory once and shared by the ml-scan analyzers.
+
+    The content is exposed as a read-only memory map (bytes for empty
+    files). It supports find(), slicing and the file-like read()/seek()
+    that pickletools needs, so analyzers never read or copy the whole
+    file. The map is created on first access and the SHA-256 digest is
+    computed once. Use as a context manager to release the map.
+    """
+
+    def __init__(self, file_path: Union[str, Path]):
+        """
+        Initialize the file context.
+
+        Args:
+            file_path: Path to the model file
+        """
+        self.file_path = Path(file_path)
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._data: Optional[Union[bytes, mmap.mmap]] = None
+        self._size: Optional[int] = None
+        self._sha256: Optional[str] = None
+
+    def __enter__(self) -> "ModelFile":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def data(self) -> Union[bytes, mmap.mmap]:
+        """
+        File content as a read-only buffer.
+
+        Raises:
+            OSError: If the file cannot be opened or mapped
+        """
+        if self._data is None:
+            self._file = open(self.file_path, 'rb')
+            size = os.fstat(self._file.fileno()).st_size
+            if size:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._data = self._map
+            else:
+                self._data = b''
+            self._size = size
+        return self._data
+
+    @property
+    def size(self) -> int:
+        """File size in bytes"""
+        if self._size is None:
+            self._size = os.path.getsize(self.file_path)
+        return self._size
+
+    @property
+    def sha256(self) -> str:
+        """SHA-256 of the content, computed on first use"""
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self.data).hexdigest()
+        return self._sha256
+
+    def read(self, offset: int, length: int) -> bytes:
+        """
+        Read a byte range.
+
+        Args:
+            offset: Start offset
+            length: Number of bytes
+
+        Returns:
+            Bytes in the range (shorter at end of file)
+        """
+        return self.data[offset:offset + length]
+
+    def close(self):
+        """Release the memory map and the file"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._data = None
@@ -6,13 +6,13 @@ malicious code in ML models.
 """
 
 import re
-import math
 import base64
 import zlib
 from typing import Set, Dict, List, Tuple, Optional
-from collections import Counter
 import logging
 
+from ..utils.byte_stats import shannon_entropy
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,6 +25,9 @@ class ObfuscationDetector:
     HIGH_ENTROPY_THRESHOLD = 7.5  # Likely encrypted/compressed
     MEDIUM_ENTROPY_THRESHOLD = 6.0  # Possibly obfuscated
     
+    # Most leading bytes decoded for encoding-pattern checks
+    MAX_LEADING_BYTES = 1024 * 1024
+    
     # Common obfuscation patterns
     OBFUSCATION_PATTERNS = [
         # Base64 encoding patterns
@@ -139,8 +142,8 @@ class ObfuscationDetector:
             results['indicators'].append(f'Elevated entropy: {entropy:.2f}')
             results['confidence'] = 0.5
         
-        # Check for encoding patterns
-        content_str = self._safe_decode(content)
+        # Check for encoding patterns (only the leading lines are analyzed)
+        content_str = self._safe_decode(self._leading_lines(content))
         encoding_results = self._detect_encoding_patterns(content_str)
         if encoding_results['found']:
             results['is_obfuscated'] = True
@@ -189,21 +192,26 @@ class ObfuscationDetector:
     
     def _calculate_entropy(self, data: bytes) -> float:
         """Calculate Shannon entropy of data"""
-        if not data:
-            return 0.0
-        
-        # Count byte frequencies
-        frequencies = Counter(data)
-        data_len = len(data)
-        
-        # Calculate entropy
-        entropy = 0.0
-        for count in frequencies.values():
-            if count > 0:
-                probability = count / data_len
-                entropy -= probability * math.log2(probability)
+        return shannon_entropy(data)
+    
+    @classmethod
+    def _leading_lines(cls, content: bytes, max_lines: int = 100) -> bytes:
+        """
+        Bytes that _detect_encoding_patterns looks at, without copying the rest.
         
-        return entropy
+        That is content up to the max_lines-th newline, but never more than
+        MAX_LEADING_BYTES, so a memory-mapped model with few or no newlines
+        is not copied whole. Decoding drops invalid bytes, so no byte count
+        guarantees the 1000 characters checked when there is no newline;
+        the cap bounds the work instead, and lines past it are not checked.
+        """
+        limit = min(len(content), cls.MAX_LEADING_BYTES)
+        end = -1
+        for _ in range(max_lines):
+            end = content.find(b'\n', end + 1, limit)
+            if end == -1:
+                return content[:limit]
+        return content[:end]
     
     def _safe_decode(self, content: bytes) -> str:
         """Safely decode bytes to string"""
@@ -310,12 +318,12 @@ class ObfuscationDetector:
             pass
         
         # Check for compressed then encoded
-        if b'eJy' in content or b'eJx' in content:  # zlib markers
+        if content.find(b'eJy') != -1 or content.find(b'eJx') != -1:  # zlib markers
             indicators += 1
             
         # Check for multiple encoding indicators
         encoding_markers = [b'base64', b'zlib', b'gzip', b'marshal']
-        if sum(1 for marker in encoding_markers if marker in content) >= 2:
+        if sum(1 for marker in encoding_markers if content.find(marker) != -1) >= 2:
             indicators += 1
             
         return indicators >= 2
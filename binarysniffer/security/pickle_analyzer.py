@@ -5,13 +5,15 @@ This module provides deep security analysis of pickle files,
 detecting malicious code patterns, backdoors, and exploits.
 """
 
-import pickle
-import pickletools
 import io
 import logging
+from collections import deque
 from typing import Set, Dict, List, Tuple, Optional, Any
 from pathlib import Path
 
+from ..utils.byte_stats import printable_runs, shannon_entropy
+from ..utils.pickle_stream import STRING_OPCODES, scan_opcodes
+from .model_file import ModelFile
 from .patterns import MaliciousPatterns, ThreatPattern
 from .risk_scorer import RiskScorer, RiskAssessment
 
@@ -55,25 +57,30 @@ class PickleSecurityAnalyzer:
         self.risk_scorer = RiskScorer()
         self.patterns = MaliciousPatterns()
     
-    def analyze_pickle(self, file_path: str) -> Tuple[RiskAssessment, Set[str]]:
+    def analyze_pickle(self, file_path: str,
+                       model_file: Optional[ModelFile] = None) -> Tuple[RiskAssessment, Set[str]]:
         """
         Perform comprehensive security analysis on a pickle file
         
         Args:
             file_path: Path to the pickle file
+            model_file: Shared mapping of the file; the file is mapped if omitted
             
         Returns:
             Tuple of (RiskAssessment, extracted_features)
         """
+        if model_file is None:
+            # Map the file rather than reading it into memory
+            with ModelFile(file_path) as model_file:
+                return self.analyze_pickle(file_path, model_file)
+        
         features = set()
         suspicious_items = set()
         imports = set()
         dangerous_calls = set()
         
         try:
-            # Read file content
-            with open(file_path, 'rb') as f:
-                content = f.read()
+            content = model_file.data
             
             # Analyze opcodes
             opcode_features = self._analyze_opcodes(content)
@@ -135,94 +142,75 @@ class PickleSecurityAnalyzer:
             
             return risk_assessment, features
     
+    @staticmethod
+    def _opcode_stream(content) -> Any:
+        """File-like reader over content for the opcode scanner, without copying it"""
+        if isinstance(content, (bytes, bytearray)):
+            return io.BytesIO(content)
+        # A memory map is itself file-like; rewind it for each pass
+        content.seek(0)
+        return content
+    
     def _analyze_opcodes(self, content: bytes) -> Dict[str, Any]:
-        """Analyze pickle opcodes for security threats"""
+        """
+        Analyze pickle opcodes for security threats.
+
+        Opcodes are decoded as a stream and findings are recorded as they
+        occur; only the last few opcode names are kept for exploit
+        sequences, so memory does not grow with the pickle.
+        """
         features = set()
         suspicious = set()
         imports = set()
         dangerous_calls = set()
+        recent_opcodes = deque(maxlen=4)  # Longest exploit pattern
+        exploit_found = False
+        reverse_shell_found = False
         
         try:
-            # Use pickletools for safe static analysis (dis is for display only)
-            pickletools.dis(io.BytesIO(content), annotate=0)
-            opcode_list = []
-            
-            # Parse opcodes
-            for opcode, arg, pos in pickletools.genops(content):
-                opcode_list.append((opcode.name, arg, pos))
+            for op in scan_opcodes(self._opcode_stream(content)):
+                recent_opcodes.append(op.name)
                 
                 # Check for dangerous opcodes
-                if opcode.name in self.DANGEROUS_OPCODES:
-                    features.add(f"opcode:{opcode.name}")
-                    
-                    # Analyze GLOBAL imports
-                    if opcode.name == 'GLOBAL' and arg:
-                        if isinstance(arg, str):
-                            if ' ' in arg:
-                                module, name = arg.split(' ', 1)
-                            else:
-                                module, name = arg, ''
-                        elif isinstance(arg, (tuple, list)) and len(arg) >= 2:
-                            module, name = arg[0], arg[1]
-                        else:
-                            module, name = str(arg), ''
-                        
-                        import_str = f"{module}.{name}" if name else module
-                        imports.add(import_str)
-                        
-                        # Check for malicious imports
-                        if module in self.MALICIOUS_IMPORTS:
-                            if not name or name in self.MALICIOUS_IMPORTS[module]:
-                                dangerous_calls.add(import_str)
-                                features.add(f"malicious_import:{import_str}")
-                                suspicious.add(f"dangerous_import_{module}_{name}")
-                    
-                    # Analyze STACK_GLOBAL 
-                    elif opcode.name == 'STACK_GLOBAL':
-                        # STACK_GLOBAL builds module.name from the two strings on stack
-                        if len(opcode_list) >= 2:
-                            # Look for the two STRING opcodes before this
-                            prev_strings = []
-                            for i in range(len(opcode_list) - 1, -1, -1):
-                                if opcode_list[i][0] in ['SHORT_BINUNICODE', 'BINUNICODE', 'STRING']:
-                                    prev_strings.insert(0, opcode_list[i][1])
-                                    if len(prev_strings) == 2:
-                                        break
-                            
-                            if len(prev_strings) == 2:
-                                module, name = prev_strings
-                                import_str = f"{module}.{name}"
-                                imports.add(import_str)
-                                
-                                # Check for malicious imports
-                                if module in self.MALICIOUS_IMPORTS:
-                                    if not name or name in self.MALICIOUS_IMPORTS[module]:
-                                        dangerous_calls.add(import_str)
-                                        features.add(f"malicious_import:{import_str}")
-                                        suspicious.add(f"dangerous_import_{module}_{name}")
+                if op.name in self.DANGEROUS_OPCODES:
+                    features.add(f"opcode:{op.name}")
+                
+                # Analyze imports (GLOBAL, STACK_GLOBAL, INST)
+                if op.name in ('GLOBAL', 'STACK_GLOBAL', 'INST') and op.target:
+                    module, name = op.target
+                    import_str = str(op.target)
+                    imports.add(import_str)
                     
-                    # Analyze REDUCE calls
-                    elif opcode.name == 'REDUCE' and len(opcode_list) > 1:
-                        # Check previous opcode for function being called
-                        prev_op = opcode_list[-2] if len(opcode_list) >= 2 else None
-                        if prev_op and prev_op[0] == 'GLOBAL':
-                            func = prev_op[1]
-                            if any(danger in func.lower() for danger in 
-                                  ['system', 'exec', 'eval', 'popen', 'spawn']):
-                                dangerous_calls.add(func)
-                                features.add(f"dangerous_reduce:{func}")
-                                suspicious.add("code_execution_attempt")
-            
-            # Pattern detection in opcode sequences
-            opcode_sequence = [op[0] for op in opcode_list]
+                    # Check for malicious imports
+                    if module in self.MALICIOUS_IMPORTS:
+                        if not name or name in self.MALICIOUS_IMPORTS[module]:
+                            dangerous_calls.add(import_str)
+                            features.add(f"malicious_import:{import_str}")
+                            suspicious.add(f"dangerous_import_{module}_{name}")
+                
+                # Analyze REDUCE calls on the callable they pop
+                elif op.name == 'REDUCE' and op.target:
+                    func = str(op.target)
+                    if any(danger in func.lower() for danger in
+                           ['system', 'exec', 'eval', 'popen', 'spawn']):
+                        dangerous_calls.add(func)
+                        features.add(f"dangerous_reduce:{func}")
+                        suspicious.add("code_execution_attempt")
+                
+                # Every exploit pattern ends in a call
+                if not exploit_found and op.name in ('REDUCE', 'INST'):
+                    exploit_found = self._has_exploit_pattern(list(recent_opcodes))
+                
+                if not reverse_shell_found and op.name in STRING_OPCODES:
+                    reverse_shell_found = self._has_reverse_shell_pattern([op[:3]])
             
             # Check for common exploit patterns
-            if self._has_exploit_pattern(opcode_sequence):
+            if exploit_found:
                 suspicious.add("exploit_pattern_detected")
                 features.add("known_exploit_sequence")
             
             # Check for reverse shell patterns
-            if self._has_reverse_shell_pattern(opcode_list):
+            if reverse_shell_found:
                 suspicious.add("reverse_shell_pattern")
                 features.add("reverse_shell_detected")
                 
@@ -242,10 +230,9 @@ class PickleSecurityAnalyzer:
         features = set()
         
         try:
-            # Extract printable strings
-            strings = self._extract_strings(content)
-            
-            for string in strings:
+            # Scan printable strings one at a time
+            for start, end in printable_runs(content):
+                string = bytes(content[start:end]).decode('ascii')
                 # Check against malicious patterns
                 matches = MaliciousPatterns.check_pattern(string)
                 for pattern, _ in matches:
@@ -269,7 +256,6 @@ class PickleSecurityAnalyzer:
     def _check_known_exploits(self, content: bytes) -> Set[str]:
         """Check for known pickle exploit signatures"""
         features = set()
-        content_str = str(content)
         
         # Known exploit signatures
         exploits = {
@@ -282,7 +268,7 @@ class PickleSecurityAnalyzer:
         }
         
         for exploit_name, signature in exploits.items():
-            if signature in content:
+            if content.find(signature) != -1:
                 features.add(f"exploit:{exploit_name}")
                 
         return features
@@ -298,7 +284,7 @@ class PickleSecurityAnalyzer:
             
         # Check for obfuscation patterns
         obfusc_patterns = [b'exec(', b'eval(', b'compile(', b'marshal.loads']
-        return any(pattern in content for pattern in obfusc_patterns)
+        return any(content.find(pattern) != -1 for pattern in obfusc_patterns)
     
     def _has_exploit_pattern(self, opcodes: List[str]) -> bool:
         """Check for common exploit opcode patterns"""
@@ -342,40 +328,11 @@ class PickleSecurityAnalyzer:
     
     def _extract_strings(self, content: bytes, min_length: int = 4) -> List[str]:
         """Extract printable strings from binary content"""
-        strings = []
-        current = []
-        
-        for byte in content:
-            if 32 <= byte <= 126:  # Printable ASCII
-                current.append(chr(byte))
-            else:
-                if len(current) >= min_length:
-                    strings.append(''.join(current))
-                current = []
-                
-        if len(current) >= min_length:
-            strings.append(''.join(current))
-            
-        return strings
+        return [
+            bytes(content[start:end]).decode('ascii')
+            for start, end in printable_runs(content, min_length)
+        ]
     
     def _calculate_entropy(self, data: bytes) -> float:
         """Calculate Shannon entropy of data"""
-        if not data:
-            return 0.0
-            
-        import math
-        entropy = 0.0
-        data_len = len(data)
-        
-        # Count byte frequencies
-        frequencies = {}
-        for byte in data:
-            frequencies[byte] = frequencies.get(byte, 0) + 1
-            
-        # Calculate entropy using Shannon entropy formula
-        for count in frequencies.values():
-            if count > 0:
-                probability = float(count) / float(data_len)
-                entropy -= probability * math.log2(probability)
-                
-        return entropy
\ No newline at end of file
+        return shannon_entropy(data)
@@ -5,7 +5,6 @@ This module provides integrity validation for ML models,
 detecting tampering, backdoors, and supply chain attacks.
 """
 
-import hashlib
 import json
 import os
 from typing import Dict, List, Set, Optional, Tuple, Any
@@ -14,6 +13,8 @@ import logging
 from dataclasses import dataclass
 from enum import Enum
 
+from .model_file import ModelFile
+
 logger = logging.getLogger(__name__)
 
 
@@ -100,7 +101,8 @@ class ModelIntegrityValidator:
                        file_path: str,
                        model_type: str = None,
                        expected_hash: str = None,
-                       strict_mode: bool = False) -> ValidationResult:
+                       strict_mode: bool = False,
+                       model_file: Optional[ModelFile] = None) -> ValidationResult:
         """
         Perform comprehensive model validation
         
@@ -109,10 +111,16 @@ class ModelIntegrityValidator:
             model_type: Type of model (pickle, onnx, etc)
             expected_hash: Expected file hash for verification
             strict_mode: Enable strict validation
+            model_file: Shared mapping of the file (its digest is reused);
+                one is opened for this validation if omitted
             
         Returns:
             Validation result with status and details
         """
+        if model_file is None:
+            with ModelFile(file_path) as model_file:
+                return self.validate_model(file_path, model_type, expected_hash, strict_mode, model_file)
+        
         checks = []
         risk_factors = []
         recommendations = []
@@ -129,24 +137,24 @@ class ModelIntegrityValidator:
             )
         
         # File size validation
-        size_check = self._check_file_size(file_path, model_type)
+        size_check = self._check_file_size(model_file, model_type)
         checks.append(size_check)
         if size_check.status == ValidationStatus.INVALID:
             risk_factors.append('abnormal_size')
             
         # Hash verification
         if expected_hash:
-            hash_check = self._verify_hash(file_path, expected_hash)
+            hash_check = self._verify_hash(model_file, expected_hash)
             checks.append(hash_check)
             if hash_check.status != ValidationStatus.VALID:
                 risk_factors.append('hash_mismatch')
                 
         # Check against known good models
-        known_check = self._check_known_model(file_path)
+        known_check = self._check_known_model(model_file)
         checks.append(known_check)
         
         # Format validation
-        format_check = self._validate_format(file_path, model_type)
+        format_check = self._validate_format(model_file, model_type)
         checks.append(format_check)
         if format_check.status != ValidationStatus.VALID:
             risk_factors.append('invalid_format')
@@ -158,7 +166,7 @@ class ModelIntegrityValidator:
             risk_factors.append('suspicious_metadata')
             
         # Tensor validation
-        tensor_check = self._validate_tensors(file_path, model_type)
+        tensor_check = self._validate_tensors(model_file, model_type)
         checks.append(tensor_check)
         if tensor_check.status != ValidationStatus.VALID:
             risk_factors.append('invalid_tensors')
@@ -194,7 +202,7 @@ class ModelIntegrityValidator:
         metadata = {
             'file_path': file_path,
             'model_type': model_type,
-            'file_size': os.path.getsize(file_path) if os.path.exists(file_path) else 0,
+            'file_size': model_file.size,
             'checks_performed': len(checks),
             'risk_factor_count': len(risk_factors)
         }
@@ -222,10 +230,10 @@ class ModelIntegrityValidator:
                 message='File not found'
             )
     
-    def _check_file_size(self, file_path: str, model_type: str) -> IntegrityCheck:
+    def _check_file_size(self, model_file: ModelFile, model_type: str) -> IntegrityCheck:
         """Validate file size is reasonable"""
         try:
-            size = os.path.getsize(file_path)
+            size = model_file.size
             max_size = self.MAX_MODEL_SIZES.get(
                 model_type, 
                 10 * 1024 * 1024 * 1024  # Default 10GB
@@ -259,16 +267,10 @@ class ModelIntegrityValidator:
                 message=f'Could not check size: {e}'
             )
     
-    def _verify_hash(self, file_path: str, expected_hash: str) -> IntegrityCheck:
+    def _verify_hash(self, model_file: ModelFile, expected_hash: str) -> IntegrityCheck:
         """Verify file hash matches expected"""
         try:
-            # Calculate file hash
-            sha256_hash = hashlib.sha256()
-            with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(4096), b''):
-                    sha256_hash.update(chunk)
-            
-            actual_hash = sha256_hash.hexdigest()
+            actual_hash = model_file.sha256
             
             if actual_hash == expected_hash:
                 return IntegrityCheck(
@@ -294,16 +296,10 @@ class ModelIntegrityValidator:
                 message=f'Could not verify hash: {e}'
             )
     
-    def _check_known_model(self, file_path: str) -> IntegrityCheck:
+    def _check_known_model(self, model_file: ModelFile) -> IntegrityCheck:
         """Check if model matches known good models"""
         try:
-            # Calculate hash
-            sha256_hash = hashlib.sha256()
-            with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(4096), b''):
-                    sha256_hash.update(chunk)
-            
-            file_hash = sha256_hash.hexdigest()
+            file_hash = model_file.sha256
             
             # Check against known models
             for model_name, known_hash in self.KNOWN_GOOD_HASHES.items():
@@ -328,11 +324,10 @@ class ModelIntegrityValidator:
                 message=f'Could not check: {e}'
             )
     
-    def _validate_format(self, file_path: str, model_type: str) -> IntegrityCheck:
+    def _validate_format(self, model_file: ModelFile, model_type: str) -> IntegrityCheck:
         """Validate file format is correct"""
         try:
-            with open(file_path, 'rb') as f:
-                header = f.read(16)
+            header = model_file.read(0, 16)
             
             # Check magic bytes for different formats
             format_checks = {
@@ -382,27 +377,25 @@ class ModelIntegrityValidator:
             message='Metadata validation not implemented'
         )
     
-    def _validate_tensors(self, file_path: str, model_type: str) -> IntegrityCheck:
+    def _validate_tensors(self, model_file: ModelFile, model_type: str) -> IntegrityCheck:
         """Validate tensor shapes and values"""
         # Check for anomalous tensor sizes that might indicate data exfiltration
         try:
-            file_size = os.path.getsize(file_path)
+            file_size = model_file.size
             
             # Suspicious if single tensor is very large
             if file_size > 1024 * 1024 * 1024:  # 1GB
-                with open(file_path, 'rb') as f:
-                    # Simple heuristic: check for repeating patterns
-                    sample1 = f.read(1024)
-                    f.seek(file_size // 2)
-                    sample2 = f.read(1024)
-                    
-                    if sample1 == sample2:
-                        return IntegrityCheck(
-                            check_type='tensor_validation',
-                            status=ValidationStatus.SUSPICIOUS,
-                            message='Suspicious tensor patterns detected',
-                            details={'pattern': 'repeating_data'}
-                        )
+                # Simple heuristic: check for repeating patterns
+                sample1 = model_file.read(0, 1024)
+                sample2 = model_file.read(file_size // 2, 1024)
+                
+                if sample1 == sample2:
+                    return IntegrityCheck(
+                        check_type='tensor_validation',
+                        status=ValidationStatus.SUSPICIOUS,
+                        message='Suspicious tensor patterns detected',
+                        details={'pattern': 'repeating_data'}
+                    )
             
             return IntegrityCheck(
                 check_type='tensor_validation',
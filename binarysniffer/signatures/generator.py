@@ -8,7 +8,7 @@ from pathlib import Path
 from typing import Dict, List, Set, Optional, Any
 from datetime import datetime
 
-from ..extractors.factory import ExtractorFactory
+from ..extractors.factory import get_default_factory
 from ..core.config import Config
 from ..hashing.tlsh_hasher import TLSHHasher
 from .validator import SignatureValidator
@@ -27,7 +27,7 @@ class SignatureGenerator:
             config: BinarySniffer configuration
         """
         self.config = config or Config()
-        self.extractor_factory = ExtractorFactory()
+        self.extractor_factory = get_default_factory()
         self.tlsh_hasher = TLSHHasher()
     
     def generate_from_path(
@@ -2,17 +2,20 @@
 Signature management for packaged and remote signatures
 """
 
+import os
 import json
 import logging
 import tempfile
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set, Tuple
 from datetime import datetime
 
-from ..storage.database import SignatureDatabase
+from ..storage.database import PreparedSignature, SignatureDatabase
+from ..storage.snapshot import MatcherSnapshot
 from ..core.config import Config
-from ..utils.hashing import compute_minhash_for_strings
+from ..utils.hashing import compute_minhashes_for_string_sets
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +23,9 @@ logger = logging.getLogger(__name__)
 class SignatureManager:
     """Manage signatures from package and remote sources"""
     
+    # Upper bound on threads preparing signature files for import
+    MAX_IMPORT_WORKERS = 8
+    
     def __init__(self, config: Config, db: SignatureDatabase):
         """
         Initialize signature manager.
@@ -70,26 +76,19 @@ class SignatureManager:
         Returns:
             Number of signatures imported
         """
-        imported = 0
-        
         if not self.package_signatures_dir.exists():
             logger.warning("No packaged signatures directory found")
             return 0
         
-        for json_file in self.package_signatures_dir.glob("*.json"):
-            if json_file.name == "manifest.json":
-                continue
-                
-            try:
-                logger.info(f"Importing {json_file.name}")
-                count = self._import_signature_file(json_file, force=force)
-                imported += count
-                
-            except Exception as e:
-                logger.error(f"Error importing {json_file}: {e}")
+        json_files = [
+            json_file for json_file in self.package_signatures_dir.glob("*.json")
+            if json_file.name != "manifest.json"
+        ]
+        imported = self._import_signature_files(json_files, force=force)
         
-        # Database indexes are automatically managed
+        # Database indexes are rebuilt at the end of the bulk import
         if imported > 0:
+            self._invalidate_matcher_snapshot()
             logger.info("Import completed successfully")
         
         logger.info(f"Imported {imported} signatures from package")
@@ -156,17 +155,11 @@ class SignatureManager:
             logger.error(f"Directory not found: {directory}")
             return 0
         
-        imported = 0
-        
-        for json_file in directory.glob("*.json"):
-            try:
-                count = self._import_signature_file(json_file, force=force)
-                imported += count
-                
-            except Exception as e:
-                logger.error(f"Error importing {json_file}: {e}")
+        imported = self._import_signature_files(list(directory.glob("*.json")), force=force)
         
-        # Database indexes are automatically managed
+        # Database indexes are rebuilt at the end of the bulk import
+        if imported > 0:
+            self._invalidate_matcher_snapshot()
         
         return imported
     
@@ -234,6 +227,81 @@ class SignatureManager:
     
     def _import_signature_file(self, json_file: Path, force: bool = False) -> int:
         """Import single signature file using new JSON format"""
+        return self._import_signature_files([json_file], force=force)
+    
+    def _import_signature_files(self, json_files: List[Path], force: bool = False) -> int:
+        """
+        Import signature files in one bulk transaction.
+        
+        Files are parsed and their signatures hashed, compressed and
+        MinHashed on a thread pool; the database is written from this
+        thread in file order.
+        
+        Args:
+            json_files: Signature files (new JSON format)
+            force: Import components that already exist again
+            
+        Returns:
+            Number of signatures imported
+        """
+        if not json_files:
+            return 0
+        
+        # Skip parsing work for components that are already imported
+        existing: Set[str] = set()
+        if not force:
+            with self.db._get_connection() as conn:
+                existing = {row[0] for row in conn.execute("SELECT DISTINCT name FROM components")}
+        
+        def prepare(json_file: Path):
+            try:
+                return self._prepare_signature_file(json_file, existing)
+            except Exception as e:
+                logger.error(f"Error importing {json_file}: {e}")
+                return None
+        
+        workers = min(self.MAX_IMPORT_WORKERS, os.cpu_count() or 1, len(json_files))
+        imported = 0
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor, self.db.bulk_import() as writer:
+                for json_file, prepared in zip(json_files, executor.map(prepare, json_files)):
+                    if prepared is None:
+                        continue
+                    
+                    component_data, signatures = prepared
+                    package_name = component_data['name']
+                    # Check if already imported (unless forcing)
+                    if not force and writer.component_exists(package_name):
+                        logger.debug(f"Signature already exists: {package_name}")
+                        continue
+                    
+                    logger.info(f"Importing {json_file.name}")
+                    component_id = writer.add_component(**component_data)
+                    for signature in signatures:
+                        writer.add_signature(component_id, signature)
+                    imported += len(signatures)
+                    logger.debug(f"Imported {package_name}: {len(signatures)} signatures")
+        except Exception as e:
+            logger.error(f"Error importing signatures, no changes were made: {e}")
+            return 0
+        
+        return imported
+    
+    def _prepare_signature_file(
+        self,
+        json_file: Path,
+        existing: Set[str]
+    ) -> Optional[Tuple[Dict[str, Any], List[PreparedSignature]]]:
+        """
+        Parse a signature file and compute its database rows.
+        
+        Args:
+            json_file: Signature file (new JSON format)
+            existing: Component names to skip
+            
+        Returns:
+            (component fields, prepared signatures), or None if skipped
+        """
         with open(json_file, 'r', encoding='utf-8') as f:
             signature_data = json.load(f)
         
@@ -241,70 +309,54 @@ class SignatureManager:
         component_info = signature_data.get("component", {})
         package_name = component_info.get("name", json_file.stem)
         
-        # Check if already imported (unless forcing)
-        if not force and self._signature_exists(package_name):
+        if package_name in existing:
             logger.debug(f"Signature already exists: {package_name}")
-            return 0
+            return None
         
-        # Create component using new format
         component_data = {
             'name': package_name,
             'version': component_info.get('version', ''),
-            'publisher': component_info.get('publisher', ''),
-            'license': component_info.get('license', ''),
             'ecosystem': component_info.get('ecosystem', 'native'),
-            'description': component_info.get('description', ''),
-            'metadata': json.dumps({
+            'license': component_info.get('license', ''),
+            'metadata': {
                 'category': component_info.get('category', 'unknown'),
                 'platforms': component_info.get('platforms', []), 
                 'languages': component_info.get('languages', []),
                 'signature_metadata': signature_data.get('signature_metadata', {})
-            })
+            }
         }
         
-        component_id = self.db.add_component(
-            name=component_data['name'],
-            version=component_data['version'],
-            ecosystem=component_data['ecosystem'],
-            license=component_data['license'],
-            metadata=json.loads(component_data['metadata']) if component_data['metadata'] else None
-        )
-        
         # Add signatures from new format (handle both "signatures" and "patterns" keys)
         signatures = signature_data.get("signatures", signature_data.get("patterns", []))
-        imported_count = 0
         
-        for sig_entry in signatures:
-            pattern = sig_entry.get("pattern", "")
-            if pattern and len(pattern) >= 3:  # Only import non-empty patterns
-                confidence = float(sig_entry.get("confidence", 0.7))
-                sig_type = sig_entry.get("type", "string_pattern")
-                
-                # Map signature type to integer
-                type_mapping = {
-                    "string_pattern": 1,
-                    "byte_pattern": 2,
-                    "function_name": 1,
-                    1: 1,  # Handle integer types from exports
-                    2: 2
-                }
-                sig_type_int = type_mapping.get(sig_type, 1)
-                
-                # Compute minhash for the signature
-                minhash_obj = compute_minhash_for_strings([pattern])
-                minhash = minhash_obj.to_bytes()
-                
-                self.db.add_signature(
-                    component_id=component_id,
-                    signature=pattern,
-                    sig_type=sig_type_int,
-                    confidence=confidence,
-                    minhash=minhash
-                )
-                imported_count += 1
-        
-        logger.debug(f"Imported {package_name}: {imported_count} signatures")
-        return imported_count
+        # Only import non-empty patterns (entries with a null or short pattern are skipped)
+        entries = [
+            sig_entry for sig_entry in signatures
+            if isinstance(sig_entry.get("pattern"), str) and len(sig_entry["pattern"]) >= 3
+        ]
+        
+        # Compute the minhashes of all patterns in one batch
+        minhashes = compute_minhashes_for_string_sets([sig_entry["pattern"]] for sig_entry in entries)
+        
+        # Map signature type to integer
+        type_mapping = {
+            "string_pattern": 1,
+            "byte_pattern": 2,
+            "function_name": 1,
+            1: 1,  # Handle integer types from exports
+            2: 2
+        }
+        
+        prepared = [
+            SignatureDatabase.prepare_signature(
+                sig_entry["pattern"],
+                type_mapping.get(sig_entry.get("type", "string_pattern"), 1),
+                float(sig_entry.get("confidence", 0.7)),
+                minhash_obj.to_bytes()
+            )
+            for sig_entry, minhash_obj in zip(entries, minhashes)
+        ]
+        return component_data, prepared
     
     def _get_packaged_version(self) -> str:
         """Get version of packaged signatures"""
@@ -348,6 +400,14 @@ class SignatureManager:
         self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
         with open(self.manifest_path, 'w') as f:
             json.dump(manifest, f, indent=2)
+        
+        # Record the version in the database too; it is part of the snapshot stamp
+        self.db.set_metadata("signature_version", version)
+        self._invalidate_matcher_snapshot()
+    
+    def _invalidate_matcher_snapshot(self):
+        """Drop the precompiled matcher snapshot after the signature set changed"""
+        MatcherSnapshot(self.config.snapshot_path).invalidate()
     
     def _version_newer(self, version1: str, version2: str) -> bool:
         """Check if version1 is newer than version2"""
@@ -383,6 +443,7 @@ class SignatureManager:
                 DELETE FROM components;
                 VACUUM;
             """)
+        self._invalidate_matcher_snapshot()
     
     def _count_signatures(self) -> int:
         """Count total signatures in database"""
@@ -3,6 +3,8 @@ Storage modules for signature management
 """
 
 from .database import SignatureDatabase
+from .snapshot import MatcherSnapshot
+from .result_cache import ResultCache
 from .updater import SignatureUpdater
 
-__all__ = ["SignatureDatabase", "SignatureUpdater"]
\ No newline at end of file
+__all__ = ["SignatureDatabase", "MatcherSnapshot", "ResultCache", "SignatureUpdater"]
\ No newline at end of file
@@ -6,17 +6,61 @@ import sqlite3
 import json
 import logging
 import struct
+import threading
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from contextlib import contextmanager
+from dataclasses import dataclass
 import zstandard as zstd
 
-from ..utils.hashing import compute_sha256
+from ..utils.hashing import (
+    MINHASH_ALGORITHM,
+    compute_minhash_for_strings,
+    compute_minhashes_for_string_sets,
+    compute_sha256,
+)
 
 
 logger = logging.getLogger(__name__)
 
 
+# Secondary indexes; dropped during bulk imports and rebuilt afterwards
+SIGNATURE_INDEXES = {
+    'idx_sig_hash': 'signatures(signature_hash)',
+    'idx_sig_component': 'signatures(component_id)',
+    'idx_sig_confidence': 'signatures(confidence)',
+    'idx_trigram_lookup': 'trigrams(trigram)',
+}
+
+# Compression level of stored signatures
+SIGNATURE_COMPRESSION_LEVEL = 9
+
+# Signatures whose MinHashes are recomputed per batch on an algorithm change
+MINHASH_UPGRADE_BATCH = 5000
+
+_compressors = threading.local()
+
+
+def _signature_compressor() -> zstd.ZstdCompressor:
+    """Get this thread's signature compressor (compressors are not thread-safe)"""
+    compressor = getattr(_compressors, 'compressor', None)
+    if compressor is None:
+        compressor = _compressors.compressor = zstd.ZstdCompressor(level=SIGNATURE_COMPRESSION_LEVEL)
+    return compressor
+
+
+@dataclass
+class PreparedSignature:
+    """Signature row computed ahead of insertion (see SignatureDatabase.prepare_signature)"""
+    
+    signature_hash: str
+    compressed: bytes
+    sig_type: int
+    confidence: float
+    minhash: bytes
+    trigrams: List[Tuple[str, int]]  # (trigram, position)
+
+
 class SignatureDatabase:
     """
     SQLite-based signature storage with compression and indexing.
@@ -93,22 +137,52 @@ class SignatureDatabase:
                     value TEXT
                 );
                 
-                -- Create indexes
-                CREATE INDEX IF NOT EXISTS idx_sig_hash ON signatures(signature_hash);
-                CREATE INDEX IF NOT EXISTS idx_sig_component ON signatures(component_id);
-                CREATE INDEX IF NOT EXISTS idx_sig_confidence ON signatures(confidence);
-                CREATE INDEX IF NOT EXISTS idx_trigram_lookup ON trigrams(trigram);
-                
                 -- Set pragmas for performance
                 PRAGMA journal_mode = WAL;
                 PRAGMA synchronous = NORMAL;
                 PRAGMA cache_size = -64000;  -- 64MB cache
                 PRAGMA temp_store = MEMORY;
             """)
+            self._create_indexes(conn)
             
             # Set initial metadata
             self._set_metadata(conn, "version", "1.0.0")
             self._set_metadata(conn, "created", str(Path.cwd()))
+            self._upgrade_minhashes(conn)
+    
+    def _upgrade_minhashes(self, conn: sqlite3.Connection):
+        """
+        Recompute stored MinHashes of another MINHASH_ALGORITHM.
+        
+        Their values never equal those of current queries, so LSH lookups
+        against them would silently find nothing. Each MinHash is recomputed
+        from its signature, as on import.
+        """
+        row = conn.execute("SELECT value FROM metadata WHERE key = 'minhash_algorithm'").fetchone()
+        if row and row[0] == MINHASH_ALGORITHM:
+            return
+        
+        count = conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+        if count:
+            logger.info(f"Recomputing {count} MinHashes ({row[0] if row else 'legacy'} -> {MINHASH_ALGORITHM})")
+            decompressor = zstd.ZstdDecompressor()
+            last_id = 0
+            while True:
+                rows = conn.execute(
+                    "SELECT id, signature_compressed FROM signatures WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, MINHASH_UPGRADE_BATCH)
+                ).fetchall()
+                if not rows:
+                    break
+                signatures = [decompressor.decompress(r['signature_compressed']).decode('utf-8') for r in rows]
+                minhashes = compute_minhashes_for_string_sets([signature] for signature in signatures)
+                conn.executemany(
+                    "UPDATE signatures SET minhash = ? WHERE id = ?",
+                    [(minhash.to_bytes(), r['id']) for r, minhash in zip(rows, minhashes)]
+                )
+                last_id = rows[-1]['id']
+        
+        self._set_metadata(conn, "minhash_algorithm", MINHASH_ALGORITHM)
     
     @contextmanager
     def _get_connection(self):
@@ -124,6 +198,68 @@ class SignatureDatabase:
         finally:
             conn.close()
     
+    @staticmethod
+    def _create_indexes(conn: sqlite3.Connection):
+        """Create the secondary indexes if missing"""
+        for name, target in SIGNATURE_INDEXES.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+    
+    @contextmanager
+    def bulk_import(self) -> Iterator["SignatureBulkWriter"]:
+        """
+        Open a writer that imports many components and signatures at once.
+        
+        Everything is written in a single transaction with import-time
+        pragmas; secondary indexes are dropped first and rebuilt once at
+        the end. On error the whole import is rolled back.
+        
+        Yields:
+            SignatureBulkWriter bound to the transaction
+        """
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.execute("PRAGMA cache_size = -256000")  # 256MB cache
+            conn.execute("PRAGMA temp_store = MEMORY")
+            conn.execute("BEGIN IMMEDIATE")
+            for name in SIGNATURE_INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+            
+            writer = SignatureBulkWriter(conn)
+            yield writer
+            writer.flush()
+            
+            self._create_indexes(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def prepare_signature(
+        signature: str,
+        sig_type: int,
+        confidence: float,
+        minhash: bytes
+    ) -> PreparedSignature:
+        """
+        Compute the stored form of a signature (hash, compressed text, trigrams).
+        
+        Safe to call from several threads; each thread reuses its own compressor.
+        """
+        return PreparedSignature(
+            signature_hash=compute_sha256(signature),
+            compressed=_signature_compressor().compress(signature.encode('utf-8')),
+            sig_type=sig_type,
+            confidence=confidence,
+            minhash=minhash,
+            trigrams=SignatureDatabase._trigrams(signature)
+        )
+    
     def is_initialized(self) -> bool:
         """Check if database is properly initialized"""
         if not self.db_path.exists():
@@ -169,10 +305,7 @@ class SignatureDatabase:
         minhash: bytes
     ) -> int:
         """Add a signature to the database"""
-        # Compress signature
-        compressor = zstd.ZstdCompressor(level=9)
-        compressed = compressor.compress(signature.encode('utf-8'))
-        sig_hash = compute_sha256(signature)
+        prepared = self.prepare_signature(signature, sig_type, confidence, minhash)
         
         with self._get_connection() as conn:
             cursor = conn.execute("""
@@ -181,8 +314,8 @@ class SignatureDatabase:
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (
                 component_id,
-                sig_hash,
-                compressed,
+                prepared.signature_hash,
+                prepared.compressed,
                 sig_type,
                 confidence,
                 minhash
@@ -195,15 +328,19 @@ class SignatureDatabase:
             
             return sig_id
     
+    @staticmethod
+    def _trigrams(signature: str) -> List[Tuple[str, int]]:
+        """Get the (trigram, position) pairs indexed for a signature"""
+        sig_lower = signature.lower()
+        return [
+            (sig_lower[i:i+3], i)
+            for i in range(len(sig_lower) - 2)
+            if sig_lower[i:i+3].isalnum()  # Only alphanumeric trigrams
+        ]
+    
     def _add_trigrams(self, conn: sqlite3.Connection, sig_id: int, signature: str):
         """Add trigrams for a signature"""
-        trigrams = []
-        sig_lower = signature.lower()
-        
-        for i in range(len(sig_lower) - 2):
-            trigram = sig_lower[i:i+3]
-            if trigram.isalnum():  # Only alphanumeric trigrams
-                trigrams.append((trigram, sig_id, i))
+        trigrams = [(trigram, sig_id, position) for trigram, position in self._trigrams(signature)]
         
         if trigrams:
             conn.executemany(
@@ -302,31 +439,31 @@ class SignatureDatabase:
             
             logger.info(f"XMDB version {version}: {comp_count} components, {sig_count} signatures")
             
-            # Read components
-            components = {}
-            for _ in range(comp_count):
-                comp_id = struct.unpack('<I', f.read(4))[0]
-                name_len = struct.unpack('<H', f.read(2))[0]
-                name = f.read(name_len).decode('utf-8')
-                version_len = struct.unpack('<H', f.read(2))[0]
-                version = f.read(version_len).decode('utf-8') if version_len > 0 else None
-                meta_len = struct.unpack('<I', f.read(4))[0]
-                metadata = f.read(meta_len).decode('utf-8') if meta_len > 0 else None
+            with self.bulk_import() as writer:
+                # Read components
+                components = {}
+                for _ in range(comp_count):
+                    comp_id = struct.unpack('<I', f.read(4))[0]
+                    name_len = struct.unpack('<H', f.read(2))[0]
+                    name = f.read(name_len).decode('utf-8')
+                    version_len = struct.unpack('<H', f.read(2))[0]
+                    version = f.read(version_len).decode('utf-8') if version_len > 0 else None
+                    meta_len = struct.unpack('<I', f.read(4))[0]
+                    metadata = f.read(meta_len).decode('utf-8') if meta_len > 0 else None
+                    
+                    # Add to database
+                    db_id = writer.add_component(name, version, metadata=json.loads(metadata) if metadata else None)
+                    components[comp_id] = db_id
+                
+                # Read signatures
+                decompressor = zstd.ZstdDecompressor()
+                loaded = 0
                 
-                # Add to database
-                db_id = self.add_component(name, version, metadata=json.loads(metadata) if metadata else None)
-                components[comp_id] = db_id
-            
-            # Read signatures
-            decompressor = zstd.ZstdDecompressor()
-            loaded = 0
-            
-            with self._get_connection() as conn:
                 for _ in range(sig_count):
                     comp_id = struct.unpack('<I', f.read(4))[0]
                     sig_type = struct.unpack('<B', f.read(1))[0]
                     confidence = struct.unpack('<f', f.read(4))[0]
-                    minhash = f.read(16)
+                    f.read(16)  # Legacy MinHash, recomputed below
                     sig_len = struct.unpack('<I', f.read(4))[0]
                     sig_compressed = f.read(sig_len)
                     
@@ -337,12 +474,12 @@ class SignatureDatabase:
                         signature = sig_compressed.decode('utf-8')
                     
                     # Add to database
-                    self.add_signature(
+                    writer.add_signature(
                         components[comp_id],
-                        signature,
-                        sig_type,
-                        confidence,
-                        minhash
+                        self.prepare_signature(
+                            signature, sig_type, confidence,
+                            compute_minhash_for_strings([signature]).to_bytes()
+                        )
                     )
                     loaded += 1
                     
@@ -394,6 +531,37 @@ class SignatureDatabase:
             
             return stats
     
+    def get_content_stamp(self) -> str:
+        """
+        Get a cheap fingerprint of the signature content.
+        
+        Combines the signature set version recorded by SignatureManager with
+        row counts and the highest signature ID, so any import, rebuild or
+        version change yields a different stamp.
+        """
+        with self._get_connection() as conn:
+            sig_count, max_sig_id = conn.execute(
+                "SELECT COUNT(*), COALESCE(MAX(id), 0) FROM signatures"
+            ).fetchone()
+            comp_count = conn.execute("SELECT COUNT(*) FROM components").fetchone()[0]
+            row = conn.execute(
+                "SELECT value FROM metadata WHERE key = 'signature_version'"
+            ).fetchone()
+            version = row[0] if row else "0.0.0"
+        
+        return f"{version}:{sig_count}:{max_sig_id}:{comp_count}"
+    
+    def get_metadata(self, key: str) -> Optional[str]:
+        """Get metadata value"""
+        with self._get_connection() as conn:
+            row = conn.execute("SELECT value FROM metadata WHERE key = ?", (key,)).fetchone()
+            return row[0] if row else None
+    
+    def set_metadata(self, key: str, value: str):
+        """Set metadata value"""
+        with self._get_connection() as conn:
+            self._set_metadata(conn, key, value)
+    
     def _set_metadata(self, conn: sqlite3.Connection, key: str, value: str):
         """Set metadata value"""
         conn.execute(
@@ -406,4 +574,105 @@ class SignatureDatabase:
         with self._get_connection() as conn:
             conn.execute("VACUUM")
             conn.execute("ANALYZE")
-        logger.info("Database optimized")
\ No newline at end of file
+        logger.info("Database optimized")
+
+
+class SignatureBulkWriter:
+    """
+    Writer returned by SignatureDatabase.bulk_import().
+    
+    Signature IDs are assigned up front, so signatures and their trigrams
+    can be buffered and inserted with executemany instead of one statement
+    (and connection) per signature.
+    """
+    
+    # Signatures buffered before they are written
+    BATCH_SIZE = 10000
+    
+    def __init__(self, conn: sqlite3.Connection):
+        """
+        Initialize writer.
+        
+        Args:
+            conn: Connection with an open write transaction
+        """
+        self.conn = conn
+        self.count = 0
+        self._next_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM signatures").fetchone()[0]
+        self._signatures: List[Tuple] = []
+        self._trigrams: List[Tuple[str, int, int]] = []
+    
+    def component_exists(self, name: str) -> bool:
+        """Check if a component with this name exists (including ones added in this import)"""
+        row = self.conn.execute("SELECT 1 FROM components WHERE name = ? LIMIT 1", (name,)).fetchone()
+        return row is not None
+    
+    def add_component(
+        self,
+        name: str,
+        version: Optional[str] = None,
+        ecosystem: Optional[str] = None,
+        license: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Add a component (same semantics as SignatureDatabase.add_component)"""
+        cursor = self.conn.execute("""
+            INSERT OR REPLACE INTO components 
+            (name, version, ecosystem, license, metadata)
+            VALUES (?, ?, ?, ?, ?)
+        """, (
+            name,
+            version,
+            ecosystem,
+            license,
+            json.dumps(metadata) if metadata else None
+        ))
+        return cursor.lastrowid
+    
+    def add_signature(self, component_id: int, prepared: PreparedSignature) -> int:
+        """
+        Queue a signature for insertion.
+        
+        Args:
+            component_id: Owning component
+            prepared: Result of SignatureDatabase.prepare_signature()
+            
+        Returns:
+            ID the signature is stored under
+        """
+        sig_id = self._next_id
+        self._next_id += 1
+        self._signatures.append((
+            sig_id,
+            component_id,
+            prepared.signature_hash,
+            prepared.compressed,
+            prepared.sig_type,
+            prepared.confidence,
+            prepared.minhash
+        ))
+        self._trigrams.extend((trigram, sig_id, position) for trigram, position in prepared.trigrams)
+        self.count += 1
+        
+        if len(self._signatures) >= self.BATCH_SIZE:
+            self.flush()
+        return sig_id
+    
+    def flush(self):
+        """Write queued signatures and trigrams"""
+        if self._signatures:
+            self.conn.executemany("""
+                INSERT INTO signatures 
+                (id, component_id, signature_hash, signature_compressed, sig_type, confidence, minhash)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, self._signatures)
+            self._signatures = []
+        
+        if self._trigrams:
+            # Insert in primary key order so the trigram B-tree is appended to
+            self._trigrams.sort()
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO trigrams (trigram, signature_id, position) VALUES (?, ?, ?)",
+                self._trigrams
+            )
+            self._trigrams = []
@@ -0,0 +1,226 @@
+"""
+Content-addressed cache of analysis results
+"""
+
+import json
+import time
+import pickle
+import sqlite3
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+from contextlib import contextmanager
+
+import zstandard as zstd
+
+from ..core.results import AnalysisResult
+
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """
+    Persistent LRU cache mapping file content plus analysis inputs to results.
+
+    Entries are keyed by the SHA-256 of the file content, the signature
+    database stamp and the analysis options, so a changed file, signature
+    set or option simply misses. Results are stored as compressed pickles in
+    a SQLite file under Config.cache_dir. Once the stored size exceeds the
+    limit the least recently used entries are evicted. Hit and miss counters
+    are kept in the same file, so worker processes add to shared totals.
+
+    The cache lives in the user's data directory and is trusted like the
+    signature database.
+    """
+
+    # Evict down to this fraction of the limit to avoid evicting on every put
+    EVICT_TARGET = 0.9
+
+    def __init__(self, cache_dir: Path, max_size_mb: int):
+        """
+        Initialize result cache.
+
+        Args:
+            cache_dir: Cache directory
+            max_size_mb: Maximum size of stored results in MB
+        """
+        self.cache_dir = Path(cache_dir)
+        self.db_path = self.cache_dir / "results.db"
+        self.max_size = max_size_mb * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self._compressor = zstd.ZstdCompressor(level=3)
+        self._decompressor = zstd.ZstdDecompressor()
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._init_database()
+
+    def _init_database(self):
+        """Initialize cache schema"""
+        with self._get_connection() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    data BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_results_access ON results(last_access);
+
+                CREATE TABLE IF NOT EXISTS counters (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+                INSERT OR IGNORE INTO counters (name, value) VALUES ('hits', 0), ('misses', 0), ('size', 0);
+            """)
+
+    @contextmanager
+    def _get_connection(self):
+        """Get database connection with proper cleanup"""
+        # Worker processes share the file; wait for their writes instead of failing
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(content_hash: str, signature_stamp: str, options: Dict[str, Any]) -> str:
+        """
+        Build a cache key.
+
+        Args:
+            content_hash: SHA-256 of the file content
+            signature_stamp: Signature database stamp the result was matched against
+            options: Analysis options and any other inputs that affect the result
+
+        Returns:
+            Hex digest identifying the entry
+        """
+        material = json.dumps([content_hash, signature_stamp, options], sort_keys=True, default=str)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[AnalysisResult]:
+        """
+        Look up a result and mark it as recently used.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Cached result, or None on a miss
+        """
+        result = None
+        try:
+            with self._get_connection() as conn:
+                row = conn.execute("SELECT data FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    try:
+                        result = pickle.loads(self._decompressor.decompress(row[0]))
+                    except Exception as e:
+                        logger.debug(f"Dropping unreadable cache entry {key}: {e}")
+                        self._delete(conn, key)
+
+                counter = 'hits' if result is not None else 'misses'
+                if result is not None:
+                    conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+                conn.execute("UPDATE counters SET value = value + 1 WHERE name = ?", (counter,))
+        except sqlite3.Error as e:
+            logger.debug(f"Result cache lookup failed: {e}")
+            result = None
+
+        if result is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return result
+
+    def put(self, key: str, result: AnalysisResult):
+        """
+        Store a result, evicting least recently used entries if needed.
+
+        Args:
+            key: Cache key from make_key()
+            result: Analysis result to store
+        """
+        try:
+            data = self._compressor.compress(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception as e:
+            logger.debug(f"Result for {result.file_path} not cacheable: {e}")
+            return
+
+        if len(data) > self.max_size:
+            return
+
+        try:
+            with self._get_connection() as conn:
+                self._delete(conn, key)
+                conn.execute(
+                    "INSERT INTO results (key, data, size, last_access) VALUES (?, ?, ?, ?)",
+                    (key, data, len(data), time.time())
+                )
+                conn.execute("UPDATE counters SET value = value + ? WHERE name = 'size'", (len(data),))
+                self._evict(conn)
+        except sqlite3.Error as e:
+            logger.debug(f"Result cache store failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Entry count, stored size, limit, and hit/miss totals across all processes
+        """
+        with self._get_connection() as conn:
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            entries = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+        return {
+            'entries': entries,
+            'size_bytes': counters.get('size', 0),
+            'max_size_bytes': self.max_size,
+            'hits': counters.get('hits', 0),
+            'misses': counters.get('misses', 0)
+        }
+
+    def clear(self):
+        """Remove all entries and reset counters"""
+        with self._get_connection() as conn:
+            conn.execute("DELETE FROM results")
+            conn.execute("UPDATE counters SET value = 0")
+        self.hits = 0
+        self.misses = 0
+
+    def _delete(self, conn: sqlite3.Connection, key: str):
+        """Delete one entry and update the stored size"""
+        row = conn.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            conn.execute("UPDATE counters SET value = value - ? WHERE name = 'size'", (row[0],))
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Evict least recently used entries while over the size limit"""
+        size = conn.execute("SELECT value FROM counters WHERE name = 'size'").fetchone()[0]
+        if size <= self.max_size:
+            return
+
+        target = self.max_size * self.EVICT_TARGET
+        evicted = 0
+        for key, entry_size in conn.execute(
+            "SELECT key, size FROM results ORDER BY last_access"
+        ).fetchall():
+            if size <= target:
+                break
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            size -= entry_size
+            evicted += 1
+
+        conn.execute("UPDATE counters SET value = ? WHERE name = 'size'", (size,))
+        logger.debug(f"Evicted {evicted} cached results ({size / 1024 / 1024:.1f} MB left)")
@@ -0,0 +1,176 @@
+"""
+Scan manifest for incremental directory analysis
+"""
+
+import os
+import pickle
+import logging
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import zstandard as zstd
+
+from ..core.results import AnalysisResult
+from ..utils.hashing import compute_file_sha256, compute_sha256
+
+
+logger = logging.getLogger(__name__)
+
+
+# (size, mtime_ns, inode) of a file
+StatKey = Tuple[int, int, int]
+
+
+class ScanManifest:
+    """
+    Record of the files and results of the previous scan of a directory.
+
+    For every successfully analyzed file the manifest keeps its size, mtime,
+    inode and content hash together with the result. On the next scan a file
+    whose stat tuple is unchanged reuses its result without being read; a
+    file whose metadata changed but whose size and content hash match (e.g.
+    touched or restored from a cache) is reused as well. The manifest is only
+    valid for the signature set and analysis options (the fingerprint) it
+    was written with.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, path: Path, fingerprint: str):
+        """
+        Initialize manifest.
+
+        Args:
+            path: Manifest file path
+            fingerprint: Signature stamp and analysis options of this scan
+        """
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self.entries: Dict[str, Tuple[StatKey, str, AnalysisResult]] = {}
+        self._previous: Dict[str, Tuple[StatKey, str, AnalysisResult]] = {}
+
+    @classmethod
+    def for_directory(cls, manifest_dir: Path, scan_id: str, fingerprint: str) -> "ScanManifest":
+        """
+        Load the manifest of a directory scan.
+
+        Args:
+            manifest_dir: Directory holding manifests
+            scan_id: Identifies the scan (resolved directory, recursion, patterns)
+            fingerprint: Signature stamp and analysis options of this scan
+
+        Returns:
+            Manifest, populated with the previous scan if it is still valid
+        """
+        manifest = cls(Path(manifest_dir) / f"{compute_sha256(scan_id)[:24]}.manifest", fingerprint)
+        manifest.load()
+        return manifest
+
+    def load(self) -> bool:
+        """Load the previous scan (False if missing, stale or unreadable)"""
+        if not self.path.exists():
+            return False
+
+        try:
+            with open(self.path, 'rb') as f:
+                data = pickle.loads(zstd.ZstdDecompressor().decompress(f.read()))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable scan manifest {self.path}: {e}")
+            return False
+
+        if data.get('version') != self.FORMAT_VERSION or data.get('fingerprint') != self.fingerprint:
+            logger.info("Signatures or analysis options changed since the previous scan - analyzing all files")
+            return False
+
+        self._previous = data['entries']
+        logger.debug(f"Loaded scan manifest with {len(self._previous)} files from {self.path}")
+        return True
+
+    @staticmethod
+    def stat(file_path: Path) -> Optional[StatKey]:
+        """Get the stat tuple of a file (None if it cannot be read)"""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns, st.st_ino
+
+    def lookup(self, file_path: Path) -> Optional[AnalysisResult]:
+        """
+        Get the previous result of a file if it is unchanged.
+
+        Reused entries are carried over into this scan's manifest.
+
+        Args:
+            file_path: File to check
+
+        Returns:
+            Previous result, or None if the file is new or changed
+        """
+        key = str(Path(file_path).resolve())
+        previous = self._previous.get(key)
+        if previous is None:
+            return None
+
+        stat_key, content_hash, result = previous
+        current = self.stat(file_path)
+        if current is None or current[0] != stat_key[0]:
+            return None
+
+        if current != stat_key:
+            # Metadata changed but the size did not: compare content
+            try:
+                if compute_file_sha256(file_path) != content_hash:
+                    return None
+            except OSError:
+                return None
+
+        self.entries[key] = (current, content_hash, result)
+        return result
+
+    def record(self, file_path: Path, result: AnalysisResult, stat_before: Optional[StatKey]):
+        """
+        Record a freshly analyzed file.
+
+        Failed results are not recorded so they are retried next time, and
+        neither are files that changed while they were being analyzed. The
+        content hash computed during the analysis is reused when the result
+        carries one; otherwise the file is hashed here.
+
+        Args:
+            file_path: Analyzed file
+            result: Its analysis result
+            stat_before: Stat tuple taken before the analysis started
+        """
+        if result.error or stat_before is None or self.stat(file_path) != stat_before:
+            return
+
+        content_hash = result.content_sha256
+        if content_hash is None:
+            try:
+                content_hash = compute_file_sha256(file_path)
+            except OSError:
+                return
+
+        self.entries[str(Path(file_path).resolve())] = (stat_before, content_hash, result)
+
+    def save(self):
+        """Write this scan's entries atomically, replacing the previous scan"""
+        data = {
+            'version': self.FORMAT_VERSION,
+            'fingerprint': self.fingerprint,
+            'entries': self.entries
+        }
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(zstd.ZstdCompressor(level=3).compress(
+                    pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+                ))
+            os.replace(tmp_path, self.path)
+            logger.debug(f"Saved scan manifest with {len(self.entries)} files to {self.path}")
+        except OSError as e:
+            logger.warning(f"Could not save scan manifest {self.path}: {e}")
+            tmp_path.unlink(missing_ok=True)
@@ -0,0 +1,446 @@
+"""
+Precompiled matcher snapshot stored next to the signature database
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import zlib
+import logging
+from array import array
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class MatcherSnapshot:
+    """
+    Versioned binary image of the validated signature set and matcher index.
+
+    Building the DirectMatcher index from SQLite means decompressing and
+    validating every signature. The snapshot stores the finished result so
+    later runs only memory-map a file. A snapshot is valid only for the
+    database stamp it was written with (see SignatureDatabase.get_content_stamp).
+    Signature records stay in the map and are decoded as lookups return
+    them (see SnapshotSignatures).
+
+    Layout (little-endian header, native-order uint32 sections):
+        magic 'BSMS' | format version (u32) | byte order (u8) | stamp (u16 + utf-8)
+        section count (u32), then per section:
+        name (u8 + ascii) | length (u64) | padding to 8 bytes | data
+    """
+
+    MAGIC = b'BSMS'
+    FORMAT_VERSION = 2
+
+    # One fixed-size record per signature, stored in match order
+    # (id, component_id, sig_type, confidence, order, substring_id, pattern_offset, pattern_length)
+    SIGNATURE_RECORD = struct.Struct('<IIidIiII')
+
+    # Trailing (pattern_offset, pattern_length) fields of a signature record
+    PATTERN_SPAN = struct.Struct('<II')
+
+    # Empty slot of the exact-pattern hash table
+    EMPTY_SLOT = 0xFFFFFFFF
+
+    def __init__(self, path: Path):
+        """
+        Initialize snapshot handle.
+
+        Args:
+            path: Snapshot file path
+        """
+        self.path = Path(path)
+        self._mmap = None
+
+    def exists(self) -> bool:
+        """Check if a snapshot file is present"""
+        return self.path.exists()
+
+    def invalidate(self):
+        """Remove the snapshot so the next matcher rebuilds it"""
+        self.close()
+        try:
+            self.path.unlink()
+            logger.debug(f"Invalidated matcher snapshot {self.path}")
+        except FileNotFoundError:
+            pass
+
+    def write(
+        self,
+        stamp: str,
+        signatures: List[Dict[str, Any]],
+        component_map: Dict[int, Dict[str, Any]],
+        automaton_patterns: List[str],
+        automaton_arrays: Dict[str, array]
+    ):
+        """
+        Write a snapshot atomically.
+
+        Args:
+            stamp: Database stamp the snapshot belongs to
+            signatures: Signature dicts as indexed by DirectMatcher
+            component_map: Component ID -> component info
+            automaton_patterns: Substring automaton patterns in ID order
+            automaton_arrays: Flattened automaton (AhoCorasickAutomaton.to_arrays)
+        """
+        signatures = sorted(signatures, key=lambda sig: sig['order'])
+        pattern_blob, pattern_spans = self._pack_strings(sig['pattern'] for sig in signatures)
+        records = bytearray()
+        for sig, (offset, length) in zip(signatures, pattern_spans):
+            records += self.SIGNATURE_RECORD.pack(
+                sig['id'],
+                sig['component_id'],
+                sig['sig_type'] if sig['sig_type'] is not None else 0,
+                sig['confidence'],
+                sig['order'],
+                sig['substring_id'],
+                offset,
+                length
+            )
+
+        # Signatures grouped by exact pattern, found through a crc32 hash table
+        pattern_groups = {}
+        for offset, length in pattern_spans:
+            pattern_groups.setdefault(pattern_blob[offset:offset + length], len(pattern_groups))
+        exact_offsets, exact_signatures = self._pack_groups(
+            (pattern_groups[pattern_blob[offset:offset + length]] for offset, length in pattern_spans),
+            len(pattern_groups)
+        )
+        table_size = 1
+        while table_size < 4 * len(pattern_groups):  # Short probe runs for the common miss
+            table_size *= 2
+        exact_table = array('I', [self.EMPTY_SLOT]) * table_size
+        exact_hashes = array('I', [0]) * table_size
+        for group, pattern in enumerate(pattern_groups):
+            pattern_hash = zlib.crc32(pattern)
+            slot = pattern_hash & (table_size - 1)
+            while exact_table[slot] != self.EMPTY_SLOT:
+                slot = (slot + 1) & (table_size - 1)
+            exact_table[slot] = group
+            exact_hashes[slot] = pattern_hash
+
+        # Signatures grouped by the automaton pattern they match as a substring
+        substring_offsets, substring_signatures = self._pack_groups(
+            (sig['substring_id'] for sig in signatures), len(automaton_patterns)
+        )
+
+        auto_blob, auto_spans = self._pack_strings(automaton_patterns)
+        auto_offsets = array('I', [0])
+        for offset, length in auto_spans:
+            auto_offsets.append(offset + length)
+
+        sections = [
+            ('components', json.dumps({str(k): v for k, v in component_map.items()}).encode('utf-8')),
+            ('signatures', bytes(records)),
+            ('patterns', pattern_blob),
+            ('exact_offsets', exact_offsets.tobytes()),
+            ('exact_signatures', exact_signatures.tobytes()),
+            ('exact_table', exact_table.tobytes()),
+            ('exact_hashes', exact_hashes.tobytes()),
+            ('substring_offsets', substring_offsets.tobytes()),
+            ('substring_signatures', substring_signatures.tobytes()),
+            ('automaton_patterns', auto_blob),
+            ('automaton_pattern_offsets', auto_offsets.tobytes()),
+        ]
+        sections.extend((f'automaton_{name}', values.tobytes()) for name, values in automaton_arrays.items())
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        stamp_bytes = stamp.encode('utf-8')
+        with open(tmp_path, 'wb') as f:
+            f.write(self.MAGIC)
+            f.write(struct.pack('<IB', self.FORMAT_VERSION, 0 if sys.byteorder == 'little' else 1))
+            f.write(struct.pack('<H', len(stamp_bytes)))
+            f.write(stamp_bytes)
+            f.write(struct.pack('<I', len(sections)))
+            for name, data in sections:
+                name_bytes = name.encode('ascii')
+                f.write(struct.pack('<B', len(name_bytes)))
+                f.write(name_bytes)
+                f.write(struct.pack('<Q', len(data)))
+                f.write(b'\0' * (-f.tell() % 8))  # Align data for zero-copy casts
+                f.write(data)
+        os.replace(tmp_path, self.path)
+
+        logger.debug(f"Wrote matcher snapshot with {len(signatures)} signatures to {self.path}")
+
+    def load(
+        self,
+        stamp: str
+    ) -> Optional[Tuple["SnapshotSignatures", Dict[int, Dict[str, Any]], List[str], Dict[str, memoryview]]]:
+        """
+        Memory-map the snapshot if it matches the given database stamp.
+
+        Args:
+            stamp: Current database stamp
+
+        Returns:
+            (signatures, component_map, automaton_patterns, automaton_arrays),
+            or None if the snapshot is missing, stale or unreadable
+        """
+        if not self.path.exists():
+            return None
+
+        try:
+            sections = self._map_sections(stamp)
+            if sections is None:
+                return None
+
+            component_map = {
+                int(k): v for k, v in json.loads(bytes(sections['components']).decode('utf-8')).items()
+            }
+
+            signatures = SnapshotSignatures(sections)
+
+            auto_blob = bytes(sections['automaton_patterns'])
+            auto_offsets = sections['automaton_pattern_offsets'].cast('I').tolist()
+            automaton_patterns = [
+                auto_blob[start:end].decode('utf-8')
+                for start, end in zip(auto_offsets, auto_offsets[1:])
+            ]
+
+            automaton_arrays = {
+                name[len('automaton_'):]: view.cast('I')
+                for name, view in sections.items()
+                if name.startswith('automaton_') and not name.startswith('automaton_pattern')
+            }
+
+            logger.debug(f"Loaded matcher snapshot with {len(signatures)} signatures from {self.path}")
+            return signatures, component_map, automaton_patterns, automaton_arrays
+
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable matcher snapshot {self.path}: {e}")
+            self.close()
+            return None
+
+    def close(self):
+        """Release the memory map"""
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Views handed out by load() are still alive; the map is freed with them
+                pass
+            self._mmap = None
+
+    def _map_sections(self, stamp: str) -> Optional[Dict[str, memoryview]]:
+        """Map the file and return section views, or None (and unmap it) if it is stale"""
+        self.close()
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(self._mmap)
+        sections = None
+        try:
+            sections = self._read_sections(view, stamp)
+        finally:
+            if sections is None:
+                view.release()
+                self.close()
+        return sections
+
+    def _read_sections(self, view: memoryview, stamp: str) -> Optional[Dict[str, memoryview]]:
+        """Parse the header and section table of a mapped snapshot"""
+        if bytes(view[:4]) != self.MAGIC:
+            logger.debug(f"Not a matcher snapshot: {self.path}")
+            return None
+
+        format_version, byte_order = struct.unpack_from('<IB', view, 4)
+        if format_version != self.FORMAT_VERSION or byte_order != (0 if sys.byteorder == 'little' else 1):
+            logger.debug(f"Matcher snapshot format mismatch: {self.path}")
+            return None
+
+        pos = 9
+        (stamp_len,) = struct.unpack_from('<H', view, pos)
+        pos += 2
+        snapshot_stamp = bytes(view[pos:pos + stamp_len]).decode('utf-8')
+        pos += stamp_len
+        if snapshot_stamp != stamp:
+            logger.debug(f"Matcher snapshot is stale ({snapshot_stamp} != {stamp})")
+            return None
+
+        (section_count,) = struct.unpack_from('<I', view, pos)
+        pos += 4
+        sections = {}
+        for _ in range(section_count):
+            name_len = view[pos]
+            pos += 1
+            name = bytes(view[pos:pos + name_len]).decode('ascii')
+            pos += name_len
+            (length,) = struct.unpack_from('<Q', view, pos)
+            pos += 8
+            pos += -pos % 8
+            sections[name] = view[pos:pos + length]
+            pos += length
+
+        return sections
+
+    @staticmethod
+    def _pack_groups(keys, count: int) -> Tuple[array, array]:
+        """Group record indexes by key (0..count-1) as (offsets, indexes); negative keys are left out"""
+        groups = [[] for _ in range(count)]
+        for index, key in enumerate(keys):
+            if key >= 0:
+                groups[key].append(index)
+        offsets = array('I', [0])
+        indexes = array('I')
+        for group in groups:
+            indexes.extend(group)
+            offsets.append(len(indexes))
+        return offsets, indexes
+
+    @staticmethod
+    def _pack_strings(strings) -> Tuple[bytes, List[Tuple[int, int]]]:
+        """Concatenate strings as UTF-8 and return (blob, [(offset, length)])"""
+        blob = bytearray()
+        spans = []
+        for value in strings:
+            data = value.encode('utf-8')
+            spans.append((len(blob), len(data)))
+            blob += data
+        return bytes(blob), spans
+
+
+class SnapshotSignatures(Sequence):
+    """
+    Signature records of a mapped snapshot, decoded into dicts on first use.
+
+    Records are stored in match order, so the index of a record is its
+    'order'. exact() and substring() find signatures through the index
+    sections and decode only the records they return; each record is
+    decoded once and the same dict is returned afterwards.
+    """
+
+    def __init__(self, sections: Dict[str, memoryview]):
+        """
+        Initialize from the section views of a mapped snapshot.
+
+        Args:
+            sections: Section views as returned by MatcherSnapshot._map_sections
+        """
+        self._records = sections['signatures']
+        self._patterns = sections['patterns']
+        self._exact_offsets = sections['exact_offsets'].cast('I')
+        self._exact_signatures = sections['exact_signatures'].cast('I')
+        self._exact_table = sections['exact_table'].cast('I')
+        self._exact_hashes = sections['exact_hashes'].cast('I')
+        self._substring_offsets = sections['substring_offsets'].cast('I')
+        self._substring_signatures = sections['substring_signatures'].cast('I')
+        self._count = len(self._records) // MatcherSnapshot.SIGNATURE_RECORD.size
+        self._decoded: Dict[int, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("signature index out of range")
+
+        sig = self._decoded.get(index)
+        if sig is None:
+            record = MatcherSnapshot.SIGNATURE_RECORD
+            sig_id, component_id, sig_type, confidence, order, substring_id, offset, length = \
+                record.unpack_from(self._records, index * record.size)
+            sig = self._decoded[index] = {
+                'id': sig_id,
+                'component_id': component_id,
+                'pattern': bytes(self._patterns[offset:offset + length]).decode('utf-8'),
+                'sig_type': sig_type,
+                'confidence': confidence,
+                'order': order,
+                'substring_id': substring_id
+            }
+        return sig
+
+    @property
+    def pattern_count(self) -> int:
+        """Number of distinct exact patterns"""
+        return len(self._exact_offsets) - 1
+
+    def exact(self, pattern: str) -> List[Dict[str, Any]]:
+        """
+        Get the signatures whose pattern equals the given string.
+
+        Args:
+            pattern: Lowercased string to look up
+
+        Returns:
+            Signatures in match order (empty if none)
+        """
+        data = pattern.encode('utf-8', 'surrogatepass')
+        pattern_hash = zlib.crc32(data)
+        table, hashes = self._exact_table, self._exact_hashes
+        mask = len(table) - 1
+        slot = pattern_hash & mask
+        while True:
+            group = table[slot]
+            if group == MatcherSnapshot.EMPTY_SLOT:
+                return []
+            # Only read the pattern bytes when the stored hash agrees
+            if hashes[slot] == pattern_hash:
+                start = self._exact_offsets[group]
+                offset, length = self._pattern_span(self._exact_signatures[start])
+                if self._patterns[offset:offset + length] == data:
+                    return [self[i] for i in self._exact_signatures[start:self._exact_offsets[group + 1]]]
+            slot = (slot + 1) & mask
+
+    def substring(self, pattern_id: int) -> List[Dict[str, Any]]:
+        """
+        Get the signatures matched as a substring by an automaton pattern.
+
+        Args:
+            pattern_id: Automaton pattern ID
+
+        Returns:
+            Signatures in match order (empty if none)
+        """
+        start, end = self._substring_offsets[pattern_id], self._substring_offsets[pattern_id + 1]
+        return [self[i] for i in self._substring_signatures[start:end]]
+
+    def _pattern_span(self, index: int) -> Tuple[int, int]:
+        """(offset, length) of a record's pattern, read without decoding the record"""
+        span = MatcherSnapshot.PATTERN_SPAN
+        record_size = MatcherSnapshot.SIGNATURE_RECORD.size
+        return span.unpack_from(self._records, (index + 1) * record_size - span.size)
+
+
+class SnapshotIndex:
+    """
+    Read-only mapping view over a SnapshotSignatures lookup.
+
+    Stands in for the dicts and lists DirectMatcher builds when it indexes
+    signatures itself; keys without signatures map to an empty list.
+    """
+
+    def __init__(self, lookup: Callable[[Any], List[Dict[str, Any]]], size: int):
+        """
+        Initialize view.
+
+        Args:
+            lookup: Function returning the signatures for a key
+            size: Number of keys
+        """
+        self._lookup = lookup
+        self._size = size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, key) -> List[Dict[str, Any]]:
+        return self._lookup(key)
+
+    def __contains__(self, key) -> bool:
+        return bool(self._lookup(key))
+
+    def get(self, key, default=None):
+        return self._lookup(key) or default
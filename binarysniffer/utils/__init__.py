@@ -7,7 +7,8 @@ from .hashing import (
     compute_xxhash,
     MinHash,
     LSHIndex,
-    compute_minhash_for_strings
+    compute_minhash_for_strings,
+    compute_minhashes_for_string_sets
 )
 
 __all__ = [
@@ -15,5 +16,6 @@ __all__ = [
     "compute_xxhash",
     "MinHash",
     "LSHIndex",
-    "compute_minhash_for_strings"
+    "compute_minhash_for_strings",
+    "compute_minhashes_for_string_sets"
 ]
\ No newline at end of file
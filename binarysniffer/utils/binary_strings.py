@@ -3,13 +3,22 @@ Shared utilities for binary string extraction
 """
 
 import re
+import mmap
 import logging
 from pathlib import Path
-from typing import Set, List
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
 
+class ExtractedString(NamedTuple):
+    """String found in a binary file"""
+
+    offset: int     # Byte offset of the first character in the file
+    value: str      # Decoded and stripped string
+    encoding: str   # 'ascii' or 'utf-16le'
+
+
 class BinaryStringExtractor:
     """Shared utility for extracting strings from binary files"""
     
@@ -22,76 +31,135 @@ class BinaryStringExtractor:
         """
         self.min_length = min_length
         self.max_strings = max_strings
-        # Pattern for extracting ASCII strings
-        self.ascii_pattern = re.compile(
-            rb'[\x20-\x7e]{' + str(min_length).encode() + b',}'
-        )
-        # Pattern for extracting UTF-16 strings (common in Windows binaries)
-        self.utf16_pattern = re.compile(
-            rb'(?:[\x20-\x7e]\x00){' + str(min_length).encode() + b',}'
+        # ASCII and UTF-16LE (common in Windows binaries) strings in one
+        # pattern: a printable byte followed either by NUL-interleaved
+        # characters (group 1, UTF-16LE) or by more printable bytes
+        rest = str(max(min_length - 1, 0)).encode()
+        self.string_pattern = re.compile(
+            rb'[\x20-\x7e](?:(\x00(?:[\x20-\x7e]\x00){' + rest + b',})|[\x20-\x7e]{' + rest + b',})'
         )
     
-    def extract_strings(self, file_path: Path, chunk_size: int = 1024 * 1024) -> Set[str]:
-        """Extract strings from binary file
+    def iter_strings(self, file_path: Path,
+                     ranges: Optional[Iterable[Tuple[int, int]]] = None) -> Iterator[ExtractedString]:
+        """Iterate over the valid strings of a binary file in file order
+        
+        The file is memory-mapped and scanned in place, so no chunk copies
+        are made and strings spanning any boundary are found whole. ASCII
+        and UTF-16LE runs are matched in the same pass.
+        
+        Args:
+            file_path: Path to binary file
+            ranges: Optional (start, end) byte ranges to scan, e.g. sections;
+                the whole file if omitted
+            
+        Yields:
+            Strings with their offsets, duplicates included
+        """
+        with open(file_path, 'rb') as f:
+            size = f.seek(0, 2)
+            if size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for start, end in self._normalize_ranges(ranges, size):
+                    yield from self._scan(mm, start, end)
+    
+    def extract_ordered_strings(self, file_path: Path,
+                                ranges: Optional[Iterable[Tuple[int, int]]] = None) -> List[ExtractedString]:
+        """Extract unique strings from binary file in file order
+        
+        Each string is reported at its first occurrence. Truncation at
+        max_strings keeps the strings closest to the start of the file, so
+        the result does not depend on hashing or set iteration order.
         
         Args:
             file_path: Path to binary file
-            chunk_size: Size of chunks to read (default 1MB)
+            ranges: Optional (start, end) byte ranges to scan
             
         Returns:
-            Set of extracted strings
+            List of extracted strings with offsets
         """
-        strings = set()
+        seen = set()
+        strings = []
+        if self.max_strings <= 0:
+            return strings
         
         try:
-            with open(file_path, 'rb') as f:
-                overlap = b''
-                
-                while len(strings) < self.max_strings:
-                    chunk = f.read(chunk_size)
-                    if not chunk:
-                        break
-                    
-                    # Include overlap from previous chunk to catch strings at boundaries
-                    data = overlap + chunk
-                    
-                    # Extract ASCII strings
-                    for match in self.ascii_pattern.finditer(data):
-                        if len(strings) >= self.max_strings:
-                            break
-                        try:
-                            string = match.group().decode('ascii', errors='ignore').strip()
-                            if self._is_valid_string(string):
-                                strings.add(string)
-                        except Exception:
-                            continue
-                    
-                    # Extract UTF-16 strings (if we haven't hit the limit)
-                    if len(strings) < self.max_strings:
-                        for match in self.utf16_pattern.finditer(data):
-                            if len(strings) >= self.max_strings:
-                                break
-                            try:
-                                # Decode UTF-16 LE
-                                string = match.group().decode('utf-16le', errors='ignore').strip()
-                                if self._is_valid_string(string):
-                                    strings.add(string)
-                            except Exception:
-                                continue
-                    
-                    # Keep last part of chunk as overlap for next iteration
-                    overlap = chunk[-256:] if len(chunk) > 256 else chunk
-        
+            for string in self.iter_strings(file_path, ranges):
+                if string.value in seen:
+                    continue
+                seen.add(string.value)
+                strings.append(string)
+                if len(strings) >= self.max_strings:
+                    break
         except Exception as e:
             logger.error(f"Error extracting strings from {file_path}: {e}")
         
         return strings
     
-    def extract_functions(self, strings: Set[str]) -> List[str]:
+    def scanner(self) -> "StringScanner":
+        """Create an incremental scanner fed with consecutive chunks of a file
+        
+        Returns:
+            Scanner whose final() gives the same strings as extract_ordered_strings()
+        """
+        return StringScanner(self)
+    
+    def extract_strings(self, file_path: Path, chunk_size: int = 1024 * 1024,
+                        ranges: Optional[Iterable[Tuple[int, int]]] = None) -> Set[str]:
+        """Extract strings from binary file
+        
+        Args:
+            file_path: Path to binary file
+            chunk_size: Unused; the file is memory-mapped (kept for compatibility)
+            ranges: Optional (start, end) byte ranges to scan
+            
+        Returns:
+            Set of extracted strings
+        """
+        return {string.value for string in self.extract_ordered_strings(file_path, ranges)}
+    
+    def _scan(self, data, start: int, end: int) -> Iterator[ExtractedString]:
+        """Find valid strings in data[start:end]"""
+        search = self.string_pattern.search
+        pos = start
+        while True:
+            match = search(data, pos, end)
+            if match is None:
+                return
+            match_start, match_end = match.span()
+            if match.group(1) is not None:
+                encoding = 'utf-16le'
+                pos = match_end
+            else:
+                encoding = 'ascii'
+                # The last character may begin a UTF-16 run ("abcD\0E\0...")
+                pos = match_end - 1 if match_end < end and data[match_end] == 0 else match_end
+            
+            string = match.group().decode(encoding, errors='ignore').strip()
+            if self._is_valid_string(string):
+                yield ExtractedString(match_start, string, encoding)
+    
+    @staticmethod
+    def _normalize_ranges(ranges: Optional[Iterable[Tuple[int, int]]], size: int) -> List[Tuple[int, int]]:
+        """Clip ranges to the file, sort them and merge overlaps"""
+        if ranges is None:
+            return [(0, size)]
+        
+        merged: List[Tuple[int, int]] = []
+        for start, end in sorted((max(0, s), min(e, size)) for s, e in ranges):
+            if start >= end:
+                continue
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+    
+    def extract_functions(self, strings: Iterable[str]) -> List[str]:
         """Extract function-like strings
         
         Args:
-            strings: Set of strings to filter
+            strings: Strings to filter
             
         Returns:
             List of function-like strings
@@ -115,11 +183,11 @@ class BinaryStringExtractor:
         
         return functions[:1000]  # Limit to 1000 functions
     
-    def extract_constants(self, strings: Set[str]) -> List[str]:
+    def extract_constants(self, strings: Iterable[str]) -> List[str]:
         """Extract constant-like strings
         
         Args:
-            strings: Set of strings to filter
+            strings: Strings to filter
             
         Returns:
             List of constant-like strings
@@ -140,11 +208,11 @@ class BinaryStringExtractor:
         
         return constants[:500]  # Limit to 500 constants
     
-    def extract_imports(self, strings: Set[str]) -> List[str]:
+    def extract_imports(self, strings: Iterable[str]) -> List[str]:
         """Extract import/library references
         
         Args:
-            strings: Set of strings to filter
+            strings: Strings to filter
             
         Returns:
             List of import-like strings
@@ -226,4 +294,85 @@ class BinaryStringExtractor:
         if 'codec' in string_lower or 'mime' in string_lower:
             return True
         
-        return False
\ No newline at end of file
+        return False
+
+
+class StringScanner:
+    """Incremental string scan over consecutive chunks of a file
+    
+    Lets a caller that already reads a file sequentially (e.g. to hash it)
+    extract its strings from the same read. Bytes at the end of a chunk
+    that may belong to a string continuing in the next chunk are carried
+    over, so strings spanning chunk boundaries are found whole.
+    """
+    
+    def __init__(self, extractor: BinaryStringExtractor):
+        """Initialize scanner
+        
+        Args:
+            extractor: Extractor whose pattern, validation and limits apply
+        """
+        self.extractor = extractor
+        self.strings: List[ExtractedString] = []
+        self._seen: Set[str] = set()
+        self._carry = b''
+        self._offset = 0  # File offset of the carried bytes
+        self._done = extractor.max_strings <= 0
+        # A match needs at most this many bytes to reach its minimum length
+        # (UTF-16LE: two bytes per character), so a shorter unmatched tail
+        # may still start a string
+        self._tail = 2 * max(extractor.min_length, 1) + 2
+    
+    def update(self, chunk: bytes):
+        """Scan the next chunk of the file
+        
+        Args:
+            chunk: Bytes following the previous chunk
+        """
+        if self._done:
+            return
+        data = self._carry + chunk if self._carry else chunk
+        resume = self._consume(data, final=False)
+        self._offset += resume
+        self._carry = data[resume:]
+    
+    def final(self) -> List[ExtractedString]:
+        """Scan the carried bytes at end of file
+        
+        Returns:
+            Unique strings in file order, as extract_ordered_strings() returns them
+        """
+        if not self._done and self._carry:
+            self._consume(self._carry, final=True)
+        self._carry = b''
+        return self.strings
+    
+    def _consume(self, data: bytes, final: bool) -> int:
+        """Record the strings of data that are complete; return where to resume"""
+        search = self.extractor.string_pattern.search
+        end = len(data)
+        # A match ending within two bytes of the end may still grow (the
+        # next byte decides, or a UTF-16 pair is incomplete)
+        limit = end if final else end - 2
+        pos = 0
+        while not self._done:
+            match = search(data, pos, end)
+            if match is None:
+                break
+            match_start, match_end = match.span()
+            if match_end > limit:
+                return match_start
+            if match.group(1) is not None:
+                encoding = 'utf-16le'
+                pos = match_end
+            else:
+                encoding = 'ascii'
+                # The last character may begin a UTF-16 run ("abcD\0E\0...")
+                pos = match_end - 1 if match_end < end and data[match_end] == 0 else match_end
+            
+            string = match.group().decode(encoding, errors='ignore').strip()
+            if self.extractor._is_valid_string(string) and string not in self._seen:
+                self._seen.add(string)
+                self.strings.append(ExtractedString(self._offset + match_start, string, encoding))
+                self._done = len(self.strings) >= self.extractor.max_strings
+        return max(pos, end - self._tail)
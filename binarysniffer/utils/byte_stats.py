@@ -0,0 +1,194 @@
+"""
+Byte statistics over binary buffers.
+
+Histograms, Shannon entropy (global and per sliding window) and runs of
+printable ASCII, computed with NumPy over bytes, memoryviews or mmaps
+without copying them. Large buffers are processed in fixed-size blocks,
+so temporary arrays stay bounded however big the mapped file is. Without
+NumPy the same results are computed with the C-level helpers of the
+standard library.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Iterator, List, Sequence, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+# Bytes processed per NumPy pass; bounds the temporaries (bincount
+# widens its input to 64-bit integers)
+BLOCK_SIZE = 4 * 1024 * 1024
+
+# Default sliding window of entropy_profile()
+ENTROPY_WINDOW = 4096
+
+
+def byte_histogram(data) -> List[int]:
+    """
+    Count the occurrences of each byte value.
+
+    Args:
+        data: Bytes-like object (bytes, memoryview, mmap)
+
+    Returns:
+        256 counts, indexed by byte value
+    """
+    size = len(data)
+    if not HAS_NUMPY:
+        counts = [0] * 256
+        for start in range(0, size, BLOCK_SIZE):
+            for value, count in Counter(data[start:start + BLOCK_SIZE]).items():
+                counts[value] += count
+        return counts
+
+    counts = np.zeros(256, dtype=np.int64)
+    for start in range(0, size, BLOCK_SIZE):
+        block = np.frombuffer(data, dtype=np.uint8, count=min(BLOCK_SIZE, size - start), offset=start)
+        counts += np.bincount(block, minlength=256)
+    return counts.tolist()
+
+
+def histogram_entropy(counts: Sequence[int]) -> float:
+    """
+    Shannon entropy, in bits per byte, of a byte histogram.
+
+    Args:
+        counts: Occurrences of each byte value
+
+    Returns:
+        Entropy between 0.0 and 8.0 (0.0 for an empty histogram)
+    """
+    total = sum(counts)
+    if not total:
+        return 0.0
+    entropy = 0.0
+    for count in counts:
+        if count:
+            probability = count / total
+            entropy -= probability * math.log2(probability)
+    return entropy
+
+
+def shannon_entropy(data) -> float:
+    """
+    Shannon entropy of a buffer, in bits per byte.
+
+    Args:
+        data: Bytes-like object
+
+    Returns:
+        Entropy between 0.0 and 8.0 (0.0 for empty data)
+    """
+    if not len(data):
+        return 0.0
+    return histogram_entropy(byte_histogram(data))
+
+
+def entropy_profile(data, window: int = ENTROPY_WINDOW, step: int = None) -> List[float]:
+    """
+    Shannon entropy of each window sliding over a buffer.
+
+    Windows start at offsets 0, step, 2*step, ... and only whole windows
+    are reported; data shorter than one window gives a single value for
+    all of it. Per-step histograms are computed once and summed into
+    window histograms, so overlapping windows cost no extra pass.
+
+    Args:
+        data: Bytes-like object
+        window: Window size in bytes
+        step: Distance between window starts; must divide window
+            (defaults to window, i.e. adjacent windows)
+
+    Returns:
+        Entropy of each window, in order
+    """
+    step = step or window
+    if window <= 0 or step <= 0 or window % step:
+        raise ValueError(f"step ({step}) must be a positive divisor of window ({window})")
+
+    size = len(data)
+    if size <= window:
+        return [shannon_entropy(data)] if size else []
+
+    if not HAS_NUMPY:
+        return [
+            shannon_entropy(data[start:start + window])
+            for start in range(0, size - window + 1, step)
+        ]
+
+    steps_per_window = window // step
+    num_steps = size // step
+    # Whole steps per NumPy pass, keeping the widened block within BLOCK_SIZE
+    steps_per_block = max(BLOCK_SIZE // step, 1)
+    profile = []
+    carry = np.zeros((0, 256), dtype=np.int64)  # Histograms of the previous steps still in a window
+    for first in range(0, num_steps, steps_per_block):
+        count = min(steps_per_block, num_steps - first)
+        block = np.frombuffer(data, dtype=np.uint8, count=count * step, offset=first * step)
+        # One bincount over (step index, byte value) codes gives every step's histogram
+        codes = block.reshape(count, step) + (np.arange(count, dtype=np.int64)[:, None] << 8)
+        step_counts = np.bincount(codes.ravel(), minlength=count * 256).reshape(count, 256)
+
+        step_counts = np.concatenate((carry, step_counts))
+        cumulative = np.zeros((len(step_counts) + 1, 256), dtype=np.int64)
+        np.cumsum(step_counts, axis=0, out=cumulative[1:])
+        window_counts = cumulative[steps_per_window:] - cumulative[:-steps_per_window]
+        if len(window_counts):
+            probabilities = window_counts / window
+            with np.errstate(divide='ignore', invalid='ignore'):
+                terms = np.where(window_counts > 0, probabilities * np.log2(probabilities), 0.0)
+            profile.extend((-terms.sum(axis=1)).tolist())
+        carry = step_counts[max(len(step_counts) - steps_per_window + 1, 0):]
+    return profile
+
+
+def printable_runs(data, min_length: int = 4) -> Iterator[Tuple[int, int]]:
+    """
+    Find runs of printable ASCII bytes (0x20-0x7e).
+
+    Runs are yielded block by block, so callers that stop early (e.g. at
+    a string limit) do not scan the rest of the buffer.
+
+    Args:
+        data: Bytes-like object
+        min_length: Minimum run length
+
+    Yields:
+        (start, end) offsets of the runs, in order
+    """
+    min_length = max(min_length, 1)
+    size = len(data)
+    if not HAS_NUMPY:
+        pattern = re.compile(rb'[\x20-\x7e]{%d,}' % min_length)
+        for match in pattern.finditer(data):
+            yield match.span()
+        return
+
+    open_start = None  # Start of a run continuing past the current block
+    for base in range(0, size, BLOCK_SIZE):
+        block = np.frombuffer(data, dtype=np.uint8, count=min(BLOCK_SIZE, size - base), offset=base)
+        printable = np.zeros(len(block) + 2, dtype=np.int8)
+        printable[0] = open_start is not None
+        printable[1:-1] = (block >= 32) & (block <= 126)
+        edges = np.diff(printable)
+        starts = np.flatnonzero(edges == 1) + base
+        ends = np.flatnonzero(edges == -1) + base
+
+        if open_start is not None:
+            starts = np.concatenate(([open_start], starts))
+        open_start = None
+        # A run reaching the block end may continue into the next block
+        if printable[-2] and base + len(block) < size:
+            open_start = int(starts[-1])
+            starts, ends = starts[:-1], ends[:-1]
+        keep = (ends - starts) >= min_length
+        yield from zip(starts[keep].tolist(), ends[keep].tolist())
+
+    if open_start is not None and size - open_start >= min_length:
+        yield open_start, size
@@ -6,7 +6,7 @@ Provides functions to calculate hashes and extract metadata from files.
 
 import hashlib
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Any, Dict, Iterable, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -27,49 +27,127 @@ except ImportError:
     logger.debug("ssdeep not available for fuzzy hashing")
 
 
+# Chunk size of sequential file reads
+READ_CHUNK_SIZE = 1024 * 1024
+
+# Digests calculate_file_hashes() reports
+CRYPTO_HASHES = ('md5', 'sha1', 'sha256')
+FUZZY_HASHES = ('tlsh', 'ssdeep')
+
+
+class FileDigests:
+    """
+    Digests of a file's content, fed chunk by chunk.
+
+    Cryptographic hashes, TLSH and ssdeep are all updated incrementally,
+    so a file is hashed in one sequential read without holding it in
+    memory. Fuzzy hashes whose library is missing are skipped.
+    """
+
+    def __init__(self, names: Iterable[str] = CRYPTO_HASHES + FUZZY_HASHES):
+        """
+        Initialize digests.
+
+        Args:
+            names: Digests to compute ('md5', 'sha1', 'sha256', 'tlsh', 'ssdeep')
+        """
+        names = set(names)
+        self.size = 0
+        self._hashes = {name: hashlib.new(name) for name in CRYPTO_HASHES if name in names}
+        self._tlsh = tlsh.Tlsh() if 'tlsh' in names and HAS_TLSH else None
+        self._ssdeep = ssdeep.Hash() if 'ssdeep' in names and HAS_SSDEEP else None
+
+    def update(self, chunk: bytes):
+        """Add the next chunk of the file"""
+        self.size += len(chunk)
+        for digest in self._hashes.values():
+            digest.update(chunk)
+        if self._tlsh is not None:
+            self._tlsh.update(chunk)
+        if self._ssdeep is not None:
+            try:
+                self._ssdeep.update(chunk)
+            except Exception as e:
+                logger.debug(f"Failed to calculate ssdeep: {e}")
+                self._ssdeep = None
+
+    def hexdigests(self) -> Dict[str, str]:
+        """
+        Get the digests of the content read so far (call once, at end of file).
+
+        Returns:
+            Dictionary of hash type to hash value; fuzzy hashes that cannot
+            be computed (e.g. content too small for TLSH) are left out
+        """
+        hashes = {name: digest.hexdigest() for name, digest in self._hashes.items()}
+
+        if self._tlsh is not None and self.size >= 50:  # TLSH needs min 50 bytes
+            try:
+                self._tlsh.final()
+                tlsh_hash = self._tlsh.hexdigest()
+                if tlsh_hash and tlsh_hash != 'TNULL':
+                    hashes['tlsh'] = tlsh_hash
+            except Exception as e:
+                logger.debug(f"Failed to calculate TLSH: {e}")
+
+        if self._ssdeep is not None:
+            try:
+                hashes['ssdeep'] = self._ssdeep.digest()
+            except Exception as e:
+                logger.debug(f"Failed to calculate ssdeep: {e}")
+
+        return hashes
+
+
+def read_file_once(file_path: Path, consumers: Iterable[Any], chunk_size: int = READ_CHUNK_SIZE) -> int:
+    """
+    Read a file sequentially, feeding every chunk to each consumer.
+
+    Lets digests and scanners that all need the whole content share a
+    single read instead of each reading the file.
+
+    Args:
+        file_path: File to read
+        consumers: Objects with an update(chunk) method
+        chunk_size: Bytes per read
+
+    Returns:
+        Number of bytes read
+    """
+    consumers = list(consumers)
+    size = 0
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            size += len(chunk)
+            for consumer in consumers:
+                consumer.update(chunk)
+    return size
+
+
 def calculate_file_hashes(file_path: Path, include_fuzzy: bool = True) -> Dict[str, str]:
     """
     Calculate various hashes for a file.
     
+    The file is streamed once; all hashes are updated from the same chunks.
+    
     Args:
         file_path: Path to the file
         include_fuzzy: Whether to include fuzzy hashes (TLSH, ssdeep)
         
     Returns:
-        Dictionary of hash type to hash value
+        Dictionary of hash type to hash value. A fuzzy hash that fails is
+        left out and the others are still returned; if the file cannot be
+        read the dictionary is empty, since digests of a partial read would
+        be wrong (as before, when the whole file was read up front).
     """
-    hashes = {}
-    
+    digests = FileDigests(CRYPTO_HASHES + FUZZY_HASHES if include_fuzzy else CRYPTO_HASHES)
     try:
-        # Read file content
-        with open(file_path, 'rb') as f:
-            content = f.read()
-        
-        # Calculate standard cryptographic hashes
-        hashes['md5'] = hashlib.md5(content).hexdigest()
-        hashes['sha1'] = hashlib.sha1(content).hexdigest()
-        hashes['sha256'] = hashlib.sha256(content).hexdigest()
-        
-        # Calculate fuzzy hashes if available and requested
-        if include_fuzzy:
-            if HAS_TLSH and len(content) >= 50:  # TLSH needs min 50 bytes
-                try:
-                    tlsh_hash = tlsh.hash(content)
-                    if tlsh_hash:  # TLSH returns empty string if it can't hash
-                        hashes['tlsh'] = tlsh_hash
-                except Exception as e:
-                    logger.debug(f"Failed to calculate TLSH: {e}")
-            
-            if HAS_SSDEEP:
-                try:
-                    hashes['ssdeep'] = ssdeep.hash(content)
-                except Exception as e:
-                    logger.debug(f"Failed to calculate ssdeep: {e}")
-    
+        read_file_once(file_path, [digests])
     except Exception as e:
         logger.error(f"Failed to calculate hashes for {file_path}: {e}")
+        return {}
     
-    return hashes
+    return digests.hexdigests()
 
 
 def get_file_metadata(file_path: Path, include_hashes: bool = True, include_fuzzy: bool = True) -> Dict[str, Any]:
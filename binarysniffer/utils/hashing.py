@@ -2,10 +2,29 @@
 Hashing utilities for signature generation and matching
 """
 
+import struct
 import hashlib
-from typing import List, Union, Tuple
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, List, Sequence, Tuple, Union
 import xxhash
 
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+_MASK64 = 2**64 - 1
+_MASK32 = 2**32 - 1
+
+# Identifies how MinHash values are computed and serialized. Stored with
+# persisted MinHashes (signature database, LSH index); values stamped
+# differently are recomputed, since they never equal current query values.
+# Change it whenever the token hash, permutations or byte layout change.
+MINHASH_ALGORITHM = "xxh32-mas-u32le-1"
+
 
 def compute_sha256(data: Union[str, bytes]) -> str:
     """Compute SHA256 hash of data"""
@@ -14,6 +33,15 @@ def compute_sha256(data: Union[str, bytes]) -> str:
     return hashlib.sha256(data).hexdigest()
 
 
+def compute_file_sha256(file_path: Union[str, Path], chunk_size: int = 1024 * 1024) -> str:
+    """Compute SHA256 hash of a file's content, reading it in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 def compute_xxhash(data: Union[str, bytes]) -> int:
     """Compute xxHash64 of data"""
     if isinstance(data, str):
@@ -21,11 +49,33 @@ def compute_xxhash(data: Union[str, bytes]) -> int:
     return xxhash.xxh64(data).intdigest()
 
 
+@lru_cache(maxsize=None)
+def _permutation_params(num_perm: int, seed: int) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """
+    Get the (a, b) multipliers and offsets of the MinHash permutations.
+
+    Derived from xxhash rather than a random generator, so stored MinHash
+    values stay comparable across NumPy versions and platforms.
+    """
+    a = tuple(xxhash.xxh64_intdigest(struct.pack('<I', i), seed=seed) | 1 for i in range(num_perm))
+    b = tuple(xxhash.xxh64_intdigest(struct.pack('<I', i), seed=seed + num_perm + 1) for i in range(num_perm))
+    return a, b
+
+
 class MinHash:
     """
     MinHash implementation for similarity detection.
+
+    Each token is hashed once to 32 bits; permutation i maps a token hash x
+    to ((a_i * x + b_i) mod 2**64) >> 32 (multiply-add-shift universal
+    hashing), which is evaluated for all permutations and tokens at once
+    with NumPy when it is installed. Values therefore fit in 32 bits and
+    are stored as uint32.
     """
     
+    # Tokens permuted per NumPy block (bounds the num_perm x block temporary)
+    TOKEN_BLOCK = 8192
+    
     def __init__(self, num_perm: int = 128, seed: int = 1):
         """
         Initialize MinHash.
@@ -36,31 +86,128 @@ class MinHash:
         """
         self.num_perm = num_perm
         self.seed = seed
+        self._array = None  # Hash values as a uint64 array, until a list is needed
         self.hashvalues = self._init_hashvalues()
     
+    @property
+    def hashvalues(self) -> List[int]:
+        """Hash values (minimum per permutation)"""
+        if self._hashvalues is None:
+            self._hashvalues = self._array.tolist()
+            self._array = None
+        return self._hashvalues
+    
+    @hashvalues.setter
+    def hashvalues(self, values: List[int]):
+        self._hashvalues = values
+        self._array = None
+    
     def _init_hashvalues(self) -> List[int]:
         """Initialize hash values to maximum"""
-        return [2**64 - 1] * self.num_perm
+        return [_MASK32] * self.num_perm
     
-    def _hash(self, data: bytes, perm: int) -> int:
-        """Generate hash for given permutation"""
-        # Use xxhash with different seeds for each permutation
-        return xxhash.xxh64(data, seed=self.seed + perm).intdigest()
+    def _token_hashes(self, data_list: Iterable[Union[str, bytes]]) -> List[int]:
+        """Hash each token once"""
+        seed = self.seed
+        return [
+            xxhash.xxh32_intdigest(data.encode('utf-8') if isinstance(data, str) else data, seed=seed)
+            for data in data_list
+        ]
+    
+    def _permuted_minimums(self, hashes: Sequence[int]) -> List[int]:
+        """Minimum of every permutation over the given token hashes"""
+        a, b = _permutation_params(self.num_perm, self.seed)
+        if not HAS_NUMPY:
+            return [
+                min(((ai * x + bi) & _MASK64) >> 32 for x in hashes)
+                for ai, bi in zip(a, b)
+            ]
+        
+        a_arr = np.array(a, dtype=np.uint64)[:, None]
+        b_arr = np.array(b, dtype=np.uint64)[:, None]
+        values = np.array(hashes, dtype=np.uint64)
+        mins = np.full(self.num_perm, _MASK32, dtype=np.uint64)
+        for start in range(0, len(values), self.TOKEN_BLOCK):
+            block = values[None, start:start + self.TOKEN_BLOCK]
+            np.minimum(mins, ((a_arr * block + b_arr) >> np.uint64(32)).min(axis=1), out=mins)
+        return mins.tolist()
     
     def update(self, data: Union[str, bytes]):
         """Update MinHash with new data"""
-        if isinstance(data, str):
-            data = data.encode('utf-8')
-        
-        for i in range(self.num_perm):
-            hash_val = self._hash(data, i)
-            if hash_val < self.hashvalues[i]:
-                self.hashvalues[i] = hash_val
+        self.update_batch([data])
     
     def update_batch(self, data_list: List[Union[str, bytes]]):
         """Update MinHash with multiple data items"""
-        for data in data_list:
-            self.update(data)
+        hashes = self._token_hashes(data_list)
+        if not hashes:
+            return
+        
+        self.hashvalues = [
+            min(current, new) for current, new in zip(self.hashvalues, self._permuted_minimums(hashes))
+        ]
+    
+    @classmethod
+    def bulk(cls, token_sets: Iterable[Iterable[Union[str, bytes]]],
+             num_perm: int = 128, seed: int = 1) -> List["MinHash"]:
+        """
+        Compute MinHashes for many token sets at once.
+        
+        Small sets (e.g. single signature patterns) are permuted together in
+        blocks instead of one array operation per set.
+        
+        Args:
+            token_sets: Token sets to hash
+            num_perm: Number of permutations
+            seed: Random seed for hash functions
+            
+        Returns:
+            One MinHash per token set, in order
+        """
+        minhashes = []
+        hashes_per_set = []
+        for tokens in token_sets:
+            minhash = cls(num_perm=num_perm, seed=seed)
+            minhashes.append(minhash)
+            hashes_per_set.append(minhash._token_hashes(tokens))
+        
+        if not HAS_NUMPY:
+            for minhash, hashes in zip(minhashes, hashes_per_set):
+                if hashes:
+                    minhash.hashvalues = minhash._permuted_minimums(hashes)
+            return minhashes
+        
+        a, b = _permutation_params(num_perm, seed)
+        a_arr = np.array(a, dtype=np.uint64)[:, None]
+        b_arr = np.array(b, dtype=np.uint64)[:, None]
+        
+        # Group consecutive non-empty sets into blocks of about TOKEN_BLOCK tokens
+        group: List[int] = []
+        group_size = 0
+        
+        def flush():
+            values = np.array([h for i in group for h in hashes_per_set[i]], dtype=np.uint64)
+            starts = np.cumsum([0] + [len(hashes_per_set[i]) for i in group[:-1]])
+            permuted = (a_arr * values[None, :] + b_arr) >> np.uint64(32)
+            rows = np.ascontiguousarray(np.minimum.reduceat(permuted, starts, axis=1).T)
+            for i, row in zip(group, rows):
+                minhashes[i]._hashvalues = None
+                minhashes[i]._array = row
+        
+        for i, hashes in enumerate(hashes_per_set):
+            if not hashes:
+                continue
+            if len(hashes) >= cls.TOKEN_BLOCK:
+                minhashes[i].hashvalues = minhashes[i]._permuted_minimums(hashes)
+                continue
+            if group_size + len(hashes) > cls.TOKEN_BLOCK:
+                flush()
+                group, group_size = [], 0
+            group.append(i)
+            group_size += len(hashes)
+        if group:
+            flush()
+        
+        return minhashes
     
     def jaccard(self, other: "MinHash") -> float:
         """Calculate Jaccard similarity with another MinHash"""
@@ -71,29 +218,25 @@ class MinHash:
         return matches / self.num_perm
     
     def to_bytes(self) -> bytes:
-        """Convert MinHash to bytes for storage"""
-        # Pack as 16 bytes (128 bits) by taking first 16 hash values
-        # and using lower 8 bits of each
-        if self.num_perm < 16:
-            raise ValueError("num_perm must be at least 16 for byte conversion")
-        
-        result = bytearray(16)
-        for i in range(16):
-            result[i] = self.hashvalues[i] & 0xFF
-        
-        return bytes(result)
+        """Convert MinHash to bytes for storage (num_perm little-endian uint32 values)"""
+        if self._array is not None:
+            return self._array.astype('<u4').tobytes()
+        return struct.pack(f'<{self.num_perm}I', *self.hashvalues)
     
     @classmethod
-    def from_bytes(cls, data: bytes, num_perm: int = 128) -> "MinHash":
-        """Create MinHash from bytes"""
-        if len(data) != 16:
-            raise ValueError("Data must be 16 bytes")
+    def from_bytes(cls, data: bytes, num_perm: int = 128, seed: int = 1) -> "MinHash":
+        """
+        Create MinHash from bytes written by to_bytes().
         
-        minhash = cls(num_perm=num_perm)
-        # Restore first 16 values from bytes
-        for i in range(16):
-            minhash.hashvalues[i] = data[i]
+        Values of another MINHASH_ALGORITHM (such as the legacy 16-byte
+        or the uint64 form) cannot be compared and are rejected when the
+        width differs.
+        """
+        minhash = cls(num_perm=num_perm, seed=seed)
+        if len(data) != num_perm * 4:
+            raise ValueError(f"Data must be {num_perm * 4} bytes")
         
+        minhash.hashvalues = list(struct.unpack(f'<{num_perm}I', data))
         return minhash
 
 
@@ -165,4 +308,19 @@ def compute_minhash_for_strings(strings: List[str], num_perm: int = 128) -> MinH
     """
     minhash = MinHash(num_perm=num_perm)
     minhash.update_batch(strings)
-    return minhash
\ No newline at end of file
+    return minhash
+
+
+def compute_minhashes_for_string_sets(string_sets: Iterable[Iterable[str]],
+                                      num_perm: int = 128) -> List[MinHash]:
+    """
+    Compute MinHashes for many string lists in one batch.
+    
+    Args:
+        string_sets: String lists to hash
+        num_perm: Number of permutations
+        
+    Returns:
+        One MinHash per string list, in order
+    """
+    return MinHash.bulk(string_sets, num_perm=num_perm)
\ No newline at end of file
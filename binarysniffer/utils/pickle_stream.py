@@ -0,0 +1,315 @@
+"""
+Streaming static analysis of pickle opcodes.
+
+Pickles are decoded opcode by opcode from a file handle, memory map or
+zip member without ever holding the whole pickle or its large payloads.
+A small symbolic stack and memo track only what is needed to resolve the
+globals that GLOBAL, STACK_GLOBAL and INST import and the callables that
+REDUCE, NEWOBJ and OBJ invoke, so memory stays bounded however large the
+pickle (or a tensor buffer inside it) is. Nothing is ever unpickled.
+"""
+
+import io
+import pickletools
+from collections import OrderedDict, deque
+from typing import IO, Any, Iterator, NamedTuple, Optional
+
+# Longest string or bytes argument reported; longer payloads are
+# truncated to this many bytes and the rest is skipped unread
+MAX_ARG_LENGTH = 64 * 1024
+
+# Longest string kept on the symbolic stack or in the memo (module and
+# attribute names are far shorter)
+MAX_NAME_LENGTH = 1024
+
+# Bounds of the symbolic stack and memo
+MAX_STACK_DEPTH = 10000
+MAX_MEMO_ENTRIES = 16384
+
+# Block size for discarding skipped payloads from unseekable streams
+SKIP_CHUNK_SIZE = 1024 * 1024
+
+# Opcodes pushing a text or bytes constant
+STRING_OPCODES = frozenset({
+    'STRING', 'BINSTRING', 'SHORT_BINSTRING',
+    'UNICODE', 'BINUNICODE', 'SHORT_BINUNICODE', 'BINUNICODE8',
+    'BINBYTES', 'SHORT_BINBYTES', 'BINBYTES8', 'BYTEARRAY8',
+})
+
+# Length-prefixed arguments: opcode name -> (length reader, payload kind)
+_COUNTED_ARGS = {
+    'SHORT_BINSTRING': (pickletools.read_uint1, 'text'),
+    'BINSTRING': (pickletools.read_int4, 'text'),
+    'SHORT_BINUNICODE': (pickletools.read_uint1, 'text'),
+    'BINUNICODE': (pickletools.read_uint4, 'text'),
+    'BINUNICODE8': (pickletools.read_uint8, 'text'),
+    'SHORT_BINBYTES': (pickletools.read_uint1, 'bytes'),
+    'BINBYTES': (pickletools.read_uint4, 'bytes'),
+    'BINBYTES8': (pickletools.read_uint8, 'bytes'),
+    'BYTEARRAY8': (pickletools.read_uint8, 'bytes'),
+    'LONG1': (pickletools.read_uint1, 'long'),
+    'LONG4': (pickletools.read_int4, 'long'),
+}
+
+# Newline-terminated protocol 0 arguments that are text (the others are numbers)
+_TEXT_LINE_ARGS = frozenset({'stringnl', 'stringnl_noescape', 'stringnl_noescape_pair', 'unicodestringnl'})
+
+_OPCODES = {opcode.code: opcode for opcode in pickletools.opcodes}
+
+_MARK = object()  # MARK on the symbolic stack
+
+
+class PickleGlobal(NamedTuple):
+    """A module attribute imported by the pickle"""
+    module: str
+    name: str
+
+    def __str__(self) -> str:
+        return f"{self.module}.{self.name}" if self.name else self.module
+
+
+class PickleOp(NamedTuple):
+    """
+    One decoded opcode.
+
+    arg is the decoded argument (string and bytes payloads truncated to
+    MAX_ARG_LENGTH; integers and floats longer than that are None). target is the PickleGlobal imported by GLOBAL,
+    STACK_GLOBAL and INST, or the one called or built by REDUCE, NEWOBJ,
+    NEWOBJ_EX, OBJ and BUILD, when it can be resolved.
+    """
+    name: str
+    arg: Any
+    pos: Optional[int]
+    target: Optional[PickleGlobal] = None
+
+
+def scan_opcodes(stream: IO[bytes], max_arg_length: int = MAX_ARG_LENGTH) -> Iterator[PickleOp]:
+    """
+    Decode a pickle opcode by opcode, resolving globals and calls.
+
+    Like pickletools.genops, decoding stops after STOP and malformed
+    input raises ValueError with the same messages. Arguments longer
+    than max_arg_length, length-prefixed or newline-terminated, are
+    truncated and the rest is skipped unread.
+
+    Args:
+        stream: Binary file-like object positioned at the pickle (file,
+            BytesIO, mmap or zip member)
+        max_arg_length: Longest string or bytes argument decoded
+
+    Yields:
+        PickleOp for each opcode, in order
+    """
+    tell = getattr(stream, 'tell', None)
+    try:
+        if tell is not None:
+            tell()
+    except OSError:
+        tell = None  # Unseekable stream; positions are unknown
+    stack = deque(maxlen=MAX_STACK_DEPTH)
+    memo = OrderedDict()  # Memo index -> name or PickleGlobal (least recently used first)
+    memo_count = 0
+
+    while True:
+        pos = tell() if tell is not None else None
+        code = stream.read(1)
+        opcode = _OPCODES.get(code.decode('latin-1'))
+        if opcode is None:
+            if code == b'':
+                raise ValueError("pickle exhausted before seeing STOP")
+            raise ValueError(f"at position {'<unknown>' if pos is None else pos}, opcode {code!r} unknown")
+
+        name = opcode.name
+        if name in _COUNTED_ARGS:
+            arg = _read_counted(stream, opcode, max_arg_length)
+        elif opcode.arg is not None and opcode.arg.n == pickletools.UP_TO_NEWLINE:
+            arg = _read_line_arg(stream, opcode, max_arg_length)
+        elif opcode.arg is not None:
+            arg = opcode.arg.reader(stream)
+        else:
+            arg = None
+
+        target = None
+        if name in STRING_OPCODES:
+            stack.append(arg if isinstance(arg, str) and len(arg) <= MAX_NAME_LENGTH else None)
+        elif name == 'GLOBAL':
+            target = _split_global(arg)
+            stack.append(target)
+        elif name == 'STACK_GLOBAL':
+            attribute, module = _pop(stack), _pop(stack)
+            if isinstance(module, str) and isinstance(attribute, str):
+                target = PickleGlobal(module, attribute)
+            stack.append(target)
+        elif name == 'INST':
+            _pop_mark(stack)
+            target = _split_global(arg)
+            stack.append(None)
+        elif name in ('MEMOIZE', 'PUT', 'BINPUT', 'LONG_BINPUT'):
+            index = memo_count if name == 'MEMOIZE' else arg
+            memo_count += 1
+            value = stack[-1] if stack else None
+            memo.pop(index, None)
+            if value is not None and value is not _MARK:
+                memo[index] = value
+                if len(memo) > MAX_MEMO_ENTRIES:
+                    memo.popitem(last=False)
+        elif name in ('GET', 'BINGET', 'LONG_BINGET'):
+            value = memo.get(arg)
+            if value is not None:
+                memo.move_to_end(arg)
+            stack.append(value)
+        elif name == 'DUP':
+            stack.append(stack[-1] if stack else None)
+        else:
+            if name in ('REDUCE', 'NEWOBJ', 'BUILD'):
+                target = _peek(stack, 2)
+            elif name == 'NEWOBJ_EX':
+                target = _peek(stack, 3)
+            elif name == 'OBJ':
+                target = _first_after_mark(stack)
+            _apply_stack_effect(stack, opcode)
+            if not isinstance(target, PickleGlobal):
+                target = None
+
+        yield PickleOp(name, arg, pos, target)
+        if name == 'STOP':
+            break
+
+
+def _read_counted(stream: IO[bytes], opcode: Any, max_arg_length: int) -> Any:
+    """Read a length-prefixed argument, skipping what exceeds max_arg_length"""
+    read_length, kind = _COUNTED_ARGS[opcode.name]
+    length = read_length(stream)
+    if length < 0:
+        raise ValueError(f"{opcode.arg.name} byte count < 0: {length}")
+
+    kept = min(length, max_arg_length)
+    data = stream.read(kept)
+    if len(data) < kept:
+        raise ValueError(f"expected {length} bytes in a {opcode.arg.name}, but only {len(data)} remain")
+    if length > kept:
+        _skip(stream, length - kept, opcode)
+
+    if kind == 'bytes':
+        return data
+    if kind == 'long':
+        # A truncated integer has no meaningful value
+        return pickletools.decode_long(data) if length == kept else None
+    if opcode.name in ('SHORT_BINSTRING', 'BINSTRING'):
+        return data.decode('latin-1')
+    # A truncated payload may end inside a multi-byte character
+    return data.decode('utf-8', 'surrogatepass' if length == kept else 'ignore')
+
+
+def _read_line_arg(stream: IO[bytes], opcode: Any, max_arg_length: int) -> Any:
+    """Read a newline-terminated argument, skipping what exceeds max_arg_length"""
+    lines = []
+    truncated = False
+    for _ in range(2 if opcode.arg.name == 'stringnl_noescape_pair' else 1):
+        line = _readline(stream, max_arg_length + 1)
+        if not line.endswith(b'\n'):
+            if len(line) <= max_arg_length:
+                raise ValueError(f"no newline found when trying to read {opcode.arg.name}")
+            _skip_line(stream, opcode)
+            line = line[:max_arg_length]
+            truncated = True
+        lines.append(line)
+
+    if not truncated:
+        return opcode.arg.reader(io.BytesIO(b''.join(lines)))
+    if opcode.arg.name not in _TEXT_LINE_ARGS:
+        return None
+    # Escapes and quotes of a truncated line cannot be undone reliably
+    text = [line.rstrip(b'\n').decode('raw-unicode-escape', 'ignore')
+            if opcode.arg.name == 'unicodestringnl' else line.rstrip(b'\n').decode('latin-1')
+            for line in lines]
+    return ' '.join(text)
+
+
+def _readline(stream: IO[bytes], limit: int) -> bytes:
+    """Read a line, or its first limit bytes"""
+    find = getattr(stream, 'find', None)
+    if find is None:
+        return stream.readline(limit)
+    # mmap.readline() takes no size and would copy the whole line
+    pos = stream.tell()
+    end = find(b'\n', pos, pos + limit)
+    return stream.read(limit if end < 0 else end + 1 - pos)
+
+
+def _skip_line(stream: IO[bytes], opcode: Any):
+    """Advance past the rest of a line without keeping it"""
+    while True:
+        data = _readline(stream, SKIP_CHUNK_SIZE)
+        if not data:
+            raise ValueError(f"no newline found when trying to read {opcode.arg.name}")
+        if data.endswith(b'\n'):
+            return
+
+
+def _skip(stream: IO[bytes], count: int, opcode: Any):
+    """Advance past count bytes without keeping them"""
+    try:
+        stream.seek(count, io.SEEK_CUR)
+        return
+    except (AttributeError, OSError):
+        pass  # Not seekable; discard in blocks below
+    except ValueError:
+        # Memory maps refuse to seek past their end
+        raise ValueError(f"expected {count} more bytes in a {opcode.arg.name}, but fewer remain") from None
+
+    while count:
+        data = stream.read(min(count, SKIP_CHUNK_SIZE))
+        if not data:
+            raise ValueError(f"expected {count} more bytes in a {opcode.arg.name}, but fewer remain")
+        count -= len(data)
+
+
+def _split_global(arg: Any) -> Optional[PickleGlobal]:
+    """Get the global named by a GLOBAL or INST argument ('module name')"""
+    if not isinstance(arg, str) or not arg:
+        return None
+    module, _, name = arg.partition(' ')
+    return PickleGlobal(module, name)
+
+
+def _pop(stack: deque) -> Any:
+    """Pop a value, or None if the tracked stack is exhausted"""
+    return stack.pop() if stack else None
+
+
+def _peek(stack: deque, depth: int) -> Any:
+    """Value depth entries from the top, or None if not tracked"""
+    return stack[-depth] if len(stack) >= depth else None
+
+
+def _pop_mark(stack: deque):
+    """Pop everything down to and including the topmost MARK"""
+    while stack:
+        if stack.pop() is _MARK:
+            return
+
+
+def _first_after_mark(stack: deque) -> Any:
+    """Value pushed right after the topmost MARK"""
+    previous = None
+    for value in reversed(stack):
+        if value is _MARK:
+            return previous
+        previous = value
+    return None
+
+
+def _apply_stack_effect(stack: deque, opcode: Any):
+    """Apply an opcode's documented stack effect with unknown values"""
+    before = opcode.stack_before
+    if pickletools.markobject in before:
+        _pop_mark(stack)
+        # Values below the mark (e.g. the list APPENDS extends) are consumed too
+        below = before.index(pickletools.markobject)
+    else:
+        below = len(before)
+    for _ in range(below):
+        _pop(stack)
+    for value in opcode.stack_after:
+        stack.append(_MARK if value is pickletools.markobject else None)
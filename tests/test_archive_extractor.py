@@ -2,6 +2,7 @@
 Tests for archive extractor
 """
 
+import io
 import pytest
 import zipfile
 import tarfile
@@ -183,4 +184,188 @@ class TestArchiveExtractor:
         # Should return empty features without crashing
         assert features.file_type == "zip"
         assert len(features.strings) == 0
-        assert len(features.functions) == 0
\ No newline at end of file
+        assert len(features.functions) == 0
+
+class TestArchiveMembers:
+    """Test member-level archive reading"""
+
+    def test_member_listing_and_normalization(self, tmp_path):
+        """Test that member names are listed sorted and kept inside the root"""
+        from binarysniffer.extractors.archive_members import ZipMemberSource
+
+        zip_path = tmp_path / "test.zip"
+        with zipfile.ZipFile(zip_path, 'w') as zf:
+            zf.writestr("b/lib.so", b"ELF")
+            zf.writestr("../../evil.txt", b"escape")
+            zf.writestr("/abs/a.txt", b"absolute")
+            zf.writestr("dir/", b"")
+
+        with ZipMemberSource(zip_path, tmp_path / "out") as source:
+            assert [m.name for m in source.members] == ["abs/a.txt", "b/lib.so", "evil.txt"]
+            evil = source.members[2]
+            assert source.read(evil) == b"escape"
+            assert source.materialize(evil) == tmp_path / "out" / "evil.txt"
+
+    def test_no_extractall(self, tmp_path):
+        """Test that ZIP and TAR archives are streamed member by member"""
+        zip_path = tmp_path / "test.zip"
+        with zipfile.ZipFile(zip_path, 'w') as zf:
+            zf.writestr("code.py", "import os\ndef main():\n    pass")
+        tar_path = tmp_path / "test.tar.gz"
+        with tarfile.open(tar_path, 'w:gz') as tf:
+            tf.add(zip_path, arcname="inner/test.zip")
+
+        extractor = ArchiveExtractor()
+        with patch.object(zipfile.ZipFile, 'extractall', side_effect=AssertionError), \
+                patch.object(tarfile.TarFile, 'extractall', side_effect=AssertionError):
+            features = extractor.extract(tar_path)
+
+        assert "os" in features.imports
+        assert features.metadata["processed_files"] == ["[nested:1]test.zip/code.py"]
+
+    def test_unselected_members_not_read(self, tmp_path):
+        """Test that members beyond the prioritized selection are never decompressed"""
+        from binarysniffer.extractors.archive_members import ZipMemberSource
+
+        zip_path = tmp_path / "test.apk"
+        with zipfile.ZipFile(zip_path, 'w') as zf:
+            zf.writestr("lib/arm64-v8a/libnative.so", b"\x7fELF" + b"native_symbol_name" * 4)
+            for i in range(150):
+                zf.writestr(f"res/raw/asset{i:03d}.bin", b"\x00" * 16)
+
+        opened = []
+        original_open = ZipMemberSource.open
+
+        def tracking_open(self, member):
+            opened.append(member.name)
+            return original_open(self, member)
+
+        with patch.object(ZipMemberSource, 'open', tracking_open):
+            features = ArchiveExtractor().extract(zip_path)
+
+        assert "lib/arm64-v8a/libnative.so" in opened
+        # Only the first 100 low-priority members are selected
+        assert len([name for name in opened if name.startswith("res/raw/")]) == 100
+        assert features.metadata["file_count"] == 101
+
+    def test_license_scan_bounds_scratch(self, tmp_path):
+        """Test that license detection scans members as they are read instead of keeping them"""
+        from binarysniffer.extractors.archive_members import TarMemberSource
+
+        member_size = 16 * 1024
+        tar_path = tmp_path / "layer.tar"
+        with tarfile.open(tar_path, 'w') as tf:
+            def add(name, data):
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                tf.addfile(info, io.BytesIO(data))
+
+            add("bin/busybox", b"\x7fELF\x02\x01\x01" + b"\x00" * member_size)
+            for i in range(120):
+                add(f"etc/conf{i:03d}.txt", f"setting_{i} = value\n".encode() * (member_size // 20))
+            # Sorted after the 100 selected low-priority members
+            add("zz/LICENSE", b"Permission is hereby granted, free of charge, to any person "
+                              b"obtaining a copy of this software (the MIT License)\n")
+
+        extractor = ArchiveExtractor(member_workers=1)
+        scanned = []
+        peak = [0]
+        original_materialize = TarMemberSource.materialize
+        original_detect = extractor.oslili.detect_licenses_in_path
+
+        def tracking_materialize(self, member):
+            path = original_materialize(self, member)
+            on_disk = sum(f.stat().st_size for f in self.root.rglob('*') if f.is_file())
+            peak[0] = max(peak[0], on_disk)
+            return path
+
+        def tracking_detect(path):
+            scanned.append(Path(path).name)
+            return original_detect(path)
+
+        with patch.object(TarMemberSource, 'materialize', tracking_materialize), \
+                patch.object(extractor.oslili, 'detect_licenses_in_path', tracking_detect):
+            features = extractor.extract(tar_path)
+
+        # One member on disk at a time, not the uncompressed payload
+        assert peak[0] <= member_size + 1024
+        assert "busybox" not in scanned
+        assert "LICENSE" in scanned
+        assert "MIT" in features.metadata["license_spdx_ids"]
+        assert "zz/LICENSE" not in features.metadata["processed_files"]
+
+    def test_parallel_members_merge_in_order(self, tmp_path):
+        """Test that members finishing out of order are merged in priority order"""
+        import time
+        from binarysniffer.extractors.factory import ExtractorFactory
+
+        inner_path = tmp_path / "inner.zip"
+        with zipfile.ZipFile(inner_path, 'w') as zf:
+            for i in range(4):
+                zf.writestr(f"inner{i}.txt", "x")
+        zip_path = tmp_path / "test.zip"
+        with zipfile.ZipFile(zip_path, 'w') as zf:
+            for i in range(8):
+                zf.writestr(f"file{i}.txt", "x")
+            zf.write(inner_path, "nested/inner.zip")
+
+        def slow_extract(self, file_path):
+            # Earlier members take longest, so threads finish in reverse order
+            time.sleep(0.05 * (9 - int(file_path.stem[-1])))
+            return ExtractedFeatures(file_path=str(file_path), file_type="text", strings=[f"feature_{file_path.stem}"])
+
+        with patch.object(ExtractorFactory, 'extract', slow_extract):
+            sequential = ArchiveExtractor(member_workers=1).extract(zip_path)
+            parallel = ArchiveExtractor(member_workers=4).extract(zip_path)
+
+        expected = [f"feature_file{i}" for i in range(8)] + [f"feature_inner{i}" for i in range(4)]
+        assert sequential.strings == expected
+        assert parallel.strings == expected
+        assert parallel.metadata["processed_files"] == sequential.metadata["processed_files"]
+
+    def test_members_analyzed_in_processes(self, tmp_path, monkeypatch):
+        """Test that large archives are analyzed in worker processes with the same result"""
+        from binarysniffer.extractors import archive
+        from binarysniffer.extractors.factory import get_default_factory
+
+        zip_path = tmp_path / "test.jar"
+        with zipfile.ZipFile(zip_path, 'w') as zf:
+            for i in range(6):
+                zf.writestr(f"src/file{i}.c", f'int function_{i}(void) {{ return puts("message_{i}_text"); }}\n')
+            zf.writestr("nested/inner.zip", b"")
+
+        pools = []
+
+        class RecordingPool(archive.ProcessPoolExecutor):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                pools.append(self)
+
+        monkeypatch.setattr(archive, "ProcessPoolExecutor", RecordingPool)
+        monkeypatch.setattr(ArchiveExtractor, "PROCESS_MIN_MEMBERS", 1)
+        factory = get_default_factory()
+
+        sequential = ArchiveExtractor(member_workers=1, factory=factory).extract(zip_path)
+        parallel = ArchiveExtractor(member_workers=2, factory=factory).extract(zip_path)
+
+        assert len(pools) == 1
+        assert parallel.strings == sequential.strings
+        assert parallel.functions == sequential.functions
+        assert parallel.metadata["processed_files"] == sequential.metadata["processed_files"]
+        assert "src/file5.c" in parallel.metadata["processed_files"]
+        assert "message_5_text" in parallel.strings
+
+    def test_daemonic_process_uses_threads(self, monkeypatch):
+        """Test that members are analyzed on threads where child processes are not allowed"""
+        from binarysniffer.extractors import archive
+        from binarysniffer.extractors.factory import get_default_factory
+
+        monkeypatch.setattr(ArchiveExtractor, "PROCESS_MIN_MEMBERS", 1)
+        extractor = ArchiveExtractor(member_workers=2)
+        factory = get_default_factory()
+
+        monkeypatch.setattr(archive.multiprocessing, "current_process", lambda: MagicMock(daemon=True))
+        executor = extractor._member_executor(100, factory)
+        executor.shutdown()
+
+        assert isinstance(executor, archive.ThreadPoolExecutor)
@@ -0,0 +1,73 @@
+"""
+Tests for memory-mapped binary string extraction
+"""
+
+import pytest
+
+from binarysniffer.utils.binary_strings import BinaryStringExtractor, ExtractedString
+
+
+class TestBinaryStringExtractor:
+    """Test BinaryStringExtractor ordering, offsets and ranges"""
+
+    @pytest.fixture
+    def binary_file(self, tmp_path):
+        """Create a binary with ASCII and UTF-16LE strings at known offsets"""
+        data = bytearray(b"\x00" * 64)
+        data[4:4 + 13] = b"inflateInit2_"
+        data[30:30 + 14] = "KERNEL32".encode("utf-16le")
+        data += b"\x01\x02version 1.2.13\x00" + b"inflateInit2_\x00"
+        path = tmp_path / "sample.bin"
+        path.write_bytes(bytes(data))
+        return path
+
+    def test_file_order_with_offsets(self, binary_file):
+        """Test that strings come back in file order, deduplicated, with offsets"""
+        extractor = BinaryStringExtractor(min_length=4)
+        strings = extractor.extract_ordered_strings(binary_file)
+
+        assert strings == [
+            ExtractedString(4, "inflateInit2_", "ascii"),
+            ExtractedString(30, "KERNEL32", "utf-16le"),
+            ExtractedString(68, "version 1.2.13", "ascii"),
+        ]
+        assert extractor.extract_strings(binary_file) == {"inflateInit2_", "KERNEL32", "version 1.2.13"}
+
+    def test_ascii_run_followed_by_utf16(self, tmp_path):
+        """Test that a UTF-16 run starting at the last byte of an ASCII run is found"""
+        path = tmp_path / "mixed.bin"
+        path.write_bytes(b"\x01zlib" + "ABCD".encode("utf-16le") + b"\x01")
+
+        values = [s.value for s in BinaryStringExtractor(min_length=4).iter_strings(path)]
+        assert values == ["zlibA", "ABCD"]
+
+    def test_ranges_and_truncation(self, binary_file):
+        """Test that ranges restrict the scan and truncation keeps the earliest strings"""
+        extractor = BinaryStringExtractor(min_length=4)
+        in_range = extractor.extract_ordered_strings(binary_file, ranges=[(60, 1000), (0, 20)])
+        assert [s.value for s in in_range] == ["inflateInit2_", "version 1.2.13"]
+
+        limited = BinaryStringExtractor(min_length=4, max_strings=2)
+        for _ in range(3):
+            assert limited.extract_strings(binary_file) == {"inflateInit2_", "KERNEL32"}
+
+    def test_empty_file(self, tmp_path):
+        """Test that an empty file yields no strings"""
+        path = tmp_path / "empty.bin"
+        path.write_bytes(b"")
+        assert BinaryStringExtractor().extract_ordered_strings(path) == []
+
+    def test_scanner_matches_file_scan(self, binary_file, tmp_path):
+        """Test that scanning in chunks gives the same strings as the file scan"""
+        data = binary_file.read_bytes() + b"\x01zlib" + "ABCD".encode("utf-16le") + b"\x01"
+        path = tmp_path / "chunks.bin"
+        path.write_bytes(data)
+
+        for max_strings in (2, 100):
+            extractor = BinaryStringExtractor(min_length=4, max_strings=max_strings)
+            expected = extractor.extract_ordered_strings(path)
+            for chunk_size in (1, 3, 7, len(data)):
+                scanner = extractor.scanner()
+                for start in range(0, len(data), chunk_size):
+                    scanner.update(data[start:start + chunk_size])
+                assert scanner.final() == expected
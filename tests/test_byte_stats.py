@@ -0,0 +1,101 @@
+"""
+Tests for byte statistics
+"""
+
+import math
+import mmap
+import random
+import re
+from collections import Counter
+
+import pytest
+
+from binarysniffer.utils import byte_stats
+from binarysniffer.utils.byte_stats import (
+    byte_histogram,
+    entropy_profile,
+    printable_runs,
+    shannon_entropy
+)
+
+
+def reference_entropy(data: bytes) -> float:
+    """Per-byte Shannon entropy computed directly"""
+    if not data:
+        return 0.0
+    return -sum(c / len(data) * math.log2(c / len(data)) for c in Counter(data).values())
+
+
+@pytest.fixture
+def sample():
+    """Mixed printable text, NULs and random bytes"""
+    rng = random.Random(19)
+    return bytes(rng.choice(b'AZaz09 ~\x00\x7f\xff\x1f') for _ in range(3000))
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "fallback"])
+def use_numpy(request, monkeypatch):
+    """Run with NumPy and with the standard library fallback"""
+    if request.param and not byte_stats.HAS_NUMPY:
+        pytest.skip("NumPy not installed")
+    monkeypatch.setattr(byte_stats, "HAS_NUMPY", request.param)
+    return request.param
+
+
+class TestByteStats:
+    """Test histograms, entropy and printable runs"""
+
+    def test_histogram_and_entropy(self, sample, use_numpy):
+        """Test that histograms and entropy match direct counting"""
+        assert byte_histogram(sample) == [sample.count(bytes([i])) for i in range(256)]
+        assert shannon_entropy(sample) == pytest.approx(reference_entropy(sample))
+        assert shannon_entropy(b'') == 0.0
+        assert shannon_entropy(b'A' * 100) == 0.0
+        assert shannon_entropy(bytes(range(256))) == pytest.approx(8.0)
+
+    @pytest.mark.parametrize("window,step", [(256, 256), (256, 64), (100, 1)])
+    def test_entropy_profile(self, sample, use_numpy, window, step):
+        """Test that each window's entropy matches the window computed alone"""
+        profile = entropy_profile(sample, window, step)
+
+        expected = [
+            reference_entropy(sample[start:start + window])
+            for start in range(0, len(sample) - window + 1, step)
+        ]
+        assert profile == pytest.approx(expected)
+        assert entropy_profile(sample[:50], window, step) == pytest.approx([reference_entropy(sample[:50])])
+        assert entropy_profile(b'', window, step) == []
+
+    def test_entropy_profile_rejects_uneven_step(self, sample):
+        """Test that the step must divide the window"""
+        with pytest.raises(ValueError):
+            entropy_profile(sample, 100, 30)
+
+    @pytest.mark.parametrize("min_length", [1, 4, 8])
+    def test_printable_runs(self, sample, use_numpy, min_length):
+        """Test that runs match a printable-ASCII regex scan"""
+        expected = [m.span() for m in re.finditer(rb'[\x20-\x7e]{%d,}' % min_length, sample)]
+
+        assert list(printable_runs(sample, min_length)) == expected
+
+    @pytest.mark.parametrize("block_size", [1, 7, 64])
+    def test_block_boundaries(self, sample, monkeypatch, block_size):
+        """Test that results do not depend on where blocks split the data"""
+        if not byte_stats.HAS_NUMPY:
+            pytest.skip("NumPy not installed")
+        expected_runs = list(printable_runs(sample, 4))
+        expected_profile = entropy_profile(sample, 128, 32)
+
+        monkeypatch.setattr(byte_stats, "BLOCK_SIZE", block_size)
+        assert list(printable_runs(sample, 4)) == expected_runs
+        assert entropy_profile(sample, 128, 32) == pytest.approx(expected_profile)
+        assert byte_histogram(sample) == [sample.count(bytes([i])) for i in range(256)]
+
+    def test_memory_mapped_buffer(self, sample, tmp_path):
+        """Test that an mmap is analyzed in place"""
+        path = tmp_path / "sample.bin"
+        path.write_bytes(sample)
+
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            assert shannon_entropy(mm) == pytest.approx(shannon_entropy(sample))
+            assert list(printable_runs(mm)) == list(printable_runs(sample))
@@ -191,4 +191,54 @@ class TestCLI:
         
         # Verify output file contains JSON
         content = output_file.read_text()
-        assert '"file_path"' in content
\ No newline at end of file
+        assert '"file_path"' in content
+
+    def test_ndjson_output_streamed(self, runner, temp_dir):
+        """Test NDJSON output with one line per file and a summary line"""
+        data_dir = temp_dir.parent / '.binarysniffer_ndjson_data'
+        scan_dir = temp_dir / "scan"
+        scan_dir.mkdir()
+        (scan_dir / "file1.bin").write_bytes(b'data1')
+        (scan_dir / "file2.bin").write_bytes(b'data2')
+        output_file = temp_dir / "results.ndjson"
+        
+        result = runner.invoke(cli, [
+            '--data-dir', str(data_dir),
+            'analyze',
+            str(scan_dir),
+            '-r',
+            '--output', str(output_file)
+        ])
+        
+        import shutil
+        shutil.rmtree(data_dir, ignore_errors=True)
+        
+        assert result.exit_code == 0
+        import json
+        records = [json.loads(line) for line in output_file.read_text().splitlines()]
+        assert [r['record'] for r in records] == ['result', 'result', 'summary']
+        assert {r['file_path'] for r in records[:2]} == {str(scan_dir / "file1.bin"), str(scan_dir / "file2.bin")}
+        assert records[-1]['total_files'] == 2
+    
+    def test_full_export_compressed_ndjson(self, runner, temp_dir):
+        """Test --full-export streamed to a zstd-compressed NDJSON file"""
+        test_file = temp_dir / "test.bin"
+        test_file.write_bytes(b'inflate deflate zlib compression library')
+        export_file = temp_dir / "features.ndjson.zst"
+        
+        result = runner.invoke(cli, [
+            '--data-dir', str(temp_dir / '.binarysniffer'),
+            'analyze',
+            str(test_file),
+            '--full-export', str(export_file)
+        ])
+        
+        assert result.exit_code == 0
+        assert 'Full feature export saved to' in result.output
+        import json
+        import zstandard
+        with zstandard.open(export_file, 'rt') as f:
+            records = [json.loads(line) for line in f]
+        assert [r['record'] for r in records] == ['file', 'metadata']
+        assert records[0]['file_info']['path'] == str(test_file)
+        assert records[1]['total_files'] == 1
@@ -0,0 +1,214 @@
+"""
+Tests for direct signature matching and the Aho-Corasick automaton
+"""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from binarysniffer.core.config import Config
+from binarysniffer.extractors.base import ExtractedFeatures
+from binarysniffer.index.automaton import AhoCorasickAutomaton
+from binarysniffer.matchers.direct import DirectMatcher
+from binarysniffer.storage.database import SignatureDatabase
+from binarysniffer.utils.hashing import compute_minhash_for_strings
+
+
+class TestAhoCorasickAutomaton:
+    """Test the multi-pattern automaton"""
+
+    def test_finds_overlapping_patterns(self):
+        """Test that overlapping and nested patterns are all reported"""
+        automaton = AhoCorasickAutomaton()
+        ids = {p: automaton.add(p) for p in ["he", "she", "his", "hers"]}
+        automaton.build()
+
+        found = automaton.find_all("ushers")
+        assert found == {ids["he"], ids["she"], ids["hers"]}
+
+    def test_match_positions(self):
+        """Test that end offsets are reported for every occurrence"""
+        automaton = AhoCorasickAutomaton()
+        pattern_id = automaton.add("abc")
+
+        matches = list(automaton.iter_matches("abcxabc"))
+        assert matches == [(3, pattern_id), (7, pattern_id)]
+
+    def test_duplicate_pattern_same_id(self):
+        """Test that re-adding a pattern returns its existing ID"""
+        automaton = AhoCorasickAutomaton()
+        assert automaton.add("pattern") == automaton.add("pattern")
+        assert len(automaton) == 1
+
+    def test_rebuild_after_add(self):
+        """Test that patterns added after a build are still found once"""
+        automaton = AhoCorasickAutomaton()
+        first = automaton.add("alpha")
+        automaton.build()
+        second = automaton.add("pha")
+
+        assert list(automaton.iter_matches("alpha")) == [(5, first), (5, second)]
+
+    def test_empty_pattern_rejected(self):
+        """Test that empty patterns are rejected"""
+        with pytest.raises(ValueError):
+            AhoCorasickAutomaton().add("")
+
+
+class TestDirectMatcher:
+    """Test DirectMatcher exact and substring matching"""
+
+    @pytest.fixture
+    def config(self):
+        """Create a config with a small signature database"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config = Config(data_dir=Path(tmpdir), auto_update=False)
+            db = SignatureDatabase(config.db_path)
+            component_id = db.add_component("FFmpeg", "4.4", "native", "LGPL-2.1")
+            for pattern in ["avcodec_send_packet", "avformat_open_input"]:
+                db.add_signature(
+                    component_id, pattern, 1, 0.9,
+                    compute_minhash_for_strings([pattern]).to_bytes()
+                )
+            yield config
+
+    def test_exact_match(self, config):
+        """Test that exact strings match at full confidence"""
+        matcher = DirectMatcher(config)
+        features = ExtractedFeatures(
+            file_path="libavcodec.so",
+            file_type="binary",
+            strings=["AVCODEC_SEND_PACKET"]
+        )
+
+        matches = matcher.match(features, threshold=0.0)
+        assert len(matches) == 1
+        assert matches[0].component == "FFmpeg@4.4"
+        evidence = matches[0].evidence['matched_patterns']
+        assert evidence == [{
+            'pattern': 'avcodec_send_packet',
+            'matched_string': 'avcodec_send_packet',
+            'confidence': 0.9
+        }]
+
+    def test_substring_match_discounted(self, config):
+        """Test that substring hits carry the 0.8 confidence discount"""
+        matcher = DirectMatcher(config)
+        features = ExtractedFeatures(
+            file_path="player",
+            file_type="binary",
+            functions=["call_avformat_open_input_v2"]
+        )
+
+        matches = matcher.match(features, threshold=0.0)
+        assert len(matches) == 1
+        evidence = matches[0].evidence['matched_patterns'][0]
+        assert evidence['matched_string'] == 'call_avformat_open_input_v2'
+        assert evidence['confidence'] == pytest.approx(0.9 * 0.8)
+
+    def test_substring_requires_short_source(self, config):
+        """Test that patterns only found in long strings are not matched"""
+        matcher = DirectMatcher(config)
+        features = ExtractedFeatures(
+            file_path="blob",
+            file_type="binary",
+            strings=["x" * 60 + "avformat_open_input"]
+        )
+
+        assert matcher.match(features, threshold=0.0) == []
+
+
+class TestMatcherSnapshot:
+    """Test the precompiled matcher snapshot"""
+
+    @pytest.fixture
+    def config(self):
+        """Create a config with a small signature database"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config = Config(data_dir=Path(tmpdir), auto_update=False)
+            db = SignatureDatabase(config.db_path)
+            component_id = db.add_component("zlib", "1.2.13", "native", "Zlib")
+            for pattern in ["deflateInit2_", "inflate_fast_chunk"]:
+                db.add_signature(
+                    component_id, pattern, 1, 0.8,
+                    compute_minhash_for_strings([pattern]).to_bytes()
+                )
+            yield config
+
+    def test_snapshot_written_and_reused(self, config):
+        """Test that the second matcher loads the snapshot instead of SQLite"""
+        first = DirectMatcher(config)
+        assert not first.loaded_from_snapshot
+        assert config.snapshot_path.exists()
+
+        second = DirectMatcher(config)
+        assert second.loaded_from_snapshot
+        assert second.component_map == first.component_map
+        assert [s['pattern'] for s in second.signatures] == [s['pattern'] for s in first.signatures]
+
+        features = ExtractedFeatures(
+            file_path="libz.so",
+            file_type="binary",
+            strings=["deflateinit2_", "my_inflate_fast_chunk_impl"]
+        )
+        expected = [m.to_dict() for m in first.match(features, threshold=0.0)]
+        assert [m.to_dict() for m in second.match(features, threshold=0.0)] == expected
+
+    def test_snapshot_records_decoded_on_lookup(self, config):
+        """Test that a loaded snapshot decodes only the signatures lookups return"""
+        DirectMatcher(config)
+        matcher = DirectMatcher(config)
+        assert matcher.loaded_from_snapshot
+        assert matcher.signatures._decoded == {}
+
+        features = ExtractedFeatures(file_path="libz.so", file_type="binary", strings=["deflateinit2_"])
+        matches = matcher.match(features, threshold=0.0)
+
+        assert [m.component for m in matches] == ["zlib@1.2.13"]
+        assert [sig['pattern'] for sig in matcher.signatures._decoded.values()] == ["deflateinit2_"]
+        assert matcher.exact_index.get("inflate_fast_chunk") == [matcher.signatures[1]]
+        assert "missing_pattern" not in matcher.exact_index
+
+    def test_stale_snapshot_unmapped(self, config):
+        """Test that a stale snapshot is unmapped instead of kept open"""
+        from binarysniffer.storage.snapshot import MatcherSnapshot
+
+        DirectMatcher(config)
+        snapshot = MatcherSnapshot(config.snapshot_path)
+
+        assert snapshot.load("another stamp") is None
+        assert snapshot._mmap is None
+
+    def test_snapshot_stale_after_database_change(self, config):
+        """Test that adding signatures invalidates the snapshot"""
+        DirectMatcher(config)
+
+        db = SignatureDatabase(config.db_path)
+        component_id = db.add_component("libpng", "1.6", "native", "Libpng")
+        db.add_signature(component_id, "png_create_read_struct", 1, 0.9, b"\0" * 16)
+
+        matcher = DirectMatcher(config)
+        assert not matcher.loaded_from_snapshot
+        assert "png_create_read_struct" in matcher.exact_index
+
+    def test_version_change_invalidates_snapshot(self, config):
+        """Test that SignatureManager drops the snapshot on version change"""
+        from binarysniffer.signatures.manager import SignatureManager
+
+        DirectMatcher(config)
+        assert config.snapshot_path.exists()
+
+        manager = SignatureManager(config, SignatureDatabase(config.db_path))
+        manager._update_database_version("9.9.9")
+        assert not config.snapshot_path.exists()
+        assert "9.9.9" in SignatureDatabase(config.db_path).get_content_stamp()
+
+    def test_corrupt_snapshot_ignored(self, config):
+        """Test that an unreadable snapshot falls back to the database"""
+        DirectMatcher(config)
+        config.snapshot_path.write_bytes(b"garbage")
+
+        matcher = DirectMatcher(config)
+        assert not matcher.loaded_from_snapshot
+        assert len(matcher.signatures) == 2
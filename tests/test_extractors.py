@@ -225,4 +225,96 @@ class TestExtractorFactory:
         
         assert isinstance(features, ExtractedFeatures)
         assert features.file_path == str(test_file)
-        assert len(features.strings) > 0
\ No newline at end of file
+        assert len(features.strings) > 0
+
+    def test_shared_factory(self):
+        """Test that the shared factory is built once and used by its archive extractor"""
+        from binarysniffer.extractors import get_default_factory
+        from binarysniffer.extractors.archive import ArchiveExtractor
+        
+        factory = get_default_factory()
+        assert get_default_factory() is factory
+        
+        archive_extractor = factory.extractors[0]
+        assert isinstance(archive_extractor, ArchiveExtractor)
+        assert archive_extractor.factory is factory
+        assert ArchiveExtractor().factory is factory
+    
+    def test_archive_members_skip_archive_extractor(self, tmp_path):
+        """Test that archive extraction is not re-entered for archive members"""
+        import zipfile
+        from binarysniffer.extractors.archive import ArchiveExtractor
+        from binarysniffer.extractors.archive_members import archive_member_context
+        
+        zip_path = tmp_path / "inner.zip"
+        with zipfile.ZipFile(zip_path, 'w') as zf:
+            zf.writestr("a.txt", "text")
+        factory = ExtractorFactory()
+        
+        assert isinstance(factory.get_extractor(zip_path), ArchiveExtractor)
+        with archive_member_context():
+            assert not isinstance(factory.get_extractor(zip_path), ArchiveExtractor)
+        assert isinstance(factory.get_extractor(zip_path), ArchiveExtractor)
+    
+    def test_ctags_probed_once(self):
+        """Test that the ctags probe runs once per process"""
+        from unittest.mock import MagicMock, patch
+        from binarysniffer.extractors import ctags
+        
+        ctags._ctags_available.cache_clear()
+        try:
+            with patch.object(ctags.subprocess, 'run', return_value=MagicMock(stdout="Universal Ctags 6.0")) as run:
+                assert ctags.CTagsExtractor().ctags_available
+                assert ctags.CTagsExtractor().ctags_available
+            assert run.call_count == 1
+        finally:
+            ctags._ctags_available.cache_clear()
+    
+    def test_dispatch_reads_header_once(self, tmp_path):
+        """Test that extractor selection opens a file at most once"""
+        from unittest.mock import patch
+        import builtins
+        
+        pickle_file = tmp_path / "model.bin"
+        pickle_file.write_bytes(b'\x80\x04\x95' + b'\x00' * 64)
+        source_file = tmp_path / "main.c"
+        source_file.write_text("int main(void) { return 0; }\n" * 2000)
+        factory = ExtractorFactory()
+        
+        real_open = builtins.open
+        opened = []
+        
+        def counting_open(file, *args, **kwargs):
+            opened.append(str(file))
+            return real_open(file, *args, **kwargs)
+        
+        with patch('builtins.open', counting_open):
+            extractor = factory.get_extractor(pickle_file)
+            assert opened.count(str(pickle_file)) <= 1
+            factory.get_extractor(source_file)
+            assert opened.count(str(source_file)) <= 1
+        
+        from binarysniffer.extractors.pickle_model import PickleModelExtractor
+        assert isinstance(extractor, PickleModelExtractor)
+    
+    def test_dispatch_matches_can_handle(self, tmp_path):
+        """Test that extension pruning selects the same extractor as probing every one"""
+        files = {
+            "lib.so": b'\x7fELF' + b'\x00' * 32,
+            "blob": b'MZ\x90\x00' + b'\x00' * 32,
+            "app.dex": b'dex\n035\x00',
+            "classes": b'dex\n035\x00' + b'\x00' * 16,
+            "data.pkl": b'}q\x00.',
+            "notes.txt": b'hello world',
+            "noext": b'plain text only',
+        }
+        factory = ExtractorFactory()
+        for name, content in files.items():
+            path = tmp_path / name
+            path.write_bytes(content)
+            expected = next((e for e in factory.extractors if e.can_handle(path)), None)
+            selected = factory.get_extractor(path)
+            if expected is not None:
+                assert selected is expected, name
+            else:
+                assert type(selected).__name__ == "ImprovedBinaryExtractor", name
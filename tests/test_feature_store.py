@@ -0,0 +1,222 @@
+"""
+Tests for the compact interned feature store
+"""
+
+import pickle
+import time
+
+import pytest
+
+from binarysniffer.extractors import ExtractedFeatures
+from binarysniffer.extractors.feature_store import FUNCTIONS, STRINGS, SYMBOLS, FeatureStore
+
+
+@pytest.fixture
+def features():
+    """Features with one identifier in three categories"""
+    return ExtractedFeatures(
+        file_path="/test/libz.so",
+        file_type="binary",
+        strings=["inflate", "deflate", "inflate"],
+        symbols=["inflate"],
+        functions=["inflate", "crc32"],
+        imports=["libc.so.6"]
+    )
+
+
+class TestFeatureStore:
+    """Test interning, masks and compaction"""
+
+    def test_unique_features_stored_once(self, features):
+        """Test that a feature in several categories is stored once"""
+        store = features.store
+
+        assert len(store) == 4
+        inflate = store.lookup("inflate")
+        assert store.has(inflate, STRINGS) and store.has(inflate, SYMBOLS) and store.has(inflate, FUNCTIONS)
+        assert not store.has(store.lookup("crc32"), STRINGS)
+        assert list(store.unique(SYMBOLS | FUNCTIONS)) == ["inflate", "crc32"]
+
+    def test_round_trip(self):
+        """Test that non-ASCII text and lone surrogates decode unchanged"""
+        store = FeatureStore()
+        values = ["zlib", "Größe", "数据", "bad\udcff", ""]
+
+        ids = [store.intern(value) for value in values]
+
+        assert [store.get(feature_id) for feature_id in ids] == values
+
+    def test_non_str_values_stored_as_str(self, features):
+        """Test that values that are not str are stored as their str()"""
+        features.constants.append(1024)
+
+        assert features.constants == ["1024"]
+
+    def test_compact_drops_replaced_features(self, features):
+        """Test that compaction keeps only features a category still holds"""
+        features.strings = ["deflate"]
+        features.store.compact()
+
+        assert len(features.store) == 4  # inflate is still a symbol and function
+        features.symbols = []
+        features.functions = ["crc32"]
+        features.store.compact()
+
+        assert len(features.store) == 3
+        assert features.strings == ["deflate"]
+        assert features.functions == ["crc32"]
+        assert "inflate" not in features.functions
+
+        # The index is rebuilt on demand after compaction
+        features.strings.append("crc32")
+        assert len(features.store) == 3
+
+    def test_lowercase(self, features):
+        """Test cached lowercasing and its invalidation"""
+        features.strings.append("ZLIB_Version")
+        store = features.store
+
+        lowered = store.lowercase(STRINGS, min_length=5)
+        assert lowered == {"inflate", "deflate", "zlib_version"}
+        assert store.lowercase(STRINGS, min_length=5) is lowered
+
+        features.strings.append("Adler32")
+        assert "adler32" in store.lowercase(STRINGS, min_length=5)
+
+    def test_pickle(self, features):
+        """Test that features pickle without the intern index"""
+        copy = pickle.loads(pickle.dumps(features))
+
+        assert copy.strings == ["inflate", "deflate", "inflate"]
+        assert copy.imports == ["libc.so.6"]
+        assert "crc32" in copy.functions
+        assert copy == features
+
+    def test_equality_and_repr(self, features):
+        """Test that equality and repr cover the category contents, as for a dataclass"""
+        same = ExtractedFeatures(
+            file_path="/test/libz.so",
+            file_type="binary",
+            strings=["inflate", "deflate", "inflate"],
+            symbols=["inflate"],
+            functions=["inflate", "crc32"],
+            imports=["libc.so.6"]
+        )
+
+        assert features == same
+        same.strings.pop()
+        assert features != same
+        assert features != "/test/libz.so"
+        assert repr(features) == (
+            "ExtractedFeatures(file_path='/test/libz.so', file_type='binary', "
+            "strings=['inflate', 'deflate', 'inflate'], symbols=['inflate'], "
+            "functions=['inflate', 'crc32'], constants=[], imports=['libc.so.6'], metadata={})"
+        )
+
+
+class TestFeatureList:
+    """Test list compatibility of the category views"""
+
+    def test_list_operations(self, features):
+        """Test order, repeats, indexing, slicing, membership and concatenation"""
+        assert features.strings == ["inflate", "deflate", "inflate"]
+        assert len(features.strings) == 3
+        assert features.strings[1] == "deflate"
+        assert features.strings[-1] == "inflate"
+        assert features.strings[:2] == ["inflate", "deflate"]
+        assert "deflate" in features.strings
+        assert "crc32" not in features.strings
+        assert features.strings + features.functions == ["inflate", "deflate", "inflate", "inflate", "crc32"]
+        assert ["x"] + features.imports == ["x", "libc.so.6"]
+        assert sorted(set(features.functions)) == ["crc32", "inflate"]
+
+    def test_mutation(self, features):
+        """Test the mutating list methods"""
+        strings = features.strings
+        strings.extend(["adler32", "crc32"])
+        strings[0] = "compress"
+        del strings[1]
+        strings.insert(0, "uncompress")
+        strings += ["gzip"]
+
+        assert features.strings == ["uncompress", "compress", "inflate", "adler32", "crc32", "gzip"]
+
+        strings.sort()
+        assert features.strings == ["adler32", "compress", "crc32", "gzip", "inflate", "uncompress"]
+        strings.reverse()
+        assert features.strings[0] == "uncompress"
+        assert strings.pop() == "adler32"
+        strings.remove("gzip")
+        assert "gzip" not in features.strings
+
+    def test_single_item_mutation_masks(self, features):
+        """Test that a feature leaves a category only with its last occurrence"""
+        strings = features.strings
+        store = features.store
+        inflate = store.lookup("inflate")
+
+        del strings[0]
+        assert store.has(inflate, STRINGS)
+        strings[-1] = "crc32"
+        assert not store.has(inflate, STRINGS)
+        assert store.has(inflate, SYMBOLS | FUNCTIONS)
+        assert store.has(store.lookup("crc32"), STRINGS)
+
+        strings.insert(-1, "inflate")
+        strings.insert(100, "adler32")
+        assert features.strings == ["deflate", "inflate", "crc32", "adler32"]
+        assert strings.index("crc32") == 2 and strings.count("inflate") == 1
+        with pytest.raises(ValueError):
+            strings.index("crc32", 0, 2)
+        with pytest.raises(IndexError):
+            strings[10] = "x"
+        with pytest.raises(ValueError):
+            strings[::2] = ["x"]
+        del strings[::2]
+        assert features.strings == ["inflate", "adler32"]
+        assert not store.has(store.lookup("deflate"), STRINGS)
+
+    def test_single_item_mutation_scales(self):
+        """Test that pop, remove and item assignment do not rescan every feature"""
+        features = ExtractedFeatures(
+            file_path="/test/big.bin",
+            file_type="binary",
+            strings=[f"string_{i}" for i in range(100000)]
+        )
+        strings = features.strings
+        start = time.time()
+
+        for i in range(5000):
+            strings.pop()
+            strings[i] = f"replaced_{i}"
+        for i in range(0, 1000):
+            strings.remove(f"string_{5000 + i}")
+
+        assert time.time() - start < 30
+        assert len(strings) == 94000
+        assert strings[0] == "replaced_0" and "string_99999" not in strings
+
+    def test_assignment_replaces_category(self, features):
+        """Test that assigning a list, a generator or another view replaces the category"""
+        features.strings = (s.upper() for s in features.strings)
+        assert features.strings == ["INFLATE", "DEFLATE", "INFLATE"]
+
+        features.symbols = features.functions
+        assert features.symbols == ["inflate", "crc32"]
+
+        features.strings.extend(features.strings)
+        assert len(features.strings) == 6
+
+    def test_dedupe(self, features):
+        """Test that dedupe matches dict.fromkeys with a limit"""
+        features.strings.extend(["crc32", "deflate", "adler32"])
+        expected = list(dict.fromkeys(features.strings))[:3]
+
+        features.strings.dedupe(3)
+
+        assert features.strings == expected
+
+    def test_feature_count(self, features):
+        """Test that feature_count matches len(all_features)"""
+        assert features.feature_count == len(features.all_features) == 7
+        assert features.unique_features == {"inflate", "deflate", "crc32", "libc.so.6"}
@@ -0,0 +1,98 @@
+"""
+Tests for single-read file hashing
+"""
+
+import builtins
+import hashlib
+import random
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from binarysniffer.core.config import Config
+from binarysniffer.utils.file_metadata import FileDigests, calculate_file_hashes, read_file_once
+
+
+@pytest.fixture
+def temp_dir():
+    """Create temporary directory"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+@pytest.fixture
+def sample_file(temp_dir):
+    """Create an ELF-like file with random content and a few strings"""
+    rng = random.Random(3)
+    path = temp_dir / "libsample.so"
+    path.write_bytes(
+        b"\x7fELF" + bytes(rng.randrange(256) for _ in range(4096))
+        + b"\x00inflateInit2_\x00deflateEnd\x00"
+    )
+    return path
+
+
+class TestFileDigests:
+    """Test chunked digest computation"""
+
+    def test_chunked_digests_match_whole_content(self, sample_file):
+        """Test that digests fed in small chunks equal digests of the whole content"""
+        content = sample_file.read_bytes()
+        digests = FileDigests(["md5", "sha256"])
+        assert read_file_once(sample_file, [digests], chunk_size=100) == len(content)
+
+        assert digests.hexdigests() == {
+            "md5": hashlib.md5(content).hexdigest(),
+            "sha256": hashlib.sha256(content).hexdigest(),
+        }
+
+    def test_tlsh_streamed(self, sample_file):
+        """Test that the streamed TLSH hash equals tlsh.hash of the content"""
+        tlsh = pytest.importorskip("tlsh")
+        hashes = calculate_file_hashes(sample_file)
+        assert hashes["tlsh"] == tlsh.hash(sample_file.read_bytes())
+        assert list(hashes)[:3] == ["md5", "sha1", "sha256"]
+        assert "tlsh" not in calculate_file_hashes(sample_file, include_fuzzy=False)
+
+    def test_small_or_unreadable_file(self, temp_dir):
+        """Test that TLSH is skipped for tiny files and unreadable files give no hashes"""
+        path = temp_dir / "tiny.bin"
+        path.write_bytes(b"tiny")
+        assert set(calculate_file_hashes(path)) >= {"md5", "sha1", "sha256"}
+        assert "tlsh" not in calculate_file_hashes(path)
+        assert calculate_file_hashes(temp_dir / "missing.bin") == {}
+
+
+class TestAnalyzerSingleRead:
+    """Test that EnhancedBinarySniffer.analyze_file reads a file once"""
+
+    @pytest.fixture
+    def sniffer(self, temp_dir):
+        """Create analyzer with its own data directory"""
+        from binarysniffer.core.analyzer_enhanced import EnhancedBinarySniffer
+        return EnhancedBinarySniffer(Config(data_dir=temp_dir / ".binarysniffer", auto_update=False))
+
+    @pytest.mark.parametrize("use_cache", [False, True])
+    def test_hashes_and_strings_from_one_read(self, sniffer, sample_file, monkeypatch, use_cache):
+        """Test that hashes, TLSH, strings and the cache key share one read"""
+        sniffer.config.use_result_cache = use_cache
+        extractor = sniffer.extractor_factory.get_extractor(sample_file)
+        expected = extractor.extract(sample_file)
+
+        opened = []
+        real_open = builtins.open
+
+        def counting_open(file, *args, **kwargs):
+            if str(file) == str(sample_file):
+                opened.append(file)
+            return real_open(file, *args, **kwargs)
+
+        monkeypatch.setattr(builtins, "open", counting_open)
+        result = sniffer.analyze_file(sample_file, include_hashes=True, include_fuzzy_hashes=True)
+        monkeypatch.undo()
+
+        # Header probe plus one sequential read
+        assert len(opened) == 2
+        assert result.file_hashes == calculate_file_hashes(sample_file)
+        assert result.features_extracted == len(expected.strings) + len(expected.symbols)
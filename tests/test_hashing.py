@@ -97,16 +97,53 @@ class TestHashingUtils:
         mh1 = MinHash(num_perm=128)
         mh1.update_batch(["test", "data", "serialization"])
         
-        # Convert to bytes
+        # Convert to bytes (values fit in 32 bits: 4 bytes per permutation)
         data = mh1.to_bytes()
-        assert len(data) == 16  # Should be 16 bytes
+        assert len(data) == 128 * 4
+        assert MinHash.bulk([["test", "data", "serialization"]])[0].to_bytes() == data
         
         # Convert back
         mh2 = MinHash.from_bytes(data, num_perm=128)
-        
-        # First 16 hash values should match
-        for i in range(16):
-            assert mh1.hashvalues[i] & 0xFF == mh2.hashvalues[i]
+        assert mh2.hashvalues == mh1.hashvalues
+        assert mh1.jaccard(mh2) == 1.0
+        assert len(MinHash(num_perm=128).to_bytes()) == 128 * 4
+    
+    def test_minhash_legacy_bytes(self):
+        """Test that legacy 16-byte and uint64 MinHash values are rejected, not compared"""
+        with pytest.raises(ValueError):
+            MinHash.from_bytes(bytes(range(16)), num_perm=128)
+        with pytest.raises(ValueError):
+            MinHash.from_bytes(b"\x00" * 128 * 8, num_perm=128)
+        with pytest.raises(ValueError):
+            MinHash.from_bytes(b"\x00" * 24, num_perm=128)
+    
+    def test_minhash_bulk(self):
+        """Test that batch computation matches per-set computation"""
+        from binarysniffer.utils.hashing import compute_minhashes_for_string_sets
+        
+        string_sets = [["zlib_inflate"], [], ["png_read", "png_write", "png_read"], ["x" * 40]]
+        bulk = compute_minhashes_for_string_sets(string_sets, num_perm=64)
+        
+        assert len(bulk) == len(string_sets)
+        for minhash, strings in zip(bulk, string_sets):
+            expected = compute_minhash_for_strings(strings, num_perm=64)
+            assert minhash.to_bytes() == expected.to_bytes()
+            assert minhash.hashvalues == expected.hashvalues
+        assert bulk[1].hashvalues == [2**32 - 1] * 64
+    
+    def test_minhash_without_numpy(self):
+        """Test that the pure Python fallback gives identical values"""
+        from unittest.mock import patch
+        from binarysniffer.utils import hashing
+        
+        strings = [f"symbol_{i}" for i in range(100)]
+        vectorized = compute_minhash_for_strings(strings)
+        with patch.object(hashing, "HAS_NUMPY", False):
+            fallback = compute_minhash_for_strings(strings)
+            bulk = hashing.compute_minhashes_for_string_sets([strings[:10], strings])
+        
+        assert fallback.hashvalues == vectorized.hashvalues
+        assert bulk[1].hashvalues == vectorized.hashvalues
     
     def test_lsh_index(self):
         """Test LSH index functionality"""
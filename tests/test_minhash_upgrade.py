@@ -0,0 +1,94 @@
+"""
+Tests for recomputing MinHashes stored with another algorithm
+"""
+
+import sqlite3
+import struct
+
+import pytest
+
+from binarysniffer.index.minhash import MinHashIndex
+from binarysniffer.storage.database import SignatureDatabase
+from binarysniffer.utils.hashing import MINHASH_ALGORITHM, compute_minhash_for_strings
+
+
+PATTERNS = ["inflateInit2_", "deflateEnd", "zlib_version", "png_create_read_struct"]
+
+
+def stored_minhashes(db_path):
+    """Get the stored MinHash of each signature, by id"""
+    conn = sqlite3.connect(db_path)
+    try:
+        return dict(conn.execute("SELECT id, minhash FROM signatures ORDER BY id"))
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    """Database whose MinHashes predate the algorithm stamp (16-byte values)"""
+    db = SignatureDatabase(tmp_path / "signatures.db")
+    component_id = db.add_component("zlib", "1.2.13")
+    for pattern in PATTERNS:
+        db.add_signature(component_id, pattern, 1, 0.8, bytes(range(16)))
+
+    conn = sqlite3.connect(db.db_path)
+    conn.execute("DELETE FROM metadata WHERE key = 'minhash_algorithm'")
+    conn.commit()
+    conn.close()
+    return db.db_path
+
+
+class TestMinHashUpgrade:
+    """Test invalidation of MinHashes and indexes from another algorithm"""
+
+    def test_database_minhashes_recomputed(self, legacy_db):
+        """Test that opening a legacy database recomputes and stamps its MinHashes"""
+        db = SignatureDatabase(legacy_db)
+
+        minhashes = stored_minhashes(legacy_db)
+        assert list(minhashes.values()) == [compute_minhash_for_strings([p]).to_bytes() for p in PATTERNS]
+        assert db.get_metadata("minhash_algorithm") == MINHASH_ALGORITHM
+
+    def test_uint64_database_recomputed(self, legacy_db):
+        """Test that MinHashes stored as uint64 values are recomputed as uint32"""
+        conn = sqlite3.connect(legacy_db)
+        conn.execute("UPDATE signatures SET minhash = ?", (b"\x00" * 128 * 8,))
+        conn.execute("INSERT INTO metadata (key, value) VALUES ('minhash_algorithm', 'xxh32-mas-u64le-1')")
+        conn.commit()
+        conn.close()
+
+        SignatureDatabase(legacy_db)
+
+        assert {len(minhash) for minhash in stored_minhashes(legacy_db).values()} == {128 * 4}
+
+    def test_current_database_untouched(self, legacy_db):
+        """Test that stamped databases are not recomputed again"""
+        SignatureDatabase(legacy_db)
+        conn = sqlite3.connect(legacy_db)
+        conn.execute("UPDATE signatures SET minhash = ? WHERE id = 1", (b"\x00" * 512,))
+        conn.commit()
+        conn.close()
+
+        SignatureDatabase(legacy_db)
+
+        assert stored_minhashes(legacy_db)[1] == b"\x00" * 512
+
+    def test_legacy_index_removed(self, tmp_path, legacy_db):
+        """Test that an index without the algorithm header is deleted and can be rebuilt"""
+        index_path = tmp_path / "minhash.idx"
+        # Pre-header layout: bucket count, (band hash, offset, count) table, ids
+        index_path.write_bytes(struct.pack('<I', 1) + struct.pack('<QII', 42, 20, 1) + struct.pack('<I', 1))
+
+        index = MinHashIndex(index_path)
+
+        assert not index_path.exists()
+        assert not index.is_initialized()
+
+        db = SignatureDatabase(legacy_db)
+        index.build_index([(sig_id, minhash) for sig_id, minhash in stored_minhashes(db.db_path).items()])
+        reloaded = MinHashIndex(index_path)
+        assert reloaded.is_initialized()
+        assert 3 in reloaded.query(compute_minhash_for_strings(["zlib_version"]))
+        reloaded.close()
+        index.close()
@@ -0,0 +1,131 @@
+"""
+Tests for analyzing one representative per cluster of near-duplicate files
+"""
+
+import random
+import tempfile
+from pathlib import Path
+
+import pytest
+
+tlsh = pytest.importorskip("tlsh")
+
+from binarysniffer.core.base_analyzer import BaseAnalyzer
+from binarysniffer.core.config import Config
+from binarysniffer.core.results import AnalysisResult
+from binarysniffer.hashing.tlsh_hasher import TLSHHasher
+
+
+class StubAnalyzer(BaseAnalyzer):
+    """Analyzer that fails on files named bad* and records nothing else"""
+
+    def analyze_file(self, file_path, confidence_threshold=None):
+        file_path = Path(file_path)
+        if file_path.name.startswith("bad"):
+            return AnalysisResult.create_error(str(file_path), "unsupported")
+        return AnalysisResult(
+            file_path=str(file_path),
+            file_size=file_path.stat().st_size,
+            file_type="binary",
+            matches=[],
+            analysis_time=0.01,
+            features_extracted=len(file_path.read_bytes())
+        )
+
+
+@pytest.fixture(scope="module")
+def hashes():
+    """Create TLSH hashes of mutated variants of a few base blobs"""
+    rng = random.Random(7)
+    bases = [rng.randbytes(rng.choice([1000, 4000, 20000])) for _ in range(6)]
+    hashes = []
+    for _ in range(300):
+        data = bytearray(rng.choice(bases))
+        for _ in range(rng.randint(0, 100)):
+            data[rng.randrange(len(data))] = rng.randrange(256)
+        hashes.append(tlsh.hash(bytes(data)))
+    return hashes
+
+
+class TestClusterHashes:
+    """Test TLSHHasher.cluster_hashes"""
+
+    def test_cluster_hashes_greedy_order(self, hashes):
+        """Test that indexed clustering gives the same clusters as pairwise comparison"""
+        named = {f"f{i}": h for i, h in enumerate(hashes)}
+        named["empty"] = ""
+
+        expected = []
+        remaining = [key for key, h in named.items() if h]
+        while remaining:
+            first = remaining.pop(0)
+            members = [key for key in remaining if tlsh.diff(named[first], named[key]) <= 30]
+            remaining = [key for key in remaining if key not in members]
+            expected.append([first] + members)
+
+        assert TLSHHasher().cluster_hashes(named, 30) == expected
+
+
+class TestNearDuplicateClustering:
+    """Test analyze_directory(cluster_threshold=...)"""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Create a directory with near-identical variants of one library"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            scan_dir = tmpdir / "scan"
+            scan_dir.mkdir()
+            rng = random.Random(5)
+            base = bytes(rng.randrange(256) for _ in range(8192))
+            for i in range(4):
+                data = bytearray(base)
+                data[100 * i] ^= 0xFF
+                (scan_dir / f"abi{i}.so").write_bytes(b"\x7fELF" + bytes(data))
+            (scan_dir / "abi0.dll").write_bytes(b"\x7fELF" + base)
+            (scan_dir / "other.so").write_bytes(b"\x7fELF" + bytes(rng.randrange(256) for _ in range(8192)))
+            yield tmpdir
+
+    @pytest.fixture
+    def analyzer(self, temp_dir):
+        """Create a stub analyzer with its own data directory"""
+        config = Config(data_dir=temp_dir / ".binarysniffer", auto_update=False, parallel_workers=2)
+        return StubAnalyzer(config)
+
+    def test_representative_result_propagated(self, analyzer, temp_dir):
+        """Test that only cluster representatives are analyzed and members get their result"""
+        scan_dir = temp_dir / "scan"
+        calls = []
+        received = {}
+        batch = analyzer.analyze_directory(
+            scan_dir,
+            cluster_threshold=10,
+            progress_callback=lambda current, total, file_path=None: calls.append((current, total)),
+            result_callback=lambda file_path, result: received.setdefault(file_path, result)
+        )
+
+        # abi1-abi3.so copy abi0.so; other extensions and dissimilar files are analyzed
+        assert calls[-1] == (3, 3)
+        assert batch.propagated_files == 3
+        assert list(batch.results) == sorted(batch.results)
+        member = batch.results[str(scan_dir / "abi2.so")]
+        assert member.propagated_from["file_path"] == str(scan_dir / "abi0.so")
+        assert 0 < member.propagated_from["tlsh_distance"] <= 10
+        assert member.file_path == str(scan_dir / "abi2.so")
+        assert member.to_dict()["propagated_from"] == member.propagated_from
+        assert batch.results[str(scan_dir / "abi0.so")].propagated_from is None
+        assert batch.results[str(scan_dir / "abi0.dll")].propagated_from is None
+        assert batch.to_dict()["summary"]["propagated_files"] == 3
+        assert all(received[path] is result for path, result in batch.results.items())
+
+    def test_failed_representative_members_analyzed(self, analyzer, temp_dir):
+        """Test that members are analyzed themselves when their representative fails"""
+        scan_dir = temp_dir / "scan"
+        (scan_dir / "abi0.so").rename(scan_dir / "bad.so")
+        for i in range(1, 4):
+            (scan_dir / f"abi{i}.so").rename(scan_dir / f"lib{i}.so")
+
+        batch = analyzer.analyze_directory(scan_dir, cluster_threshold=10)
+        assert batch.propagated_files == 0
+        assert batch.failed_files == 1
+        assert not batch.results[str(scan_dir / "lib1.so")].error
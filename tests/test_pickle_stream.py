@@ -0,0 +1,186 @@
+"""
+Tests for streaming pickle opcode analysis
+"""
+
+import collections
+import io
+import mmap
+import os
+import pickle
+import pickletools
+import tracemalloc
+
+import pytest
+
+from binarysniffer.utils import pickle_stream
+from binarysniffer.utils.pickle_stream import PickleGlobal, scan_opcodes
+
+
+class SystemCall:
+    """Object whose pickle calls os.system (never unpickled here)"""
+
+    def __reduce__(self):
+        return (os.system, ('echo test',))
+
+
+class UnseekableStream(io.RawIOBase):
+    """Binary stream that can only be read forward"""
+
+    def __init__(self, data: bytes):
+        self._stream = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class GeneratedStream(io.RawIOBase):
+    """Unseekable stream of repeated bytes pieces, generated as it is read"""
+
+    def __init__(self, *pieces):
+        self._pieces = list(pieces)  # (piece, repeat count)
+        self._offset = 0  # Bytes of the first piece's repeats already read
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while self._pieces:
+            piece, count = self._pieces[0]
+            if self._offset < len(piece) * count:
+                break
+            self._pieces.pop(0)
+            self._offset = 0
+        else:
+            return 0
+        size = min(len(buffer), len(piece) * count - self._offset)
+        start = self._offset % len(piece)
+        data = (piece * (size // len(piece) + 2))[start:start + size]
+        buffer[:size] = data
+        self._offset += size
+        return size
+
+
+SAMPLE = {
+    'weights': b'\x00' * 200000,
+    'layers': [('conv1', 3.5), ('fc', None)],
+    'counts': collections.Counter('abc'),
+}
+
+
+class TestScanOpcodes:
+    """Test decoding and resolution of pickle opcodes"""
+
+    @pytest.mark.parametrize("protocol", range(pickle.HIGHEST_PROTOCOL + 1))
+    def test_matches_genops(self, protocol):
+        """Test that opcodes, arguments and positions match pickletools"""
+        data = pickle.dumps(SAMPLE, protocol=protocol)
+        expected = [(opcode.name, arg, pos) for opcode, arg, pos in pickletools.genops(data)]
+
+        ops = list(scan_opcodes(io.BytesIO(data), max_arg_length=1 << 22))
+
+        assert [op[:3] for op in ops] == expected
+
+    @pytest.mark.parametrize("protocol", range(pickle.HIGHEST_PROTOCOL + 1))
+    def test_resolves_calls(self, protocol):
+        """Test that imports and the callables REDUCE invokes are resolved"""
+        data = pickle.dumps([SystemCall(), collections.OrderedDict(a=1)], protocol=protocol)
+
+        targets = [(op.name, str(op.target)) for op in scan_opcodes(io.BytesIO(data)) if op.target]
+
+        import_op = 'STACK_GLOBAL' if protocol >= 4 else 'GLOBAL'
+        system = str(PickleGlobal(os.system.__module__, 'system'))
+        assert (import_op, system) in targets
+        assert ('REDUCE', system) in targets
+        assert ('REDUCE', 'collections.OrderedDict') in targets
+
+    def test_stack_global_from_memo(self):
+        """Test STACK_GLOBAL with a module name pushed again from the memo"""
+        data = pickle.dumps([collections.OrderedDict(), collections.Counter()], protocol=4)
+
+        imports = [str(op.target) for op in scan_opcodes(io.BytesIO(data)) if op.name == 'STACK_GLOBAL']
+
+        assert imports == ['collections.OrderedDict', 'collections.Counter']
+
+    def test_large_payloads_are_skipped(self, tmp_path):
+        """Test that payloads beyond the argument limit are skipped, not read"""
+        data = pickle.dumps(['x' * 100000, b'\x01' * 100000, SystemCall()], protocol=4)
+        path = tmp_path / "large.pkl"
+        path.write_bytes(data)
+
+        streams = {'bytes': io.BytesIO(data), 'unseekable': UnseekableStream(data)}
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            streams.update(file=f, mmap=mm)
+            for kind, stream in streams.items():
+                ops = list(scan_opcodes(stream, max_arg_length=16))
+
+                assert [op.arg for op in ops if op.name == 'BINUNICODE'] == ['x' * 16], kind
+                assert [op.arg for op in ops if op.name == 'BINBYTES'] == [b'\x01' * 16], kind
+                assert any(op.name == 'REDUCE' and op.target for op in ops), kind
+                assert ops[-1].name == 'STOP'
+
+    def test_long_lines_are_truncated(self, tmp_path):
+        """Test that protocol 0 lines beyond the argument limit are truncated on every stream type"""
+        data = pickle.dumps(['x' * 100000, 10 ** 4000, SystemCall()], protocol=0)
+        path = tmp_path / "large.pkl"
+        path.write_bytes(data)
+
+        streams = {'bytes': io.BytesIO(data), 'unseekable': io.BufferedReader(UnseekableStream(data))}
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            streams.update(file=f, mmap=mm)
+            for kind, stream in streams.items():
+                ops = list(scan_opcodes(stream, max_arg_length=16))
+
+                assert [op.arg for op in ops if op.name == 'UNICODE'] == ['x' * 16, 'echo test'], kind
+                assert [op.arg for op in ops if op.name == 'LONG'] == [None], kind
+                assert any(op.name == 'REDUCE' and op.target for op in ops), kind
+                assert ops[-1].name == 'STOP'
+
+    def test_bounded_memo(self, monkeypatch):
+        """Test that names evicted from the memo leave imports unresolved instead of failing"""
+        monkeypatch.setattr(pickle_stream, "MAX_MEMO_ENTRIES", 2)
+        data = pickle.dumps([collections.OrderedDict(), collections.Counter()], protocol=4)
+
+        ops = list(scan_opcodes(io.BytesIO(data)))
+        imports = [op.target for op in ops if op.name == 'STACK_GLOBAL']
+
+        # 'collections' was evicted before Counter fetched it again
+        assert imports == [PickleGlobal('collections', 'OrderedDict'), None]
+        assert ops[-1].name == 'STOP'
+
+    @pytest.mark.parametrize("pieces,name,expected", [
+        # Protocol 0 unicode string on one huge line
+        ([(b'V', 1), (b'x', 50 << 20), (b'\np0\n.', 1)], 'UNICODE', 'x' * 1024),
+        # Protocol 0 import with a huge module name
+        ([(b'c', 1), (b'm', 50 << 20), (b'\nsystem\n.', 1)], 'GLOBAL', 'm' * 1024 + ' system'),
+        # Integer with a huge byte count
+        ([(b'\x80\x02\x8b\x00\x00\x20\x03', 1), (b'\x01', 50 << 20), (b'.', 1)], 'LONG4', None),
+    ])
+    def test_oversized_arguments_bounded(self, pieces, name, expected):
+        """Test that oversized line and integer arguments are skipped, not held, on unseekable streams"""
+        stream = io.BufferedReader(GeneratedStream(*pieces))
+
+        tracemalloc.start()
+        try:
+            ops = list(scan_opcodes(stream, max_arg_length=1024))
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        assert [op.arg for op in ops if op.name == name] == [expected]
+        assert ops[-1].name == 'STOP'
+        assert peak < 8 * 1024 * 1024
+
+    @pytest.mark.parametrize("data,message", [
+        (b'\x80\x04\xff', "at position 2, opcode .* unknown"),
+        (b'\x80\x04\x8c\x05ab', "expected 5 bytes"),
+        (b'\x80\x04N', "exhausted before seeing STOP"),
+    ])
+    def test_malformed_pickles(self, data, message):
+        """Test that malformed pickles raise ValueError like pickletools"""
+        with pytest.raises(ValueError, match=message):
+            list(scan_opcodes(io.BytesIO(data)))
@@ -0,0 +1,172 @@
+"""
+Tests for protobuf wire-format scanning of ONNX and TensorFlow models
+"""
+
+import pytest
+
+from binarysniffer.extractors.onnx_model import ONNXModelExtractor
+from binarysniffer.extractors.protobuf_wire import (
+    Field,
+    ProtobufError,
+    decode_message,
+    iter_fields
+)
+from binarysniffer.extractors.tensorflow_native import TensorFlowNativeExtractor
+
+
+def varint(value: int) -> bytes:
+    """Encode a varint (negative values as 64-bit two's complement)"""
+    value &= (1 << 64) - 1
+    out = bytearray()
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def field(number: int, value) -> bytes:
+    """Encode an int as a varint field, and str/bytes as a length-delimited one"""
+    if isinstance(value, int):
+        return varint(number << 3) + varint(value)
+    if isinstance(value, str):
+        value = value.encode()
+    return varint(number << 3 | 2) + varint(len(value)) + value
+
+
+# Tensor payload the scanners must never read: it is full of patterns
+# that flag a model when they are found by content search
+POISON = b'exec eval /bin/sh reverse_tcp py_func ' * 2000
+
+
+def onnx_model() -> bytes:
+    """ONNX ModelProto with a subgraph, a large initializer and metadata"""
+    def node(op_type, name, *attributes):
+        return field(4, op_type) + field(3, name) + b''.join(field(5, a) for a in attributes)
+
+    then_branch = field(1, node('Relu', 'then_relu')) + field(2, 'then')
+    graph = (
+        field(1, node('Conv', 'resnet_layer1_conv'))
+        + field(1, node('If', 'branch', field(1, 'then_branch') + field(6, then_branch)))
+        + field(2, 'torch_jit')
+        + field(5, field(1, varint(64) + varint(3) + varint(7) + varint(7)) + field(8, 'conv.weight') + field(9, POISON))
+        + field(5, field(1, 64) + field(8, 'conv.bias'))
+        + field(11, field(1, 'input'))
+        + field(12, field(1, 'output'))
+    )
+    return (
+        field(1, 8)
+        + field(2, 'pytorch')
+        + field(3, '2.1.0')
+        + field(7, graph)
+        + field(8, field(1, '') + field(2, 17))
+        + field(14, field(1, 'author') + field(2, 'someone'))
+    )
+
+
+def tf_graph_def(*ops) -> bytes:
+    """TensorFlow GraphDef with a large Const tensor in a node attr"""
+    nodes = b''.join(field(1, field(1, f'model/{op.lower()}_{i}') + field(2, op)) for i, op in enumerate(ops))
+    const = field(1, field(1, 'model/conv1/kernel') + field(2, 'Const') + field(5, field(1, 'value') + field(2, POISON)))
+    return const + nodes
+
+
+class TestWireFormat:
+    """Test field walking and schema decoding"""
+
+    def test_iter_fields(self):
+        """Test that payloads are reported as spans, not read"""
+        data = field(1, 150) + field(2, b'abc') + b'\x1d\x01\x00\x00\x00'
+
+        assert list(iter_fields(data)) == [(1, 0, 150), (2, 2, (5, 8)), (3, 5, 1)]
+
+    def test_decode_message(self):
+        """Test decoding of listed fields, packed ints and negative values"""
+        schema = {
+            1: Field('dims', 'int', repeated=True),
+            2: Field('name', 'string'),
+            3: Field('child', 'message', schema={1: Field('value', 'int')}),
+        }
+        data = (field(1, varint(2) + varint(300)) + field(1, 5) + field(2, 'w')
+                + field(3, field(1, -1)) + field(9, POISON))
+
+        assert decode_message(data, schema) == {'dims': [2, 300, 5], 'name': 'w', 'child': {'value': -1}}
+
+    @pytest.mark.parametrize("data", [
+        b'\x0a\x05ab',                # Length past the end
+        b'\x08\xff\xff',              # Truncated varint
+        b'\x0b',                      # Group wire type
+        b'\x00\x01',                  # Field number 0
+        b'\x12\x01\x00',              # Wrong wire type for an int field
+    ])
+    def test_malformed(self, data):
+        """Test that malformed messages raise ProtobufError"""
+        with pytest.raises(ProtobufError):
+            decode_message(data, {2: Field('count', 'int')})
+
+    def test_nesting_limit(self):
+        """Test that recursion depth is bounded"""
+        schema = {}
+        schema[1] = Field('child', 'message', schema=schema)
+        data = b''
+        for _ in range(100):
+            data = field(1, data)
+
+        with pytest.raises(ProtobufError):
+            decode_message(data, schema)
+
+
+class TestModelScanning:
+    """Test ONNX and TensorFlow extraction from the wire format"""
+
+    def test_onnx_model(self, tmp_path):
+        """Test ONNX structure extraction without reading initializers"""
+        model_file = tmp_path / "model.onnx"
+        model_file.write_bytes(onnx_model())
+
+        features = ONNXModelExtractor().extract(model_file)
+
+        assert set(features.functions) == {'Conv', 'If', 'Relu'}
+        assert features.metadata['ir_version'] == 8
+        assert features.metadata['producer_name'] == 'pytorch'
+        assert features.metadata['graph_name'] == 'torch_jit'
+        assert features.metadata['num_weights'] == 2
+        assert features.metadata['total_parameters'] == 64 * 3 * 7 * 7 + 64
+        assert features.metadata['author'] == 'someone'
+        assert features.metadata['opset_'] == 17
+        assert 'onnx_opset::17' in features.strings
+        assert 'pytorch' in features.imports
+        assert 'resnet' in features.constants
+        assert features.metadata['risk_level'] == 'likely_safe'
+
+    def test_tensorflow_graph_def(self, tmp_path):
+        """Test GraphDef node extraction without reading Const tensors"""
+        pb_file = tmp_path / "frozen.pb"
+        pb_file.write_bytes(tf_graph_def('Conv2D', 'BiasAdd', 'Relu'))
+
+        features = TensorFlowNativeExtractor().extract(pb_file)
+
+        assert sorted(features.functions) == ['BiasAdd', 'Const', 'Conv2D', 'Relu']
+        assert features.metadata['format_type'] == 'GraphDef'
+        assert features.metadata['node_count'] == 4
+        assert 'model/conv1/kernel' in features.constants
+        assert features.metadata['risk_level'] == 'safe'
+
+    def test_tensorflow_saved_model(self, tmp_path):
+        """Test SavedModel meta graphs, versions and PyFunc detection"""
+        meta_info = field(4, 'serve') + field(5, '2.15.0')
+        saved_model = field(1, 1) + field(2, field(1, meta_info) + field(2, tf_graph_def('MatMul', 'EagerPyFunc')))
+        pb_file = tmp_path / "saved_model.pb"
+        pb_file.write_bytes(saved_model)
+
+        features = TensorFlowNativeExtractor().extract(pb_file)
+
+        assert features.metadata['format_type'] == 'SavedModel'
+        assert features.metadata['tensorflow_version'] == '2.15.0'
+        assert features.metadata['tags'] == ['serve']
+        assert 'EagerPyFunc' in features.functions
+        assert features.metadata['suspicious_operations'] == ['EagerPyFunc']
+        assert features.metadata['risk_level'] == 'suspicious'
@@ -4,6 +4,7 @@ Tests for PyTorch native format extractor
 
 import pickle
 import tempfile
+import zipfile
 from pathlib import Path
 
 import pytest
@@ -222,4 +223,58 @@ def test_pytorch_modules_tracking(extractor, tmp_path):
     features = extractor.extract(pt_file)
     
     assert features.file_type == 'pytorch'
-    assert 'pytorch_native_format' in features.strings
\ No newline at end of file
+    assert 'pytorch_native_format' in features.strings
+
+def create_zip_checkpoint(path: Path, data: dict) -> bytes:
+    """Create a zip-format checkpoint (as torch.save writes) with two storages."""
+    storage = bytes(range(256)) * 64
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr('model/data.pkl', pickle.dumps(data, protocol=2))
+        zf.writestr('model/byteorder', 'little')
+        zf.writestr('model/data/0', storage)
+        zf.writestr('model/data/1', storage[:1024])
+        zf.writestr('model/version', '3\n')
+    return storage
+
+
+def test_zip_checkpoint_reads_pickle_only(extractor, tmp_path):
+    """Test that zip checkpoints are analyzed without reading tensor storages."""
+    pt_file = tmp_path / "checkpoint.pt"
+    storage = create_zip_checkpoint(pt_file, {
+        'model_state_dict': {'layer1.weight': 0, 'fc.bias': 1},
+        'optimizer_state_dict': {'state': {}},
+    })
+    fingerprint = extractor.extract(pt_file).metadata['storage_fingerprint']
+
+    # Corrupt the storage bytes in place: reading them would fail the CRC check
+    content = pt_file.read_bytes()
+    offset = content.index(storage)
+    pt_file.write_bytes(content[:offset] + bytes(len(storage)) + content[offset + len(storage):])
+
+    assert extractor.can_handle(pt_file)
+    features = extractor.extract(pt_file)
+
+    assert 'extraction_error' not in features.metadata
+    assert features.metadata['container'] == 'zip'
+    assert features.metadata['has_state_dict'] is True
+    assert features.metadata['has_optimizer'] is True
+    assert features.metadata['storage_count'] == 2
+    assert features.metadata['storage_bytes'] == len(storage) + 1024
+    assert features.metadata['storage_fingerprint'] == fingerprint
+    assert 'layer1.weight' in features.constants
+
+
+def test_stack_global_memoized_module(extractor, tmp_path):
+    """Test that module names reused through the memo resolve STACK_GLOBAL."""
+    import collections
+
+    pt_file = tmp_path / "globals.pt"
+    pt_file.write_bytes(pickle.dumps({
+        'state_dict': {'layer1.weight': b'data'},
+        'first': collections.OrderedDict,
+        'second': collections.Counter,
+    }, protocol=4))
+
+    features = extractor.extract(pt_file)
+
+    assert features.imports == ['collections.OrderedDict', 'collections.Counter']
@@ -0,0 +1,160 @@
+"""
+Tests for the content-addressed analysis result cache
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from binarysniffer.core.config import Config
+from binarysniffer.core.results import AnalysisResult, ComponentMatch
+from binarysniffer.storage.result_cache import ResultCache
+
+
+def make_result(file_path: str, payload: bytes = b"") -> AnalysisResult:
+    """Create a result carrying an optional incompressible payload"""
+    return AnalysisResult(
+        file_path=file_path,
+        file_size=len(payload),
+        file_type="binary",
+        matches=[ComponentMatch(
+            component="zlib@1.2.13",
+            ecosystem="native",
+            confidence=0.9,
+            evidence={'file_path': file_path, 'blob': payload}
+        )],
+        analysis_time=0.5,
+        features_extracted=10
+    )
+
+
+class TestResultCache:
+    """Test ResultCache storage, counters and eviction"""
+
+    @pytest.fixture
+    def cache_dir(self):
+        """Create temporary cache directory"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+
+    def test_round_trip_and_counters(self, cache_dir):
+        """Test that stored results come back and hits/misses are counted"""
+        cache = ResultCache(cache_dir, 10)
+        key = cache.make_key("abc", "1.0:10:10:1", {'threshold': 0.5})
+
+        assert cache.get(key) is None
+        cache.put(key, make_result("/a/libz.so"))
+        cached = cache.get(key)
+
+        assert cached.file_path == "/a/libz.so"
+        assert cached.matches[0].component == "zlib@1.2.13"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        # Totals persist for other processes using the same directory
+        stats = ResultCache(cache_dir, 10).stats()
+        assert stats['entries'] == 1
+        assert (stats['hits'], stats['misses']) == (1, 1)
+
+    def test_key_covers_inputs(self, cache_dir):
+        """Test that content, signature stamp and options all change the key"""
+        base = ResultCache.make_key("abc", "stamp", {'deep': False})
+
+        assert ResultCache.make_key("abc", "stamp", {'deep': False}) == base
+        assert ResultCache.make_key("abd", "stamp", {'deep': False}) != base
+        assert ResultCache.make_key("abc", "stamp2", {'deep': False}) != base
+        assert ResultCache.make_key("abc", "stamp", {'deep': True}) != base
+
+    def test_lru_eviction(self, cache_dir):
+        """Test that least recently used entries are evicted over the size limit"""
+        cache = ResultCache(cache_dir, 1)
+        keys = [cache.make_key(str(i), "stamp", {}) for i in range(5)]
+
+        for key in keys[:3]:
+            cache.put(key, make_result(key, os.urandom(300 * 1024)))
+        cache.get(keys[0])  # Refresh the oldest entry
+        for key in keys[3:]:
+            cache.put(key, make_result(key, os.urandom(300 * 1024)))
+
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[4]) is not None
+        assert cache.stats()['size_bytes'] <= 1024 * 1024
+
+    def test_clear(self, cache_dir):
+        """Test that clear removes entries and resets counters"""
+        cache = ResultCache(cache_dir, 10)
+        key = cache.make_key("abc", "stamp", {})
+        cache.put(key, make_result("/a/libz.so"))
+        cache.get(key)
+
+        cache.clear()
+        assert cache.stats() == {
+            'entries': 0, 'size_bytes': 0, 'max_size_bytes': 10 * 1024 * 1024, 'hits': 0, 'misses': 0
+        }
+
+
+class TestAnalyzerResultCache:
+    """Test result caching in EnhancedBinarySniffer.analyze_file"""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Create temporary directory"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+
+    @pytest.fixture
+    def sniffer(self, temp_dir):
+        """Create analyzer with its own data directory"""
+        from binarysniffer.core.analyzer_enhanced import EnhancedBinarySniffer
+        return EnhancedBinarySniffer(Config(data_dir=temp_dir / ".binarysniffer", auto_update=False))
+
+    def test_identical_content_hits_cache(self, sniffer, temp_dir):
+        """Test that a copy of an analyzed file is served from the cache"""
+        content = b"\x7fELF" + b"\x00" * 64 + b"inflateInit2_ deflateEnd zlib 1.2.13 Jean-loup Gailly"
+        first = temp_dir / "build1" / "libz.so"
+        second = temp_dir / "build2" / "libz.so"
+        for path in (first, second):
+            path.parent.mkdir()
+            path.write_bytes(content)
+
+        result1 = sniffer.analyze_file(first)
+        result2 = sniffer.analyze_file(second)
+
+        assert sniffer.result_cache.hits == 1
+        assert result2.file_path == str(second)
+        assert [m.component for m in result2.matches] == [m.component for m in result1.matches]
+        for match in result2.matches:
+            assert str(first) not in match.evidence.values()
+
+    def test_options_and_disable(self, sniffer, temp_dir):
+        """Test that different options miss and that caching can be turned off"""
+        path = temp_dir / "libfoo.so"
+        path.write_bytes(b"\x7fELF" + os.urandom(256))
+
+        sniffer.analyze_file(path)
+        sniffer.analyze_file(path, show_features=True)
+        assert (sniffer.result_cache.hits, sniffer.result_cache.misses) == (0, 2)
+
+        sniffer.config.use_result_cache = False
+        assert sniffer.result_cache is None
+        sniffer.analyze_file(path)
+
+    def test_hit_skips_matching(self, sniffer, temp_dir):
+        """Test that a cache hit reads the file once and skips feature matching"""
+        from unittest.mock import patch
+
+        path = temp_dir / "libz.so"
+        path.write_bytes(b"\x7fELF" + b"\x00" * 64 + b"inflateInit2_ deflateEnd zlib 1.2.13")
+        first = sniffer.analyze_file(path)
+
+        with patch.object(sniffer, '_read_once', wraps=sniffer._read_once) as read_once, \
+                patch.object(sniffer.direct_matcher, 'match') as match:
+            result = sniffer.analyze_file(path)
+
+        assert sniffer.result_cache.hits == 1
+        assert result.file_path == str(path)
+        assert result.content_sha256 == first.content_sha256 is not None
+        assert read_once.call_count == 1
+        match.assert_not_called()
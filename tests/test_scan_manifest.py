@@ -0,0 +1,169 @@
+"""
+Tests for incremental directory analysis with scan manifests
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from binarysniffer.core.base_analyzer import BaseAnalyzer
+from binarysniffer.core.config import Config
+from binarysniffer.core.results import AnalysisResult
+from binarysniffer.storage.scan_manifest import ScanManifest
+
+
+class StubAnalyzer(BaseAnalyzer):
+    """Analyzer that fails on files named bad* and records nothing else"""
+
+    def analyze_file(self, file_path, confidence_threshold=None):
+        file_path = Path(file_path)
+        if file_path.name.startswith("bad"):
+            return AnalysisResult.create_error(str(file_path), "unsupported")
+        return AnalysisResult(
+            file_path=str(file_path),
+            file_size=file_path.stat().st_size,
+            file_type="binary",
+            matches=[],
+            analysis_time=0.01,
+            features_extracted=len(file_path.read_bytes())
+        )
+
+
+class TestScanManifest:
+    """Test ScanManifest change detection and persistence"""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Create temporary directory"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+
+    def record(self, manifest, path):
+        """Record a successful result for path"""
+        result = AnalysisResult(str(path), path.stat().st_size, "binary", [], 0.0, 0)
+        manifest.record(path, result, manifest.stat(path))
+
+    def test_unchanged_touched_and_modified(self, temp_dir):
+        """Test that unchanged and touched files are reused and modified ones are not"""
+        files = {name: temp_dir / name for name in ("same.so", "touched.so", "modified.so")}
+        for path in files.values():
+            path.write_bytes(b"\x7fELF" + path.name.encode())
+
+        manifest = ScanManifest.for_directory(temp_dir / "manifests", "scan", "fp")
+        for path in files.values():
+            self.record(manifest, path)
+        manifest.save()
+
+        st = files["touched.so"].stat()
+        os.utime(files["touched.so"], ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        files["modified.so"].write_bytes(b"\x7fELF" + b"X" * len("modified.so"))
+
+        manifest = ScanManifest.for_directory(temp_dir / "manifests", "scan", "fp")
+        assert manifest.lookup(files["same.so"]) is not None
+        assert manifest.lookup(files["touched.so"]) is not None
+        assert manifest.lookup(files["modified.so"]) is None
+        assert manifest.lookup(temp_dir / "new.so") is None
+
+    def test_fingerprint_and_errors(self, temp_dir):
+        """Test that a different fingerprint discards the manifest and errors are not recorded"""
+        good = temp_dir / "good.so"
+        good.write_bytes(b"\x7fELF")
+
+        manifest = ScanManifest.for_directory(temp_dir, "scan", "fp")
+        self.record(manifest, good)
+        manifest.record(temp_dir / "bad.so", AnalysisResult.create_error(str(temp_dir / "bad.so"), "x"), (1, 1, 1))
+        manifest.save()
+
+        assert len(ScanManifest.for_directory(temp_dir, "scan", "fp")._previous) == 1
+        assert ScanManifest.for_directory(temp_dir, "scan", "other").lookup(good) is None
+        assert ScanManifest.for_directory(temp_dir, "other", "fp").lookup(good) is None
+
+
+    def test_record_reuses_content_hash(self, temp_dir, monkeypatch):
+        """Test that a hash computed during analysis is recorded without re-reading the file"""
+        from binarysniffer.storage import scan_manifest
+
+        path = temp_dir / "libz.so"
+        path.write_bytes(b"\x7fELF")
+        expected = scan_manifest.compute_file_sha256(path)
+
+        def no_rehash(file_path):
+            raise AssertionError("file hashed again")
+
+        monkeypatch.setattr(scan_manifest, "compute_file_sha256", no_rehash)
+        manifest = ScanManifest.for_directory(temp_dir, "scan", "fp")
+        result = AnalysisResult(str(path), 4, "binary", [], 0.0, 0, content_sha256=expected)
+        manifest.record(path, result, manifest.stat(path))
+
+        assert manifest.entries[str(path.resolve())][1] == expected
+
+
+class TestIncrementalAnalysis:
+    """Test analyze_directory(incremental=True)"""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Create a directory with a handful of files"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            scan_dir = tmpdir / "scan"
+            scan_dir.mkdir()
+            for i in range(6):
+                (scan_dir / f"lib{i}.so").write_bytes(b"\x7fELF" + bytes(i))
+            (scan_dir / "bad.so").write_bytes(b"\x7fELF")
+            yield tmpdir
+
+    @pytest.fixture
+    def analyzer(self, temp_dir):
+        """Create a stub analyzer with its own data directory"""
+        config = Config(data_dir=temp_dir / ".binarysniffer", auto_update=False, parallel_workers=2)
+        return StubAnalyzer(config)
+
+    def test_rescan_only_changed_files(self, analyzer, temp_dir):
+        """Test that a re-scan analyzes only changed, new and failed files"""
+        scan_dir = temp_dir / "scan"
+        first = analyzer.analyze_directory(scan_dir, incremental=True)
+        assert first.unchanged_files == 0
+        assert first.failed_files == 1
+
+        (scan_dir / "lib0.so").write_bytes(b"\x7fELF changed")
+        (scan_dir / "lib9.so").write_bytes(b"\x7fELF new")
+        calls = []
+        received = {}
+        second = analyzer.analyze_directory(
+            scan_dir,
+            incremental=True,
+            progress_callback=lambda current, total, file_path=None: calls.append((current, total)),
+            result_callback=lambda file_path, result: received.setdefault(file_path, result)
+        )
+
+        # lib1-lib5 reused; lib0, lib9 and the failed bad.so analyzed again
+        assert second.unchanged_files == 5
+        assert calls[-1] == (3, 3)
+        assert list(second.results) == sorted(second.results)
+        assert second.total_files == 8
+        assert second.results[str(scan_dir / "lib0.so")].features_extracted == len(b"\x7fELF changed")
+        assert second.to_dict()["summary"]["unchanged_files"] == 5
+        # Reused results are passed on too
+        assert received.keys() == second.results.keys()
+
+    def test_removed_files_dropped(self, analyzer, temp_dir):
+        """Test that deleted files disappear from the next scan"""
+        scan_dir = temp_dir / "scan"
+        analyzer.analyze_directory(scan_dir, incremental=True)
+        (scan_dir / "lib3.so").unlink()
+
+        batch = analyzer.analyze_directory(scan_dir, incremental=True)
+        assert str(scan_dir / "lib3.so") not in batch.results
+        assert batch.unchanged_files == 5
+        assert batch.total_files == 6
+
+    def test_threshold_change_invalidates(self, analyzer, temp_dir):
+        """Test that different analysis options re-analyze everything"""
+        scan_dir = temp_dir / "scan"
+        analyzer.analyze_directory(scan_dir, incremental=True, confidence_threshold=0.5)
+
+        batch = analyzer.analyze_directory(scan_dir, incremental=True, confidence_threshold=0.9)
+        assert batch.unchanged_files == 0
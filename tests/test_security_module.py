@@ -14,6 +14,9 @@ from binarysniffer.security.risk_scorer import RiskScorer, RiskLevel, RiskAssess
 from binarysniffer.security.pickle_analyzer import PickleSecurityAnalyzer
 from binarysniffer.security.obfuscation import ObfuscationDetector
 from binarysniffer.security.validators import ModelIntegrityValidator, ValidationStatus
+from binarysniffer.security.model_file import ModelFile
+from binarysniffer.security.ml_scanner import MLModelScanner
+from binarysniffer.core.config import Config
 
 
 class TestMaliciousPatterns:
@@ -191,6 +194,19 @@ class TestPickleSecurityAnalyzer:
         high_entropy = analyzer._calculate_entropy(high_entropy_data)
         assert high_entropy > 5
 
+    def test_reduce_resolves_memoized_callable(self):
+        """Test that REDUCE is traced to the global it calls, not just the opcode before it"""
+        analyzer = PickleSecurityAnalyzer()
+
+        # os.system imported via memoized strings, then called after building its arguments
+        content = (b'\x80\x04\x8c\x02os\x94\x8c\x06system\x94\x93\x94'
+                   b'\x8c\x07echo hi\x94\x85\x94R\x94.')
+        opcodes = analyzer._analyze_opcodes(content)
+
+        assert 'os.system' in opcodes['imports']
+        assert 'dangerous_reduce:os.system' in opcodes['features']
+        assert 'known_exploit_sequence' not in opcodes['features']
+
 
 class TestObfuscationDetector:
     """Test obfuscation detection"""
@@ -218,6 +234,15 @@ class TestObfuscationDetector:
         
         assert any('base64' in tech for tech in result['techniques'])
     
+    def test_leading_lines_capped(self, monkeypatch):
+        """Test that the bytes decoded for pattern checks stay bounded"""
+        monkeypatch.setattr(ObfuscationDetector, "MAX_LEADING_BYTES", 64)
+        
+        assert ObfuscationDetector._leading_lines(b"a\nb\nc", max_lines=2) == b"a\nb"
+        assert ObfuscationDetector._leading_lines(b"a\nb\nc") == b"a\nb\nc"
+        assert ObfuscationDetector._leading_lines(b"x" * 1000) == b"x" * 64
+        assert ObfuscationDetector._leading_lines(b"x\n" * 1000) == b"x\n" * 32
+    
     def test_encoding_function_detection(self):
         """Test detection of encoding functions"""
         detector = ObfuscationDetector()
@@ -377,6 +402,41 @@ class TestIntegration:
         finally:
             Path(temp_path).unlink()
     
+    def test_shared_model_file(self):
+        """Test that analyzers give the same results on a shared mapping, hashing once"""
+        malicious = b'\x80\x04\x95\x15\x00\x00\x00\x00\x00\x00\x00\x8c\x02os\x94\x8c\x06system\x94\x93\x94.'
+        with tempfile.NamedTemporaryFile(suffix='.pkl', delete=False) as f:
+            f.write(malicious + b'base64 zlib eJy /bin/sh\n' * 3)
+            temp_path = f.name
+        
+        try:
+            import hashlib
+            pickle_analyzer = PickleSecurityAnalyzer()
+            obfusc_detector = ObfuscationDetector()
+            validator = ModelIntegrityValidator()
+            content = Path(temp_path).read_bytes()
+            expected_hash = hashlib.sha256(content).hexdigest()
+            
+            _, expected_features = pickle_analyzer.analyze_pickle(temp_path)
+            expected_obfuscation = obfusc_detector.detect_obfuscation(content, expected_features)
+            
+            with ModelFile(temp_path) as model_file, \
+                    patch('hashlib.sha256', wraps=hashlib.sha256) as sha256:
+                _, features = pickle_analyzer.analyze_pickle(temp_path, model_file)
+                obfuscation = obfusc_detector.detect_obfuscation(model_file.data, features)
+                result = validator.validate_model(
+                    temp_path, 'pickle', expected_hash=expected_hash, model_file=model_file
+                )
+                assert sha256.call_count == 1
+            
+            assert features == expected_features
+            assert 'import:os.system' in features
+            assert sorted(obfuscation['techniques']) == sorted(expected_obfuscation['techniques'])
+            hash_check = next(c for c in result.checks if c.check_type == 'hash_verification')
+            assert hash_check.status == ValidationStatus.VALID
+        finally:
+            Path(temp_path).unlink()
+    
     def test_risk_assessment_serialization(self):
         """Test risk assessment JSON serialization"""
         scorer = RiskScorer()
@@ -420,5 +480,105 @@ class TestIntegration:
             Path(temp_path).unlink()
 
 
+class HangingScanner(MLModelScanner):
+    """Scanner that hangs on files whose name starts with 'hang'"""
+    
+    def scan_file(self, file_path):
+        if Path(file_path).name.startswith('hang'):
+            import time
+            time.sleep(120)
+        return super().scan_file(file_path)
+
+
+class TestMLModelScanner:
+    """Test scanning many model files in worker processes"""
+    
+    @pytest.fixture
+    def model_dir(self):
+        """Create a directory of safe and malicious pickles and an ONNX file"""
+        malicious = b'\x80\x04\x95\x15\x00\x00\x00\x00\x00\x00\x00\x8c\x02os\x94\x8c\x06system\x94\x93\x94.'
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            for i in range(6):
+                (tmpdir / f'model{i}.pkl').write_bytes(pickle.dumps({'weights': list(range(i * 10))}))
+            (tmpdir / 'evil.pkl').write_bytes(malicious)
+            (tmpdir / 'model.onnx').write_bytes(b'\x08\x07' + bytes(range(256)))
+            yield tmpdir
+    
+    @pytest.fixture
+    def config(self, model_dir):
+        return Config(data_dir=model_dir / '.binarysniffer', auto_update=False, parallel_workers=2)
+    
+    def test_parallel_matches_sequential(self, model_dir, config):
+        """Test that worker processes give the serial results, in file order"""
+        files = sorted(model_dir.glob('*.*'))
+        scanner = MLModelScanner(config)
+        scanner.show_features = True
+        
+        parallel = scanner.scan_files(files, RiskLevel.SAFE)
+        sequential = [scanner.scan_file(f) for f in files]
+        
+        assert [r['file'] for r in parallel] == [str(f) for f in files]
+        for result, expected in zip(parallel, sequential):
+            assert result['type'] == expected['type']
+            assert result['integrity'].status == expected['integrity'].status
+            if expected['type'] == 'pickle':
+                assert result['risk_assessment'].level == expected['risk_assessment'].level
+                assert sorted(result['features']) == sorted(expected['features'])
+        evil = next(r for r in parallel if r['file'].endswith('evil.pkl'))
+        assert 'import:os.system' in evil['features']
+        
+        # Safe pickles fall below the default LOW threshold; files without
+        # a risk assessment are always reported
+        reported = [Path(r['file']).name for r in scanner.scan_files(files)]
+        assert reported == ['evil.pkl', 'model.onnx']
+    
+    def test_timeout_kills_worker(self, model_dir, config):
+        """Test that a hanging file times out without stopping the others"""
+        (model_dir / 'hang.pkl').write_bytes(pickle.dumps([1, 2, 3]))
+        files = sorted(model_dir.glob('*.*'))
+        scanner = HangingScanner(config)
+        scanner.file_timeout = 2
+        calls = []
+        
+        import time
+        start = time.time()
+        results = scanner.scan_files(
+            files, RiskLevel.SAFE, progress_callback=lambda current, total, file_path: calls.append((current, total))
+        )
+        
+        assert time.time() - start < 30
+        assert len(results) == len(files)
+        hang = next(r for r in results if r['file'].endswith('hang.pkl'))
+        assert 'timeout' in hang['error'].lower()
+        assert hang['type'] == 'pickle'
+        assert all('error' not in r for r in results if r is not hang)
+        assert calls[-1] == (len(files), len(files))
+    
+    @pytest.mark.parametrize("pool_available", [True, False])
+    def test_in_process_timeout(self, model_dir, config, monkeypatch, pool_available):
+        """Test that a single file and the sequential fallback also time out"""
+        from binarysniffer.core import worker_pool
+        
+        (model_dir / 'hang.pkl').write_bytes(pickle.dumps([1, 2, 3]))
+        files = [model_dir / 'hang.pkl'] if pool_available else sorted(model_dir.glob('*.*'))
+        if not pool_available:
+            def unavailable(*args, **kwargs):
+                raise OSError("no processes")
+            monkeypatch.setattr(worker_pool.WorkerPool, 'run', unavailable)
+        scanner = HangingScanner(config)
+        scanner.file_timeout = 1
+        
+        import time
+        start = time.time()
+        results = scanner.scan_files(files, RiskLevel.SAFE)
+        
+        assert time.time() - start < 30
+        assert len(results) == len(files)
+        hang = next(r for r in results if r['file'].endswith('hang.pkl'))
+        assert 'timeout' in hang['error'].lower()
+        assert all('error' not in r for r in results if r is not hang)
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
\ No newline at end of file
@@ -0,0 +1,144 @@
+"""
+Tests for bulk signature import
+"""
+
+import json
+import sqlite3
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from binarysniffer.core.config import Config
+from binarysniffer.signatures.manager import SignatureManager
+from binarysniffer.storage.database import SIGNATURE_INDEXES, SignatureDatabase
+from binarysniffer.utils.hashing import compute_minhash_for_strings
+
+
+PATTERNS = ["inflateInit2_", "deflateEnd", "zlib_version", "ab", "png_create_read_struct"]
+
+
+def dump(db_path: Path):
+    """Get all signature rows and trigrams of a database"""
+    conn = sqlite3.connect(db_path)
+    try:
+        return (
+            conn.execute("SELECT id, component_id, signature_hash, signature_compressed, "
+                         "sig_type, confidence, minhash FROM signatures ORDER BY id").fetchall(),
+            conn.execute("SELECT trigram, signature_id, position FROM trigrams "
+                         "ORDER BY trigram, signature_id").fetchall()
+        )
+    finally:
+        conn.close()
+
+
+def count(db_path: Path, table: str) -> int:
+    """Count the rows of a table"""
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def index_names(db_path: Path):
+    """Get the names of the explicitly created indexes"""
+    conn = sqlite3.connect(db_path)
+    try:
+        return {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+        )}
+    finally:
+        conn.close()
+
+
+class TestBulkImport:
+    """Test SignatureDatabase.bulk_import()"""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Create temporary directory"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+
+    def test_matches_row_by_row_import(self, temp_dir):
+        """Test that bulk import stores the same rows as add_signature"""
+        single = SignatureDatabase(temp_dir / "single.db")
+        component_id = single.add_component("zlib", "1.2.13")
+        for pattern in PATTERNS:
+            single.add_signature(component_id, pattern, 1, 0.8, compute_minhash_for_strings([pattern]).to_bytes())
+
+        bulk = SignatureDatabase(temp_dir / "bulk.db")
+        with bulk.bulk_import() as writer:
+            component_id = writer.add_component("zlib", "1.2.13")
+            for pattern in PATTERNS:
+                writer.add_signature(component_id, SignatureDatabase.prepare_signature(
+                    pattern, 1, 0.8, compute_minhash_for_strings([pattern]).to_bytes()
+                ))
+
+        assert dump(bulk.db_path) == dump(single.db_path)
+        assert index_names(bulk.db_path) == set(SIGNATURE_INDEXES)
+
+    def test_rollback_on_error(self, temp_dir):
+        """Test that a failed import leaves the database and its indexes unchanged"""
+        db = SignatureDatabase(temp_dir / "sigs.db")
+        with pytest.raises(RuntimeError):
+            with db.bulk_import() as writer:
+                component_id = writer.add_component("zlib")
+                writer.add_signature(component_id, SignatureDatabase.prepare_signature("inflateInit2_", 1, 0.8, None))
+                writer.flush()
+                raise RuntimeError("boom")
+
+        assert dump(db.db_path) == ([], [])
+        assert count(db.db_path, "components") == 0
+        assert index_names(db.db_path) == set(SIGNATURE_INDEXES)
+
+
+class TestSignatureFileImport:
+    """Test SignatureManager importing JSON signature files"""
+
+    @pytest.fixture
+    def manager(self):
+        """Create manager with an empty database and a directory of signature files"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            sig_dir = tmpdir / "signatures"
+            sig_dir.mkdir()
+            for name in ("zlib", "libpng"):
+                (sig_dir / f"{name}.json").write_text(json.dumps({
+                    "component": {"name": name, "version": "1.0", "license": "Zlib"},
+                    "signatures": [
+                        {"pattern": f"{name}_{p}", "type": "string_pattern", "confidence": 0.9} for p in PATTERNS
+                    ] + [{"pattern": "xy"}]
+                }))
+            (sig_dir / "broken.json").write_text("{not json")
+
+            config = Config(data_dir=tmpdir / ".binarysniffer", auto_update=False)
+            yield SignatureManager(config, SignatureDatabase(tmpdir / "sigs.db")), sig_dir
+
+    def test_import_directory(self, manager):
+        """Test that valid files are imported, short patterns and broken files skipped"""
+        manager, sig_dir = manager
+
+        assert manager.import_directory(sig_dir) == 2 * len(PATTERNS)
+        assert count(manager.db.db_path, "components") == 2
+        assert count(manager.db.db_path, "signatures") == 2 * len(PATTERNS)
+
+    def test_reimport_skips_existing(self, manager):
+        """Test that existing components are skipped unless forced"""
+        manager, sig_dir = manager
+        manager.import_directory(sig_dir)
+
+        assert manager.import_directory(sig_dir) == 0
+        assert manager.import_directory(sig_dir, force=True) == 2 * len(PATTERNS)
+
+    def test_null_and_short_patterns_skipped(self, manager):
+        """Test that entries with a null or short pattern are skipped, not the whole file"""
+        manager, sig_dir = manager
+        (sig_dir / "libjpeg.json").write_text(json.dumps({
+            "component": {"name": "libjpeg", "version": "9e"},
+            "signatures": [{"pattern": None}, {"pattern": "jp"}, {}, {"pattern": "jpeg_read_header"}]
+        }))
+
+        assert manager.import_directory(sig_dir) == 2 * len(PATTERNS) + 1
+        assert count(manager.db.db_path, "components") == 3
@@ -277,4 +277,43 @@ class TestStaticLibraryExtractor:
         # Check limits are enforced
         assert len(features.strings) <= 10000
         assert len(features.symbols) <= 5000
-        assert len(features.functions) <= 2000
\ No newline at end of file
+        assert len(features.functions) <= 2000
+
+    def test_parse_records_offsets_only(self, extractor, temp_dir):
+        """Test that parsing does not load member data until it is accessed"""
+        ar_file = temp_dir / "lazy.a"
+        self.create_simple_ar_archive(ar_file, [
+            ("odd.o", b"abc"),
+            ("even.o", b"\x00zlib_inflate\x00")
+        ])
+        
+        members = extractor._parse_ar_archive(ar_file)
+        
+        assert [m._data for m in members] == [None, None]
+        assert members[1].offset == len(AR_MAGIC) + 2 * AR_HEADER_SIZE + 4
+        assert members[1].data == b"\x00zlib_inflate\x00"
+    
+    def test_duplicate_objects_skipped(self, extractor, temp_dir):
+        """Test that identical object members are analyzed once"""
+        ar_file = temp_dir / "dups.a"
+        content = b'\x00inflate_init\x00DEFLATE_LEVEL\x00'
+        self.create_simple_ar_archive(ar_file, [
+            ("zlib.o", content),
+            ("zlib.o", content),
+            ("zlib.o", content + b"extra_symbol\x00"),
+            ("other.o", content)
+        ])
+        
+        features = extractor.extract(ar_file)
+        
+        assert features.metadata['duplicate_objects'] == 1
+        assert [m['name'] for m in features.metadata['members']] == ["zlib.o", "zlib.o", "other.o"]
+    
+    def test_string_scanner_without_numpy(self, extractor):
+        """Test that the regex fallback finds the same printable runs"""
+        data = b'\x00\x01Hello World\x00\x02abc\x00    \x00OpenSSL_version\x00test123'
+        expected = extractor._extract_strings_from_bytes(data)
+        
+        with patch('binarysniffer.utils.byte_stats.HAS_NUMPY', False):
+            assert extractor._extract_strings_from_bytes(data) == expected
+        assert expected == ["Hello World", "OpenSSL_version", "test123"]
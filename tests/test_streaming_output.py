@@ -0,0 +1,146 @@
+"""
+Tests for streaming NDJSON and CycloneDX output
+"""
+
+import io
+import json
+
+import pytest
+import zstandard as zstd
+
+from binarysniffer.core.results import (
+    AnalysisResult,
+    BatchAnalysisResult,
+    ComponentMatch,
+    ExtractedFeaturesSummary
+)
+from binarysniffer.output import CycloneDxFormatter, CycloneDxStreamWriter, NdjsonWriter, is_ndjson_path
+from binarysniffer.output.streaming import output_suffix
+
+
+def make_result(file_path: str, *components: str, features: bool = True) -> AnalysisResult:
+    """Create a result matching the given components"""
+    return AnalysisResult(
+        file_path=file_path,
+        file_size=100,
+        file_type="binary",
+        matches=[
+            ComponentMatch(component=c, ecosystem="native", confidence=0.9,
+                           license="MIT", evidence={'signatures_matched': 4})
+            for c in components
+        ],
+        analysis_time=0.1,
+        features_extracted=2,
+        extracted_features=ExtractedFeaturesSummary(
+            total_count=2,
+            by_extractor={'binary': {'count': 2, 'features_by_type': {'strings': ['inflate', 'deflate']}}}
+        ) if features else None
+    )
+
+
+class TestNdjsonWriter:
+    """Test line-per-record output"""
+
+    @pytest.mark.parametrize("path,expected", [
+        ("results.ndjson", True),
+        ("results.JSONL", True),
+        ("results.ndjson.zst", True),
+        ("results.json", False),
+        ("results.json.zst", False),
+    ])
+    def test_is_ndjson_path(self, path, expected):
+        """Test NDJSON detection with and without compression"""
+        assert is_ndjson_path(path) is expected
+
+    def test_output_suffix(self):
+        """Test that .zst is ignored when detecting the format"""
+        assert output_suffix("sbom.CDX.zst") == ".cdx"
+        assert output_suffix("results.csv") == ".csv"
+
+    def test_write_records(self, tmp_path):
+        """Test that each record is one JSON line"""
+        path = tmp_path / "out.ndjson"
+        with NdjsonWriter(path) as writer:
+            writer.write({"record": "result", "file_path": "a"})
+            writer.write({"record": "summary", "total": 1})
+
+        lines = path.read_text().splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {"record": "result", "file_path": "a"},
+            {"record": "summary", "total": 1},
+        ]
+        assert writer.records == 2
+
+    def test_compressed_records_readable_before_close(self, tmp_path):
+        """Test that flushed records of an unfinished .zst file can be decompressed"""
+        path = tmp_path / "out.ndjson.zst"
+        writer = NdjsonWriter(path)
+        for i in range(3):
+            writer.write({"index": i})
+
+        # Simulates a crash: the frame is never ended
+        reader = zstd.ZstdDecompressor().stream_reader(io.BytesIO(path.read_bytes()))
+        data = reader.read()
+        assert [json.loads(line)["index"] for line in data.splitlines()] == [0, 1, 2]
+
+        writer.close()
+        with zstd.open(path, 'rt') as f:
+            assert len(f.readlines()) == 3
+
+
+class TestCycloneDxStreamWriter:
+    """Test incremental SBOM writing"""
+
+    @pytest.fixture
+    def batch(self):
+        """Create a batch with a component shared by two files"""
+        results = {
+            "/scan/a.so": make_result("/scan/a.so", "zlib@1.2.11", "libpng@1.6"),
+            "/scan/b.so": make_result("/scan/b.so", "zlib@1.2.11"),
+            "/scan/c.so": make_result("/scan/c.so", features=False),
+        }
+        return BatchAnalysisResult.from_results(results, total_time=0.3)
+
+    @staticmethod
+    def without_timestamps(value):
+        """Drop timestamps, which differ between two runs"""
+        if isinstance(value, dict):
+            return {k: TestCycloneDxStreamWriter.without_timestamps(v) for k, v in value.items() if k != "timestamp"}
+        if isinstance(value, list):
+            return [TestCycloneDxStreamWriter.without_timestamps(v) for v in value]
+        return value
+
+    @pytest.mark.parametrize("include_features", [False, True])
+    def test_matches_formatter(self, batch, include_features):
+        """Test that the streamed document equals the one built in memory"""
+        formatter = CycloneDxFormatter()
+        expected = json.loads(formatter.format_results(batch, include_features=include_features))
+
+        stream = io.StringIO()
+        writer = CycloneDxStreamWriter(stream, include_features=include_features, formatter=formatter)
+        for file_path, result in batch.results.items():
+            writer.add_result(file_path, result)
+        writer.close(batch)
+
+        streamed = json.loads(stream.getvalue())
+        assert self.without_timestamps(streamed) == self.without_timestamps(expected)
+        zlib = next(c for c in streamed["components"] if c["name"] == "zlib")
+        assert len(zlib["evidence"]["occurrences"]) == 2
+
+    def test_annotations_written_as_results_arrive(self, batch):
+        """Test that feature annotations are flushed per file"""
+        stream = io.StringIO()
+        writer = CycloneDxStreamWriter(stream, include_features=True)
+        writer.add_result("/scan/a.so", batch.results["/scan/a.so"])
+
+        assert "features-" in stream.getvalue()
+
+    def test_no_annotations(self):
+        """Test a valid document when no file has features"""
+        batch = BatchAnalysisResult.from_results({"/scan/c.so": make_result("/scan/c.so", features=False)}, 0.1)
+        stream = io.StringIO()
+        writer = CycloneDxStreamWriter(stream, include_features=True)
+        writer.add_result("/scan/c.so", batch.results["/scan/c.so"])
+        writer.close(batch)
+
+        assert json.loads(stream.getvalue())["annotations"] == []
@@ -0,0 +1,123 @@
+"""
+Tests for the TLSH nearest-neighbour index and signature store
+"""
+
+import json
+import random
+import tempfile
+from pathlib import Path
+
+import pytest
+
+tlsh = pytest.importorskip("tlsh")
+
+from binarysniffer.hashing import tlsh_index
+from binarysniffer.hashing.tlsh_hasher import TLSHSignatureStore
+from binarysniffer.hashing.tlsh_index import TLSHIndex, parse_tlsh, tlsh_distance
+
+
+def make_hashes(count: int, seed: int = 7):
+    """Create TLSH hashes of mutated variants of a few base blobs"""
+    rng = random.Random(seed)
+    bases = [rng.randbytes(rng.choice([1000, 4000, 20000])) for _ in range(6)]
+    hashes = []
+    for _ in range(count):
+        data = bytearray(rng.choice(bases))
+        for _ in range(rng.randint(0, 100)):
+            data[rng.randrange(len(data))] = rng.randrange(256)
+        hashes.append(tlsh.hash(bytes(data)))
+    return hashes
+
+
+@pytest.fixture(scope="module")
+def hashes():
+    """Create test hashes"""
+    return make_hashes(300)
+
+
+class TestTLSHIndex:
+    """Test TLSHIndex against tlsh.diff"""
+
+    def test_distance_matches_tlsh(self, hashes):
+        """Test that the table-based distance equals tlsh.diff"""
+        for a in hashes[:20]:
+            for b in hashes:
+                assert tlsh_distance(parse_tlsh(a), parse_tlsh(b)) == tlsh.diff(a, b)
+
+    @pytest.mark.parametrize("use_numpy", [True, False])
+    def test_query_matches_linear_scan(self, hashes, use_numpy, monkeypatch):
+        """Test that queries return exactly the hashes a linear scan finds"""
+        if use_numpy and not tlsh_index.HAS_NUMPY:
+            pytest.skip("NumPy not installed")
+        monkeypatch.setattr(tlsh_index, "HAS_NUMPY", use_numpy)
+
+        index = TLSHIndex((str(i), h) for i, h in enumerate(hashes))
+        for threshold in (0, 30, 100):
+            for target in hashes[:10]:
+                expected = sorted(
+                    ((str(i), tlsh.diff(target, h)) for i, h in enumerate(hashes)),
+                    key=lambda item: (item[1], int(item[0]))
+                )
+                assert index.query(target, threshold) == [e for e in expected if e[1] <= threshold]
+
+    def test_unprefixed_and_appended_hashes(self, hashes):
+        """Test that hashes without the T1 prefix and entries added after a query are found"""
+        index = TLSHIndex([("a", hashes[0][2:])])
+        index.query(hashes[1], 50)
+        index.add("b", hashes[1])
+
+        assert [key for key, _ in index.query(hashes[1], 0)] == ["b"]
+        assert index.query(hashes[0], 0) == [("a", 0)]
+        assert parse_tlsh("TNULL") is None
+
+class TestTLSHSignatureStore:
+    """Test the append-only binary signature store"""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Create temporary directory"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield Path(tmpdir)
+
+    def test_append_and_reload(self, temp_dir):
+        """Test that signatures are appended, replaced and read back"""
+        hashes = make_hashes(3)
+        path = temp_dir / "tlsh.bin"
+        store = TLSHSignatureStore(path)
+        store.add_signature("zlib", "1.2.13", hashes[0], {"license": "Zlib"})
+        size = path.stat().st_size
+        store.add_signatures([("zlib", "1.3", hashes[1], None), ("zlib", "1.2.13", hashes[2], None)])
+
+        assert path.read_bytes().startswith(TLSHSignatureStore.MAGIC)
+        assert path.stat().st_size > size
+
+        reloaded = TLSHSignatureStore(path)
+        assert reloaded.signatures == store.signatures
+        assert reloaded.get_signature("zlib", "1.2.13") == hashes[2]
+
+        matches = reloaded.find_matches(hashes[1], 0)
+        assert [(m["version"], m["distance"], m["similarity_level"]) for m in matches] == [("1.3", 0, "identical")]
+
+    def test_truncated_record_ignored(self, temp_dir):
+        """Test that a partially written record is dropped"""
+        hashes = make_hashes(2)
+        path = temp_dir / "tlsh.bin"
+        store = TLSHSignatureStore(path)
+        store.add_signatures([("a", "1", hashes[0], None), ("b", "1", hashes[1], None)])
+        path.write_bytes(path.read_bytes()[:-5])
+
+        assert list(TLSHSignatureStore(path).signatures) == ["a_1"]
+
+    def test_legacy_json_converted(self, temp_dir):
+        """Test that a legacy JSON store is read and converted on the next write"""
+        hashes = make_hashes(2)
+        legacy = {"zlib_1.0": {"component": "zlib", "version": "1.0", "hash": hashes[0], "metadata": {}}}
+        path = temp_dir / "tlsh.bin"
+        path.write_text(json.dumps(legacy, indent=2))
+
+        store = TLSHSignatureStore(path)
+        assert store.signatures == legacy
+        store.add_signature("zlib", "1.1", hashes[1])
+
+        assert path.read_bytes().startswith(TLSHSignatureStore.MAGIC)
+        assert list(TLSHSignatureStore(path).signatures) == ["zlib_1.0", "zlib_1.1"]
@@ -0,0 +1,187 @@
+"""
+Tests for process-pool directory analysis
+"""
+
+import hashlib
+import mmap
+import os
+import time
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from binarysniffer.core.base_analyzer import BaseAnalyzer
+from binarysniffer.core.config import Config
+from binarysniffer.core.results import AnalysisResult
+from binarysniffer.core.worker_pool import WorkerPool, process_rss_mb
+
+
+class StubAnalyzer(BaseAnalyzer):
+    """Analyzer that hangs, crashes or bloats on request, based on the file name"""
+
+    def analyze_file(self, file_path, confidence_threshold=None):
+        file_path = Path(file_path)
+        if file_path.name.startswith("hang"):
+            time.sleep(120)
+        if file_path.name.startswith("crash"):
+            os._exit(3)
+        if file_path.name.startswith("bloat"):
+            ballast = bytearray(512 * 1024 * 1024)  # noqa: F841
+            time.sleep(120)
+        if file_path.name.startswith("mapped"):
+            # Hash a large file through a memory map and hold it for a few memory polls
+            with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                hashlib.sha256(mm)
+                time.sleep(2)
+        return AnalysisResult(
+            file_path=str(file_path),
+            file_size=file_path.stat().st_size,
+            file_type="binary",
+            matches=[],
+            analysis_time=0.0,
+            features_extracted=os.getpid()
+        )
+
+
+class TestWorkerPool:
+    """Test process-pool analysis through analyze_directory"""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Create a directory with a handful of files"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            for i in range(12):
+                (tmpdir / f"lib{i:02d}.so").write_bytes(b"\x7fELF" + bytes(i))
+            yield tmpdir
+
+    @pytest.fixture
+    def analyzer(self, temp_dir):
+        """Create a stub analyzer using two worker processes"""
+        config = Config(data_dir=temp_dir / ".binarysniffer", auto_update=False, parallel_workers=2)
+        analyzer = StubAnalyzer(config)
+        analyzer.file_timeout = 2
+        return analyzer
+
+    def test_results_match_sequential_order(self, analyzer, temp_dir):
+        """Test that parallel results cover every file in sorted order"""
+        parallel = analyzer.analyze_directory(temp_dir, parallel=True)
+        sequential = analyzer.analyze_directory(temp_dir, parallel=False)
+
+        assert list(parallel.results) == list(sequential.results)
+        assert parallel.successful_files == 12
+        assert parallel.failed_files == 0
+
+        # Files were analyzed outside the parent process
+        worker_pids = {result.features_extracted for result in parallel.results.values()}
+        assert os.getpid() not in worker_pids
+
+    def test_timeout_kills_worker(self, analyzer, temp_dir):
+        """Test that a hanging file times out without blocking the others"""
+        (temp_dir / "hang.so").write_bytes(b"\x7fELF")
+
+        start = time.time()
+        batch = analyzer.analyze_directory(temp_dir, parallel=True)
+
+        assert time.time() - start < 30
+        assert "timeout" in batch.results[str(temp_dir / "hang.so")].error.lower()
+        assert batch.successful_files == 12
+        assert batch.failed_files == 1
+
+    def test_crashed_worker_replaced(self, analyzer, temp_dir):
+        """Test that a worker dying mid-file is reported and replaced"""
+        (temp_dir / "crash.so").write_bytes(b"\x7fELF")
+
+        batch = analyzer.analyze_directory(temp_dir, parallel=True)
+
+        error = batch.results[str(temp_dir / "crash.so")].error
+        assert "exited unexpectedly" in error
+        assert "exit code 3" in error
+        assert batch.successful_files == 12
+
+    def test_progress_callback(self, analyzer, temp_dir):
+        """Test that progress reaches the total file count"""
+        calls = []
+        analyzer.analyze_directory(
+            temp_dir,
+            parallel=True,
+            progress_callback=lambda current, total, file_path=None: calls.append((current, total))
+        )
+
+        assert calls[0] == (0, 12)
+        assert calls[-1] == (12, 12)
+
+    def test_result_callback(self, analyzer, temp_dir):
+        """Test that every file's final result is passed on as it completes"""
+        (temp_dir / "crash.so").write_bytes(b"\x7fELF")
+        received = {}
+
+        batch = analyzer.analyze_directory(
+            temp_dir,
+            parallel=True,
+            result_callback=lambda file_path, result: received.setdefault(file_path, result)
+        )
+
+        assert received.keys() == batch.results.keys()
+        assert all(received[path] is result for path, result in batch.results.items())
+        assert "exited unexpectedly" in received[str(temp_dir / "crash.so")].error
+
+    def test_worker_attributes_copied(self, analyzer):
+        """Test that analyzer settings are forwarded to workers"""
+        analyzer.show_features = True
+        pool = WorkerPool(analyzer, workers=2)
+
+        assert pool.analyzer_class is StubAnalyzer
+        assert pool.attributes['show_features'] is True
+        assert pool.attributes['file_timeout'] == 2
+
+    def test_sequential_timeout_kills_worker(self, analyzer, temp_dir):
+        """Test that --no-parallel scans are also isolated in a worker"""
+        (temp_dir / "hang.so").write_bytes(b"\x7fELF")
+
+        start = time.time()
+        batch = analyzer.analyze_directory(temp_dir, parallel=False)
+
+        assert time.time() - start < 30
+        assert "timeout" in batch.results[str(temp_dir / "hang.so")].error.lower()
+        assert batch.successful_files == 12
+
+    def test_workers_recycled_after_max_tasks(self, analyzer, temp_dir):
+        """Test that a worker is replaced after worker_max_tasks files"""
+        analyzer.config.worker_max_tasks = 3
+
+        batch = analyzer.analyze_directory(temp_dir, parallel=False)
+
+        assert batch.successful_files == 12
+        worker_pids = [result.features_extracted for result in batch.results.values()]
+        assert len(set(worker_pids)) == 4
+        assert all(worker_pids.count(pid) == 3 for pid in set(worker_pids))
+
+    @pytest.mark.skipif(process_rss_mb(os.getpid()) is None, reason="RSS of other processes not measurable")
+    def test_memory_ceiling_kills_worker(self, analyzer, temp_dir):
+        """Test that a worker above the RSS ceiling is killed mid-file"""
+        analyzer.config.worker_max_rss_mb = 256
+        analyzer.file_timeout = 60
+        (temp_dir / "bloat.so").write_bytes(b"\x7fELF")
+
+        start = time.time()
+        batch = analyzer.analyze_directory(temp_dir, parallel=True)
+
+        assert time.time() - start < 30
+        assert "memory limit" in batch.results[str(temp_dir / "bloat.so")].error
+        assert batch.successful_files == 12
+
+    @pytest.mark.skipif(process_rss_mb(os.getpid()) is None, reason="RSS of other processes not measurable")
+    def test_mapped_file_within_memory_ceiling(self, analyzer, temp_dir):
+        """Test that file-backed pages of a mapped model do not count towards the ceiling"""
+        analyzer.config.worker_max_rss_mb = 256
+        analyzer.file_timeout = 60
+        mapped = temp_dir / "mapped.safetensors"
+        with open(mapped, 'wb') as f:
+            f.truncate(400 * 1024 * 1024)  # Sparse: read back as zero-filled page cache
+
+        batch = analyzer.analyze_directory(temp_dir, parallel=True, include_large=True)
+
+        assert batch.results[str(mapped)].error is None
+        assert batch.successful_files == 13